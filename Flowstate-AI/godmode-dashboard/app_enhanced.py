@@ -13,7 +13,7 @@ Robust error handling and recovery
 try:
     # type: ignore - some environments/linters may not have these packages available
     from flask import Flask, render_template, jsonify, request, send_from_directory  # type: ignore
-    from flask_socketio import SocketIO, emit  # type: ignore
+    from flask_socketio import SocketIO, emit, join_room  # type: ignore
     FLASK_AVAILABLE = True
 except Exception as _import_err:
     # Avoid raising during import; provide a flag and useful message at runtime.
@@ -55,6 +55,10 @@ import uuid
 from self_improvement import SelfImprovementAgent
 from github_integration import GitHubIntegration
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent))
+
+from flowstate_ai.dashboard_feed import ChangeFeed
+
 # Enhanced logging configuration
 log_dir = Path(__file__).parent / "logs"
 log_dir.mkdir(exist_ok=True)
@@ -105,6 +109,14 @@ else:
     app = None
     socketio = None
 
+STATUS_ROOM = "status"
+
+# Fields that change on every tick without carrying information for the UI
+VOLATILE_AGENT_FIELDS = ('last_update', 'last_heartbeat')
+VOLATILE_STATS_FIELDS = ('uptime',)
+
+feed = ChangeFeed(socketio.emit, patch_event='status_patch', snapshot_event='status_snapshot') if socketio else None
+
 class GodmodeMonitorEnhanced:
     """
     Enhanced Real-time AI monitoring system
@@ -621,11 +633,24 @@ class GodmodeMonitorEnhanced:
         except Exception as e:
             logger.error(f"Failed to check heartbeats: {e}")
     
+    def _get_change_model(self) -> Dict[str, Any]:
+        """Dashboard data without per-tick volatile fields, for change detection"""
+        data = self.get_dashboard_data()
+        data.pop('timestamp', None)
+        data['ai_agents'] = [
+            {k: v for k, v in agent.items() if k not in VOLATILE_AGENT_FIELDS}
+            for agent in data.get('ai_agents', [])
+        ]
+        data['system_stats'] = {
+            k: v for k, v in data.get('system_stats', {}).items() if k not in VOLATILE_STATS_FIELDS
+        }
+        return data
+    
     def _emit_status_update(self):
-        """Emit status update via SocketIO"""
+        """Push status changes via SocketIO; nothing is sent when nothing changed"""
         try:
-            dashboard_data = self.get_dashboard_data()
-            socketio.emit('status_update', dashboard_data)
+            if feed is not None:
+                feed.publish(STATUS_ROOM, self._get_change_model())
             
         except Exception as e:
             logger.error(f"Failed to emit status update: {e}")
@@ -797,7 +822,8 @@ def handle_connect(auth=None):
     """Handle client connection"""
     try:
         logger.info(f"Client connected: {request.sid}")
-        emit('status_update', monitor.get_dashboard_data())
+        join_room(STATUS_ROOM)
+        feed.send_snapshot(STATUS_ROOM, emit)
     except Exception as e:
         logger.error(f"SocketIO connect error: {e}")
 
@@ -817,6 +843,14 @@ def handle_request_update():
     except Exception as e:
         logger.error(f"SocketIO update request error: {e}")
 
+@socketio.on('resync')
+def handle_resync(data=None):
+    """Resend the status snapshot after a client detects a missed version"""
+    try:
+        feed.send_snapshot(STATUS_ROOM, emit)
+    except Exception as e:
+        logger.error(f"SocketIO resync error: {e}")
+
 # Create basic HTML template if it doesn't exist
 def create_basic_template():
     """Create a basic HTML template for the dashboard"""
@@ -865,11 +899,45 @@ def create_basic_template():
 
     <script>
         const socket = io();
+        let state = null;
+        let version = 0;
         
         socket.on('status_update', function(data) {
             updateDashboard(data);
         });
         
+        socket.on('status_snapshot', function(message) {
+            state = message.data;
+            version = message.version;
+            updateDashboard(Object.assign({timestamp: new Date().toISOString()}, state));
+        });
+        
+        socket.on('status_patch', function(message) {
+            if (message.version !== version + 1 && message.version !== 1) {
+                socket.emit('resync');
+                return;
+            }
+            state = applyPatch(state, message.ops);
+            version = message.version;
+            updateDashboard(Object.assign({timestamp: new Date().toISOString()}, state));
+        });
+        
+        function applyPatch(doc, ops) {
+            ops.forEach(op => {
+                if (op.path === '') { doc = op.value; return; }
+                const tokens = op.path.split('/').slice(1).map(t => t.replace(/~1/g, '/').replace(/~0/g, '~'));
+                let target = doc;
+                tokens.slice(0, -1).forEach(t => { target = target[t]; });
+                const last = tokens[tokens.length - 1];
+                if (op.op === 'remove') {
+                    if (Array.isArray(target)) target.splice(Number(last), 1); else delete target[last];
+                } else {
+                    target[last] = op.value;
+                }
+            });
+            return doc;
+        }
+        
         function updateDashboard(data) {
             // Update stats
             const statsHtml = `
@@ -917,13 +985,7 @@ def create_basic_template():
             document.getElementById('timestamp').innerHTML = `Last updated: ${new Date(data.timestamp).toLocaleString()}`;
         }
         
-        // Request initial update
-        socket.emit('request_update');
-        
-        // Auto-refresh every 30 seconds
-        setInterval(() => {
-            socket.emit('request_update');
-        }, 30000);
+        // Snapshot and patches are pushed by the server; no polling needed
     </script>
 </body>
 </html>'''
@@ -0,0 +1,222 @@
+"""
+Building blocks for API analytics rollups: a mergeable latency histogram,
+per-minute rollup accumulation and a buffer that batches request log writes.
+"""
+
+import atexit
+import json
+import logging
+import math
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Bucket i covers (MIN_VALUE * GROWTH**(i-1), MIN_VALUE * GROWTH**i], so any
+# quantile is within about 5% of the true value, whatever the time unit
+HISTOGRAM_GROWTH = 1.1
+HISTOGRAM_MIN_VALUE = 0.01
+_LOG_GROWTH = math.log(HISTOGRAM_GROWTH)
+
+
+class LatencyHistogram:
+    """Sparse log-bucketed histogram that merges by adding bucket counts."""
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self.counts: Dict[int, int] = dict(counts or {})
+
+    @staticmethod
+    def bucket_index(value: float) -> int:
+        if value <= HISTOGRAM_MIN_VALUE:
+            return 0
+        return math.ceil(math.log(value / HISTOGRAM_MIN_VALUE) / _LOG_GROWTH - 1e-9)
+
+    @staticmethod
+    def bucket_value(index: int) -> float:
+        """Representative value of a bucket (midpoint of its bounds)."""
+        if index == 0:
+            return HISTOGRAM_MIN_VALUE
+        upper = HISTOGRAM_MIN_VALUE * HISTOGRAM_GROWTH ** index
+        return (upper / HISTOGRAM_GROWTH + upper) / 2
+
+    @property
+    def total(self) -> int:
+        return sum(self.counts.values())
+
+    def add(self, value: float, count: int = 1):
+        index = self.bucket_index(value)
+        self.counts[index] = self.counts.get(index, 0) + count
+
+    def merge(self, other: 'LatencyHistogram'):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate q-quantile (0 <= q <= 1), or None when empty."""
+        total = self.total
+        if not total:
+            return None
+        rank = max(1, math.ceil(q * total))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return self.bucket_value(index)
+        return self.bucket_value(max(self.counts))
+
+    def to_json(self) -> str:
+        return json.dumps({str(index): count for index, count in sorted(self.counts.items())},
+                          separators=(',', ':'))
+
+    @classmethod
+    def from_json(cls, raw: Optional[str]) -> 'LatencyHistogram':
+        if not raw:
+            return cls()
+        return cls({int(index): count for index, count in json.loads(raw).items()})
+
+
+def minute_bucket(timestamp: datetime) -> datetime:
+    return timestamp.replace(second=0, microsecond=0)
+
+
+@dataclass
+class RollupPartial:
+    """Totals for one endpoint in one minute."""
+
+    request_count: int = 0
+    error_count: int = 0
+    total_response_time: float = 0.0
+    max_response_time: float = 0.0
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+
+    def add(self, status_code: int, response_time: Optional[float]):
+        self.request_count += 1
+        if status_code is not None and status_code >= 400:
+            self.error_count += 1
+        if response_time is not None:
+            self.total_response_time += response_time
+            self.max_response_time = max(self.max_response_time, response_time)
+            self.histogram.add(response_time)
+
+    def merge(self, other: 'RollupPartial'):
+        self.request_count += other.request_count
+        self.error_count += other.error_count
+        self.total_response_time += other.total_response_time
+        self.max_response_time = max(self.max_response_time, other.max_response_time)
+        self.histogram.merge(other.histogram)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'request_count': self.request_count,
+            'error_count': self.error_count,
+            'avg_response_time': self.total_response_time / self.request_count if self.request_count else 0,
+            'max_response_time': self.max_response_time,
+            'p50_response_time': self.histogram.quantile(0.50),
+            'p95_response_time': self.histogram.quantile(0.95),
+            'p99_response_time': self.histogram.quantile(0.99)
+        }
+
+
+def summarize_requests(records: List[Dict[str, Any]]) -> Dict[Tuple[datetime, str], RollupPartial]:
+    """
+    Fold request records into per-minute, per-endpoint partials.
+
+    Each record needs timestamp, endpoint, status_code and response_time.
+    """
+    partials: Dict[Tuple[datetime, str], RollupPartial] = {}
+    for record in records:
+        key = (minute_bucket(record['timestamp']), record['endpoint'])
+        partial = partials.get(key)
+        if partial is None:
+            partial = partials[key] = RollupPartial()
+        partial.add(record['status_code'], record.get('response_time'))
+    return partials
+
+
+class RequestLogBuffer:
+    """
+    Collects request records in memory and hands them to `flush_callback` in
+    batches, from a background thread, instead of writing one per request.
+    """
+
+    def __init__(self, flush_callback: Callable[[List[Dict[str, Any]]], None],
+                 max_batch: int = 500, flush_interval: float = 1.0, max_pending: int = 50000):
+        """
+        Args:
+            flush_callback: Writes a batch of records; called outside the buffer lock
+            max_batch: Pending records that trigger an early flush
+            flush_interval: Seconds between background flushes
+            max_pending: Records kept while the store is failing before the oldest are dropped
+        """
+        self.flush_callback = flush_callback
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.dropped = 0
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def start(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name='request-log-flush', daemon=True)
+            self._thread.start()
+            # The thread is a daemon, so write what is left when the interpreter exits
+            atexit.register(self.close)
+
+    def append(self, record: Dict[str, Any]):
+        with self._lock:
+            self._pending.append(record)
+            overflow = len(self._pending) - self.max_pending
+            if overflow > 0:
+                del self._pending[:overflow]
+                self.dropped += overflow
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """Write everything pending now; returns the number of records written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+            if not batch:
+                return 0
+            try:
+                self.flush_callback(batch)
+            except Exception as e:
+                logger.error(f"Failed to write {len(batch)} request log records: {e}")
+                # Put them back ahead of newer records to retry on the next flush
+                with self._lock:
+                    self._pending[:0] = batch
+                    overflow = len(self._pending) - self.max_pending
+                    if overflow > 0:
+                        del self._pending[:overflow]
+                        self.dropped += overflow
+                return 0
+            return len(batch)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def close(self):
+        """Stop the background thread and write what is left."""
+        self._stopped.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            atexit.unregister(self.close)
+        self.flush()
@@ -1,13 +1,157 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from contextlib import asynccontextmanager
+from fastapi import APIRouter, FastAPI, Depends, HTTPException, Request
+from sqlalchemy import Column, DateTime, Float, Integer, String, Text, UniqueConstraint, case, func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, declarative_base
 from datetime import datetime, timedelta
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
+import time
 
 from backend.database import get_db
 from backend.models import APIUsage, APIPerformance
 from backend.schemas import APIUsageSchema, APIPerformanceSchema, AnalyticsSummary
+from backend.analytics_rollup import LatencyHistogram, RequestLogBuffer, RollupPartial, summarize_requests
+
+RollupBase = declarative_base()
+
+
+class APIRequestRollup(RollupBase):
+    """Per-minute, per-endpoint request totals and latency histogram, updated as requests are logged"""
+    __tablename__ = "api_request_rollups"
+    __table_args__ = (UniqueConstraint("minute", "endpoint", name="uq_api_request_rollups_minute_endpoint"),)
+
+    id = Column(Integer, primary_key=True)
+    minute = Column(DateTime, nullable=False, index=True)
+    endpoint = Column(String(255), nullable=False)
+    request_count = Column(Integer, nullable=False, default=0)
+    error_count = Column(Integer, nullable=False, default=0)
+    total_response_time = Column(Float, nullable=False, default=0.0)
+    max_response_time = Column(Float, nullable=False, default=0.0)
+    histogram = Column(Text, nullable=False, default="{}")
+
+
+def create_rollup_tables(engine):
+    """Create the rollup table if it does not exist"""
+    RollupBase.metadata.create_all(bind=engine)
+
+
+def write_request_batch(db: Session, records: List[Dict[str, Any]]):
+    """
+    Insert a batch of request records and fold them into the rollups, in one transaction.
+
+    Each record has endpoint, method, status_code, response_time and timestamp.
+    """
+    for attempt in range(2):
+        try:
+            db.bulk_insert_mappings(APIUsage, [
+                {
+                    "endpoint": r["endpoint"],
+                    "method": r["method"],
+                    "status_code": r["status_code"],
+                    "timestamp": r["timestamp"]
+                }
+                for r in records
+            ])
+            db.bulk_insert_mappings(APIPerformance, [
+                {"endpoint": r["endpoint"], "response_time": r["response_time"], "timestamp": r["timestamp"]}
+                for r in records if r.get("response_time") is not None
+            ])
+
+            partials = summarize_requests(records)
+            minutes = {minute for minute, _ in partials}
+            endpoints = {endpoint for _, endpoint in partials}
+            existing = {
+                (row.minute, row.endpoint): row
+                for row in db.query(APIRequestRollup).filter(
+                    APIRequestRollup.minute.in_(minutes),
+                    APIRequestRollup.endpoint.in_(endpoints)
+                ).with_for_update()
+            }
+            for (minute, endpoint), partial in partials.items():
+                row = existing.get((minute, endpoint))
+                if row is None:
+                    db.add(APIRequestRollup(
+                        minute=minute,
+                        endpoint=endpoint,
+                        request_count=partial.request_count,
+                        error_count=partial.error_count,
+                        total_response_time=partial.total_response_time,
+                        max_response_time=partial.max_response_time,
+                        histogram=partial.histogram.to_json()
+                    ))
+                else:
+                    histogram = LatencyHistogram.from_json(row.histogram)
+                    histogram.merge(partial.histogram)
+                    row.request_count += partial.request_count
+                    row.error_count += partial.error_count
+                    row.total_response_time += partial.total_response_time
+                    row.max_response_time = max(row.max_response_time, partial.max_response_time)
+                    row.histogram = histogram.to_json()
+            db.commit()
+            return
+        except IntegrityError:
+            # Another worker created one of the rollup rows first; retry as an update
+            db.rollback()
+            if attempt:
+                raise
+
+
+def _flush_request_log(records: List[Dict[str, Any]]):
+    db_gen = get_db()
+    db = next(db_gen)
+    try:
+        write_request_batch(db, records)
+    finally:
+        db_gen.close()
+
+
+# Requests are logged through this buffer and written in batches by a background thread
+request_log = RequestLogBuffer(_flush_request_log)
+
+
+@asynccontextmanager
+async def analytics_lifespan(app: FastAPI):
+    """Write buffered request records when the app shuts down"""
+    yield
+    request_log.close()
+
+
+# Apps including this router get its lifespan, so they write buffered records on
+# shutdown; the buffer also flushes at interpreter exit for processes that never
+# shut down cleanly
+router = APIRouter(prefix="/analytics", tags=["analytics"], lifespan=analytics_lifespan)
+
+
+def log_request(endpoint: str, method: str, status_code: int, response_time: Optional[float],
+                timestamp: Optional[datetime] = None):
+    """Queue a request for the usage, performance and rollup tables"""
+    request_log.start()
+    request_log.append({
+        "endpoint": endpoint,
+        "method": method,
+        "status_code": status_code,
+        "response_time": response_time,
+        "timestamp": timestamp or datetime.utcnow()
+    })
+
+
+async def analytics_middleware(request: Request, call_next):
+    """
+    HTTP middleware logging every request; register with app.middleware("http")(analytics_middleware).
+    Response times are recorded in milliseconds.
+    """
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        # Label by route template so /items/1 and /items/2 share a rollup
+        route = request.scope.get("route")
+        endpoint = getattr(route, "path", None) or request.url.path
+        log_request(endpoint, request.method, status_code, (time.perf_counter() - start) * 1000)
 
-router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 @router.get("/usage", response_model=List[APIUsageSchema])
 async def get_api_usage(
@@ -47,18 +191,15 @@ async def get_analytics_summary(
     """Provide summary analytics for the past `days` days"""
     since = datetime.utcnow() - timedelta(days=days)
 
-    total_calls = db.query(APIUsage).filter(APIUsage.timestamp >= since).count()
-    avg_response_time = db.query(APIPerformance).filter(APIPerformance.timestamp >= since).with_entities(
-        APIPerformance.response_time
-    ).all()
-    avg_response_time_value = 0
-    if avg_response_time:
-        avg_response_time_value = sum(r[0] for r in avg_response_time) / len(avg_response_time)
+    # Counted and averaged in the database rather than row by row in Python
+    total_calls, error_count = db.query(
+        func.count(),
+        func.coalesce(func.sum(case((APIUsage.status_code >= 400, 1), else_=0)), 0)
+    ).filter(APIUsage.timestamp >= since).one()
 
-    error_count = db.query(APIUsage).filter(
-        APIUsage.timestamp >= since,
-        APIUsage.status_code >= 400
-    ).count()
+    avg_response_time_value = db.query(func.avg(APIPerformance.response_time)).filter(
+        APIPerformance.timestamp >= since
+    ).scalar() or 0
 
     return AnalyticsSummary(
         total_calls=total_calls,
@@ -66,3 +207,65 @@ async def get_analytics_summary(
         error_count=error_count,
         period_days=days
     )
+
+@router.get("/endpoints")
+async def get_endpoint_summary(
+    days: int = 7,
+    db: Session = Depends(get_db),
+):
+    """Calls, errors and average response time per endpoint for the past `days` days"""
+    since = datetime.utcnow() - timedelta(days=days)
+
+    usage = db.query(
+        APIUsage.endpoint,
+        func.count(),
+        func.coalesce(func.sum(case((APIUsage.status_code >= 400, 1), else_=0)), 0)
+    ).filter(APIUsage.timestamp >= since).group_by(APIUsage.endpoint).all()
+
+    averages = dict(db.query(
+        APIPerformance.endpoint,
+        func.avg(APIPerformance.response_time)
+    ).filter(APIPerformance.timestamp >= since).group_by(APIPerformance.endpoint).all())
+
+    results = [
+        {
+            "endpoint": endpoint,
+            "total_calls": total_calls,
+            "error_count": error_count,
+            "avg_response_time": averages.get(endpoint) or 0
+        }
+        for endpoint, total_calls, error_count in usage
+    ]
+    results.sort(key=lambda r: r["total_calls"], reverse=True)
+    return results
+
+@router.get("/latency")
+async def get_latency_percentiles(
+    minutes: int = 60,
+    endpoint: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """Approximate p50/p95/p99 latency per endpoint over the past `minutes` minutes, from the rollups"""
+    if minutes <= 0:
+        raise HTTPException(status_code=400, detail="minutes must be positive")
+    since = datetime.utcnow().replace(second=0, microsecond=0) - timedelta(minutes=minutes - 1)
+
+    query = db.query(APIRequestRollup).filter(APIRequestRollup.minute >= since)
+    if endpoint:
+        query = query.filter(APIRequestRollup.endpoint == endpoint)
+
+    # Rows scale with minutes x endpoints, not with the number of requests
+    merged: Dict[str, RollupPartial] = {}
+    for row in query:
+        partial = merged.setdefault(row.endpoint, RollupPartial())
+        partial.merge(RollupPartial(
+            request_count=row.request_count,
+            error_count=row.error_count,
+            total_response_time=row.total_response_time,
+            max_response_time=row.max_response_time,
+            histogram=LatencyHistogram.from_json(row.histogram)
+        ))
+
+    results = [dict(endpoint=name, **partial.summary()) for name, partial in merged.items()]
+    results.sort(key=lambda r: r["request_count"], reverse=True)
+    return results
@@ -1,26 +1,141 @@
 import os
+import re
 import json
+import gzip
+import pickle
+import tempfile
 import threading
-import time
 from datetime import datetime
 
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Snapshot kinds, recorded in the file name
+FULL = 'full'
+DELTA = 'delta'
+
+_VERSION_FILE = re.compile(r'^version_(\d+)_')
+
+
+def _escape(key):
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def _unescape(token):
+    return token.replace('~1', '/').replace('~0', '~')
+
+
+def diff(old, new, path=''):
+    """
+    JSON Patch (RFC 6902) operations turning `old` into `new`.
+
+    Dicts are compared key by key and lists element-wise, with the tail added
+    or removed, so appends and in-place edits stay small.
+    """
+    if type(old) is not type(new):
+        return [{'op': 'replace', 'path': path, 'value': new}]
+
+    if isinstance(old, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f'{path}/{_escape(key)}'})
+        for key, value in new.items():
+            child = f'{path}/{_escape(key)}'
+            if key not in old:
+                ops.append({'op': 'add', 'path': child, 'value': value})
+            elif old[key] != value:
+                ops.extend(diff(old[key], value, child))
+        return ops
+
+    if isinstance(old, list):
+        ops = []
+        for i, (before, after) in enumerate(zip(old, new)):
+            if before != after:
+                ops.extend(diff(before, after, f'{path}/{i}'))
+        ops.extend({'op': 'remove', 'path': f'{path}/{i}'} for i in range(len(old) - 1, len(new) - 1, -1))
+        ops.extend({'op': 'add', 'path': f'{path}/-', 'value': value} for value in new[len(old):])
+        return ops
+
+    if old != new:
+        return [{'op': 'replace', 'path': path, 'value': new}]
+    return []
+
+
+def apply_patch(doc, ops):
+    """Apply operations produced by diff() to `doc` in place and return the result."""
+    for op in ops:
+        path = op['path']
+        if path == '':
+            doc = op['value']
+            continue
+        tokens = [_unescape(token) for token in path.split('/')[1:]]
+        parent = doc
+        for token in tokens[:-1]:
+            parent = parent[int(token)] if isinstance(parent, list) else parent[token]
+        last = tokens[-1]
+
+        if isinstance(parent, list):
+            if op['op'] == 'add' and last == '-':
+                parent.append(op['value'])
+            elif op['op'] == 'add':
+                parent.insert(int(last), op['value'])
+            elif op['op'] == 'remove':
+                del parent[int(last)]
+            else:
+                parent[int(last)] = op['value']
+        elif op['op'] == 'remove':
+            del parent[last]
+        else:
+            parent[last] = op['value']
+    return doc
+
+
 class AutoSaveManager:
-    def __init__(self, save_dir='auto_saves', interval=5):
+    def __init__(self, save_dir='auto_saves', interval=5, compression=None,
+                 compact_every=20, compact_ratio=0.5, require_mark_dirty=False):
         """
         :param save_dir: Directory where auto-save files will be stored
         :param interval: Auto-save interval in seconds
+        :param compression: 'zstd' or 'gzip' (default: zstd when installed, else gzip)
+        :param compact_every: Write a full snapshot after this many deltas
+        :param compact_ratio: Also write a full snapshot once the deltas since the last
+            one add up to this fraction of its size
+        :param require_mark_dirty: Only save after mark_dirty() was called, without
+            fetching the state at all on clean intervals
         """
         self.save_dir = save_dir
         self.interval = interval
+        self.compression = compression or ('zstd' if zstandard is not None else 'gzip')
+        if self.compression == 'zstd' and zstandard is None:
+            raise ImportError("zstd compression requires the 'zstandard' package")
+        self.compact_every = compact_every
+        self.compact_ratio = compact_ratio
+        self.require_mark_dirty = require_mark_dirty
         self.data = None
         self.version = 0
+        self.stats = {'saved_full': 0, 'saved_delta': 0, 'skipped': 0, 'bytes_written': 0}
         self._stop_event = threading.Event()
         self._lock = threading.Lock()
         self._thread = None
+        self._dirty = True
+        # Last saved state and the file holding it
+        self._saved_state = None
+        self._saved_file = None
+        self._full_size = 0
+        self._deltas_since_full = 0
+        self._delta_bytes_since_full = 0
 
         if not os.path.exists(self.save_dir):
             os.makedirs(self.save_dir)
 
+        # Continue numbering after versions left by a previous run
+        existing = self.list_versions()
+        if existing:
+            self.version = self._version_number(existing[0])
+
     def start(self, get_data_callback):
         """
         Start the auto-save thread
@@ -32,26 +147,120 @@ class AutoSaveManager:
         self._thread.start()
 
     def _run(self):
-        while not self._stop_event.is_set():
-            time.sleep(self.interval)
+        while not self._stop_event.wait(self.interval):
             self.save_version()
 
-    def save_version(self):
+    def mark_dirty(self):
+        """Record that the tracked state changed since the last save"""
+        self._dirty = True
+
+    def save_version(self, data=None):
         """
-        Save a new version of the data
+        Save a new version of the data if it changed since the last save
+        :param data: state to save (defaults to the get_data_callback result)
+        :return: filename written, or None if nothing was saved
         """
         with self._lock:
-            self.data = self.get_data_callback()
-            if self.data is None:
-                return
+            return self._save(data)
 
-            timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
-            self.version += 1
-            filename = f'version_{self.version}_{timestamp}.json'
-            filepath = os.path.join(self.save_dir, filename)
+    def _save(self, data=None):
+        if data is None:
+            if self.require_mark_dirty and not self._dirty:
+                self.stats['skipped'] += 1
+                return None
+            data = self.get_data_callback()
+            if data is None:
+                return None
+        self._dirty = False
 
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
+        # Diff the live data first, so a clean interval costs no copy
+        payload = None
+        kind = FULL
+        if self._saved_state is not None:
+            ops = diff(self._saved_state, data)
+            if not ops:
+                self.stats['skipped'] += 1
+                return None
+            if not self._needs_compaction():
+                delta = json.dumps({'parent': self._saved_file, 'ops': ops}, ensure_ascii=False,
+                                   separators=(',', ':'))
+                # A delta bigger than the last full snapshot is better written in full
+                if len(delta) < self._full_size:
+                    payload = delta
+                    kind = DELTA
+        if payload is None:
+            payload = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        # Private copy, so the next diff is not affected by the caller mutating its objects
+        state = pickle.loads(pickle.dumps(data, protocol=pickle.HIGHEST_PROTOCOL))
+
+        timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+        version = self.version + 1
+        filename = f'version_{version}_{timestamp}.{kind}.json{self._extension()}'
+        written = self._write_atomic(filename, payload.encode('utf-8'))
+
+        self.version = version
+        self.data = data
+        self._saved_state = state
+        self._saved_file = filename
+        self.stats['bytes_written'] += written
+        # Compaction compares uncompressed sizes, which is what a restore replays
+        if kind == FULL:
+            self._full_size = len(payload)
+            self._deltas_since_full = 0
+            self._delta_bytes_since_full = 0
+            self.stats['saved_full'] += 1
+        else:
+            self._deltas_since_full += 1
+            self._delta_bytes_since_full += len(payload)
+            self.stats['saved_delta'] += 1
+        return filename
+
+    def _needs_compaction(self):
+        return (self._deltas_since_full >= self.compact_every
+                or self._delta_bytes_since_full > self._full_size * self.compact_ratio)
+
+    def _extension(self):
+        return '.zst' if self.compression == 'zstd' else '.gz'
+
+    def _write_atomic(self, filename, raw):
+        if self.compression == 'zstd':
+            compressed = zstandard.ZstdCompressor(level=3).compress(raw)
+        else:
+            compressed = gzip.compress(raw, compresslevel=6, mtime=0)
+
+        # Write beside the target and rename so a crash never leaves a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.save_dir, prefix='.tmp_', suffix='.part')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compressed)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, os.path.join(self.save_dir, filename))
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return len(compressed)
+
+    def _read(self, filename):
+        filepath = os.path.join(self.save_dir, filename)
+        if not os.path.exists(filepath):
+            raise FileNotFoundError(f"Version file {filename} not found")
+
+        with open(filepath, 'rb') as f:
+            raw = f.read()
+        if filename.endswith('.zst'):
+            if zstandard is None:
+                raise ImportError("Reading zstd snapshots requires the 'zstandard' package")
+            raw = zstandard.ZstdDecompressor().decompress(raw)
+        elif filename.endswith('.gz'):
+            raw = gzip.decompress(raw)
+        return json.loads(raw.decode('utf-8'))
+
+    @staticmethod
+    def _version_number(filename):
+        match = _VERSION_FILE.match(filename)
+        return int(match.group(1)) if match else -1
 
     def list_versions(self):
         """
@@ -59,22 +268,25 @@ class AutoSaveManager:
         :return: list of filenames
         """
         files = os.listdir(self.save_dir)
-        versions = [f for f in files if f.startswith('version_') and f.endswith('.json')]
-        versions.sort(reverse=True)  # Newest first
+        versions = [f for f in files if f.startswith('version_') and re.search(r'\.json(\.gz|\.zst)?$', f)]
+        versions.sort(key=self._version_number, reverse=True)  # Newest first
         return versions
 
     def load_version(self, filename):
         """
-        Load a specific version file
+        Load a specific version file, replaying deltas onto their full snapshot
         :param filename: name of the version file
         :return: data loaded from file
         """
-        filepath = os.path.join(self.save_dir, filename)
-        if not os.path.exists(filepath):
-            raise FileNotFoundError(f"Version file {filename} not found")
+        chain = []
+        while f'.{DELTA}.json' in filename:
+            delta = self._read(filename)
+            chain.append(delta['ops'])
+            filename = delta['parent']
 
-        with open(filepath, 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = self._read(filename)
+        for ops in reversed(chain):
+            data = apply_patch(data, ops)
         return data
 
     def rollback(self, filename):
@@ -85,9 +297,9 @@ class AutoSaveManager:
         """
         data = self.load_version(filename)
         with self._lock:
-            self.data = data
             # Save a new version after rollback to keep history
-            self.save_version()
+            self._save(data)
+            self.data = data
         return data
 
     def stop(self):
@@ -1,74 +1,643 @@
-from datetime import datetime
-from typing import Optional, List, Dict
+import atexit
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Optional, List, Dict, Iterator, Sequence
+
+import numpy as np
+
+# Placeholder for "never" in per-user time arrays
+NEVER = np.iinfo(np.int64).max
+
+DAY_MS = 24 * 60 * 60 * 1000
+PERIOD_MS = {'day': DAY_MS, 'week': 7 * DAY_MS}
+# 1970-01-01 was a Thursday; shifting by 3 days makes weeks start on Monday
+PERIOD_OFFSET_MS = {'day': 0, 'week': 3 * DAY_MS}
+
+# Column name -> dtype of each segment file
+SEGMENT_COLUMNS = {'ts': np.int64, 'user': np.int32, 'type': np.int16, 'value': np.float64}
+
+LEAD_EVENT = 'lead'
+CONVERSION_EVENT = 'conversion'
+
+
+def _to_ms(timestamp) -> int:
+    if timestamp is None:
+        timestamp = datetime.utcnow()
+    if isinstance(timestamp, datetime):
+        if timestamp.tzinfo is None:
+            timestamp = timestamp.replace(tzinfo=timezone.utc)
+        return int(timestamp.timestamp() * 1000)
+    return int(timestamp)
+
+
+def _from_ms(ms: int) -> datetime:
+    return datetime.utcfromtimestamp(ms / 1000)
+
+
+class Segment:
+    """One immutable column chunk of a partition, memory-mapped on access."""
+
+    def __init__(self, path: str, rows: int, min_ts: int, max_ts: int):
+        self.path = path
+        self.rows = rows
+        self.min_ts = min_ts
+        self.max_ts = max_ts
+
+    def column(self, name: str) -> np.ndarray:
+        return np.load(os.path.join(self.path, f'{name}.npy'), mmap_mode='r')
+
+
+class EventStore:
+    """
+    Append-only event store partitioned by month.
+
+    Event types and user ids are dictionary-encoded to small integers in a
+    SQLite catalog, and events are written as immutable NumPy column segments
+    (timestamp, user, type, value) that queries memory-map one at a time, so
+    memory stays proportional to the number of users rather than events.
+
+    Single events are committed to a pending_events table in the catalog as
+    they arrive and moved into segments in bulk, so nothing acknowledged is
+    lost when the process stops before a flush.
+    """
+
+    def __init__(self, root_dir: str, buffer_rows: int = 200_000, compact_after: int = 16,
+                 user_cache_size: int = 100_000):
+        """
+        Args:
+            root_dir: Directory holding the catalog and segment files
+            buffer_rows: Pending events collected before they are written as segments
+            compact_after: Small segments a partition may collect before they are merged
+            user_cache_size: User id codes kept in memory for encoding
+        """
+        self.root_dir = root_dir
+        self.buffer_rows = buffer_rows
+        self.compact_after = compact_after
+        self.user_cache_size = user_cache_size
+        os.makedirs(os.path.join(root_dir, 'events'), exist_ok=True)
+
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(os.path.join(root_dir, 'catalog.db'), check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS event_types (id INTEGER PRIMARY KEY, name TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS users (id INTEGER PRIMARY KEY, external_id TEXT UNIQUE NOT NULL);
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY,
+                partition TEXT NOT NULL,
+                path TEXT NOT NULL,
+                rows INTEGER NOT NULL,
+                min_ts INTEGER NOT NULL,
+                max_ts INTEGER NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_segments_partition ON segments (partition);
+            CREATE TABLE IF NOT EXISTS pending_events (
+                id INTEGER PRIMARY KEY,
+                ts INTEGER NOT NULL,
+                user INTEGER NOT NULL,
+                type INTEGER NOT NULL,
+                value REAL NOT NULL
+            );
+        ''')
+        self._conn.commit()
+
+        self._types: Dict[str, int] = dict(self._conn.execute('SELECT name, id FROM event_types'))
+        self._user_cache: "OrderedDict[str, int]" = OrderedDict()
+        self._pending_rows = self._conn.execute('SELECT COUNT(*) FROM pending_events').fetchone()[0]
+        # Segments replaced by compaction are deleted once no scan can still be reading them
+        self._active_scans = 0
+        self._garbage: List[str] = []
+        self._closed = False
+        self._remove_orphans()
+
+    @contextmanager
+    def _transaction(self):
+        """Commit on exit, or join the caller's transaction if one is open."""
+        if self._conn.in_transaction:
+            yield
+            return
+        try:
+            with self._conn:
+                yield
+        except BaseException:
+            # Codes assigned in the rolled-back transaction must not stay cached
+            self._user_cache.clear()
+            self._types = dict(self._conn.execute('SELECT name, id FROM event_types'))
+            raise
+
+    def _remove_orphans(self):
+        """Delete segment directories the catalog does not reference (left by a crash)."""
+        referenced = {os.path.normpath(path) for path, in self._conn.execute('SELECT path FROM segments')}
+        events_dir = os.path.join(self.root_dir, 'events')
+        for partition in os.listdir(events_dir):
+            partition_dir = os.path.join(events_dir, partition)
+            for name in os.listdir(partition_dir):
+                if os.path.normpath(os.path.join('events', partition, name)) not in referenced:
+                    shutil.rmtree(os.path.join(partition_dir, name), ignore_errors=True)
+
+    # Dictionaries
+
+    def _type_code(self, name: str, create: bool = False) -> Optional[int]:
+        code = self._types.get(name)
+        if code is None and create:
+            with self._transaction():
+                self._conn.execute('INSERT OR IGNORE INTO event_types (name) VALUES (?)', (name,))
+            code = self._conn.execute('SELECT id FROM event_types WHERE name = ?', (name,)).fetchone()[0]
+            if code > np.iinfo(np.int16).max:
+                raise ValueError('Too many distinct event types')
+            self._types[name] = code
+        return code
+
+    def encode_users(self, external_ids: Sequence[str]) -> np.ndarray:
+        """Map external user ids to their integer codes, assigning new codes as needed."""
+        cache = self._user_cache
+        missing = [user_id for user_id in dict.fromkeys(external_ids) if user_id not in cache]
+        if missing:
+            with self._transaction():
+                self._conn.executemany('INSERT OR IGNORE INTO users (external_id) VALUES (?)',
+                                       ((user_id,) for user_id in missing))
+            found = {}
+            for i in range(0, len(missing), 500):
+                chunk = missing[i:i + 500]
+                found.update(self._conn.execute(
+                    f'SELECT external_id, id FROM users WHERE external_id IN ({",".join("?" * len(chunk))})', chunk
+                ))
+        else:
+            found = {}
+
+        codes = np.empty(len(external_ids), dtype=np.int32)
+        for i, user_id in enumerate(external_ids):
+            code = cache.get(user_id)
+            if code is None:
+                code = found[user_id]
+            codes[i] = code
+
+        for user_id, code in found.items():
+            cache[user_id] = code
+        while len(cache) > self.user_cache_size:
+            cache.popitem(last=False)
+        return codes
+
+    def decode_users(self, codes: Sequence[int]) -> List[str]:
+        codes = [int(code) for code in codes]
+        names = {}
+        for i in range(0, len(codes), 500):
+            chunk = codes[i:i + 500]
+            names.update(self._conn.execute(
+                f'SELECT id, external_id FROM users WHERE id IN ({",".join("?" * len(chunk))})', chunk
+            ))
+        return [names[code] for code in codes]
+
+    def user_count(self) -> int:
+        """Size for arrays indexed by user code."""
+        row = self._conn.execute('SELECT MAX(id) FROM users').fetchone()
+        return (row[0] or 0) + 1
+
+    # Writes
+
+    def append(self, event_type: str, user_id: str, timestamp=None, value: float = 0.0):
+        """
+        Record one event in the pending log, committed before this returns.
+
+        Inside an open catalog transaction the event commits with it instead,
+        and moving pending events into segments waits for a later call.
+        """
+        with self._lock:
+            with self._transaction():
+                self._conn.execute(
+                    'INSERT INTO pending_events (ts, user, type, value) VALUES (?, ?, ?, ?)',
+                    (_to_ms(timestamp), int(self.encode_users([user_id])[0]),
+                     self._type_code(event_type, create=True), value or 0.0)
+                )
+            self._pending_rows += 1
+            if self._pending_rows >= self.buffer_rows and not self._conn.in_transaction:
+                self.flush()
+
+    def append_many(self, event_type: str, user_ids: Sequence[str], timestamps_ms, values=None):
+        """Write a batch of events of one type; timestamps are epoch milliseconds."""
+        with self._lock:
+            self.flush()
+            timestamps_ms = np.asarray(timestamps_ms, dtype=np.int64)
+            self._write({
+                'ts': timestamps_ms,
+                'user': self.encode_users(list(user_ids)),
+                'type': np.full(len(timestamps_ms), self._type_code(event_type, create=True), dtype=np.int16),
+                'value': np.zeros(len(timestamps_ms)) if values is None else np.asarray(values, dtype=np.float64)
+            })
+
+    def flush(self):
+        """Move pending events into segments."""
+        with self._lock:
+            if not self._pending_rows:
+                return
+            # Taking the write lock first keeps two stores on one directory from flushing the same rows
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self._conn.execute('SELECT id, ts, user, type, value FROM pending_events ORDER BY id').fetchall()
+                entries = []
+                if rows:
+                    ids, ts, users, types, values = zip(*rows)
+                    entries = self._write_segments({
+                        'ts': np.asarray(ts, dtype=np.int64),
+                        'user': np.asarray(users, dtype=np.int32),
+                        'type': np.asarray(types, dtype=np.int16),
+                        'value': np.asarray(values, dtype=np.float64)
+                    })
+                    # The new segments and the removal of the pending rows they hold commit together
+                    self._register(entries)
+                    self._conn.execute('DELETE FROM pending_events WHERE id <= ?', (max(ids),))
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._pending_rows = 0
+            for entry in entries:
+                self._maybe_compact(entry[0])
+
+    def _write(self, columns: Dict[str, np.ndarray]):
+        entries = self._write_segments(columns)
+        with self._transaction():
+            self._register(entries)
+        for entry in entries:
+            self._maybe_compact(entry[0])
+
+    def _write_segments(self, columns: Dict[str, np.ndarray]) -> List[tuple]:
+        """Write one segment per month touched; returns their catalog entries."""
+        if not len(columns['ts']):
+            return []
+        months = columns['ts'].astype('datetime64[ms]').astype('datetime64[M]')
+        return [
+            self._write_segment(str(month), {name: values[months == month] for name, values in columns.items()})
+            for month in np.unique(months)
+        ]
+
+    def _register(self, entries: List[tuple]):
+        self._conn.executemany(
+            'INSERT INTO segments (partition, path, rows, min_ts, max_ts) VALUES (?, ?, ?, ?, ?)', entries
+        )
+
+    def _write_segment(self, partition: str, columns: Dict[str, np.ndarray]) -> tuple:
+        """Write a segment's files and return its catalog entry; it is not visible until registered."""
+        # Rows sorted by time let queries stop early and keep segments prunable
+        order = np.argsort(columns['ts'], kind='stable')
+        partition_dir = os.path.join(self.root_dir, 'events', partition)
+        os.makedirs(partition_dir, exist_ok=True)
+        name = uuid.uuid4().hex
+        tmp_dir = os.path.join(partition_dir, f'.tmp-{name}')
+        os.makedirs(tmp_dir)
+        for column, dtype in SEGMENT_COLUMNS.items():
+            np.save(os.path.join(tmp_dir, f'{column}.npy'), columns[column][order].astype(dtype, copy=False))
+        # Readers only see the segment once the rename and the catalog row are both in place
+        final_dir = os.path.join(partition_dir, name)
+        os.replace(tmp_dir, final_dir)
+        ts = columns['ts']
+        return partition, os.path.relpath(final_dir, self.root_dir), len(ts), int(ts.min()), int(ts.max())
+
+    def _maybe_compact(self, partition: str):
+        small = self._conn.execute(
+            'SELECT COUNT(*) FROM segments WHERE partition = ? AND rows < ?', (partition, self.buffer_rows)
+        ).fetchone()[0]
+        if small > self.compact_after:
+            self.compact(partition)
+
+    def compact(self, partition: str):
+        """Merge a partition's segments smaller than buffer_rows into one."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, path FROM segments WHERE partition = ? AND rows < ?', (partition, self.buffer_rows)
+            ).fetchall()
+            if len(rows) < 2:
+                return
+            merged = {
+                column: np.concatenate([np.load(os.path.join(self.root_dir, path, f'{column}.npy')) for _, path in rows])
+                for column in SEGMENT_COLUMNS
+            }
+            entry = self._write_segment(partition, merged)
+            with self._transaction():
+                self._register([entry])
+                self._conn.executemany('DELETE FROM segments WHERE id = ?', [(row_id,) for row_id, _ in rows])
+            self._garbage.extend(os.path.join(self.root_dir, path) for _, path in rows)
+            if not self._active_scans:
+                self._collect_garbage()
+
+    def _collect_garbage(self):
+        garbage, self._garbage = self._garbage, []
+        for segment_dir in garbage:
+            shutil.rmtree(segment_dir, ignore_errors=True)
+
+    # Reads
+
+    def segments(self, start_ms: Optional[int] = None, end_ms: Optional[int] = None) -> List[Segment]:
+        query = 'SELECT path, rows, min_ts, max_ts FROM segments WHERE 1 = 1'
+        params = []
+        if start_ms is not None:
+            query += ' AND max_ts >= ?'
+            params.append(start_ms)
+        if end_ms is not None:
+            query += ' AND min_ts <= ?'
+            params.append(end_ms)
+        return [Segment(os.path.join(self.root_dir, path), rows, min_ts, max_ts)
+                for path, rows, min_ts, max_ts in self._conn.execute(query + ' ORDER BY min_ts', params)]
+
+    def scan(self, event_type: str, start=None, end=None, columns=('user', 'ts')) -> Iterator[Dict[str, np.ndarray]]:
+        """Yield the requested columns of matching events, one segment at a time."""
+        self.flush()
+        code = self._type_code(event_type)
+        if code is None:
+            return
+        start_ms = None if start is None else _to_ms(start)
+        end_ms = None if end is None else _to_ms(end)
+        # Compaction keeps the files of the segments listed here until the scan ends
+        with self._lock:
+            self._active_scans += 1
+            segments = self.segments(start_ms, end_ms)
+        try:
+            for segment in segments:
+                mask = segment.column('type') == code
+                if start_ms is not None and segment.min_ts < start_ms:
+                    mask &= segment.column('ts') >= start_ms
+                if end_ms is not None and segment.max_ts > end_ms:
+                    mask &= segment.column('ts') <= end_ms
+                if mask.any():
+                    yield {column: segment.column(column)[mask] for column in columns}
+        finally:
+            with self._lock:
+                self._active_scans -= 1
+                if not self._active_scans and self._garbage:
+                    self._collect_garbage()
+
+    def first_times(self, event_type: str, start=None, end=None, after: Optional[np.ndarray] = None,
+                    before: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Earliest time of `event_type` per user code, NEVER where there is none.
+
+        `after` and `before` are per-user bounds; users whose `after` is NEVER are skipped.
+        """
+        self.flush()
+        first = np.full(self.user_count(), NEVER, dtype=np.int64)
+        # Users added by concurrent writes after the arrays were sized are left out
+        limit = len(first) if after is None else min(len(first), len(after))
+        for chunk in self.scan(event_type, start, end):
+            users, ts = chunk['user'], chunk['ts']
+            if users.size and users.max() >= limit:
+                known = users < limit
+                users, ts = users[known], ts[known]
+            if after is not None:
+                lower = after[users]
+                keep = (lower != NEVER) & (ts >= lower)
+                if before is not None:
+                    keep &= ts <= before[users]
+                users, ts = users[keep], ts[keep]
+            np.minimum.at(first, users, ts)
+        return first
+
+    def close(self):
+        with self._lock:
+            if self._closed:
+                return
+            self.flush()
+            self._collect_garbage()
+            self._conn.close()
+            self._closed = True
+
+
+class EventQueries:
+    """Funnel, cohort retention and time-to-convert over an EventStore."""
+
+    def __init__(self, store: EventStore):
+        self.store = store
+
+    def funnel(self, steps: List[str], window_seconds: Optional[float] = None, start=None, end=None) -> Dict:
+        """
+        Users completing each step in order, each step after the previous one.
+
+        A user's first occurrence of the first step starts their funnel; with
+        `window_seconds`, later steps must happen within that long of it.
+        """
+        if not steps:
+            raise ValueError('A funnel needs at least one step')
+        reached = self.store.first_times(steps[0], start, end)
+        entered = reached != NEVER
+        deadline = None
+        if window_seconds is not None:
+            deadline = np.where(entered, reached + int(window_seconds * 1000), NEVER)
+
+        counts = [int(entered.sum())]
+        for step in steps[1:]:
+            reached = self.store.first_times(step, start, end, after=reached, before=deadline)
+            counts.append(int((reached != NEVER).sum()))
+
+        return {
+            'steps': [
+                {
+                    'event': step,
+                    'users': count,
+                    'conversion_from_previous': count / counts[i - 1] if i and counts[i - 1] else (1.0 if not i else 0.0),
+                    'conversion_from_start': count / counts[0] if counts[0] else 0.0
+                }
+                for i, (step, count) in enumerate(zip(steps, counts))
+            ],
+            'conversion_rate': counts[-1] / counts[0] if counts[0] else 0.0
+        }
+
+    def cohort_retention(self, cohort_event: str, return_event: str, period: str = 'week',
+                         periods: int = 8, start=None, end=None) -> List[Dict]:
+        """
+        Group users by the period of their first `cohort_event` and count how
+        many had a `return_event` in each following period (0 = the cohort period).
+        """
+        if period not in PERIOD_MS:
+            raise ValueError(f"period must be one of {sorted(PERIOD_MS)}")
+        period_ms, offset_ms = PERIOD_MS[period], PERIOD_OFFSET_MS[period]
+
+        first = self.store.first_times(cohort_event, start, end)
+        in_cohort = first != NEVER
+        cohort_period = np.where(in_cohort, (first + offset_ms) // period_ms, -1)
+
+        active = np.zeros((len(first), periods), dtype=bool)
+        for chunk in self.store.scan(return_event, start):
+            users, ts = chunk['user'], chunk['ts']
+            if users.size and users.max() >= len(first):
+                known = users < len(first)
+                users, ts = users[known], ts[known]
+            offsets = (ts + offset_ms) // period_ms - cohort_period[users]
+            keep = in_cohort[users] & (offsets >= 0) & (offsets < periods)
+            active[users[keep], offsets[keep]] = True
+
+        cohorts, cohort_index = np.unique(cohort_period[in_cohort], return_inverse=True)
+        sizes = np.bincount(cohort_index, minlength=len(cohorts))
+        retained = np.stack([
+            np.bincount(cohort_index, weights=active[in_cohort, p], minlength=len(cohorts))
+            for p in range(periods)
+        ], axis=1).astype(np.int64) if len(cohorts) else np.zeros((0, periods), dtype=np.int64)
+
+        return [
+            {
+                'cohort_start': _from_ms(int(cohort) * period_ms - offset_ms).isoformat(),
+                'users': int(size),
+                'retained': retained[i].tolist(),
+                'retention_rate': (retained[i] / size).tolist()
+            }
+            for i, (cohort, size) in enumerate(zip(cohorts, sizes))
+        ]
+
+    def time_to_convert(self, start_event: str = LEAD_EVENT, convert_event: str = CONVERSION_EVENT,
+                        start=None, end=None) -> Dict:
+        """Distribution of seconds from a user's first `start_event` to their first `convert_event` after it."""
+        started = self.store.first_times(start_event, start, end)
+        converted = self.store.first_times(convert_event, start, end, after=started)
+        ok = converted != NEVER
+        seconds = (converted[ok] - started[ok]) / 1000.0
+        users_started = int((started != NEVER).sum())
+
+        result = {
+            'users_started': users_started,
+            'users_converted': int(ok.sum()),
+            'conversion_rate': int(ok.sum()) / users_started if users_started else 0.0
+        }
+        if len(seconds):
+            p50, p90, p99 = np.percentile(seconds, [50, 90, 99])
+            result.update({
+                'mean_seconds': float(seconds.mean()),
+                'median_seconds': float(p50),
+                'p90_seconds': float(p90),
+                'p99_seconds': float(p99)
+            })
+        return result
+
 
-# In-memory store for demo purposes
 class ConversionTracker:
-    def __init__(self):
-        # Store leads keyed by lead_id
-        self.leads = {}
-        # Store conversion events keyed by lead_id
-        self.conversions = {}
+    def __init__(self, store_dir: Optional[str] = None):
+        """
+        :param store_dir: Directory for the event store (defaults to CONVERSION_STORE_DIR or conversion_data)
+        """
+        self.store_dir = store_dir or os.getenv('CONVERSION_STORE_DIR', 'conversion_data')
+        self._store: Optional[EventStore] = None
+        self._queries: Optional[EventQueries] = None
+        self._init_lock = threading.Lock()
+
+    @property
+    def store(self) -> EventStore:
+        # Opened on first use so importing the module does not touch the disk
+        if self._store is None:
+            with self._init_lock:
+                if self._store is None:
+                    store = EventStore(self.store_dir)
+                    store._conn.executescript('''
+                        CREATE TABLE IF NOT EXISTS leads (
+                            lead_id TEXT PRIMARY KEY,
+                            source TEXT,
+                            metadata TEXT,
+                            created_at TEXT NOT NULL,
+                            customer_id TEXT,
+                            value REAL,
+                            converted_at TEXT
+                        );
+                        CREATE INDEX IF NOT EXISTS idx_leads_converted ON leads (converted_at);
+                    ''')
+                    self._queries = EventQueries(store)
+                    self._store = store
+                    atexit.register(self.close)
+        return self._store
+
+    @property
+    def queries(self) -> EventQueries:
+        self.store
+        return self._queries
+
+    def close(self):
+        """Move pending events into segments and close the store; reopened on next use."""
+        with self._init_lock:
+            store, self._store, self._queries = self._store, None, None
+        if store is not None:
+            store.close()
+            atexit.unregister(self.close)
 
     def track_lead(self, lead_id: str, source: Optional[str] = None, metadata: Optional[Dict] = None):
         """
         Register a new lead.
         """
-        if lead_id in self.leads:
-            # Lead already tracked
-            return
-        self.leads[lead_id] = {
-            'lead_id': lead_id,
-            'source': source,
-            'metadata': metadata or {},
-            'created_at': datetime.utcnow()
-        }
+        store = self.store
+        now = datetime.utcnow()
+        # The lead row and its event commit together
+        with store._lock, store._transaction():
+            inserted = store._conn.execute(
+                'INSERT OR IGNORE INTO leads (lead_id, source, metadata, created_at) VALUES (?, ?, ?, ?)',
+                (lead_id, source, json.dumps(metadata or {}), now.isoformat())
+            ).rowcount
+            if inserted:
+                store.append(LEAD_EVENT, lead_id, now)
 
     def track_conversion(self, lead_id: str, customer_id: Optional[str] = None, value: Optional[float] = None):
         """
         Record a conversion event for a lead.
         """
-        if lead_id not in self.leads:
+        store = self.store
+        now = datetime.utcnow()
+        with store._lock, store._transaction():
+            updated = store._conn.execute(
+                'UPDATE leads SET customer_id = ?, value = ?, converted_at = ? WHERE lead_id = ?',
+                (customer_id, value, now.isoformat(), lead_id)
+            ).rowcount
+            if updated:
+                store.append(CONVERSION_EVENT, lead_id, now, value or 0.0)
+        if not updated:
             raise ValueError(f"Lead {lead_id} not found")
 
-        self.conversions[lead_id] = {
-            'lead_id': lead_id,
-            'customer_id': customer_id,
-            'value': value,
-            'converted_at': datetime.utcnow()
-        }
+    def track_event(self, event_type: str, lead_id: str, timestamp: Optional[datetime] = None, value: float = 0.0):
+        """
+        Record any other funnel event (e.g. 'demo_booked') for a lead or user.
+        """
+        self.store.append(event_type, lead_id, timestamp, value)
 
     def get_conversion_rate(self) -> float:
         """
         Returns the conversion rate as a float between 0 and 1.
         """
-        total_leads = len(self.leads)
+        total_leads, total_converted = self.store._conn.execute(
+            'SELECT COUNT(*), COUNT(converted_at) FROM leads'
+        ).fetchone()
         if total_leads == 0:
             return 0.0
-        total_converted = len(self.conversions)
         return total_converted / total_leads
 
-    def get_report(self) -> Dict:
+    def get_report(self, limit: Optional[int] = None) -> Dict:
         """
         Returns a summary report containing:
         - total leads
         - total conversions
         - conversion rate
-        - conversions detail list
+        - conversions detail list (newest first, up to `limit`)
         """
-        total_leads = len(self.leads)
-        total_conversions = len(self.conversions)
-        conversion_rate = self.get_conversion_rate()
+        conn = self.store._conn
+        total_leads, total_conversions = conn.execute(
+            'SELECT COUNT(*), COUNT(converted_at) FROM leads'
+        ).fetchone()
+        conversion_rate = total_conversions / total_leads if total_leads else 0.0
 
-        conversions_list = []
-        for lead_id, conversion in self.conversions.items():
-            lead = self.leads.get(lead_id, {})
-            conversions_list.append({
+        query = ('SELECT lead_id, source, customer_id, value, converted_at FROM leads '
+                 'WHERE converted_at IS NOT NULL ORDER BY converted_at DESC')
+        params = ()
+        if limit is not None:
+            query += ' LIMIT ?'
+            params = (limit,)
+        conversions_list = [
+            {
                 'lead_id': lead_id,
-                'source': lead.get('source'),
-                'customer_id': conversion.get('customer_id'),
-                'value': conversion.get('value'),
-                'converted_at': conversion.get('converted_at').isoformat() if conversion.get('converted_at') else None
-            })
+                'source': source,
+                'customer_id': customer_id,
+                'value': value,
+                'converted_at': converted_at
+            }
+            for lead_id, source, customer_id, value, converted_at in conn.execute(query, params)
+        ]
 
         return {
             'total_leads': total_leads,
@@ -77,6 +646,17 @@ class ConversionTracker:
             'conversions': conversions_list
         }
 
+    def get_funnel(self, steps: List[str], window_seconds: Optional[float] = None, start=None, end=None) -> Dict:
+        return self.queries.funnel(steps, window_seconds, start, end)
+
+    def get_cohort_retention(self, cohort_event: str = LEAD_EVENT, return_event: str = CONVERSION_EVENT,
+                             period: str = 'week', periods: int = 8, start=None, end=None) -> List[Dict]:
+        return self.queries.cohort_retention(cohort_event, return_event, period, periods, start, end)
+
+    def get_time_to_convert(self, start_event: str = LEAD_EVENT, convert_event: str = CONVERSION_EVENT,
+                            start=None, end=None) -> Dict:
+        return self.queries.time_to_convert(start_event, convert_event, start, end)
+
 # Singleton instance
 tracker = ConversionTracker()
 
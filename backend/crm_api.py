@@ -7,15 +7,33 @@ from flask import Flask, request, jsonify
 import redis
 from crm_contact_service import CRMContactService
 from crm_deal_service import CRMDealService
+from search import AdvancedSearch, CONTACT_FIELD_WEIGHTS, DEAL_FIELD_WEIGHTS
 
 app = Flask(__name__)
 
 # Initialize Redis client
 redis_client = redis.Redis(host='localhost', port=6379, db=0, decode_responses=False)
 
+# In-memory search indexes, kept current by the services on every write
+contact_search = AdvancedSearch([], field_weights=CONTACT_FIELD_WEIGHTS)
+deal_search = AdvancedSearch([], field_weights=DEAL_FIELD_WEIGHTS)
+_search_indexes_loaded = False
+
 # Initialize CRM services
-contact_service = CRMContactService(redis_client)
-deal_service = CRMDealService(redis_client)
+contact_service = CRMContactService(redis_client, search_index=contact_search)
+deal_service = CRMDealService(redis_client, search_index=deal_search)
+
+
+def _ensure_search_indexes():
+    """Load existing contacts and deals into the search indexes on first use."""
+    global _search_indexes_loaded
+    if _search_indexes_loaded:
+        return
+    for contact in contact_service.list_contacts(limit=contact_service.get_contact_count()):
+        contact_search.add_item(contact)
+    for deal in deal_service.list_deals(limit=deal_service.get_deal_count()):
+        deal_search.add_item(deal)
+    _search_indexes_loaded = True
 
 # ============================================================================
 # Contact Endpoints
@@ -56,6 +74,35 @@ def list_contacts():
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+@app.route('/api/v1/contacts/search', methods=['GET'])
+def search_contacts():
+    """Full-text contact search with optional lifecycle stage filter."""
+    try:
+        _ensure_search_indexes()
+        filters = {}
+        if request.args.get('lifecycle_stage'):
+            filters['lifecycle_stage'] = request.args['lifecycle_stage']
+        limit = int(request.args.get('limit', 20))
+        
+        contacts = contact_search.search(request.args.get('q', ''), filters=filters, limit=limit)
+        return jsonify({"contacts": contacts, "limit": limit}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
+@app.route('/api/v1/contacts/autocomplete', methods=['GET'])
+def autocomplete_contacts():
+    """Autocomplete contact field values by prefix, most common first."""
+    try:
+        _ensure_search_indexes()
+        suggestions = contact_search.autocomplete(
+            request.args.get('prefix', ''),
+            field=request.args.get('field', 'name'),
+            limit=int(request.args.get('limit', 5))
+        )
+        return jsonify({"suggestions": suggestions}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
 @app.route('/api/v1/contacts/<contact_id>', methods=['GET'])
 def get_contact(contact_id):
     """Get a single contact by ID."""
@@ -133,6 +180,19 @@ def list_deals():
     except Exception as e:
         return jsonify({"error": str(e)}), 400
 
+@app.route('/api/v1/deals/search', methods=['GET'])
+def search_deals():
+    """Full-text deal search with optional pipeline/stage filters."""
+    try:
+        _ensure_search_indexes()
+        filters = {key: request.args[key] for key in ('pipeline', 'stage', 'contact_id') if request.args.get(key)}
+        limit = int(request.args.get('limit', 20))
+        
+        deals = deal_search.search(request.args.get('q', ''), filters=filters, limit=limit)
+        return jsonify({"deals": deals, "limit": limit}), 200
+    except Exception as e:
+        return jsonify({"error": str(e)}), 400
+
 @app.route('/api/v1/deals/<deal_id>', methods=['GET'])
 def get_deal(deal_id):
     """Get a single deal by ID."""
@@ -12,14 +12,16 @@ import redis
 class CRMContactService:
     """Service for managing CRM contacts."""
     
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(self, redis_client: redis.Redis, search_index=None):
         """
         Initialize the CRM Contact Service.
         
         Args:
             redis_client: Redis client instance for data storage
+            search_index: Optional AdvancedSearch index kept in sync on create/update/delete
         """
         self.redis = redis_client
+        self.search_index = search_index
         self.contact_prefix = "crm:contact:"
         self.contact_index = "crm:contacts:all"
         
@@ -70,6 +72,9 @@ class CRMContactService:
         stage_index = f"crm:contacts:stage:{contact['lifecycle_stage']}"
         self.redis.sadd(stage_index, contact_id)
         
+        if self.search_index is not None:
+            self.search_index.add_item(contact)
+        
         return contact
     
     def get_contact(self, contact_id: str) -> Optional[Dict]:
@@ -126,6 +131,9 @@ class CRMContactService:
             self.redis.srem(old_stage_index, contact_id)
             self.redis.sadd(new_stage_index, contact_id)
         
+        if self.search_index is not None:
+            self.search_index.update_item(contact)
+        
         return contact
     
     def delete_contact(self, contact_id: str) -> bool:
@@ -151,6 +159,9 @@ class CRMContactService:
         stage_index = f"crm:contacts:stage:{contact['lifecycle_stage']}"
         self.redis.srem(stage_index, contact_id)
         
+        if self.search_index is not None:
+            self.search_index.remove_item(contact_id)
+        
         return True
     
     def list_contacts(self, lifecycle_stage: Optional[str] = None, 
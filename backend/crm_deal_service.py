@@ -18,14 +18,16 @@ class CRMDealService:
         "Sales": ["New", "Qualified", "Booked", "Held", "Won", "Lost", "No-Show"]
     }
     
-    def __init__(self, redis_client: redis.Redis):
+    def __init__(self, redis_client: redis.Redis, search_index=None):
         """
         Initialize the CRM Deal Service.
         
         Args:
             redis_client: Redis client instance for data storage
+            search_index: Optional AdvancedSearch index kept in sync on create/update/delete
         """
         self.redis = redis_client
+        self.search_index = search_index
         self.deal_prefix = "crm:deal:"
         self.deal_index = "crm:deals:all"
         
@@ -85,6 +87,9 @@ class CRMDealService:
             contact_index = f"crm:deals:contact:{deal['contact_id']}"
             self.redis.sadd(contact_index, deal_id)
         
+        if self.search_index is not None:
+            self.search_index.add_item(deal)
+        
         return deal
     
     def get_deal(self, deal_id: str) -> Optional[Dict]:
@@ -165,6 +170,9 @@ class CRMDealService:
                 new_contact_index = f"crm:deals:contact:{new_contact_id}"
                 self.redis.sadd(new_contact_index, deal_id)
         
+        if self.search_index is not None:
+            self.search_index.update_item(deal)
+        
         return deal
     
     def delete_deal(self, deal_id: str) -> bool:
@@ -197,6 +205,9 @@ class CRMDealService:
             contact_index = f"crm:deals:contact:{deal['contact_id']}"
             self.redis.srem(contact_index, deal_id)
         
+        if self.search_index is not None:
+            self.search_index.remove_item(deal_id)
+        
         return True
     
     def list_deals(self, pipeline: Optional[str] = None, stage: Optional[str] = None,
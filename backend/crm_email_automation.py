@@ -3,12 +3,296 @@ CRM Email Automation Service for Flowstate-AI
 Handles automated email sequences and campaigns for CRM contacts.
 """
 
+import asyncio
+import hashlib
 import json
+import re
+import threading
 import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Sequence, Tuple
 from pathlib import Path
-from openai import OpenAI
+from openai import AsyncOpenAI, OpenAI
+
+EMAIL_MODEL = "gpt-4.1-mini"
+EMAIL_SYSTEM_PROMPT = "You are an expert email copywriter specializing in B2B sales and marketing."
+
+# Contact fields left as {placeholders} in segment templates and filled per recipient
+PER_CONTACT_FIELDS = ("name", "email")
+
+
+def prompt_hash(model: str, system: str, prompt: str) -> str:
+    return hashlib.sha256(f"{model}\0{system}\0{prompt}".encode("utf-8")).hexdigest()
+
+
+def fill_fields(text: str, values: Dict[str, str]) -> str:
+    """Replace {field} placeholders for the given fields only, leaving any other braces alone."""
+    if not values:
+        return text
+    pattern = re.compile(r"\{(" + "|".join(re.escape(key) for key in values) + r")\}")
+    return pattern.sub(lambda match: str(values[match.group(1)]), text)
+
+
+class ResponseCache:
+    """Thread-safe LRU of LLM responses keyed by prompt hash."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return dict(value)
+
+    def set(self, key: str, value: Dict):
+        with self._lock:
+            self._entries[key] = dict(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class OpenAIEmailBackend:
+    """
+    Async OpenAI chat completions returning a JSON object.
+
+    The client's connection pool belongs to the event loop it was opened on,
+    so each loop gets its own client; aclose() closes the running loop's one.
+    """
+
+    def __init__(self, model: str = EMAIL_MODEL):
+        self.model = model
+        self._clients = weakref.WeakKeyDictionary()
+
+    async def complete_json(self, system: str, prompt: str) -> Dict:
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = AsyncOpenAI()
+        response = await client.chat.completions.create(
+            model=self.model,
+            messages=[
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt}
+            ],
+            response_format={"type": "json_object"}
+        )
+        return json.loads(response.choices[0].message.content)
+
+    async def aclose(self):
+        client = self._clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.close()
+
+
+class FakeEmailBackend:
+    """
+    Offline stand-in for the LLM: waits `latency` seconds and echoes the
+    template from the prompt, so campaigns can be tested and benchmarked
+    without API calls.
+    """
+
+    model = "fake"
+    _TEMPLATE = re.compile(r"Subject: (?P<subject>.*?)\n\s*Body: (?P<body>.*)", re.DOTALL)
+
+    def __init__(self, latency: float = 0.5):
+        self.latency = latency
+        self.calls = 0
+        self.max_in_flight = 0
+        self._in_flight = 0
+
+    async def complete_json(self, system: str, prompt: str) -> Dict:
+        self.calls += 1
+        self._in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self._in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self._in_flight -= 1
+        match = self._TEMPLATE.search(prompt)
+        subject = match.group("subject").strip() if match else "Hello from Flowstate-AI"
+        body = match.group("body").strip() if match else prompt
+        return {"subject": subject, "body": f"{body}\n\n[variant {prompt_hash(self.model, system, prompt)[:8]}]"}
+
+
+class CampaignRenderer:
+    """
+    Renders one template for many contacts with as few LLM calls as possible.
+
+    Contacts are grouped by segment (template, segment fields such as
+    lifecycle stage and country, and campaign variables). Each segment gets
+    one generated template with per-recipient {placeholders}, which are then
+    filled locally. Contacts carrying their own context (`unique_field`) get
+    an individual generation. All generations run on a bounded async pool and
+    go through a response cache keyed by prompt hash, with concurrent
+    identical prompts sharing a single call.
+    """
+
+    def __init__(self, automation: "CRMEmailAutomation", backend=None, max_concurrency: int = 8,
+                 cache: Optional[ResponseCache] = None,
+                 segment_fields: Sequence[str] = ("lifecycle_stage", "country"),
+                 unique_field: str = "personalization_notes"):
+        self.automation = automation
+        self.backend = backend or OpenAIEmailBackend()
+        self.max_concurrency = max_concurrency
+        self.cache = cache if cache is not None else automation.response_cache
+        self.segment_fields = tuple(segment_fields)
+        self.unique_field = unique_field
+        self.stats = {"contacts": 0, "segments": 0, "unique": 0, "llm_calls": 0, "fallbacks": 0}
+
+    def _segment_prompt(self, template: Dict, segment: Dict, placeholders: Sequence[str]) -> str:
+        details = "\n".join(f"            - {field.replace('_', ' ').title()}: {value}" for field, value in segment.items())
+        kept = ", ".join("{" + field + "}" for field in placeholders)
+        return f"""
+            Personalize the following email template for a segment of contacts with these details:
+{details}
+
+            Template:
+            Subject: {template['subject']}
+            Body: {template['template']}
+
+            Make the email more engaging and personalized for this segment while keeping the core message.
+            Keep the placeholders {kept} exactly as written; they are filled in for each recipient.
+            Fill in any other placeholder variables with appropriate content.
+            Return the email in JSON format with 'subject' and 'body' fields.
+            """
+
+    async def _generate(self, prompt: str, semaphore: asyncio.Semaphore, in_flight: Dict) -> Dict:
+        key = prompt_hash(getattr(self.backend, "model", ""), EMAIL_SYSTEM_PROMPT, prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        if key in in_flight:
+            return dict(await in_flight[key])
+
+        future = asyncio.get_running_loop().create_future()
+        in_flight[key] = future
+        try:
+            async with semaphore:
+                self.stats["llm_calls"] += 1
+                result = await self.backend.complete_json(EMAIL_SYSTEM_PROMPT, prompt)
+            if not isinstance(result.get("subject"), str) or not isinstance(result.get("body"), str):
+                raise ValueError("LLM response is missing subject or body")
+            self.cache.set(key, result)
+            future.set_result(result)
+            return dict(result)
+        except Exception as e:
+            future.set_exception(e)
+            # Waiters get the exception through the future; nobody else needs it retrieved
+            future.exception()
+            raise
+        finally:
+            del in_flight[key]
+
+    async def render_async(self, contacts: List[Dict], template_key: str,
+                           additional_vars: Optional[Dict] = None) -> List[Dict]:
+        """
+        Render `template_key` for every contact.
+
+        Returns one {"email", "subject", "body"} dict per contact, in order.
+        """
+        if template_key not in self.automation.EMAIL_TEMPLATES:
+            raise ValueError(f"Unknown template key: {template_key}")
+        template = self.automation.EMAIL_TEMPLATES[template_key]
+        additional_vars = dict(additional_vars or {})
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        in_flight: Dict[str, asyncio.Future] = {}
+
+        segments: Dict[Tuple, List[int]] = {}
+        unique: List[int] = []
+        for index, contact in enumerate(contacts):
+            if self.unique_field and contact.get(self.unique_field):
+                unique.append(index)
+            else:
+                key = tuple(str(contact.get(field) or "") for field in self.segment_fields)
+                segments.setdefault(key, []).append(index)
+
+        self.stats["contacts"] += len(contacts)
+        self.stats["segments"] += len(segments)
+        self.stats["unique"] += len(unique)
+        results: List[Optional[Dict]] = [None] * len(contacts)
+
+        async def render_segment(key: Tuple, indexes: List[int]):
+            segment = {field: value for field, value in zip(self.segment_fields, key) if value}
+            # Campaign variables are the same for every recipient, so fill them before generating
+            base = {
+                "subject": fill_fields(template["subject"], additional_vars),
+                "template": fill_fields(template["template"], additional_vars)
+            }
+            try:
+                email = await self._generate(self._segment_prompt(base, segment, PER_CONTACT_FIELDS),
+                                             semaphore, in_flight)
+            except Exception as e:
+                self.automation.log(f"Error generating template for segment {segment}: {e}")
+                self.stats["fallbacks"] += 1
+                email = {"subject": base["subject"], "body": base["template"]}
+            for index in indexes:
+                values = self.automation.contact_variables(contacts[index])
+                values.update(additional_vars)
+                results[index] = {
+                    "email": contacts[index].get("email"),
+                    "subject": fill_fields(email["subject"], values),
+                    "body": fill_fields(email["body"], values)
+                }
+
+        async def render_unique(index: int):
+            contact = contacts[index]
+            prompt = self.automation.personalization_prompt(template, contact, additional_vars)
+            try:
+                email = await self._generate(prompt, semaphore, in_flight)
+            except Exception as e:
+                self.automation.log(f"Error generating personalized email for {contact.get('email')}: {e}")
+                self.stats["fallbacks"] += 1
+                email = self.automation.fallback_email(template, contact, additional_vars)
+            results[index] = {"email": contact.get("email"), "subject": email["subject"], "body": email["body"]}
+
+        await asyncio.gather(
+            *(render_segment(key, indexes) for key, indexes in segments.items()),
+            *(render_unique(index) for index in unique)
+        )
+        return results
+
+    def render(self, contacts: List[Dict], template_key: str, additional_vars: Optional[Dict] = None) -> List[Dict]:
+        """Synchronous wrapper around render_async."""
+        return self._run(self.render_async(contacts, template_key, additional_vars))
+
+    def render_steps(self, contacts: List[Dict], steps: Sequence[Tuple[str, Optional[Dict]]]) -> List[List[Dict]]:
+        """Render several (template_key, additional_vars) steps on one event loop."""
+        async def render_all():
+            return [await self.render_async(contacts, template_key, additional_vars)
+                    for template_key, additional_vars in steps]
+        return self._run(render_all())
+
+    def _run(self, coroutine):
+        """Run a coroutine to completion from synchronous code, closing the backend's client for that loop."""
+        async def run_and_close():
+            try:
+                return await coroutine
+            finally:
+                close = getattr(self.backend, "aclose", None)
+                if close is not None:
+                    await close()
+
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(run_and_close())
+        # asyncio.run cannot nest inside a running loop, so use a loop on a helper thread
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            return pool.submit(asyncio.run, run_and_close()).result()
+
 
 class CRMEmailAutomation:
     """Service for managing automated email sequences."""
@@ -149,10 +433,18 @@ class CRMEmailAutomation:
         }
     }
     
-    def __init__(self):
+    def __init__(self, response_cache: Optional[ResponseCache] = None):
         """Initialize the email automation service."""
-        self.client = OpenAI()
+        self._client = None
+        self.response_cache = response_cache or ResponseCache()
         self.log_file = Path(__file__).parent.parent / "logs" / "email_automation.log"
+
+    @property
+    def client(self) -> OpenAI:
+        # Created on first use so campaigns on another backend never need an API key
+        if self._client is None:
+            self._client = OpenAI()
+        return self._client
         
     def log(self, message: str):
         """Log email automation activity."""
@@ -184,23 +476,53 @@ class CRMEmailAutomation:
         
         template = self.EMAIL_TEMPLATES[template_key]
         
-        # Prepare variables for template
-        variables = {
+        # Use AI to personalize the email further
+        try:
+            prompt = self.personalization_prompt(template, contact, additional_vars)
+            key = prompt_hash(EMAIL_MODEL, EMAIL_SYSTEM_PROMPT, prompt)
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached
+            
+            response = self.client.chat.completions.create(
+                model=EMAIL_MODEL,
+                messages=[
+                    {"role": "system", "content": EMAIL_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                response_format={"type": "json_object"}
+            )
+            
+            email_content = json.loads(response.choices[0].message.content)
+            self.response_cache.set(key, email_content)
+            self.log(f"Generated personalized email for {contact.get('email')}")
+            return email_content
+        except Exception as e:
+            self.log(f"Error generating personalized email: {e}")
+            # Fallback to template with simple variable substitution
+            return self.fallback_email(template, contact, additional_vars)
+    
+    @staticmethod
+    def contact_variables(contact: Dict) -> Dict:
+        """Template variables taken from a contact."""
+        return {
             "name": contact.get("name", "there"),
             "email": contact.get("email", ""),
             "country": contact.get("country", ""),
         }
-        
+    
+    def personalization_prompt(self, template: Dict, contact: Dict, additional_vars: Optional[Dict] = None) -> str:
+        """Prompt asking the LLM to personalize `template` for one contact."""
+        variables = self.contact_variables(contact)
         if additional_vars:
             variables.update(additional_vars)
-        
-        # Use AI to personalize the email further
-        try:
-            prompt = f"""
+        notes = contact.get("personalization_notes")
+        extra = f"\n            - Notes: {notes}" if notes else ""
+        return f"""
             Personalize the following email template for a contact with these details:
             - Name: {variables['name']}
             - Country: {variables['country']}
-            - Lifecycle Stage: {contact.get('lifecycle_stage', 'lead')}
+            - Lifecycle Stage: {contact.get('lifecycle_stage', 'lead')}{extra}
             
             Template:
             Subject: {template['subject']}
@@ -210,25 +532,16 @@ class CRMEmailAutomation:
             Fill in any placeholder variables with appropriate content.
             Return the email in JSON format with 'subject' and 'body' fields.
             """
-            
-            response = self.client.chat.completions.create(
-                model="gpt-4.1-mini",
-                messages=[
-                    {"role": "system", "content": "You are an expert email copywriter specializing in B2B sales and marketing."},
-                    {"role": "user", "content": prompt}
-                ],
-                response_format={"type": "json_object"}
-            )
-            
-            email_content = json.loads(response.choices[0].message.content)
-            self.log(f"Generated personalized email for {contact.get('email')}")
-            return email_content
-        except Exception as e:
-            self.log(f"Error generating personalized email: {e}")
-            # Fallback to template with simple variable substitution
-            subject = template['subject'].format(**variables)
-            body = template['template'].format(**variables)
-            return {"subject": subject, "body": body}
+    
+    def fallback_email(self, template: Dict, contact: Dict, additional_vars: Optional[Dict] = None) -> Dict:
+        """Template with plain variable substitution, used when generation fails."""
+        variables = self.contact_variables(contact)
+        if additional_vars:
+            variables.update(additional_vars)
+        return {
+            "subject": fill_fields(template['subject'], variables),
+            "body": fill_fields(template['template'], variables)
+        }
     
     def send_email(self, to_email: str, subject: str, body: str) -> bool:
         """
@@ -382,6 +695,43 @@ class CRMEmailAutomation:
             if delay_days == 0:
                 self.send_email(contact.get("email"), email["subject"], email["body"])
 
+    def execute_campaign(self, contacts: List[Dict], sequence_type: str, backend=None,
+                         max_concurrency: int = 8) -> Dict:
+        """
+        Execute an email sequence for many contacts, rendering each step once
+        per segment instead of once per contact.
+        
+        Args:
+            contacts: Contact information for every recipient
+            sequence_type: Type of sequence (see create_email_sequence)
+            backend: LLM backend for the CampaignRenderer (defaults to OpenAI)
+            max_concurrency: Concurrent LLM calls
+            
+        Returns:
+            Renderer statistics
+        """
+        if not contacts:
+            return {}
+        renderer = CampaignRenderer(self, backend=backend, max_concurrency=max_concurrency)
+        sequence = self.create_email_sequence(contacts[0], sequence_type)
+        
+        # Every step renders on the same event loop, so the backend client is reused safely
+        rendered = renderer.render_steps(contacts, [
+            (email_schedule["template_key"], email_schedule.get("additional_vars", {}))
+            for email_schedule in sequence
+        ])
+        for email_schedule, emails in zip(sequence, rendered):
+            delay_days = email_schedule["delay_days"]
+            send_date = datetime.utcnow() + timedelta(days=delay_days)
+            self.log(f"Scheduled {len(emails)} '{email_schedule['template_key']}' emails on {send_date.isoformat()}")
+            
+            # Simulate sending (in production, this would be scheduled)
+            if delay_days == 0:
+                for email in emails:
+                    self.send_email(email["email"], email["subject"], email["body"])
+        
+        return dict(renderer.stats)
+
 def main():
     """Test the email automation service."""
     automation = CRMEmailAutomation()
@@ -1,7 +1,20 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
 from flask_sqlalchemy import SQLAlchemy
 from sqlalchemy.exc import IntegrityError
+import csv
+import hashlib
+import io
+import json
+import logging
+import os
 import re
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
 
 lead_gen = Blueprint('lead_gen', __name__)
 db = SQLAlchemy()
@@ -12,35 +25,87 @@ class Lead(db.Model):
     name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     phone = db.Column(db.String(20), nullable=True)
+    # SHA-256 of the normalized email/phone, indexed for duplicate checks
+    email_hash = db.Column(db.String(64), nullable=True, index=True)
+    phone_hash = db.Column(db.String(64), nullable=True, index=True)
 
     def __repr__(self):
         return f'<Lead {self.email}>'
 
+# Column sizes; databases that enforce them reject a whole import chunk over one long value
+LEAD_FIELD_LENGTHS = {field: Lead.__table__.columns[field].type.length for field in ('name', 'email', 'phone')}
+
 # Simple email validation regex
 EMAIL_REGEX = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")
 
-@lead_gen.route('/api/leads', methods=['POST'])
-def capture_lead():
-    data = request.get_json()
-    if not data:
-        return jsonify({'error': 'Missing JSON data'}), 400
+IMPORT_CHUNK_SIZE = 500
+# Row errors kept per import job; later ones are only counted
+MAX_REPORTED_ERRORS = 100
+
+# Bulk import jobs by id
+# In production, consider a persistent store
+import_jobs = {}
+import_jobs_lock = threading.Lock()
+
+
+def contact_hash(value):
+    return hashlib.sha256(value.encode('utf-8')).hexdigest() if value else None
+
+
+def email_hash(email):
+    return contact_hash(email.strip().lower())
+
 
-    name = data.get('name', '').strip()
-    email = data.get('email', '').strip()
-    phone = data.get('phone', '').strip() if 'phone' in data else None
+def phone_hash(phone):
+    digits = re.sub(r'\D', '', phone or '')
+    return contact_hash(digits)
+
+
+def validate_lead(data):
+    """Return (lead fields, errors) for one submitted lead"""
+    name = (data.get('name') or '').strip()
+    email = (data.get('email') or '').strip()
+    phone = (data.get('phone') or '').strip() or None
 
-    # Validation
     errors = {}
     if not name:
         errors['name'] = 'Name is required.'
+    elif len(name) > LEAD_FIELD_LENGTHS['name']:
+        errors['name'] = 'Name is too long.'
     if not email or not EMAIL_REGEX.match(email):
         errors['email'] = 'Valid email is required.'
+    elif len(email) > LEAD_FIELD_LENGTHS['email']:
+        errors['email'] = 'Email is too long.'
+    if phone and len(phone) > LEAD_FIELD_LENGTHS['phone']:
+        errors['phone'] = 'Phone number is too long.'
+    return {'name': name, 'email': email, 'phone': phone}, errors
 
+
+def backfill_contact_hashes(batch_size=1000):
+    """Fill email/phone hashes for leads created before the columns existed"""
+    while True:
+        leads = Lead.query.filter(Lead.email_hash.is_(None)).limit(batch_size).all()
+        if not leads:
+            return
+        for lead in leads:
+            lead.email_hash = email_hash(lead.email)
+            lead.phone_hash = phone_hash(lead.phone)
+        db.session.commit()
+
+@lead_gen.route('/api/leads', methods=['POST'])
+def capture_lead():
+    data = request.get_json()
+    if not data:
+        return jsonify({'error': 'Missing JSON data'}), 400
+
+    fields, errors = validate_lead(data)
     if errors:
         return jsonify({'errors': errors}), 400
 
     # Save lead
-    new_lead = Lead(name=name, email=email, phone=phone)
+    new_lead = Lead(email_hash=email_hash(fields['email']), phone_hash=phone_hash(fields['phone']), **fields)
+    if Lead.query.filter_by(email_hash=new_lead.email_hash).first() is not None:
+        return jsonify({'error': 'Email already exists'}), 409
     try:
         db.session.add(new_lead)
         db.session.commit()
@@ -52,3 +117,202 @@ def capture_lead():
         return jsonify({'error': 'Internal server error'}), 500
 
     return jsonify({'message': 'Lead captured successfully', 'lead': {'id': new_lead.id, 'name': new_lead.name, 'email': new_lead.email, 'phone': new_lead.phone}}), 201
+
+
+class LeadImportJob:
+    """Progress of one bulk import, safe to read while the worker updates it"""
+
+    def __init__(self, filename, fmt):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.format = fmt
+        self.status = 'queued'
+        self.rows_read = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.invalid = 0
+        self.submitted = 0
+        self.submission_failures = 0
+        self.errors = []
+        self.created_at = time.time()
+        self.finished_at = None
+
+    def add_error(self, row, error):
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'row': row, 'error': error})
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'filename': self.filename,
+            'format': self.format,
+            'status': self.status,
+            'rows_read': self.rows_read,
+            'imported': self.imported,
+            'duplicates': self.duplicates,
+            'invalid': self.invalid,
+            'submitted': self.submitted,
+            'submission_failures': self.submission_failures,
+            'errors': list(self.errors),
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+
+def iter_upload_rows(stream, fmt):
+    """Yield (row number, dict) from a CSV or NDJSON byte stream without reading it all"""
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        reader = csv.DictReader(text)
+        for row_number, row in enumerate(reader, 2):
+            yield row_number, {key.strip().lower(): value for key, value in row.items() if key}
+    else:
+        for row_number, line in enumerate(text, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield row_number, None
+                continue
+            yield row_number, row if isinstance(row, dict) else None
+
+
+def _import_chunk(job, chunk, seen_hashes, submit):
+    """Validate, dedupe and insert one chunk of rows in a single transaction"""
+    candidates = []
+    for row_number, row in chunk:
+        if row is None:
+            job.invalid += 1
+            job.add_error(row_number, 'Unreadable row')
+            continue
+        fields, errors = validate_lead(row)
+        if errors:
+            job.invalid += 1
+            job.add_error(row_number, errors)
+            continue
+        fields['email_hash'] = email_hash(fields['email'])
+        fields['phone_hash'] = phone_hash(fields['phone'])
+        candidates.append((row_number, fields))
+
+    for attempt in range(2):
+        email_hashes = {fields['email_hash'] for _, fields in candidates}
+        phone_hashes = {fields['phone_hash'] for _, fields in candidates if fields['phone_hash']}
+        existing = set()
+        if email_hashes:
+            existing.update(h for (h,) in db.session.query(Lead.email_hash).filter(Lead.email_hash.in_(email_hashes)))
+        if phone_hashes:
+            existing.update(h for (h,) in db.session.query(Lead.phone_hash).filter(Lead.phone_hash.in_(phone_hashes)))
+        # Exact email matches also catch legacy rows that have no hash yet
+        existing_emails = {e.lower() for (e,) in db.session.query(Lead.email).filter(
+            Lead.email.in_([fields['email'] for _, fields in candidates]))} if candidates else set()
+
+        rows = []
+        duplicates = 0
+        chunk_hashes = set()
+        for row_number, fields in candidates:
+            keys = {fields['email_hash'], fields['phone_hash']} - {None}
+            if fields['email'].lower() in existing_emails or any(
+                    key in existing or key in seen_hashes or key in chunk_hashes for key in keys):
+                duplicates += 1
+                continue
+            chunk_hashes.update(keys)
+            rows.append(fields)
+
+        try:
+            if rows:
+                # One executemany and one commit for the whole chunk
+                db.session.execute(Lead.__table__.insert(), rows)
+            db.session.commit()
+            break
+        except IntegrityError:
+            # A lead was added concurrently; check the chunk against the table again
+            db.session.rollback()
+            if attempt:
+                raise
+
+    seen_hashes.update(chunk_hashes)
+    job.duplicates += duplicates
+    job.imported += len(rows)
+
+    if submit and rows:
+        leads = [{'name': r['name'], 'email': r['email'], 'phone': r['phone'] or ''} for r in rows]
+        results = submit(leads)
+        job.submitted += len(results)
+        job.submission_failures += sum(1 for r in results if not r.get('success'))
+
+
+def run_import_job(app, job, path, submit=None, chunk_size=IMPORT_CHUNK_SIZE):
+    """Import an uploaded file chunk by chunk, updating `job` as it goes"""
+    job.status = 'running'
+    try:
+        with app.app_context(), open(path, 'rb') as stream:
+            seen_hashes = set()
+            chunk = []
+            for row_number, row in iter_upload_rows(stream, job.format):
+                job.rows_read += 1
+                chunk.append((row_number, row))
+                if len(chunk) >= chunk_size:
+                    _import_chunk(job, chunk, seen_hashes, submit)
+                    chunk = []
+            if chunk:
+                _import_chunk(job, chunk, seen_hashes, submit)
+            db.session.remove()
+        job.status = 'completed'
+    except Exception as e:
+        logger.exception(f'Lead import {job.id} failed')
+        job.status = 'failed'
+        job.add_error(None, str(e))
+    finally:
+        job.finished_at = time.time()
+        os.remove(path)
+
+
+def _upload_format(upload_name, content_type):
+    fmt = request.args.get('format')
+    if not fmt:
+        name = (upload_name or '').lower()
+        if name.endswith('.csv') or 'csv' in content_type:
+            fmt = 'csv'
+        elif name.endswith(('.ndjson', '.jsonl')) or 'ndjson' in content_type or 'jsonl' in content_type:
+            fmt = 'ndjson'
+    return fmt
+
+
+@lead_gen.route('/api/leads/import', methods=['POST'])
+def import_leads():
+    """
+    Start a bulk import from a CSV (name,email,phone header) or NDJSON upload,
+    sent as multipart field 'file' or as the raw request body.
+    Set LEAD_IMPORT_SUBMITTER in the app config (e.g. LeadCapture(...).submit_many)
+    to also submit imported leads to external sources.
+    """
+    upload = request.files.get('file')
+    stream = upload.stream if upload else request.stream
+    content_type = (upload.mimetype if upload else request.mimetype) or ''
+    fmt = _upload_format(upload.filename if upload else None, content_type)
+    if fmt not in ('csv', 'ndjson'):
+        return jsonify({'error': 'Upload must be CSV or NDJSON'}), 400
+
+    # Spool to disk so the request can finish while rows are imported
+    fd, path = tempfile.mkstemp(prefix='lead_import_', suffix=f'.{fmt}')
+    with os.fdopen(fd, 'wb') as spool:
+        shutil.copyfileobj(stream, spool, 1024 * 1024)
+
+    job = LeadImportJob(upload.filename if upload else None, fmt)
+    with import_jobs_lock:
+        import_jobs[job.id] = job
+
+    app = current_app._get_current_object()
+    submit = app.config.get('LEAD_IMPORT_SUBMITTER')
+    threading.Thread(target=run_import_job, args=(app, job, path, submit), daemon=True).start()
+    return jsonify(job.to_dict()), 202
+
+
+@lead_gen.route('/api/leads/import/<job_id>', methods=['GET'])
+def import_status(job_id):
+    job = import_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Import job not found'}), 404
+    return jsonify(job.to_dict())
@@ -1,40 +1,213 @@
-from fastapi import Request, HTTPException
+from fastapi import Request
+from fastapi.responses import JSONResponse
 from starlette.middleware.base import BaseHTTPMiddleware
 from starlette.status import HTTP_429_TOO_MANY_REQUESTS
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+import math
+import threading
 import time
-import asyncio
+import zlib
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Allow `limit` requests per `period_seconds`, with bursts of up to `limit` requests."""
+
+    limit: int
+    period_seconds: float
+
+    @property
+    def emission_interval(self) -> float:
+        """Seconds each request adds to the client's theoretical arrival time."""
+        return self.period_seconds / self.limit
+
+
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+
+
+class InMemoryRateLimitBackend:
+    """
+    GCRA (generic cell rate algorithm) limiter with state held in-process.
+
+    Each key costs one float (its theoretical arrival time, TAT), no matter how
+    many requests it makes. Keys are spread over lock-striped shards, and keys
+    whose TAT has passed, which are indistinguishable from unseen keys, are
+    evicted one shard at a time.
+    """
+
+    def __init__(self, num_shards: int = 64, eviction_interval: float = 60.0):
+        self.num_shards = num_shards
+        self.eviction_interval = eviction_interval
+        self._shards: List[Dict[str, float]] = [{} for _ in range(num_shards)]
+        self._locks = [threading.Lock() for _ in range(num_shards)]
+        self._next_eviction = time.monotonic() + eviction_interval / num_shards
+        self._eviction_cursor = 0
+
+    def _shard_index(self, key: str) -> int:
+        return zlib.crc32(key.encode('utf-8')) % self.num_shards
+
+    def __len__(self) -> int:
+        return sum(len(shard) for shard in self._shards)
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        return self.hit_sync(key, policy)
+
+    def hit_sync(self, key: str, policy: RateLimitPolicy, now: Optional[float] = None) -> RateLimitResult:
+        """Record a request for key and report whether it is allowed."""
+        now = time.monotonic() if now is None else now
+        interval = policy.emission_interval
+        index = self._shard_index(key)
+
+        with self._locks[index]:
+            shard = self._shards[index]
+            tat = max(shard.get(key, now), now)
+            new_tat = tat + interval
+            allow_at = new_tat - policy.period_seconds
+            if now < allow_at:
+                result = RateLimitResult(False, policy.limit, 0, allow_at - now)
+            else:
+                shard[key] = new_tat
+                remaining = int((policy.period_seconds - (new_tat - now)) / interval + 1e-9)
+                result = RateLimitResult(True, policy.limit, remaining, 0.0)
+
+        if now >= self._next_eviction:
+            self._evict_next_shard(now)
+        return result
+
+    def _evict_next_shard(self, now: float):
+        """Drop fully recovered keys from one shard, spreading the sweep over the interval."""
+        index = self._eviction_cursor
+        self._eviction_cursor = (index + 1) % self.num_shards
+        self._next_eviction = now + self.eviction_interval / self.num_shards
+        with self._locks[index]:
+            shard = self._shards[index]
+            expired = [key for key, tat in shard.items() if tat <= now]
+            for key in expired:
+                del shard[key]
+
+
+# KEYS[1] = limiter key; ARGV = emission interval (ms), period (ms).
+# Uses the Redis server clock so all workers agree on time.
+GCRA_LUA = """
+local interval = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000 + math.floor(tonumber(time[2]) / 1000)
+local tat = tonumber(redis.call('GET', KEYS[1]) or now)
+if tat < now then
+    tat = now
+end
+local new_tat = tat + interval
+local allow_at = new_tat - period
+if now < allow_at then
+    return {0, 0, allow_at - now}
+end
+redis.call('SET', KEYS[1], new_tat, 'PX', math.ceil(new_tat - now))
+return {1, math.floor((period - (new_tat - now)) / interval), 0}
+"""
+
+
+class RedisRateLimitBackend:
+    """
+    GCRA limiter evaluated atomically in Redis, so limits hold across workers.
+
+    State is one string per key that expires once the key has fully recovered.
+    """
+
+    def __init__(self, redis_client, key_prefix: str = "ratelimit:"):
+        """
+        Args:
+            redis_client: redis.asyncio.Redis client
+            key_prefix: Prefix for limiter keys
+        """
+        self.redis = redis_client
+        self.key_prefix = key_prefix
+        self._script = redis_client.register_script(GCRA_LUA)
+
+    async def hit(self, key: str, policy: RateLimitPolicy) -> RateLimitResult:
+        allowed, remaining, retry_after_ms = await self._script(
+            keys=[self.key_prefix + key],
+            args=[policy.emission_interval * 1000, policy.period_seconds * 1000]
+        )
+        return RateLimitResult(bool(allowed), policy.limit, int(remaining), float(retry_after_ms) / 1000)
+
 
 class RateLimiterMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, max_requests: int = 100, window_seconds: int = 60):
+    def __init__(self, app, max_requests: int = 100, window_seconds: int = 60,
+                 backend=None,
+                 route_policies: Optional[Dict[str, RateLimitPolicy]] = None,
+                 api_key_policies: Optional[Dict[str, RateLimitPolicy]] = None,
+                 api_key_header: str = "X-API-Key",
+                 api_key_validator: Optional[Callable[[str], bool]] = None):
+        """
+        Args:
+            app: ASGI application
+            max_requests: Default requests allowed per window
+            window_seconds: Default window length
+            backend: InMemoryRateLimitBackend (default) or RedisRateLimitBackend
+            route_policies: Policies by path prefix; the longest matching prefix wins
+                and gets its own bucket per client
+            api_key_policies: Policies by API key, taking precedence over route policies
+            api_key_header: Header identifying API clients; others are limited per IP
+            api_key_validator: Accepts keys that get their own bucket besides those in
+                api_key_policies; requests with any other key are limited per IP
+        """
         super().__init__(app)
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        # Store data in the form {client_ip: [timestamps]}
-        self.requests = {}
-        self.lock = asyncio.Lock()
+        self.default_policy = RateLimitPolicy(max_requests, window_seconds)
+        self.backend = backend if backend is not None else InMemoryRateLimitBackend()
+        self.route_policies = sorted((route_policies or {}).items(), key=lambda item: len(item[0]), reverse=True)
+        self.api_key_policies = api_key_policies or {}
+        self.api_key_header = api_key_header
+        self.api_key_validator = api_key_validator
 
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host
-        now = time.monotonic()
+    def resolve(self, request: Request) -> Tuple[str, RateLimitPolicy]:
+        """Pick the limiter key and policy for a request."""
+        api_key = request.headers.get(self.api_key_header)
+        # Unknown keys share the caller's IP bucket, so rotating keys buys nothing
+        if api_key and not (api_key in self.api_key_policies
+                            or (self.api_key_validator is not None and self.api_key_validator(api_key))):
+            api_key = None
+        client = f"key:{api_key}" if api_key else f"ip:{request.client.host if request.client else 'unknown'}"
 
-        async with self.lock:
-            if client_ip not in self.requests:
-                self.requests[client_ip] = []
+        policy = self.default_policy
+        key = client
+        path = request.url.path
+        for prefix, route_policy in self.route_policies:
+            if path.startswith(prefix):
+                policy = route_policy
+                key = f"{client}|{prefix}"
+                break
 
-            # Remove timestamps outside the window
-            window_start = now - self.window_seconds
-            self.requests[client_ip] = [ts for ts in self.requests[client_ip] if ts > window_start]
+        if api_key and api_key in self.api_key_policies:
+            policy = self.api_key_policies[api_key]
+        return key, policy
 
-            if len(self.requests[client_ip]) >= self.max_requests:
-                retry_after = self.requests[client_ip][0] + self.window_seconds - now
-                headers = {"Retry-After": str(int(retry_after))}
-                raise HTTPException(
-                    status_code=HTTP_429_TOO_MANY_REQUESTS,
-                    detail=f"Rate limit exceeded. Try again in {int(retry_after)} seconds.",
-                    headers=headers
-                )
+    async def dispatch(self, request: Request, call_next):
+        key, policy = self.resolve(request)
+        result = await self.backend.hit(key, policy)
 
-            self.requests[client_ip].append(now)
+        if not result.allowed:
+            retry_after = math.ceil(result.retry_after)
+            # Exceptions raised in BaseHTTPMiddleware bypass FastAPI's handlers, so respond directly
+            return JSONResponse(
+                status_code=HTTP_429_TOO_MANY_REQUESTS,
+                content={"detail": f"Rate limit exceeded. Try again in {retry_after} seconds."},
+                headers={
+                    "Retry-After": str(retry_after),
+                    "X-RateLimit-Limit": str(result.limit),
+                    "X-RateLimit-Remaining": "0"
+                }
+            )
 
         response = await call_next(request)
+        response.headers["X-RateLimit-Limit"] = str(result.limit)
+        response.headers["X-RateLimit-Remaining"] = str(result.remaining)
         return response
@@ -1,38 +1,290 @@
+import heapq
+import math
 import re
-from typing import List, Dict, Any
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Iterable, Tuple
+
+# Default weights for the fields that contribute to full-text relevance
+DEFAULT_FIELD_WEIGHTS = {'title': 2.0, 'content': 1.0}
+
+# Field weights for CRM contacts and deals (see crm_contact_service / crm_deal_service)
+CONTACT_FIELD_WEIGHTS = {'name': 3.0, 'email': 2.0, 'handle_ig': 2.0, 'phone': 1.0, 'country': 0.5}
+DEAL_FIELD_WEIGHTS = {'product': 2.0, 'notes': 1.0, 'stage': 0.5, 'pipeline': 0.5}
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text: Any) -> List[str]:
+    """Split text into lowercase word tokens"""
+    if text is None:
+        return []
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+class _TrieNode:
+    __slots__ = ('children', 'value', 'count', 'top', 'dirty')
+
+    def __init__(self):
+        self.children: Dict[str, '_TrieNode'] = {}
+        self.value: Optional[str] = None
+        self.count = 0
+        self.top: List[Tuple[int, str]] = []
+        self.dirty = False
+
+
+class PrefixTrie:
+    """
+    Prefix trie of field values ranked by popularity (number of records holding the value).
+
+    Every node caches the top-N (count, value) pairs of its subtree. Updates only
+    mark the nodes along one path dirty, and a lookup recomputes a dirty node by
+    merging its children's cached lists, so suggestions cost O(len(prefix) + N)
+    instead of a scan over all values.
+    """
+
+    def __init__(self, cache_size: int = 10):
+        self.root = _TrieNode()
+        self.cache_size = cache_size
+
+    def adjust(self, value: str, delta: int):
+        """Change the popularity of a value by delta, inserting or removing it as needed"""
+        node = self.root
+        path = [node]
+        for char in value.lower():
+            node = node.children.setdefault(char, _TrieNode())
+            path.append(node)
+        node.count = max(0, node.count + delta)
+        if node.count and delta > 0:
+            node.value = value
+        elif not node.count:
+            node.value = None
+        for visited in path:
+            visited.dirty = True
+
+    def _refresh(self, node: _TrieNode) -> List[Tuple[int, str]]:
+        if node.dirty:
+            candidates = [(node.count, node.value)] if node.count else []
+            for child in node.children.values():
+                candidates.extend(self._refresh(child))
+            node.top = heapq.nlargest(self.cache_size, candidates, key=lambda pair: (pair[0], pair[1]))
+            node.dirty = False
+        return node.top
+
+    def _collect(self, node: _TrieNode, out: List[Tuple[int, str]]):
+        if node.count:
+            out.append((node.count, node.value))
+        for child in node.children.values():
+            self._collect(child, out)
+
+    def suggest(self, prefix: str, limit: int = 5) -> List[str]:
+        """Return up to limit values starting with prefix, most popular first"""
+        node = self.root
+        for char in prefix.lower():
+            node = node.children.get(char)
+            if node is None:
+                return []
+        if limit <= self.cache_size:
+            top = self._refresh(node)
+        else:
+            top = []
+            self._collect(node, top)
+            top = heapq.nlargest(limit, top, key=lambda pair: (pair[0], pair[1]))
+        return [value for _, value in top[:limit]]
+
 
 class AdvancedSearch:
-    def __init__(self, data_source: List[Dict[str, Any]]):
-        """Initialize with a list of data entries (e.g. documents, notes, etc.)"""
-        self.data = data_source
-
-    def _filter_by_fields(self, filters: Dict[str, Any], items: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Filter items by given key-value filters"""
-        if not filters:
-            return items
-        filtered = []
-        for item in items:
-            match = True
-            for key, value in filters.items():
-                if key not in item or str(item[key]).lower() != str(value).lower():
-                    match = False
-                    break
-            if match:
-                filtered.append(item)
-        return filtered
+    def __init__(self, data_source: List[Dict[str, Any]], field_weights: Dict[str, float] = None,
+                 id_field: str = 'id', k1: float = 1.2, b: float = 0.75):
+        """
+        Initialize with a list of data entries (e.g. documents, notes, etc.)
 
-    def _autocomplete(self, prefix: str, field: str = 'title', limit: int = 5) -> List[str]:
-        """Return autocomplete suggestions for a given prefix on a field"""
-        prefix = prefix.lower()
-        suggestions = set()
-        for item in self.data:
+        Entries are held in an incrementally maintained inverted index, so
+        add_item/update_item/remove_item keep search and autocomplete current
+        without rebuilding anything.
+
+        :param data_source: initial entries
+        :param field_weights: text fields to index and their relevance weights
+        :param id_field: key holding a unique entry ID (entries without one get a sequential ID)
+        :param k1: BM25 term-frequency saturation
+        :param b: BM25 length normalisation
+        """
+        self.field_weights = field_weights or DEFAULT_FIELD_WEIGHTS
+        self.id_field = id_field
+        self.k1 = k1
+        self.b = b
+
+        self._items: Dict[Any, Dict[str, Any]] = {}
+        self._order: Dict[Any, int] = {}
+        self._doc_terms: Dict[Any, Dict[str, float]] = {}
+        self._doc_lengths: Dict[Any, float] = {}
+        self._total_length = 0.0
+        self._postings: Dict[str, Dict[Any, float]] = defaultdict(dict)
+        # field -> lowercased value -> set of IDs, built on first filter use of a field
+        self._filter_postings: Dict[str, Dict[str, set]] = {}
+        # field -> PrefixTrie, built on first autocomplete use of a field
+        self._tries: Dict[str, PrefixTrie] = {}
+        self._next_id = 0
+        self._sequence = 0
+
+        for item in data_source:
+            self.add_item(item)
+
+    @property
+    def data(self) -> List[Dict[str, Any]]:
+        """All indexed entries"""
+        return list(self._items.values())
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def _item_id(self, item: Dict[str, Any]) -> Any:
+        item_id = item.get(self.id_field)
+        if item_id is None:
+            item_id = self._next_id
+            self._next_id += 1
+        return item_id
+
+    def add_item(self, item: Dict[str, Any]) -> Any:
+        """
+        Index an entry, replacing any entry with the same ID.
+
+        :param item: entry to index
+        :return: the entry's ID
+        """
+        item_id = self._item_id(item)
+        sequence = self._order.get(item_id)
+        if sequence is None:
+            sequence = self._sequence
+            self._sequence += 1
+        else:
+            # Updates keep the entry's original position
+            self.remove_item(item_id)
+
+        terms: Dict[str, float] = defaultdict(float)
+        for field, weight in self.field_weights.items():
+            for token in tokenize(item.get(field)):
+                terms[token] += weight
+        length = sum(terms.values())
+
+        self._items[item_id] = item
+        self._order[item_id] = sequence
+        self._doc_terms[item_id] = terms
+        self._doc_lengths[item_id] = length
+        self._total_length += length
+        for term, frequency in terms.items():
+            self._postings[term][item_id] = frequency
+
+        for field, values in self._filter_postings.items():
+            if field in item:
+                values.setdefault(str(item[field]).lower(), set()).add(item_id)
+        for field, trie in self._tries.items():
+            if item.get(field):
+                trie.adjust(str(item[field]), 1)
+        return item_id
+
+    def update_item(self, item: Dict[str, Any]) -> Any:
+        """Re-index an entry after it changed"""
+        return self.add_item(item)
+
+    def remove_item(self, item_id: Any) -> bool:
+        """
+        Remove an entry from the index.
+
+        :param item_id: ID of the entry
+        :return: True if the entry was indexed
+        """
+        item = self._items.pop(item_id, None)
+        if item is None:
+            return False
+        del self._order[item_id]
+
+        for term in self._doc_terms.pop(item_id):
+            postings = self._postings[term]
+            postings.pop(item_id, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._doc_lengths.pop(item_id)
+
+        for field, values in self._filter_postings.items():
             if field in item:
-                val = str(item[field])
-                if val.lower().startswith(prefix):
-                    suggestions.add(val)
-                    if len(suggestions) >= limit:
-                        break
-        return list(suggestions)
+                key = str(item[field]).lower()
+                ids = values.get(key)
+                if ids is not None:
+                    ids.discard(item_id)
+                    if not ids:
+                        del values[key]
+        for field, trie in self._tries.items():
+            if item.get(field):
+                trie.adjust(str(item[field]), -1)
+        return True
+
+    def _field_postings(self, field: str) -> Dict[str, set]:
+        values = self._filter_postings.get(field)
+        if values is None:
+            values = {}
+            for item_id, item in self._items.items():
+                if field in item:
+                    values.setdefault(str(item[field]).lower(), set()).add(item_id)
+            self._filter_postings[field] = values
+        return values
+
+    def _candidate_ids(self, terms: Iterable[str], filters: Dict[str, Any]) -> Optional[set]:
+        """Intersect posting lists for all terms and filters, smallest first; None means no constraint"""
+        lists = []
+        for term in terms:
+            postings = self._postings.get(term)
+            if not postings:
+                return set()
+            lists.append(postings.keys())
+        for field, value in filters.items():
+            ids = self._field_postings(field).get(str(value).lower())
+            if not ids:
+                return set()
+            lists.append(ids)
+        if not lists:
+            return None
+
+        # Walk the shortest list and probe the others (O(1) membership each)
+        lists.sort(key=len)
+        shortest, rest = lists[0], lists[1:]
+        if len(rest) == 1:
+            other = rest[0]
+            return {item_id for item_id in shortest if item_id in other}
+        return {item_id for item_id in shortest if all(item_id in ids for ids in rest)}
+
+    def _score(self, candidates: Iterable[Any], terms: List[str]) -> List[Tuple[float, Any]]:
+        """BM25 scores for candidates that contain every term"""
+        total = len(self._items)
+        average_length = self._total_length / total if self._total_length else 1.0
+        k1, b = self.k1, self.b
+        lengths = self._doc_lengths
+        weighted = []
+        for term in terms:
+            postings = self._postings[term]
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            weighted.append((postings, idf * (k1 + 1)))
+
+        scored = []
+        for item_id in candidates:
+            norm = k1 * (1 - b + b * lengths[item_id] / average_length)
+            score = 0.0
+            for postings, factor in weighted:
+                frequency = postings[item_id]
+                score += factor * frequency / (frequency + norm)
+            scored.append((score, item_id))
+        return scored
+
+    def _autocomplete(self, prefix: str, field: str = 'title', limit: int = 5) -> List[str]:
+        """Return autocomplete suggestions for a given prefix on a field, most common values first"""
+        trie = self._tries.get(field)
+        if trie is None:
+            trie = PrefixTrie()
+            for item in self._items.values():
+                if item.get(field):
+                    trie.adjust(str(item[field]), 1)
+            trie.suggest('')  # Fill every node's top-N cache up front
+            self._tries[field] = trie
+        return trie.suggest(prefix, limit)
 
     def _parse_natural_language_query(self, query: str) -> Dict[str, Any]:
         """Basic natural language query parsing to extract filters and keywords"""
@@ -62,33 +314,44 @@ class AdvancedSearch:
 
         return {'filters': filters, 'keywords': keywords}
 
-    def search(self, query: str, filters: Dict[str, Any] = None) -> List[Dict[str, Any]]:
+    def search(self, query: str, filters: Dict[str, Any] = None, limit: int = None) -> List[Dict[str, Any]]:
         """
         Perform a search over the data.
         Supports natural language queries and explicit filters.
 
+        Every keyword must match a token in one of the indexed fields; matches
+        are ranked by BM25 relevance. Filter-only queries keep index order.
+
         :param query: search query string, can be natural language
         :param filters: explicit filters as dict
+        :param limit: maximum number of results (all matches if None)
         :return: list of matched items
         """
         parsed = self._parse_natural_language_query(query)
-        combined_filters = filters or {}
+        combined_filters = dict(filters or {})
         combined_filters.update(parsed.get('filters', {}))
 
-        # Filter data first
-        filtered_data = self._filter_by_fields(combined_filters, self.data)
-
-        # If there are keywords, filter by them (simple substring match in 'content' or 'title')
-        keywords = parsed.get('keywords', [])
-        if keywords:
-            result = []
-            for item in filtered_data:
-                searchable_text = ((item.get('title', '') + ' ' + item.get('content', ''))).lower()
-                if all(kw.lower() in searchable_text for kw in keywords):
-                    result.append(item)
-            return result
+        terms = []
+        for keyword in parsed.get('keywords', []):
+            terms.extend(tokenize(keyword))
+        terms = list(dict.fromkeys(terms))
+
+        candidates = self._candidate_ids(terms, combined_filters)
+        if candidates is None:
+            items = list(self._items.values())
+            return items[:limit] if limit is not None else items
+
+        if not terms:
+            ids = sorted(candidates, key=self._order.__getitem__)
+            ids = ids[:limit] if limit is not None else ids
         else:
-            return filtered_data
+            scored = self._score(candidates, terms)
+            if limit is not None:
+                ranked = heapq.nlargest(limit, scored, key=lambda pair: pair[0])
+            else:
+                ranked = sorted(scored, key=lambda pair: pair[0], reverse=True)
+            ids = [item_id for _, item_id in ranked]
+        return [self._items[item_id] for item_id in ids]
 
     def autocomplete(self, prefix: str, field: str = 'title', limit: int = 5) -> List[str]:
         """Get autocomplete suggestions"""
@@ -1,13 +1,465 @@
+import asyncio
 import json
+import logging
+import os
+import random
+import sqlite3
 import threading
-import requests
-from typing import List, Dict, Any
+import time
+from collections import defaultdict
+from typing import List, Dict, Any, Optional, Tuple
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
 
 # In-memory storage for registered webhooks
 # In production, consider a persistent DB
 registered_webhooks: List[Dict[str, Any]] = []
 
+# Outbox row states
+PENDING = 'pending'
+IN_FLIGHT = 'in_flight'
+DELIVERED = 'delivered'
+DEAD = 'dead'
+
+# Client errors worth retrying; any other 4xx is treated as permanent
+RETRYABLE_STATUS = {408, 409, 425, 429}
+
+
+class WebhookOutbox:
+    """
+    Durable SQLite outbox of webhook deliveries.
+
+    Events are appended in a single transaction per dispatch, so either every
+    subscribed endpoint gets a delivery record or none does. Rows claimed by a
+    dispatcher that crashed are returned to pending on startup.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._conn.executescript('''
+            CREATE TABLE IF NOT EXISTS webhook_outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL,
+                event TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                next_attempt_at REAL NOT NULL,
+                created_at REAL NOT NULL,
+                delivered_at REAL,
+                last_error TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_webhook_outbox_due
+                ON webhook_outbox (status, next_attempt_at);
+        ''')
+        with self._lock:
+            self._conn.execute(
+                "UPDATE webhook_outbox SET status = ? WHERE status = ?", (PENDING, IN_FLIGHT)
+            )
+
+    def enqueue(self, deliveries: List[Tuple[str, str, str]]) -> int:
+        """
+        Append deliveries atomically.
+
+        Args:
+            deliveries: (url, event_name, payload_json) tuples
+
+        Returns:
+            Number of rows added
+        """
+        if not deliveries:
+            return 0
+        now = time.time()
+        with self._lock:
+            self._conn.execute('BEGIN')
+            try:
+                self._conn.executemany(
+                    'INSERT INTO webhook_outbox (url, event, payload, next_attempt_at, created_at) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    [(url, event, payload, now, now) for url, event, payload in deliveries]
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return len(deliveries)
+
+    def claim_due(self, limit: int, now: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Mark up to `limit` due pending rows in flight and return them, oldest first."""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._conn.execute('BEGIN IMMEDIATE')
+            try:
+                rows = self._conn.execute(
+                    'SELECT id, url, event, payload, attempts FROM webhook_outbox '
+                    'WHERE status = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?',
+                    (PENDING, now, limit)
+                ).fetchall()
+                self._conn.executemany(
+                    'UPDATE webhook_outbox SET status = ? WHERE id = ?',
+                    [(IN_FLIGHT, row[0]) for row in rows]
+                )
+                self._conn.execute('COMMIT')
+            except Exception:
+                self._conn.execute('ROLLBACK')
+                raise
+        return [
+            {'id': row[0], 'url': row[1], 'event': row[2], 'payload': row[3], 'attempts': row[4]}
+            for row in rows
+        ]
+
+    def next_due_at(self) -> Optional[float]:
+        """Earliest next_attempt_at of any pending row."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT MIN(next_attempt_at) FROM webhook_outbox WHERE status = ?', (PENDING,)
+            ).fetchone()
+        return row[0]
+
+    def mark_delivered(self, ids: List[int]):
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                'UPDATE webhook_outbox SET status = ?, delivered_at = ?, attempts = attempts + 1, '
+                'last_error = NULL WHERE id = ?',
+                [(DELIVERED, now, row_id) for row_id in ids]
+            )
+
+    def reschedule(self, ids: List[int], next_attempt_at: float, error: Optional[str], count_attempt: bool = True):
+        """Return rows to pending for a later attempt."""
+        with self._lock:
+            self._conn.executemany(
+                'UPDATE webhook_outbox SET status = ?, next_attempt_at = ?, last_error = ?, '
+                'attempts = attempts + ? WHERE id = ?',
+                [(PENDING, next_attempt_at, error, 1 if count_attempt else 0, row_id) for row_id in ids]
+            )
+
+    def mark_dead(self, ids: List[int], error: str):
+        with self._lock:
+            self._conn.executemany(
+                'UPDATE webhook_outbox SET status = ?, last_error = ?, attempts = attempts + 1 WHERE id = ?',
+                [(DEAD, error, row_id) for row_id in ids]
+            )
+
+    def purge(self, older_than: float, now: Optional[float] = None, batch_size: int = 1000) -> int:
+        """
+        Delete delivered and dead rows older than `older_than` seconds.
+
+        Delivered rows age from their delivery time, dead rows from when the
+        event was enqueued. Rows are deleted in batches so the dispatcher is
+        never locked out for long.
+
+        Returns:
+            Number of rows deleted
+        """
+        cutoff = (time.time() if now is None else now) - older_than
+        deleted = 0
+        while True:
+            with self._lock:
+                cursor = self._conn.execute(
+                    'DELETE FROM webhook_outbox WHERE id IN ('
+                    'SELECT id FROM webhook_outbox WHERE status IN (?, ?) '
+                    'AND COALESCE(delivered_at, created_at) < ? LIMIT ?)',
+                    (DELIVERED, DEAD, cutoff, batch_size)
+                )
+            deleted += cursor.rowcount
+            if cursor.rowcount < batch_size:
+                return deleted
+
+    def stats(self) -> Dict[str, int]:
+        """Row counts by status."""
+        with self._lock:
+            rows = self._conn.execute('SELECT status, COUNT(*) FROM webhook_outbox GROUP BY status').fetchall()
+        return {status: count for status, count in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CircuitBreaker:
+    """Per-endpoint breaker: opens after consecutive failures, half-opens after a cool-down."""
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+
+    def allow(self, now: float) -> bool:
+        """Whether a request may be attempted (a single trial once the cool-down passes)."""
+        if self.opened_at is None:
+            return True
+        if now - self.opened_at >= self.reset_timeout:
+            # Half-open: let one trial through and re-open on failure
+            self.opened_at = now
+            return True
+        return False
+
+    def retry_at(self) -> float:
+        return (self.opened_at or time.time()) + self.reset_timeout
+
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+
+    def record_failure(self, now: float):
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self.opened_at = now
+
+
+class WebhookDispatcher:
+    """
+    Drains the outbox with a fixed pool of async workers on a background thread.
+
+    Requests share one keep-alive connection pool, failures are retried with
+    exponential backoff and full jitter, endpoints that keep failing are
+    paused by a circuit breaker, and up to `batch_size` due events for the
+    same endpoint can be sent in one request.
+    """
+
+    def __init__(self, outbox: WebhookOutbox, workers: int = 8, batch_size: int = 1,
+                 max_attempts: int = 8, base_delay: float = 1.0, max_delay: float = 300.0,
+                 timeout: float = 5.0, poll_interval: float = 1.0,
+                 breaker_threshold: int = 5, breaker_reset: float = 30.0,
+                 retention_seconds: Optional[float] = 7 * 24 * 3600, purge_interval: float = 3600.0):
+        """
+        Args:
+            outbox: Outbox to drain
+            workers: Concurrent deliveries
+            batch_size: Max events per request to one endpoint (1 disables batching)
+            max_attempts: Attempts before a delivery is marked dead
+            base_delay: Backoff base in seconds
+            max_delay: Backoff cap in seconds
+            timeout: Per-request timeout in seconds
+            poll_interval: Seconds between outbox polls when not notified
+            breaker_threshold: Consecutive failures that open an endpoint's breaker
+            breaker_reset: Seconds an open breaker waits before a trial request
+            retention_seconds: How long delivered and dead rows are kept (None keeps them)
+            purge_interval: Seconds between purges of expired rows
+        """
+        self.outbox = outbox
+        self.workers = workers
+        self.batch_size = max(1, batch_size)
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.breakers: Dict[str, CircuitBreaker] = defaultdict(
+            lambda: CircuitBreaker(breaker_threshold, breaker_reset)
+        )
+        self.retention_seconds = retention_seconds
+        self.purge_interval = purge_interval
+        self.metrics = {'requests': 0, 'delivered': 0, 'retried': 0, 'dead': 0, 'purged': 0, 'latency_total': 0.0}
+        self._next_purge = 0.0
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._stopping = False
+
+    def start(self):
+        """Start the delivery thread if it is not running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stopping = False
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), name='webhook-dispatcher', daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def notify(self):
+        """Wake the dispatcher because new events were enqueued."""
+        if self._loop is not None and self._wake is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def stop(self, timeout: float = 10.0):
+        """Stop after in-flight requests finish."""
+        self._stopping = True
+        self.notify()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self, ready: threading.Event):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._wake = asyncio.Event()
+        ready.set()
+        try:
+            self._loop.run_until_complete(self._main())
+        finally:
+            self._loop.close()
+            self._loop = None
+
+    def backoff(self, attempts: int) -> float:
+        """Full-jitter exponential backoff after `attempts` failed attempts."""
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** max(0, attempts - 1))))
+
+    def _batches(self, rows: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        by_url: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for row in rows:
+            by_url[row['url']].append(row)
+        batches = []
+        for url_rows in by_url.values():
+            for i in range(0, len(url_rows), self.batch_size):
+                batches.append(url_rows[i:i + self.batch_size])
+        return batches
+
+    async def _main(self):
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.workers * 2)
+        # One keep-alive connection per worker at most, reused across endpoints on the same host
+        connector = aiohttp.TCPConnector(limit=self.workers, limit_per_host=self.workers)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as client:
+            workers = [asyncio.create_task(self._worker(client, queue)) for _ in range(self.workers)]
+            try:
+                while not self._stopping:
+                    self._purge_if_due()
+                    rows = self.outbox.claim_due(self.workers * self.batch_size * 2)
+                    for batch in self._batches(rows):
+                        await queue.put(batch)
+                    if rows:
+                        continue
+
+                    next_due = self.outbox.next_due_at()
+                    wait = self.poll_interval if next_due is None else min(self.poll_interval, max(0.0, next_due - time.time()))
+                    self._wake.clear()
+                    try:
+                        await asyncio.wait_for(self._wake.wait(), timeout=wait)
+                    except asyncio.TimeoutError:
+                        pass
+                await queue.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+    def _purge_if_due(self):
+        if self.retention_seconds is None or time.monotonic() < self._next_purge:
+            return
+        self._next_purge = time.monotonic() + self.purge_interval
+        try:
+            self.metrics['purged'] += self.outbox.purge(self.retention_seconds)
+        except sqlite3.Error as e:
+            logger.error(f'Webhook outbox purge failed: {e}')
+
+    async def _worker(self, client: aiohttp.ClientSession, queue: asyncio.Queue):
+        while True:
+            batch = await queue.get()
+            try:
+                await self._deliver(client, batch)
+            except Exception as e:
+                logger.error(f'Webhook delivery error: {e}')
+                self.outbox.reschedule([row['id'] for row in batch], time.time() + self.backoff(1), str(e))
+            finally:
+                queue.task_done()
+
+    async def _deliver(self, client: aiohttp.ClientSession, batch: List[Dict[str, Any]]):
+        url = batch[0]['url']
+        ids = [row['id'] for row in batch]
+        breaker = self.breakers[url]
+        now = time.time()
+
+        if not breaker.allow(now):
+            # Endpoint is paused; try again once the breaker half-opens, without using up an attempt
+            self.outbox.reschedule(ids, breaker.retry_at(), 'circuit open', count_attempt=False)
+            return
+
+        if len(batch) == 1:
+            row = batch[0]
+            headers = {
+                'Content-Type': 'application/json',
+                'X-FlowstateAI-Event': row['event'],
+                'X-FlowstateAI-Delivery': str(row['id'])
+            }
+            body = row['payload']
+        else:
+            headers = {'Content-Type': 'application/json', 'X-FlowstateAI-Batch': str(len(batch))}
+            body = '{"events": [%s]}' % ', '.join(
+                '{"id": %d, "event": %s, "payload": %s}' % (row['id'], json.dumps(row['event']), row['payload'])
+                for row in batch
+            )
+
+        start = time.perf_counter()
+        error = None
+        retryable = True
+        try:
+            async with client.post(url, data=body, headers=headers) as response:
+                await response.read()
+                status = response.status
+            if 200 <= status < 300:
+                breaker.record_success()
+                self.outbox.mark_delivered(ids)
+                self.metrics['requests'] += 1
+                self.metrics['delivered'] += len(ids)
+                self.metrics['latency_total'] += time.perf_counter() - start
+                return
+            error = f'HTTP {status}'
+            retryable = status >= 500 or status in RETRYABLE_STATUS
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            error = f'{type(e).__name__}: {e}'
+
+        self.metrics['requests'] += 1
+        breaker.record_failure(time.time())
+        attempts = max(row['attempts'] for row in batch) + 1
+        if not retryable or attempts >= self.max_attempts:
+            logger.warning(f'Giving up on webhook to {url} after {attempts} attempts: {error}')
+            self.outbox.mark_dead(ids, error)
+            self.metrics['dead'] += len(ids)
+        else:
+            self.outbox.reschedule(ids, time.time() + self.backoff(attempts), error)
+            self.metrics['retried'] += len(ids)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        metrics = dict(self.metrics)
+        metrics['latency_avg'] = metrics['latency_total'] / metrics['delivered'] if metrics['delivered'] else 0.0
+        metrics['open_circuits'] = [url for url, breaker in self.breakers.items() if breaker.opened_at is not None]
+        return metrics
+
+
+_outbox: Optional[WebhookOutbox] = None
+_dispatcher: Optional[WebhookDispatcher] = None
+_setup_lock = threading.Lock()
+
+
 class WebhookManager:
+    @staticmethod
+    def configure(db_path: Optional[str] = None, **dispatcher_options) -> WebhookDispatcher:
+        """
+        Set up the outbox and start its dispatcher.
+
+        Args:
+            db_path: SQLite outbox file (defaults to WEBHOOK_OUTBOX_DB or webhook_outbox.db)
+            **dispatcher_options: Passed to WebhookDispatcher
+
+        Returns:
+            The running dispatcher
+        """
+        global _outbox, _dispatcher
+        with _setup_lock:
+            if _dispatcher is not None:
+                _dispatcher.stop()
+                _outbox.close()
+            _outbox = WebhookOutbox(db_path or os.getenv('WEBHOOK_OUTBOX_DB', 'webhook_outbox.db'))
+            _dispatcher = WebhookDispatcher(_outbox, **dispatcher_options)
+            _dispatcher.start()
+            return _dispatcher
+
+    @staticmethod
+    def _get_outbox() -> Tuple[WebhookOutbox, WebhookDispatcher]:
+        if _dispatcher is None:
+            WebhookManager.configure()
+        return _outbox, _dispatcher
+
     @staticmethod
     def register_webhook(url: str, events: List[str]) -> Dict[str, Any]:
         # Basic validation
@@ -28,20 +480,33 @@ class WebhookManager:
         return len(registered_webhooks) < before_count
 
     @staticmethod
-    def dispatch_event(event_name: str, payload: Dict[str, Any]) -> None:
-        # Dispatch event asynchronously to all webhooks subscribed to event_name
-        for webhook in registered_webhooks:
-            if event_name in webhook['events']:
-                threading.Thread(target=WebhookManager._post_event, args=(webhook['url'], event_name, payload)).start()
+    def dispatch_event(event_name: str, payload: Dict[str, Any]) -> int:
+        # Record one delivery per subscribed webhook in the outbox; the dispatcher sends them
+        deliveries = [
+            (webhook['url'], event_name, json.dumps(payload))
+            for webhook in registered_webhooks
+            if event_name in webhook['events']
+        ]
+        if not deliveries:
+            return 0
+        outbox, dispatcher = WebhookManager._get_outbox()
+        outbox.enqueue(deliveries)
+        dispatcher.notify()
+        return len(deliveries)
 
     @staticmethod
-    def _post_event(url: str, event_name: str, payload: Dict[str, Any]) -> None:
-        headers = {
-            'Content-Type': 'application/json',
-            'X-FlowstateAI-Event': event_name
-        }
-        try:
-            requests.post(url, headers=headers, data=json.dumps(payload), timeout=5)
-        except requests.RequestException as e:
-            # In production, log failure or retry
-            print(f'Failed to send webhook to {url}: {e}')
+    def delivery_stats() -> Dict[str, Any]:
+        """Outbox row counts and dispatcher metrics."""
+        outbox, dispatcher = WebhookManager._get_outbox()
+        return {'outbox': outbox.stats(), 'dispatcher': dispatcher.get_metrics()}
+
+    @staticmethod
+    def shutdown():
+        """Stop the dispatcher; undelivered events stay in the outbox for the next start."""
+        global _outbox, _dispatcher
+        with _setup_lock:
+            if _dispatcher is not None:
+                _dispatcher.stop()
+                _outbox.close()
+                _outbox = None
+                _dispatcher = None
@@ -1,8 +1,10 @@
 import asyncio
+import itertools
 import json
+from collections import OrderedDict
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from typing import List
+from typing import Any, Dict, Iterable, List, Optional, Set, Union
 
 app = FastAPI()
 
@@ -15,23 +17,174 @@ app.add_middleware(
     allow_headers=["*"]
 )
 
+# What to do when a client's send queue is full
+SLOW_CONSUMER_DROP = "drop"              # Drop the oldest queued message
+SLOW_CONSUMER_COALESCE = "coalesce"      # Replace queued messages with the same key, then drop oldest
+SLOW_CONSUMER_DISCONNECT = "disconnect"  # Close the connection
+
+# Every client receives pipeline updates unless it unsubscribes
+PIPELINES_TOPIC = "pipelines"
+
+_sequence = itertools.count()
+
+
+class ClientConnection:
+    """
+    A websocket with a bounded send queue drained by its own writer task,
+    so a slow client only ever delays itself.
+    """
+
+    def __init__(self, websocket: WebSocket, manager: "ConnectionManager", max_queue: int, policy: str):
+        self.websocket = websocket
+        self.manager = manager
+        self.max_queue = max_queue
+        self.policy = policy
+        self.topics: Set[str] = set()
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        # Queue keyed by coalesce key (or a unique sequence number) in send order
+        self._queue: "OrderedDict[Any, str]" = OrderedDict()
+        self._ready = asyncio.Event()
+        self._writer: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._writer = asyncio.create_task(self._write_loop())
+
+    def enqueue(self, message: str, key: Optional[str] = None) -> bool:
+        """Queue a message without blocking; returns False if it was not queued."""
+        if self.closed:
+            return False
+
+        if key is not None and self.policy == SLOW_CONSUMER_COALESCE and key in self._queue:
+            # Newer state supersedes the pending one but keeps its place in line
+            self._queue[key] = message
+            self.coalesced += 1
+            return True
+
+        if len(self._queue) >= self.max_queue:
+            if self.policy == SLOW_CONSUMER_DISCONNECT:
+                self.dropped += 1
+                asyncio.create_task(self.manager.close(self.websocket, code=1013))
+                return False
+            self._queue.popitem(last=False)
+            self.dropped += 1
+
+        self._queue[key if key is not None and self.policy == SLOW_CONSUMER_COALESCE else next(_sequence)] = message
+        self._ready.set()
+        return True
+
+    async def _write_loop(self):
+        try:
+            while True:
+                await self._ready.wait()
+                while self._queue:
+                    _, message = self._queue.popitem(last=False)
+                    await self.websocket.send_text(message)
+                self._ready.clear()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # The socket is gone; stop delivering to it
+            self.manager.disconnect(self.websocket)
+
+    def stop(self):
+        self.closed = True
+        self._queue.clear()
+        if self._writer is not None and self._writer is not asyncio.current_task():
+            self._writer.cancel()
+
+
 class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+    def __init__(self, max_queue: int = 100, slow_consumer_policy: str = SLOW_CONSUMER_COALESCE):
+        """
+        Args:
+            max_queue: Messages buffered per client before the slow-consumer policy applies
+            slow_consumer_policy: SLOW_CONSUMER_DROP, SLOW_CONSUMER_COALESCE or SLOW_CONSUMER_DISCONNECT
+        """
+        self.max_queue = max_queue
+        self.slow_consumer_policy = slow_consumer_policy
+        self.connections: Dict[WebSocket, ClientConnection] = {}
+        self.topics: Dict[str, Set[ClientConnection]] = {}
 
-    async def connect(self, websocket: WebSocket):
+    @property
+    def active_connections(self) -> List[WebSocket]:
+        return list(self.connections)
+
+    async def connect(self, websocket: WebSocket, topics: Iterable[str] = (PIPELINES_TOPIC,)):
         await websocket.accept()
-        self.active_connections.append(websocket)
+        connection = ClientConnection(websocket, self, self.max_queue, self.slow_consumer_policy)
+        self.connections[websocket] = connection
+        for topic in topics:
+            self.subscribe(websocket, topic)
+        connection.start()
 
     def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+        connection = self.connections.pop(websocket, None)
+        if connection is None:
+            return
+        for topic in connection.topics:
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.topics[topic]
+        connection.stop()
+
+    async def close(self, websocket: WebSocket, code: int = 1000):
+        """Disconnect a client and close its socket."""
+        self.disconnect(websocket)
+        try:
+            await websocket.close(code=code)
+        except Exception:
+            pass
+
+    def subscribe(self, websocket: WebSocket, topic: str):
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            connection.topics.add(topic)
+            self.topics.setdefault(topic, set()).add(connection)
+
+    def unsubscribe(self, websocket: WebSocket, topic: str):
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            connection.topics.discard(topic)
+            subscribers = self.topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(connection)
+                if not subscribers:
+                    del self.topics[topic]
 
     async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+        connection = self.connections.get(websocket)
+        if connection is not None:
+            connection.enqueue(message)
+
+    async def broadcast(self, message: Union[str, dict], topics: Optional[Iterable[str]] = None,
+                        key: Optional[str] = None) -> int:
+        """
+        Queue a message for every client, or only for subscribers of `topics`.
+
+        Dict messages are serialized once for all recipients. `key` identifies
+        messages that supersede each other under the coalesce policy.
+
+        Returns:
+            Number of clients the message was queued for
+        """
+        if not isinstance(message, str):
+            message = json.dumps(message)
+
+        if topics is None:
+            recipients = self.connections.values()
+        else:
+            recipients = set()
+            for topic in topics:
+                recipients.update(self.topics.get(topic, ()))
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+        delivered = 0
+        for connection in list(recipients):
+            delivered += connection.enqueue(message, key)
+        return delivered
 
 manager = ConnectionManager()
 
@@ -42,19 +195,38 @@ async def websocket_endpoint(websocket: WebSocket):
         while True:
             # Keep connection open, listen for messages if needed
             data = await websocket.receive_text()
-            # Echo received message or handle commands if desired
-            await manager.send_personal_message(f"Message received: {data}", websocket)
+            # Clients may send {"action": "subscribe"|"unsubscribe", "topic": ...};
+            # anything else is echoed back
+            try:
+                command = json.loads(data)
+            except ValueError:
+                command = None
+            if isinstance(command, dict) and command.get("action") in ("subscribe", "unsubscribe") and command.get("topic"):
+                if command["action"] == "subscribe":
+                    manager.subscribe(websocket, command["topic"])
+                else:
+                    manager.unsubscribe(websocket, command["topic"])
+                await manager.send_personal_message(json.dumps({"type": command["action"] + "d", "topic": command["topic"]}), websocket)
+            else:
+                await manager.send_personal_message(f"Message received: {data}", websocket)
     except WebSocketDisconnect:
         manager.disconnect(websocket)
 
-# Example function to broadcast pipeline updates to all clients
+# Example function to broadcast pipeline updates to subscribed clients
 async def broadcast_pipeline_update(update: dict):
-    message = json.dumps({"type": "pipeline_update", "data": update})
-    await manager.broadcast(message)
+    topics = [PIPELINES_TOPIC]
+    key = None
+    if "pipeline_id" in update:
+        topics.append(f"pipeline:{update['pipeline_id']}")
+        # A newer update for the same pipeline replaces one a slow client has not received yet
+        key = f"pipeline:{update['pipeline_id']}"
+    await manager.broadcast({"type": "pipeline_update", "data": update}, topics=topics, key=key)
 
-# Example usage: 
+# Example usage:
 # In your pipeline processing logic, after an update occurs, call:
 # await broadcast_pipeline_update({"pipeline_id": 123, "status": "running", "progress": 42})
+# Clients receive every update by default, or can send
+# {"action": "unsubscribe", "topic": "pipelines"} and {"action": "subscribe", "topic": "pipeline:123"}.
 
 # To run this server, use:
 # uvicorn backend.websocket_server:app --reload
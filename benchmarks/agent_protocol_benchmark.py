@@ -0,0 +1,92 @@
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flowstate_ai.agent_communication.protocol import (
+    AgentMessage, MessageType, decode_batch, encode_batch
+)
+
+# Size and throughput of 100k typical inter-agent messages: JSON per message
+# (to_json / from_json, the previous format) against binary frames of 1000
+# messages. The routing case decodes each message, rewrites its receiver and
+# encodes it again without reading the content, as a relay hop would.
+
+
+def build(count, seed=5):
+    rng = random.Random(seed)
+    agents = [f'agent_{i:03d}' for i in range(50)]
+    types = list(MessageType)
+    messages = []
+    for i in range(count):
+        content = {
+            'task': rng.choice(['fetch_data', 'summarize', 'score_lead', 'sync_crm']),
+            'params': {'lead_id': rng.randrange(10 ** 6), 'fields': ['name', 'email', 'stage'], 'limit': 50},
+            'priority': rng.randrange(10),
+            'trace': [rng.choice(agents) for _ in range(3)],
+        }
+        messages.append(AgentMessage(rng.choice(agents), rng.choice(agents), rng.choice(types), content,
+                                     f'msg_{i:08d}', f'msg_{i - 1:08d}' if i % 2 else None))
+    return messages
+
+
+def rate(count, seconds):
+    return count / seconds
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return time.perf_counter() - start, result
+
+
+def main(count=100000, batch=1000):
+    messages = build(count)
+    batches = [messages[i:i + batch] for i in range(0, count, batch)]
+
+    json_encode, encoded_json = timed(lambda: [m.to_json() for m in messages])
+    json_decode, _ = timed(lambda: [AgentMessage.from_json(s).content for s in encoded_json])
+    json_route, _ = timed(lambda: [json.dumps(dict(json.loads(s), receiver_id='relay')) for s in encoded_json])
+
+    binary_encode, frames = timed(lambda: [encode_batch(b) for b in batches])
+    binary_decode, _ = timed(lambda: [[m.content for m in decode_batch(f)] for f in frames])
+
+    def route():
+        relayed = []
+        for frame in frames:
+            decoded = decode_batch(frame)
+            for message in decoded:
+                message.receiver_id = 'relay'
+            relayed.append(encode_batch(decoded))
+        return relayed
+    binary_route, _ = timed(route)
+
+    json_bytes = sum(len(s.encode('utf-8')) for s in encoded_json)
+    binary_bytes = sum(len(f) for f in frames)
+    results = {
+        'messages': count,
+        'batch_size': batch,
+        'json': {
+            'bytes_per_message': json_bytes / count,
+            'encode_per_second': rate(count, json_encode),
+            'decode_per_second': rate(count, json_decode),
+            'route_per_second': rate(count, json_route)
+        },
+        'binary': {
+            'bytes_per_message': binary_bytes / count,
+            'encode_per_second': rate(count, binary_encode),
+            'decode_per_second': rate(count, binary_decode),
+            'route_per_second': rate(count, binary_route)
+        },
+        'size_ratio': json_bytes / binary_bytes,
+        'route_speedup': json_route / binary_route
+    }
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
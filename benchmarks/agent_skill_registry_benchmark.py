@@ -0,0 +1,141 @@
+import json
+import os
+import random
+import sys
+import threading
+import time
+from threading import Lock
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flowstate_ai.agent_skill_registry import Agent, AgentSkillRegistry, Skill
+
+# 10,000 agents with 20 of 1,000 skills each. Two writer threads keep
+# flipping availability and adding/removing skills while the main thread
+# times 1-3 skill lookups. The previous registry scanned every agent under
+# the global lock (multi-skill queries filter the single-skill result); the
+# indexed one intersects per-skill id sets from a lock-free snapshot.
+
+
+class LegacyAgentSkillRegistry:
+    def __init__(self):
+        self._agents: Dict[str, Agent] = {}
+        self._lock = Lock()
+
+    def register_agent(self, agent_id: str) -> Agent:
+        with self._lock:
+            if agent_id not in self._agents:
+                self._agents[agent_id] = Agent(agent_id)
+            return self._agents[agent_id]
+
+    def add_skill_to_agent(self, agent_id: str, skill_name: str, description: Optional[str] = None):
+        with self._lock:
+            agent = self._agents.get(agent_id)
+            if not agent:
+                raise ValueError(f"Agent '{agent_id}' not registered.")
+            agent.add_skill(Skill(skill_name, description))
+
+    def remove_skill_from_agent(self, agent_id: str, skill_name: str):
+        with self._lock:
+            agent = self._agents.get(agent_id)
+            if not agent:
+                raise ValueError(f"Agent '{agent_id}' not registered.")
+            agent.remove_skill(skill_name)
+
+    def set_agent_availability(self, agent_id: str, available: bool):
+        with self._lock:
+            agent = self._agents.get(agent_id)
+            if not agent:
+                raise ValueError(f"Agent '{agent_id}' not registered.")
+            agent.set_availability(available)
+
+    def find_agents_with_skill(self, skill_name: str, only_available: bool = True) -> List[Agent]:
+        with self._lock:
+            return [agent for agent in self._agents.values()
+                    if agent.has_skill(skill_name) and (agent.available or not only_available)]
+
+    def find_agents_with_skills(self, skill_names, only_available=True):
+        first, *rest = skill_names
+        return [agent for agent in self.find_agents_with_skill(first, only_available)
+                if all(agent.has_skill(s) for s in rest)]
+
+
+def populate(registry, agents, skills, per_agent, seed=1):
+    rng = random.Random(seed)
+    for i in range(agents):
+        registry.register_agent(f"agent{i}")
+        for skill in rng.sample(range(skills), per_agent):
+            registry.add_skill_to_agent(f"agent{i}", f"skill{skill}")
+
+
+def writer(registry, agents, skills, stop, counter, seed):
+    rng = random.Random(seed)
+    while not stop.is_set():
+        agent_id = f"agent{rng.randrange(agents)}"
+        action = rng.random()
+        if action < 0.5:
+            registry.set_agent_availability(agent_id, rng.random() < 0.8)
+        elif action < 0.75:
+            registry.add_skill_to_agent(agent_id, f"skill{rng.randrange(skills)}")
+        else:
+            registry.remove_skill_from_agent(agent_id, f"skill{rng.randrange(skills)}")
+        counter[seed] += 1
+        time.sleep(0)
+
+
+def run(registry_class, agents, skills, per_agent, lookups, writers):
+    registry = registry_class()
+    populate(registry, agents, skills, per_agent)
+    rng = random.Random(2)
+    queries = [[f"skill{s}" for s in rng.sample(range(skills), rng.randrange(1, 4))] for _ in range(lookups)]
+
+    stop = threading.Event()
+    counter = [0] * writers
+    threads = [threading.Thread(target=writer, args=(registry, agents, skills, stop, counter, seed))
+               for seed in range(writers)]
+    for thread in threads:
+        thread.start()
+    latencies = []
+    matches = 0
+    start = time.perf_counter()
+    try:
+        for query in queries:
+            began = time.perf_counter()
+            matches += len(registry.find_agents_with_skills(query))
+            latencies.append(time.perf_counter() - began)
+    finally:
+        elapsed = time.perf_counter() - start
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    latencies.sort()
+    return {
+        'lookups_per_second': lookups / elapsed,
+        'mean_lookup_ms': sum(latencies) / lookups * 1000,
+        'p50_lookup_ms': latencies[lookups // 2] * 1000,
+        'p99_lookup_ms': latencies[int(lookups * 0.99)] * 1000,
+        'writes_during_lookups': sum(counter),
+        'matches': matches
+    }
+
+
+def main(agents=10000, skills=1000, per_agent=20, writers=2):
+    legacy = run(LegacyAgentSkillRegistry, agents, skills, per_agent, 200, writers)
+    indexed = run(AgentSkillRegistry, agents, skills, per_agent, 20000, writers)
+    results = {
+        'agents': agents,
+        'skills': skills,
+        'skills_per_agent': per_agent,
+        'writer_threads': writers,
+        'locked_scan': legacy,
+        'indexed_snapshot': indexed,
+        'mean_lookup_speedup': legacy['mean_lookup_ms'] / indexed['mean_lookup_ms']
+    }
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
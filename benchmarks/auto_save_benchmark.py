@@ -0,0 +1,122 @@
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from auto_save import AutoSaveManager
+
+# Auto-save cost on a large state object: the previous full pretty-printed
+# JSON write on every interval against dirty-checked, compressed deltas with
+# periodic compaction, plus restore time for the newest version.
+
+
+def build_state(records, seed=11):
+    rng = random.Random(seed)
+    return {
+        'project': {'name': 'benchmark', 'settings': {'theme': 'dark', 'autosave': True}},
+        'records': [
+            {
+                'id': i,
+                'title': f'Task {i}',
+                'status': rng.choice(['todo', 'doing', 'done']),
+                'tags': rng.sample(['ui', 'api', 'db', 'ops', 'ml', 'docs'], 2),
+                'estimate': rng.randint(1, 13),
+                'notes': ' '.join(rng.choice(['fix', 'add', 'refactor', 'test', 'ship']) for _ in range(12))
+            }
+            for i in range(records)
+        ]
+    }
+
+
+def mutate(state, rng, edits):
+    """A few edits per interval, plus an occasional new record."""
+    records = state['records']
+    for _ in range(edits):
+        record = rng.choice(records)
+        record['status'] = rng.choice(['todo', 'doing', 'done'])
+        record['estimate'] = rng.randint(1, 13)
+    if rng.random() < 0.3:
+        records.append({'id': len(records), 'title': f'Task {len(records)}', 'status': 'todo',
+                        'tags': [], 'estimate': 1, 'notes': ''})
+
+
+def legacy_save(save_dir, version, data):
+    """The previous save_version: a new indented JSON file every interval."""
+    timestamp = datetime.utcnow().strftime('%Y%m%d_%H%M%S')
+    filepath = os.path.join(save_dir, f'version_{version}_{timestamp}.json')
+    with open(filepath, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    return os.path.getsize(filepath)
+
+
+def run(records, intervals, idle_share, edits):
+    """Replay the same edit sequence through both savers."""
+    rng = random.Random(5)
+    plan = [rng.random() >= idle_share for _ in range(intervals)]
+
+    results = {}
+    for name in ('legacy', 'incremental', 'incremental_mark_dirty'):
+        state = build_state(records)
+        rng = random.Random(7)
+        with tempfile.TemporaryDirectory() as save_dir:
+            manager = AutoSaveManager(save_dir=save_dir, require_mark_dirty=name == 'incremental_mark_dirty')
+            manager.get_data_callback = lambda: state
+            bytes_written = 0
+            save_times = []
+            for version, changed in enumerate(plan, 1):
+                if changed:
+                    mutate(state, rng, edits)
+                    manager.mark_dirty()
+                start = time.perf_counter()
+                if name == 'legacy':
+                    bytes_written += legacy_save(save_dir, version, state)
+                else:
+                    manager.save_version()
+                save_times.append(time.perf_counter() - start)
+
+            latest = sorted(os.listdir(save_dir), key=lambda f: int(f.split('_')[1]))[-1]
+            # Restore from disk as a fresh process would, replaying the delta chain
+            start = time.perf_counter()
+            if name == 'legacy':
+                with open(os.path.join(save_dir, latest), encoding='utf-8') as f:
+                    restored = json.load(f)
+            else:
+                restored = AutoSaveManager(save_dir=save_dir).load_version(latest)
+                bytes_written = manager.stats['bytes_written']
+            restore_seconds = time.perf_counter() - start
+            assert restored == json.loads(json.dumps(state))
+
+            save_times.sort()
+            results[name] = {
+                'total_save_seconds': sum(save_times),
+                'p50_save_ms': save_times[len(save_times) // 2] * 1000,
+                'p95_save_ms': save_times[int(len(save_times) * 0.95)] * 1000,
+                'bytes_written': bytes_written,
+                'files': len(os.listdir(save_dir)),
+                'restore_latest_ms': restore_seconds * 1000
+            }
+            if name != 'legacy':
+                results[name].update(manager.stats)
+    return results
+
+
+def main(records=50000, intervals=60, idle_share=0.5, edits=20):
+    results = run(records, intervals, idle_share, edits)
+    results['records'] = records
+    results['intervals'] = intervals
+    results['idle_share'] = idle_share
+    for name in ('incremental', 'incremental_mark_dirty'):
+        results[name]['bytes_reduction'] = results['legacy']['bytes_written'] / results[name]['bytes_written']
+        results[name]['save_time_speedup'] = results['legacy']['total_save_seconds'] / results[name]['total_save_seconds']
+
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+import json
+import os
+import resource
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from conversion_tracking import EventQueries, EventStore
+
+# Loads a synthetic event stream into the partitioned event store and times
+# funnel, cohort retention and time-to-convert queries over it, alongside the
+# previous approach of looping over in-memory Python event lists.
+
+STEPS = ['visit', 'signup', 'activate', 'purchase']
+START_MS = 1_735_689_600_000  # 2025-01-01
+DAY_MS = 24 * 60 * 60 * 1000
+
+
+def generate(users, events_per_user, days, seed=1):
+    """Yield (event_type, user_ids, timestamps) batches: a funnel per user plus repeat visits."""
+    rng = np.random.default_rng(seed)
+    chunk = 250_000
+    for offset in range(0, users, chunk):
+        ids = np.arange(offset, min(users, offset + chunk))
+        t = START_MS + rng.integers(0, days * DAY_MS, len(ids))
+        alive = np.ones(len(ids), dtype=bool)
+        for i, step in enumerate(STEPS):
+            if i:
+                alive &= rng.random(len(ids)) < 0.5
+                t = t + rng.integers(60_000, 3 * DAY_MS, len(ids))
+            yield step, ids[alive], t[alive]
+        repeats = max(0, events_per_user - 2)
+        repeat_users = np.repeat(ids, repeats)
+        yield 'visit', repeat_users, START_MS + rng.integers(0, days * DAY_MS, len(repeat_users))
+
+
+def python_funnel(events, steps):
+    """The previous style: a pass over a Python list of event dicts per step."""
+    reached = {}
+    for event in events:
+        if event['type'] == steps[0]:
+            user = event['user']
+            if user not in reached or event['ts'] < reached[user]:
+                reached[user] = event['ts']
+    counts = [len(reached)]
+    for step in steps[1:]:
+        next_reached = {}
+        for event in events:
+            if event['type'] == step:
+                user = event['user']
+                prev = reached.get(user)
+                if prev is not None and event['ts'] >= prev and (user not in next_reached or event['ts'] < next_reached[user]):
+                    next_reached[user] = event['ts']
+        reached = next_reached
+        counts.append(len(reached))
+    return counts
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def peak_rss_mb():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(users=2_000_000, events_per_user=6, days=120, python_sample_users=200_000):
+    results = {'users': users}
+    with tempfile.TemporaryDirectory() as root:
+        store = EventStore(root)
+        rows = 0
+        start = time.perf_counter()
+        for event_type, ids, ts in generate(users, events_per_user, days):
+            store.append_many(event_type, [f'user-{i}' for i in ids], ts)
+            rows += len(ids)
+        results['events'] = rows
+        results['load_seconds'] = time.perf_counter() - start
+        results['segments'] = len(store.segments())
+        results['rss_after_load_mb'] = peak_rss_mb()
+
+        queries = EventQueries(store)
+        results['funnel_seconds'], funnel = timed(lambda: queries.funnel(STEPS))
+        results['funnel_users'] = [s['users'] for s in funnel['steps']]
+        results['funnel_window_seconds'], _ = timed(lambda: queries.funnel(STEPS, window_seconds=7 * 24 * 3600))
+        results['cohort_seconds'], cohorts = timed(lambda: queries.cohort_retention('signup', 'visit', 'week', 8))
+        results['cohorts'] = len(cohorts)
+        results['time_to_convert_seconds'], ttc = timed(lambda: queries.time_to_convert('signup', 'purchase'))
+        results['median_time_to_convert_hours'] = ttc['median_seconds'] / 3600
+        results['peak_rss_mb'] = peak_rss_mb()
+        store.close()
+
+    # The same funnel on a slice, with events held as Python dicts
+    sample = []
+    for event_type, ids, ts in generate(python_sample_users, events_per_user, days):
+        sample.extend({'type': event_type, 'user': int(u), 'ts': int(t)} for u, t in zip(ids, ts))
+    python_seconds, _ = timed(lambda: python_funnel(sample, STEPS))
+    results['python_list_funnel'] = {
+        'events': len(sample),
+        'seconds': python_seconds,
+        'projected_seconds_at_full_size': python_seconds * rows / len(sample)
+    }
+    results['funnel_speedup_vs_projected'] = results['python_list_funnel']['projected_seconds_at_full_size'] / results['funnel_seconds']
+
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,109 @@
+import heapq
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from brain.decision_engine import DecisionEngine, Task
+
+# Allocation cycle time with 50k pending tasks over 1k resource types. Each
+# cycle completes some running tasks, submits as many new ones and runs
+# prioritize_and_allocate. The previous engine popped and re-pushed every
+# pending task per cycle; the new one only retries tasks whose missing
+# resource was released, taken from per-resource queues.
+
+
+class LegacyDecisionEngine(DecisionEngine):
+    """prioritize_and_allocate as it was: drain the whole heap every cycle."""
+
+    def __init__(self, total_resources):
+        super().__init__(total_resources)
+        self.task_queue = []
+
+    def add_task(self, task_id, description, priority, resource_requirements):
+        heapq.heappush(self.task_queue, Task(task_id, description, priority, resource_requirements))
+
+    def prioritize_and_allocate(self):
+        started_tasks = []
+        temp_tasks = []
+        while self.task_queue:
+            task = heapq.heappop(self.task_queue)
+            if self._allocate_resources_to_task(task):
+                started_tasks.append(task)
+            else:
+                temp_tasks.append(task)
+        for task in temp_tasks:
+            heapq.heappush(self.task_queue, task)
+        return started_tasks
+
+    def complete_task(self, task_id, success=True):
+        task = self.running_tasks.pop(task_id)
+        self.resource_pool.release(task.allocated_resources)
+
+
+def workload(tasks, resources, cycles, churn, seed=7):
+    rng = random.Random(seed)
+    names = [f"node{i}" for i in range(resources)]
+    capacity = {name: rng.randrange(4, 16) for name in names}
+
+    def task(i):
+        requirements = {name: rng.randrange(1, 4) for name in rng.sample(names, rng.randrange(1, 4))}
+        return f"task{i}", f"job {i}", rng.randrange(0, 100), requirements
+
+    initial = [task(i) for i in range(tasks)]
+    new = [[task(tasks + c * churn + j) for j in range(churn)] for c in range(cycles)]
+    completions = [rng.random() for _ in range(cycles * churn)]
+    return capacity, initial, new, completions
+
+
+def run(engine_class, capacity, initial, new, completions, churn):
+    engine = engine_class(capacity)
+    for args in initial:
+        engine.add_task(*args)
+    start = time.perf_counter()
+    engine.prioritize_and_allocate()
+    first = time.perf_counter() - start
+
+    started = 0
+    pick = iter(completions)
+    start = time.perf_counter()
+    for batch in new:
+        running = list(engine.running_tasks)
+        for _ in range(min(churn, len(running))):
+            index = int(next(pick) * len(running))
+            running[index], running[-1] = running[-1], running[index]
+            engine.complete_task(running.pop())
+        for args in batch:
+            engine.add_task(*args)
+        started += len(engine.prioritize_and_allocate())
+    cycles = time.perf_counter() - start
+    return {
+        'first_cycle_seconds': first,
+        'mean_cycle_ms': cycles / len(new) * 1000,
+        'tasks_started': started,
+        'pending_after': len(engine.task_queue)
+    }
+
+
+def main(tasks=50000, resources=1000, cycles=50, churn=100):
+    capacity, initial, new, completions = workload(tasks, resources, cycles, churn)
+    legacy = run(LegacyDecisionEngine, capacity, initial, new, completions, churn)
+    indexed = run(DecisionEngine, capacity, initial, new, completions, churn)
+    results = {
+        'pending_tasks': tasks,
+        'resource_types': resources,
+        'cycles': cycles,
+        'churn_per_cycle': churn,
+        'drain_heap_every_cycle': legacy,
+        'indexed_queues': indexed,
+        'cycle_speedup': legacy['mean_cycle_ms'] / indexed['mean_cycle_ms']
+    }
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
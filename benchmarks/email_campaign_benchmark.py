@@ -0,0 +1,87 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from backend.crm_email_automation import CRMEmailAutomation, CampaignRenderer, FakeEmailBackend
+
+# Renders one campaign against the offline fake LLM backend: one blocking
+# generation per contact (the old execute_sequence path) versus the
+# CampaignRenderer, which generates once per segment plus once per contact
+# with its own notes, on a bounded async pool.
+
+COUNTRIES = ['USA', 'Germany', 'France', 'Brazil', 'Japan']
+STAGES = ['lead', 'prospect', 'customer']
+
+
+def build_contacts(count, unique_share=0.02):
+    contacts = []
+    for i in range(count):
+        contact = {
+            'name': f'Contact {i}',
+            'email': f'contact{i}@example.com',
+            'country': COUNTRIES[i % len(COUNTRIES)],
+            'lifecycle_stage': STAGES[i % len(STAGES)]
+        }
+        if i < count * unique_share:
+            contact['personalization_notes'] = f'Mentioned use case #{i}'
+        contacts.append(contact)
+    return contacts
+
+
+def per_contact(contacts, latency):
+    automation = CRMEmailAutomation()
+    backend = FakeEmailBackend(latency=latency)
+    template = automation.EMAIL_TEMPLATES['welcome_lead']
+    start = time.perf_counter()
+    for contact in contacts:
+        prompt = automation.personalization_prompt(template, contact)
+        asyncio.run(backend.complete_json('', prompt))
+    return time.perf_counter() - start, backend.calls
+
+
+def campaign(contacts, latency, max_concurrency):
+    automation = CRMEmailAutomation()
+    backend = FakeEmailBackend(latency=latency)
+    renderer = CampaignRenderer(automation, backend=backend, max_concurrency=max_concurrency)
+    start = time.perf_counter()
+    renderer.render(contacts, 'welcome_lead')
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    renderer.render(contacts, 'welcome_lead')
+    warm = time.perf_counter() - start
+    return cold, warm, backend.calls, renderer.stats
+
+
+def main(count=500, latency=0.05, max_concurrency=8):
+    contacts = build_contacts(count)
+    per_contact_seconds, per_contact_calls = per_contact(contacts, latency)
+    cold, warm, calls, stats = campaign(contacts, latency, max_concurrency)
+
+    results = {
+        'contacts': count,
+        'llm_latency_seconds': latency,
+        'per_contact': {
+            'seconds': per_contact_seconds,
+            'emails_per_second': count / per_contact_seconds,
+            'llm_calls': per_contact_calls
+        },
+        'campaign_renderer': {
+            'seconds': cold,
+            'emails_per_second': count / cold,
+            'cached_rerun_seconds': warm,
+            'llm_calls': calls,
+            'segments': stats['segments'] // 2,
+            'unique': stats['unique'] // 2
+        },
+        'speedup': per_contact_seconds / cold
+    }
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,126 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+import traceback
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flowstate_ai.error_tracking import ErrorTracker
+
+# An error storm: 4 threads each hit the same failing downstream call 5,000
+# times (plus one rarer error every 100 calls) and report every exception
+# through handle_exception. The previous tracker formatted the traceback
+# and wrote it through the FileHandler on the failing thread; the current
+# one queues a record of code objects and lets a writer thread log one
+# exemplar per fingerprint and window plus repeat counts. Caller time is
+# measured on the failing threads; drain time is the wait for the writer.
+
+
+class LegacyErrorTracker:
+    """The previous ErrorTracker, without installing the global hooks."""
+
+    def __init__(self, log_file_path):
+        self.logger = logging.getLogger("LegacyErrorTrackerBenchmark")
+        self.logger.setLevel(logging.ERROR)
+        self.logger.propagate = False
+        formatter = logging.Formatter(
+            '%(asctime)s | %(levelname)s | Thread-%(thread)d | %(message)s'
+        )
+        self.file_handler = logging.FileHandler(log_file_path)
+        self.file_handler.setLevel(logging.ERROR)
+        self.file_handler.setFormatter(formatter)
+        self.logger.addHandler(self.file_handler)
+
+    def handle_exception(self, exc_type, exc_value, exc_traceback):
+        error_message = ''.join(
+            traceback.format_exception(exc_type, exc_value, exc_traceback)
+        )
+        self.logger.error(f"Uncaught exception:\n{error_message}")
+
+    def close(self):
+        self.logger.removeHandler(self.file_handler)
+        self.file_handler.close()
+
+
+def call_downstream(request_id):
+    raise ConnectionError(f"upstream unavailable for request {request_id}")
+
+
+def parse_reply(request_id):
+    raise ValueError(f"malformed reply for request {request_id}")
+
+
+def handle_request(request_id):
+    if request_id % 100 == 0:
+        return parse_reply(request_id)
+    return call_downstream(request_id)
+
+
+def storm(tracker, threads, errors_per_thread):
+    caller_seconds = [0.0] * threads
+
+    def worker(index):
+        spent = 0.0
+        for i in range(errors_per_thread):
+            try:
+                handle_request(index * errors_per_thread + i)
+            except Exception:
+                start = time.perf_counter()
+                tracker.handle_exception(*sys.exc_info())
+                spent += time.perf_counter() - start
+        caller_seconds[index] = spent
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(caller_seconds)
+
+
+def run(make_tracker, path, threads, errors_per_thread):
+    tracker = make_tracker(path)
+    elapsed, caller = storm(tracker, threads, errors_per_thread)
+    start = time.perf_counter()
+    if hasattr(tracker, 'flush'):
+        tracker.flush()
+    drain = time.perf_counter() - start
+    tracker.close()
+    errors = threads * errors_per_thread
+    with open(path) as f:
+        lines = sum(1 for _ in f)
+    return {
+        'storm_seconds': elapsed,
+        'caller_us_per_error': caller / errors * 1e6,
+        'drain_seconds': drain,
+        'log_bytes': os.path.getsize(path),
+        'log_lines': lines,
+        'dropped': getattr(tracker, 'dropped', 0)
+    }
+
+
+def main(threads=4, errors_per_thread=5000):
+    with tempfile.TemporaryDirectory() as directory:
+        legacy = run(LegacyErrorTracker, os.path.join(directory, 'legacy.log'), threads, errors_per_thread)
+        queued = run(lambda path: ErrorTracker(path, window=1.0), os.path.join(directory, 'queued.log'),
+                     threads, errors_per_thread)
+    results = {
+        'errors': threads * errors_per_thread,
+        'threads': threads,
+        'format_and_write_inline': legacy,
+        'queued_and_deduplicated': queued,
+        'caller_speedup': legacy['caller_us_per_error'] / queued['caller_us_per_error'],
+        'log_volume_reduction': legacy['log_bytes'] / queued['log_bytes']
+    }
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
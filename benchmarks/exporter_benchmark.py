@@ -0,0 +1,129 @@
+import csv
+import io
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from fpdf import FPDF
+
+from flowstate_ai.exporter import DataExporter
+
+# Time and peak Python memory (tracemalloc, measured in a second run) to
+# export rows read from a SQLite cursor to a file. The previous exporter
+# needed the rows as a list and built each output as one string, and its PDF
+# kept every page until output(); the streaming exporter reads the cursor in
+# chunks and writes pieces, and pages, as they are done. Row counts are 500k
+# for the text formats and Parquet and 50k for PDF (about 2k pages).
+
+
+class LegacyDataExporter:
+    """DataExporter as it was, kept for comparison."""
+
+    def __init__(self, data):
+        self.data = data
+
+    def to_csv(self):
+        if not self.data:
+            return ""
+        output = io.StringIO()
+        writer = csv.DictWriter(output, fieldnames=self.data[0].keys())
+        writer.writeheader()
+        writer.writerows(self.data)
+        return output.getvalue()
+
+    def to_json(self):
+        return json.dumps(self.data, indent=2)
+
+    def to_pdf(self):
+        pdf = FPDF()
+        pdf.add_page()
+        pdf.set_font("Arial", size=12)
+        col_widths = {}
+        headers = list(self.data[0].keys())
+        for header in headers:
+            max_len = len(header)
+            for row in self.data:
+                max_len = max(max_len, len(str(row.get(header, ''))))
+            col_widths[header] = max_len * 3 + 4
+        for header in headers:
+            pdf.cell(col_widths[header], 10, header, border=1)
+        pdf.ln()
+        for row in self.data:
+            for header in headers:
+                pdf.cell(col_widths[header], 10, str(row.get(header, '')), border=1)
+            pdf.ln()
+        return pdf.output(dest='S').encode('latin1')
+
+
+def build_database(path, count):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE leads (id INTEGER PRIMARY KEY, name TEXT, email TEXT, stage TEXT, score REAL)")
+    conn.executemany("INSERT INTO leads VALUES (?, ?, ?, ?, ?)", (
+        (i, f"Lead {i}", f"lead{i}@example.com", ('new', 'qualified', 'won')[i % 3], (i % 100) / 10)
+        for i in range(count)
+    ))
+    conn.commit()
+    return conn
+
+
+def measure(function):
+    start = time.perf_counter()
+    function()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {'seconds': seconds, 'peak_mb': peak / 2 ** 20}
+
+
+def legacy_export(conn, count, method, out):
+    cursor = conn.execute("SELECT * FROM leads LIMIT ?", (count,))
+    names = [column[0] for column in cursor.description]
+    data = [dict(zip(names, row)) for row in cursor]
+    result = getattr(LegacyDataExporter(data), method)()
+    with open(out, 'wb' if isinstance(result, bytes) else 'w') as f:
+        f.write(result)
+
+
+def streaming_export(conn, count, fmt, out):
+    exporter = DataExporter(conn.execute("SELECT * FROM leads LIMIT ?", (count,)), chunk_size=5000)
+    if fmt == 'pdf':
+        with open(out, 'wb') as f:
+            exporter.write_pdf(f)
+    elif fmt == 'parquet':
+        exporter.write_parquet(out)
+    else:
+        with open(out, 'w') as f:
+            for piece in getattr(exporter, f"iter_{fmt}")():
+                f.write(piece)
+
+
+def main(rows=500000, pdf_rows=50000):
+    results = {'rows': rows, 'pdf_rows': pdf_rows}
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build_database(os.path.join(tmp, 'leads.db'), rows)
+        out = os.path.join(tmp, 'export')
+        for fmt, method, count in (('csv', 'to_csv', rows), ('json', 'to_json', rows), ('pdf', 'to_pdf', pdf_rows)):
+            results[fmt] = {
+                'whole_dataset': measure(lambda: legacy_export(conn, count, method, out)),
+                'streaming': measure(lambda: streaming_export(conn, count, fmt, out))
+            }
+        results['ndjson'] = {'streaming': measure(lambda: streaming_export(conn, rows, 'ndjson', out))}
+        try:
+            results['parquet'] = {'streaming': measure(lambda: streaming_export(conn, rows, 'parquet', out))}
+        except ImportError:
+            results['parquet'] = 'pyarrow not installed'
+        conn.close()
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flask import Flask
+
+from backend.lead_generation import db, lead_gen
+
+# Imports the same lead list through the single-lead endpoint (a transaction
+# per lead) and through the bulk CSV import (a transaction per chunk) into a
+# file-backed SQLite database.
+
+
+def make_app(path):
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{path}'
+    db.init_app(app)
+    app.register_blueprint(lead_gen)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def build_leads(count, duplicate_share=0.1):
+    leads = [{'name': f'Lead {i}', 'email': f'lead{i}@example.com', 'phone': f'+1555{i:07d}'} for i in range(count)]
+    # Re-submissions of the same person with different capitalisation
+    leads += [dict(lead, email=lead['email'].upper()) for lead in leads[:int(count * duplicate_share)]]
+    return leads
+
+
+def per_lead(leads):
+    with tempfile.TemporaryDirectory() as tmp:
+        client = make_app(os.path.join(tmp, 'leads.db')).test_client()
+        start = time.perf_counter()
+        statuses = [client.post('/api/leads', json=lead).status_code for lead in leads]
+        return time.perf_counter() - start, statuses.count(201)
+
+
+def bulk(leads):
+    with tempfile.TemporaryDirectory() as tmp:
+        client = make_app(os.path.join(tmp, 'leads.db')).test_client()
+        body = 'name,email,phone\n' + '\n'.join(f"{l['name']},{l['email']},{l['phone']}" for l in leads)
+        start = time.perf_counter()
+        job = client.post('/api/leads/import', data=body.encode(), content_type='text/csv').get_json()
+        while True:
+            status = client.get(f"/api/leads/import/{job['job_id']}").get_json()
+            if status['status'] in ('completed', 'failed'):
+                break
+            time.sleep(0.005)
+        return time.perf_counter() - start, status
+
+
+def main(count=5000):
+    leads = build_leads(count)
+    per_lead_seconds, per_lead_created = per_lead(leads)
+    bulk_seconds, status = bulk(leads)
+
+    results = {
+        'rows': len(leads),
+        'per_lead_requests': {
+            'seconds': per_lead_seconds,
+            'rows_per_second': len(leads) / per_lead_seconds,
+            'created': per_lead_created
+        },
+        'bulk_import': {
+            'seconds': bulk_seconds,
+            'rows_per_second': len(leads) / bulk_seconds,
+            'imported': status['imported'],
+            'duplicates': status['duplicates']
+        },
+        'speedup': per_lead_seconds / bulk_seconds
+    }
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
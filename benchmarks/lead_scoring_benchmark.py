@@ -0,0 +1,88 @@
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flowstate_ai.lead_scoring import LeadScorer
+from flowstate_ai.scoring.qualification_scoring import QualificationScorer
+
+# Rescoring 1M leads. The scalar path calls LeadScorer.score /
+# QualificationScorer.calculate_score per lead; score_batch is timed on the
+# same list of dicts and on columnar data (structured array / dict of
+# arrays), where no per-lead Python work is left except the cached
+# title/industry lookups.
+
+TITLES = ['CEO', 'Co-Founder', 'Engineering Manager', 'Director of Sales', 'Software Engineer', 'Intern',
+          'VP Marketing', 'Head of Operations', 'Account Executive', 'Product Manager']
+INDUSTRIES = ['Software', 'SaaS', 'Finance', 'Healthcare', 'Education', 'Retail', 'Manufacturing', 'Technology']
+
+
+def build(count, seed=3):
+    rng = np.random.default_rng(seed)
+    columns = {
+        'visits': rng.integers(0, 25, count),
+        'time_spent_minutes': rng.uniform(0, 60, count),
+        'emails_sent': rng.integers(0, 12, count),
+        'emails_opened': rng.integers(0, 8, count),
+        'links_clicked': rng.integers(0, 5, count),
+        'job_title': np.array(TITLES)[rng.integers(0, len(TITLES), count)],
+        'company_size': rng.choice([5, 20, 150, 800, 2000, 10000], count),
+        'industry': np.array(INDUSTRIES)[rng.integers(0, len(INDUSTRIES), count)],
+        'email_open_rate': rng.uniform(0, 1, count),
+        'click_through_rate': rng.uniform(0, 0.5, count),
+        'website_visits': rng.integers(0, 30, count),
+        'time_on_site': rng.uniform(0, 900, count),
+    }
+    return columns
+
+
+def as_dicts(columns, count):
+    lists = {name: values.tolist() for name, values in columns.items()}
+    engagement = [{name: lists[name][i] for name in LeadScorer().weights} for i in range(count)]
+    qualification = [{
+        'engagement_metrics': {name: lists[name][i] for name in
+                               ('visits', 'time_spent_minutes', 'emails_sent', 'emails_opened', 'links_clicked')},
+        'profile_data': {name: lists[name][i] for name in ('job_title', 'company_size', 'industry')}
+    } for i in range(count)]
+    return engagement, qualification
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+
+def main(count=1000000):
+    columns = build(count)
+    engagement, qualification = as_dicts(columns, count)
+    lead_scorer = LeadScorer()
+    qualification_scorer = QualificationScorer()
+
+    results = {'leads': count}
+    for name, scorer, scalar, leads in (
+        ('lead_scorer', lead_scorer, lead_scorer.score, engagement),
+        ('qualification_scorer', qualification_scorer, qualification_scorer.calculate_score, qualification),
+    ):
+        scalar_seconds, expected = timed(lambda: [scalar(lead) for lead in leads])
+        dicts_seconds, from_dicts = timed(scorer.score_batch, leads)
+        columnar_seconds, from_columns = timed(scorer.score_batch, columns)
+        assert from_dicts.tolist() == expected and from_columns.tolist() == expected
+        results[name] = {
+            'scalar_seconds': scalar_seconds,
+            'batch_from_dicts_seconds': dicts_seconds,
+            'batch_from_columns_seconds': columnar_seconds,
+            'speedup_dicts': scalar_seconds / dicts_seconds,
+            'speedup_columns': scalar_seconds / columnar_seconds
+        }
+
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'python-worker'))
+
+from evolution_framework.llm_gateway import LLMGateway, FakeLLMBackend
+
+# Offline benchmark of the evolution framework's LLM gateway against the
+# deterministic fake backend. Compares serial uncached calls (the old
+# requests.post behaviour) with the gateway's bounded-concurrency path on a
+# workload where a share of prompts repeat.
+
+
+def build_prompts(total=400, unique=100):
+    return [f"Suggest an improvement for module_{i % unique}.py" for i in range(total)]
+
+
+async def serial_baseline(prompts, latency):
+    backend = FakeLLMBackend(latency=latency)
+    start = time.perf_counter()
+    for prompt in prompts:
+        await backend.generate(prompt, "llama2")
+    return time.perf_counter() - start, backend.calls
+
+
+async def gateway_run(prompts, latency, max_concurrency):
+    backend = FakeLLMBackend(latency=latency)
+    gateway = LLMGateway(backend, max_concurrency=max_concurrency)
+    start = time.perf_counter()
+    await gateway.generate_many(prompts)
+    return time.perf_counter() - start, gateway.get_metrics()
+
+
+def main(latency=0.02, max_concurrency=8):
+    prompts = build_prompts()
+
+    serial_seconds, serial_calls = asyncio.run(serial_baseline(prompts, latency))
+    gateway_seconds, metrics = asyncio.run(gateway_run(prompts, latency, max_concurrency))
+
+    results = {
+        'prompts': len(prompts),
+        'simulated_latency_seconds': latency,
+        'serial': {
+            'seconds': serial_seconds,
+            'backend_calls': serial_calls,
+            'prompts_per_second': len(prompts) / serial_seconds
+        },
+        'gateway': {
+            'seconds': gateway_seconds,
+            'max_concurrency': max_concurrency,
+            'prompts_per_second': len(prompts) / gateway_seconds,
+            'metrics': metrics
+        },
+        'speedup': serial_seconds / gateway_seconds
+    }
+
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
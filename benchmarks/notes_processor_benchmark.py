@@ -0,0 +1,170 @@
+import json
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from brain.notes_processor import CategorizationCache, NotesProcessor
+
+# Processes 10k quick notes against 50k leads in a file-backed SQLite
+# database. The previous path ran a LIKE query per extracted name on a new
+# connection per note and one LLM request per note; it is timed on a sample
+# because each lookup scans the whole table. The new path matches against the
+# in-memory lead index and categorizes 20 notes per LLM request. LLM calls go
+# to a fake client and are counted, with time estimated at LLM_LATENCY each.
+
+LLM_LATENCY = 0.8
+
+FIRST_NAMES = ['Anna', 'Anders', 'Bjørn', 'Camilla', 'Erik', 'Ingrid', 'Johanne', 'Kari', 'Lars', 'Marte',
+               'Nils', 'Ola', 'Per', 'Ragnhild', 'Sigrid', 'Thomas', 'Sarah', 'Michael', 'Emma', 'David']
+# About 5k distinct surnames such as Bergheim, Holmestad or Vikrud
+SURNAME_ROOTS = ['Berg', 'Dal', 'Holm', 'Lund', 'Strand', 'Vik', 'Haug', 'Bakke', 'Moe', 'Nord', 'Sol', 'Fjell',
+                 'Skog', 'Eng', 'Aas', 'Ny', 'Lien', 'Sand', 'Bø', 'Øy', 'Rød', 'Kvam', 'Hol', 'Tveit', 'Lyng',
+                 'Myr', 'Nes', 'Ruud', 'Sæ', 'Tor']
+SURNAME_MIDDLES = ['', 'e', 'er', 'a', 'ø', 'sk', 'n', 'or', 'ing', 'el', 'ved', 'ha', 'li', 'bu', 'ang']
+SURNAME_ENDINGS = ['heim', 'stad', 'rud', 'vold', 'by', 'land', 'sen', 'mo', 'li', 'vik', 'dal', 'nes']
+LAST_NAMES = [root + middle + ending for root in SURNAME_ROOTS for middle in SURNAME_MIDDLES for ending in SURNAME_ENDINGS]
+TEMPLATES = [
+    "Ring {name} i morgen kl {time} om tilbudet",
+    "Call {name} at {time} to follow up on the demo",
+    "Send {name} the contract in {n} days",
+    "Møte med {name} om {n} dager",
+    "Remember that {name} wants pricing for {n} seats",
+]
+
+
+class CountingClient:
+    def __init__(self):
+        self.calls = 0
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        count = messages[-1]['content'].count('\nNote: ')
+        analysis = {'note_type': 'follow_up', 'priority': 'normal', 'summary': '', 'confidence': 0.8}
+        if 'results' in messages[0]['content']:
+            body = {'results': [dict(analysis, index=i) for i in range(1, count + 1)]}
+        else:
+            body = analysis
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(body)))])
+
+
+def build_database(path, leads, seed=1):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE leads (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL, email TEXT NOT NULL, "
+                 "phone TEXT, stage TEXT NOT NULL, pipeline TEXT)")
+    conn.executemany("INSERT INTO leads (name, email, phone, stage, pipeline) VALUES (?, ?, ?, ?, ?)", [
+        (f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"lead{i}@example.com", None, 'new', 'sales')
+        for i in range(leads)
+    ])
+    conn.commit()
+    conn.close()
+
+
+def typo(word, rng):
+    i = rng.randrange(1, len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+
+def build_notes(count, seed=2):
+    rng = random.Random(seed)
+    notes = []
+    for _ in range(count):
+        last_name = rng.choice(LAST_NAMES)
+        # Some names are mistyped
+        if rng.random() < 0.1:
+            last_name = typo(last_name, rng)
+        name = f"{rng.choice(FIRST_NAMES)} {last_name}"
+        notes.append(rng.choice(TEMPLATES).format(name=name, time=f"{rng.randrange(8, 18)}:{rng.choice(['00', '30'])}",
+                                                  n=rng.randrange(1, 10)))
+    # Repeated notes, e.g. the same reminder pasted for several days
+    return notes + rng.sample(notes, count // 10)
+
+
+def legacy_match(conn, names):
+    cursor = conn.cursor()
+    matches = []
+    for name in names:
+        cursor.execute("""
+            SELECT id, name, email, phone, stage, pipeline
+            FROM leads
+            WHERE name LIKE ? OR name LIKE ?
+            ORDER BY
+                CASE
+                    WHEN name LIKE ? THEN 1
+                    WHEN name LIKE ? THEN 2
+                    ELSE 3
+                END
+            LIMIT 5
+        """, (f"{name}%", f"% {name}%", f"{name}%", f"% {name}%"))
+        matches.extend(cursor.fetchall())
+    return matches
+
+
+def legacy(path, notes):
+    processor = NotesProcessor(client=CountingClient(), cache=CategorizationCache())
+    start = time.perf_counter()
+    for text in notes:
+        conn = sqlite3.connect(path)
+        language = processor.detect_language(text)
+        processor.extract_time_info(text, language)
+        legacy_match(conn, processor.extract_person_names(text))
+        conn.close()
+    return time.perf_counter() - start
+
+
+def batched(path, notes):
+    client = CountingClient()
+    processor = NotesProcessor(client=client, cache=CategorizationCache())
+    conn = sqlite3.connect(path)
+    start = time.perf_counter()
+    processor.lead_index_for(conn)
+    load_seconds = time.perf_counter() - start
+    results = processor.process_notes_batch(notes, conn)
+    total = time.perf_counter() - start
+    conn.close()
+    matched = sum(1 for r in results if r['lead_matches'])
+    return total, load_seconds, client.calls, matched
+
+
+def main(note_count=10000, lead_count=50000, legacy_sample=300):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'dashboard.db')
+        build_database(path, lead_count)
+        notes = build_notes(note_count)
+
+        legacy_seconds = legacy(path, notes[:legacy_sample])
+        batched_seconds, load_seconds, llm_requests, matched = batched(path, notes)
+
+    legacy_rate = legacy_sample / legacy_seconds
+    results = {
+        'notes': len(notes),
+        'leads': lead_count,
+        'legacy_like_per_note': {
+            'sampled_notes': legacy_sample,
+            'notes_per_second_excluding_llm': legacy_rate,
+            'llm_requests': len(notes),
+            'estimated_seconds': len(notes) / legacy_rate + len(notes) * LLM_LATENCY
+        },
+        'index_and_batches': {
+            'seconds_excluding_llm': batched_seconds,
+            'index_load_seconds': load_seconds,
+            'notes_per_second_excluding_llm': len(notes) / batched_seconds,
+            'notes_with_lead_match': matched,
+            'llm_requests': llm_requests,
+            'estimated_seconds': batched_seconds + llm_requests * LLM_LATENCY
+        },
+        'matching_speedup': (len(notes) / batched_seconds) / legacy_rate
+    }
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+import json
+import os
+import smtplib
+import socket
+import sys
+import threading
+import time
+from email.mime.text import MIMEText
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from aiosmtpd.controller import Controller
+
+from nurturing_automation.automation import EmailSender, NurturingAutomation, SMSSender, StepScheduler
+
+# Sends through a local aiosmtpd server and a local HTTP SMS sink. Compares a
+# new SMTP connection per email (the previous EmailSender) with the session
+# pool, a fixed sleep between SMS with the provider token bucket, and a thread
+# per sequence with the shared step scheduler.
+
+
+class CountingHandler:
+    def __init__(self):
+        self.count = 0
+
+    async def handle_DATA(self, server, session, envelope):
+        self.count += 1
+        return '250 OK'
+
+
+class SinkHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        self.rfile.read(int(self.headers['Content-Length']))
+        self.send_response(200)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def connection_per_email(host, port, count):
+    start = time.perf_counter()
+    for i in range(count):
+        msg = MIMEText('<p>Hi</p>', 'html')
+        msg['Subject'] = 'Hello'
+        with smtplib.SMTP(host, port) as server:
+            server.sendmail('no-reply@flowstate-ai.com', [f'user{i}@example.com'], msg.as_string())
+    return time.perf_counter() - start
+
+
+def pooled(host, port, count, pool_size):
+    sender = EmailSender(host, port, password=None, pool_size=pool_size, use_tls=False)
+    automation = NurturingAutomation(sender, None, StepScheduler(workers=pool_size))
+    start = time.perf_counter()
+    for i in range(count):
+        automation.send_email_sequence(f'user{i}@example.com', [{'subject': 'Hello', 'html_content': '<p>Hi</p>'}])
+    automation.wait_until_idle()
+    elapsed = time.perf_counter() - start
+    automation.shutdown()
+    return elapsed, sender.pool.stats['connections_opened']
+
+
+def sequences(host, port, count, delay, use_threads):
+    sender = EmailSender(host, port, password=None, pool_size=4, use_tls=False)
+    sequence = [
+        {'subject': 'Step 1', 'html_content': '<p>1</p>', 'delay_seconds': delay},
+        {'subject': 'Step 2', 'html_content': '<p>2</p>'}
+    ]
+    baseline = threading.active_count()
+    peak = 0
+    start = time.perf_counter()
+    if use_threads:
+        def run(email):
+            for step in sequence:
+                sender.send_email(email, step['subject'], step['html_content'])
+                time.sleep(step.get('delay_seconds', 0))
+        threads = [threading.Thread(target=run, args=(f'user{i}@example.com',)) for i in range(count)]
+        for thread in threads:
+            thread.start()
+        peak = threading.active_count() - baseline
+        for thread in threads:
+            thread.join()
+    else:
+        automation = NurturingAutomation(sender, None, StepScheduler(workers=4))
+        for i in range(count):
+            automation.send_email_sequence(f'user{i}@example.com', sequence)
+        peak = threading.active_count() - baseline
+        automation.wait_until_idle()
+        automation.scheduler.stop()
+    elapsed = time.perf_counter() - start
+    sender.close()
+    return elapsed, peak
+
+
+def sms(url, count, rate):
+    start = time.perf_counter()
+    sender = SMSSender(url, 'key', rate_per_second=None)
+    for i in range(count):
+        sender.send_sms(f'+1555{i:07d}', 'Hi')
+        time.sleep(1 / rate)
+    fixed_sleep = time.perf_counter() - start
+
+    automation = NurturingAutomation(None, SMSSender(url, 'key', rate_per_second=rate, burst=rate),
+                                     StepScheduler(workers=4))
+    start = time.perf_counter()
+    automation.send_sms_campaign([f'+1555{i:07d}' for i in range(count)], 'Hi')
+    automation.wait_until_idle()
+    token_bucket = time.perf_counter() - start
+    automation.scheduler.stop()
+    return fixed_sleep, token_bucket
+
+
+def main(emails=1000, sequence_count=500, sms_count=200, sms_rate=100):
+    handler = CountingHandler()
+    controller = Controller(handler, hostname='127.0.0.1', port=free_port())
+    controller.start()
+    sink = ThreadingHTTPServer(('127.0.0.1', 0), SinkHandler)
+    threading.Thread(target=sink.serve_forever, daemon=True).start()
+    sms_url = f'http://127.0.0.1:{sink.server_address[1]}/api/send'
+
+    try:
+        per_email_seconds = connection_per_email(controller.hostname, controller.port, emails)
+        pooled_seconds, connections = pooled(controller.hostname, controller.port, emails, pool_size=4)
+        thread_seconds, thread_peak = sequences(controller.hostname, controller.port, sequence_count, 0.5, True)
+        scheduler_seconds, scheduler_peak = sequences(controller.hostname, controller.port, sequence_count, 0.5, False)
+        fixed_sleep_seconds, bucket_seconds = sms(sms_url, sms_count, sms_rate)
+    finally:
+        controller.stop()
+        sink.shutdown()
+
+    results = {
+        'email': {
+            'messages': emails,
+            'connection_per_email_per_second': emails / per_email_seconds,
+            'pooled_per_second': emails / pooled_seconds,
+            'pooled_connections_opened': connections,
+            'speedup': per_email_seconds / pooled_seconds
+        },
+        'sequences': {
+            'sequences': sequence_count,
+            'thread_per_sequence': {'seconds': thread_seconds, 'extra_threads': thread_peak},
+            'scheduler': {'seconds': scheduler_seconds, 'extra_threads': scheduler_peak}
+        },
+        'sms': {
+            'messages': sms_count,
+            'provider_rate_per_second': sms_rate,
+            'fixed_sleep_per_second': sms_count / fixed_sleep_seconds,
+            'token_bucket_per_second': sms_count / bucket_seconds
+        }
+    }
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,165 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from flowstate_ai.polling_system import PollingHub
+
+# 100 sources with ~20 KB JSON payloads polled for 5 seconds at a 0.1 s base
+# interval against a local server; one source in ten changes every second.
+# The previous poller ran a thread per source doing a plain requests.get
+# every interval and comparing parsed payloads; the hub multiplexes all
+# sources on one loop and session with conditional requests, hash-based
+# change detection and idle backoff (max 1 s). Server and pollers share the
+# process, so CPU seconds cover both.
+
+
+class FeedServer:
+    """Serves /<name> JSON feeds with an ETag, counting requests, 304s and connections."""
+
+    def __init__(self):
+        self.feeds = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                with server.lock:
+                    server.requests += 1
+                    body = server.feeds[self.path.lstrip('/')]
+                payload = json.dumps(body).encode()
+                etag = '"%s"' % hashlib.md5(payload).hexdigest()
+                if self.headers.get('If-None-Match') == etag:
+                    with server.lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Length', str(len(payload)))
+                self.send_header('ETag', etag)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+class LegacyPollingSystem:
+    """PollingSystem as it was, kept for comparison."""
+
+    def __init__(self, poll_interval, endpoint, callback):
+        self.poll_interval = poll_interval
+        self.endpoint = endpoint
+        self.callback = callback
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._last_data = None
+
+    def _poll(self):
+        while not self._stop_event.is_set():
+            try:
+                response = requests.get(self.endpoint)
+                response.raise_for_status()
+                data = response.json()
+                if data != self._last_data:
+                    self._last_data = data
+                    self.callback(data)
+            except Exception as e:
+                print(f"Polling error: {e}")
+            time.sleep(self.poll_interval)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._poll, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        self._thread.join()
+
+
+
+def payload(i, version):
+    return {'source': i, 'version': version, 'items': [{'id': n, 'name': f'item {n}', 'score': n * 0.5} for n in range(400)]}
+
+
+def run(kind, sources, seconds, interval):
+    server = FeedServer()
+    server.feeds = {f'feed{i}': payload(i, 0) for i in range(sources)}
+    changes = []
+    if kind == 'legacy':
+        pollers = [LegacyPollingSystem(interval, f'{server.url}/feed{i}', changes.append) for i in range(sources)]
+        for poller in pollers:
+            poller.start()
+    else:
+        hub = PollingHub(max_concurrency=8)
+        for i in range(sources):
+            hub.add_source(f'{server.url}/feed{i}', changes.append, interval, max_interval=1.0)
+        hub.start()
+
+    cpu = time.process_time()
+    for second in range(1, int(seconds) + 1):
+        time.sleep(1)
+        for i in range(0, sources, 10):
+            server.feeds[f'feed{i}'] = payload(i, second)
+    cpu = time.process_time() - cpu
+
+    if kind == 'legacy':
+        for poller in pollers:
+            poller.stop()
+    else:
+        hub.stop()
+    server.close()
+    return {
+        'requests': server.requests,
+        'not_modified': server.not_modified,
+        'connections': server.connections,
+        'changes_delivered': len(changes),
+        'cpu_seconds': cpu
+    }
+
+
+def main(sources=100, seconds=5, interval=0.1):
+    legacy = run('legacy', sources, seconds, interval)
+    hub = run('hub', sources, seconds, interval)
+    results = {
+        'sources': sources,
+        'seconds': seconds,
+        'base_interval': interval,
+        'thread_per_source': legacy,
+        'polling_hub': hub,
+        'request_reduction': legacy['requests'] / hub['requests'],
+        'cpu_reduction': legacy['cpu_seconds'] / hub['cpu_seconds']
+    }
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
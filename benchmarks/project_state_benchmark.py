@@ -0,0 +1,90 @@
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import fakeredis
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from brain.autonomous_task_system import ProjectStateCounters
+
+# Project state analysis against a keyspace with 200k keys, of which 20k are
+# CRM contacts and 2k deals, and a tasks table with 50k rows. The previous
+# path counted contacts and deals with SCAN and grouped the tasks table on
+# every analysis; the new one reads the maintained counters. Runs against
+# fakeredis, so absolute SCAN times are not those of a Redis server.
+
+
+def build(client, path, keys, contacts, deals, tasks):
+    pipe = client.pipeline(transaction=False)
+    for i in range(contacts):
+        pipe.set(f"contact:{i}", "{}")
+    for i in range(deals):
+        pipe.set(f"deal:{i}", "{}")
+    for i in range(keys - contacts - deals):
+        pipe.set(f"session:{i}", "x")
+    pipe.execute()
+
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE tasks (id INTEGER PRIMARY KEY, status TEXT, category TEXT, assigned_agent TEXT, created_at TEXT)")
+    now = datetime.now()
+    conn.executemany("INSERT INTO tasks (status, category, assigned_agent, created_at) VALUES (?, ?, ?, ?)", [
+        (("pending", "assigned", "completed")[i % 3], f"category{i % 7}", f"agent{i % 5}" if i % 3 else None,
+         (now - timedelta(hours=i % 72)).isoformat())
+        for i in range(tasks)
+    ])
+    conn.commit()
+    return conn
+
+
+def legacy(client, conn):
+    start = time.perf_counter()
+    cursor = conn.cursor()
+    cursor.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status")
+    by_status = dict(cursor.fetchall())
+    cursor.execute("SELECT COUNT(*) FROM tasks WHERE status = 'pending' AND created_at < datetime('now', '-24 hours')")
+    cursor.fetchone()
+    contacts = sum(1 for _ in client.scan_iter("contact:*"))
+    deals = sum(1 for _ in client.scan_iter("deal:*"))
+    return time.perf_counter() - start, by_status, contacts, deals
+
+
+def counters(client, conn, repeat):
+    state = ProjectStateCounters(client)
+    start = time.perf_counter()
+    state.rebuild(conn)
+    rebuild = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(repeat):
+        snapshot = state.snapshot(datetime.now() - timedelta(hours=24))
+    return rebuild, (time.perf_counter() - start) / repeat, snapshot
+
+
+def main(keys=200000, contacts=20000, deals=2000, tasks=50000, repeat=200):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = build(client, os.path.join(tmp, 'state.db'), keys, contacts, deals, tasks)
+        legacy_seconds, by_status, legacy_contacts, legacy_deals = legacy(client, conn)
+        rebuild_seconds, snapshot_seconds, snapshot = counters(client, conn, repeat)
+        conn.close()
+
+    assert snapshot['tasks_by_status'] == by_status
+    assert (snapshot['total_contacts'], snapshot['total_deals']) == (legacy_contacts, legacy_deals)
+    results = {
+        'redis_keys': keys,
+        'tasks': tasks,
+        'scan_and_group_by_ms': legacy_seconds * 1000,
+        'counter_snapshot_ms': snapshot_seconds * 1000,
+        'background_rebuild_ms': rebuild_seconds * 1000,
+        'speedup': legacy_seconds / snapshot_seconds
+    }
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
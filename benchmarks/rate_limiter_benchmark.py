@@ -0,0 +1,132 @@
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+import httpx
+from fastapi import FastAPI
+
+from middleware.rate_limiter import InMemoryRateLimitBackend, RateLimitPolicy, RateLimiterMiddleware
+
+# Load test of the rate limiter with 10k distinct clients. Compares the GCRA
+# backend against the previous per-client timestamp lists behind one global
+# lock, then drives the middleware end to end through an ASGI transport.
+
+
+class TimestampListLimiter:
+    """The previous implementation: a growing timestamp list per client, pruned on every request."""
+
+    def __init__(self, max_requests, window_seconds):
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self.requests = {}
+        self.lock = asyncio.Lock()
+
+    async def hit(self, key, now):
+        async with self.lock:
+            window_start = now - self.window_seconds
+            timestamps = [ts for ts in self.requests.get(key, []) if ts > window_start]
+            allowed = len(timestamps) < self.max_requests
+            if allowed:
+                timestamps.append(now)
+            self.requests[key] = timestamps
+            return allowed
+
+
+def build_workload(clients, requests, hot_clients=50, hot_share=0.2, seed=3):
+    """Mostly uniform traffic over all clients plus a few hot clients that exceed their limit."""
+    rng = random.Random(seed)
+    return [
+        f"client-{rng.randrange(hot_clients) if rng.random() < hot_share else rng.randrange(clients)}"
+        for _ in range(requests)
+    ]
+
+
+async def run_backend(backend_hit, workload):
+    start = time.perf_counter()
+    allowed = 0
+    for key in workload:
+        allowed += await backend_hit(key)
+    return time.perf_counter() - start, allowed
+
+
+async def run_middleware(clients, requests, concurrency=64):
+    app = FastAPI()
+
+    @app.get("/api/ping")
+    async def ping():
+        return {"ok": True}
+
+    backend = InMemoryRateLimitBackend()
+    app.add_middleware(RateLimiterMiddleware, max_requests=100, window_seconds=60, backend=backend)
+    workload = build_workload(clients, requests)
+    semaphore = asyncio.Semaphore(concurrency)
+    statuses = []
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def call(key):
+            async with semaphore:
+                response = await client.get("/api/ping", headers={"X-API-Key": key})
+                statuses.append(response.status_code)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(call(key) for key in workload))
+        seconds = time.perf_counter() - start
+
+    return seconds, statuses, len(backend)
+
+
+def main(clients=10000, requests=200000, middleware_requests=5000):
+    workload = build_workload(clients, requests)
+    policy = RateLimitPolicy(100, 60)
+
+    gcra = InMemoryRateLimitBackend()
+
+    async def gcra_hit(key):
+        return (await gcra.hit(key, policy)).allowed
+
+    gcra_seconds, gcra_allowed = asyncio.run(run_backend(gcra_hit, workload))
+
+    legacy = TimestampListLimiter(100, 60)
+    legacy_seconds, legacy_allowed = asyncio.run(
+        run_backend(lambda key: legacy.hit(key, time.monotonic()), workload)
+    )
+
+    middleware_seconds, statuses, tracked = asyncio.run(run_middleware(clients, middleware_requests))
+
+    results = {
+        'distinct_clients': clients,
+        'backend_requests': requests,
+        'gcra': {
+            'seconds': gcra_seconds,
+            'requests_per_second': requests / gcra_seconds,
+            'rejected': requests - gcra_allowed,
+            'tracked_keys': len(gcra)
+        },
+        'timestamp_lists': {
+            'seconds': legacy_seconds,
+            'requests_per_second': requests / legacy_seconds,
+            'rejected': requests - legacy_allowed,
+            'stored_timestamps': sum(len(ts) for ts in legacy.requests.values())
+        },
+        'backend_speedup': legacy_seconds / gcra_seconds,
+        'middleware': {
+            'requests': middleware_requests,
+            'seconds': middleware_seconds,
+            'requests_per_second': middleware_requests / middleware_seconds,
+            'status_200': statuses.count(200),
+            'status_429': statuses.count(429),
+            'tracked_keys': tracked
+        }
+    }
+
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
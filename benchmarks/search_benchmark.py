@@ -0,0 +1,95 @@
+import json
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from search import AdvancedSearch, CONTACT_FIELD_WEIGHTS
+
+# Benchmark of the inverted-index AdvancedSearch over synthetic CRM contacts:
+# build time, multi-term and filtered query latency, autocomplete latency and
+# incremental update cost.
+
+SYLLABLES = ['an', 'bo', 'ca', 'da', 'el', 'fa', 'go', 'hi', 'in', 'ja', 'ko', 'lu', 'ma', 'ni', 'ol',
+             'pa', 'ri', 'sa', 'ta', 'ul', 've', 'wi', 'ya', 'zo']
+COUNTRIES = ['US', 'DE', 'ES', 'BR', 'JP', 'NG', 'IT', 'SE']
+STAGES = ['lead', 'mql', 'sql', 'customer']
+
+
+def build_names(rng, count, syllables):
+    return sorted({''.join(rng.choice(SYLLABLES) for _ in range(syllables)) for _ in range(count)})
+
+
+def build_contacts(count, seed=42):
+    """Synthetic contacts with CRM-like name cardinality (thousands of first and last names)."""
+    rng = random.Random(seed)
+    first_names = build_names(rng, 3000, 3)
+    last_names = build_names(rng, 20000, 4)
+    contacts = []
+    for i in range(count):
+        # Skewed so that some names are much more popular than others
+        first = first_names[min(int(rng.expovariate(1 / 300)), len(first_names) - 1)]
+        last = rng.choice(last_names)
+        contacts.append({
+            'id': f'c{i}',
+            'name': f'{first.title()} {last.title()}',
+            'email': f'{first}.{last}{i}@example.com',
+            'country': rng.choice(COUNTRIES),
+            'lifecycle_stage': rng.choice(STAGES)
+        })
+    return contacts
+
+
+def time_calls(func, args_list):
+    timings = []
+    for args in args_list:
+        start = time.perf_counter()
+        func(*args)
+        timings.append((time.perf_counter() - start) * 1000)
+    return {
+        'median_ms': statistics.median(timings),
+        'p95_ms': sorted(timings)[int(len(timings) * 0.95) - 1]
+    }
+
+
+def main(records=100000, queries=200):
+    contacts = build_contacts(records)
+    rng = random.Random(7)
+
+    start = time.perf_counter()
+    index = AdvancedSearch(contacts, field_weights=CONTACT_FIELD_WEIGHTS)
+    build_seconds = time.perf_counter() - start
+
+    # Warm the lazily built filter postings and autocomplete trie
+    index.search('', filters={'lifecycle_stage': 'lead'}, limit=1)
+    index.autocomplete('a', field='name')
+
+    sample = [rng.choice(contacts)['name'].lower().split() for _ in range(queries)]
+    multi_term = [(f'{first} {last}', None, 20) for first, last in sample]
+    filtered = [(last, {'lifecycle_stage': rng.choice(STAGES)}, 20) for _, last in sample]
+    prefixes = [(first[:rng.randint(1, 3)], 'name', 5) for first, _ in sample]
+
+    updates = []
+    for first, last in sample:
+        contact = dict(rng.choice(contacts))
+        contact['name'] = f'{last.title()} {first.title()}'
+        updates.append((contact,))
+
+    results = {
+        'records': records,
+        'build_seconds': build_seconds,
+        'multi_term_search': time_calls(index.search, multi_term),
+        'filtered_search': time_calls(index.search, filtered),
+        'autocomplete': time_calls(index.autocomplete, prefixes),
+        'update_item': time_calls(index.update_item, updates)
+    }
+
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
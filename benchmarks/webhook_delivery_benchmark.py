@@ -0,0 +1,144 @@
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+import requests
+
+from webhooks import WebhookDispatcher, WebhookOutbox, DELIVERED
+
+# Delivery throughput and latency of the webhook outbox against a local stub
+# HTTP server, compared with the previous thread-per-event requests.post. The
+# stub runs in its own process so it does not compete with the sender for the GIL.
+
+
+async def handle_stub_connection(reader, writer, delay):
+    """Minimal keep-alive HTTP/1.1 endpoint that answers every POST with 200."""
+    try:
+        while True:
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = 0
+            for line in head.split(b'\r\n'):
+                if line.lower().startswith(b'content-length:'):
+                    length = int(line.split(b':', 1)[1])
+            await reader.readexactly(length)
+            if delay:
+                await asyncio.sleep(delay)
+            writer.write(b'HTTP/1.1 200 OK\r\nContent-Length: 0\r\n\r\n')
+            await writer.drain()
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+def serve_stub(delay, port_queue):
+    async def serve():
+        server = await asyncio.start_server(
+            lambda reader, writer: handle_stub_connection(reader, writer, delay), '127.0.0.1', 0, backlog=4096
+        )
+        port_queue.put(server.sockets[0].getsockname()[1])
+        await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+def start_stub(delay):
+    port_queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=serve_stub, args=(delay, port_queue), daemon=True)
+    process.start()
+    return process, f'http://127.0.0.1:{port_queue.get()}/hook'
+
+
+def thread_per_event(url, events):
+    """The previous dispatch: one thread and one new connection per delivery, no record kept."""
+    start = time.perf_counter()
+    threads = []
+    failures = 0
+
+    def post(i):
+        nonlocal failures
+        try:
+            requests.post(url, json={'id': i}, headers={'X-FlowstateAI-Event': 'bench'}, timeout=5)
+        except requests.RequestException:
+            failures += 1
+
+    for i in range(events):
+        thread = threading.Thread(target=post, args=(i,))
+        thread.start()
+        threads.append(thread)
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, failures
+
+
+def outbox_delivery(url, events, workers, batch_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        outbox = WebhookOutbox(os.path.join(tmp, 'outbox.db'))
+        dispatcher = WebhookDispatcher(outbox, workers=workers, batch_size=batch_size, poll_interval=0.05)
+        dispatcher.start()
+
+        start = time.perf_counter()
+        for i in range(0, events, 100):
+            outbox.enqueue([(url, 'bench', json.dumps({'id': j})) for j in range(i, min(events, i + 100))])
+            dispatcher.notify()
+        enqueue_seconds = time.perf_counter() - start
+        while outbox.stats().get(DELIVERED, 0) < events:
+            time.sleep(0.005)
+        seconds = time.perf_counter() - start
+
+        dispatcher.stop()
+        metrics = dispatcher.get_metrics()
+        outbox.close()
+    return seconds, enqueue_seconds, metrics
+
+
+def main(events=2000, workers=16, batch_size=20, server_delay=0.002):
+    stub, url = start_stub(server_delay)
+
+    legacy_seconds, legacy_failures = thread_per_event(url, events)
+    pooled_seconds, pooled_enqueue, pooled_metrics = outbox_delivery(url, events, workers, 1)
+    batched_seconds, batched_enqueue, batched_metrics = outbox_delivery(url, events, workers, batch_size)
+
+    stub.terminate()
+    stub.join()
+
+    results = {
+        'events': events,
+        'stub_server_delay_seconds': server_delay,
+        'thread_per_event': {
+            'seconds': legacy_seconds,
+            'events_per_second': events / legacy_seconds,
+            'failures': legacy_failures
+        },
+        'outbox_pooled': {
+            'workers': workers,
+            'seconds': pooled_seconds,
+            'enqueue_seconds': pooled_enqueue,
+            'events_per_second': events / pooled_seconds,
+            'requests': pooled_metrics['requests'],
+            'avg_request_latency_seconds': pooled_metrics['latency_total'] / pooled_metrics['requests']
+        },
+        'outbox_batched': {
+            'workers': workers,
+            'batch_size': batch_size,
+            'seconds': batched_seconds,
+            'enqueue_seconds': batched_enqueue,
+            'events_per_second': events / batched_seconds,
+            'requests': batched_metrics['requests'],
+            'avg_request_latency_seconds': batched_metrics['latency_total'] / batched_metrics['requests']
+        }
+    }
+
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
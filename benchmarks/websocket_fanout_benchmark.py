@@ -0,0 +1,121 @@
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+
+from websocket_server import ConnectionManager, SLOW_CONSUMER_COALESCE
+
+# Fan-out benchmark for the websocket ConnectionManager with thousands of
+# simulated local connections, a handful of which are slow. Compares the old
+# sequential send loop with the queued per-connection writers, and measures
+# topic-targeted delivery.
+
+
+class SimulatedWebSocket:
+    def __init__(self, send_delay=0.0):
+        self.send_delay = send_delay
+        self.received = 0
+        self.last_received_at = 0.0
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        if self.send_delay:
+            await asyncio.sleep(self.send_delay)
+        self.received += 1
+        self.last_received_at = time.perf_counter()
+
+    async def close(self, code=1000):
+        pass
+
+
+def build_sockets(connections, slow_clients, slow_delay):
+    return [SimulatedWebSocket(slow_delay if i < slow_clients else 0.0) for i in range(connections)]
+
+
+async def sequential_broadcast(sockets, messages):
+    """The previous broadcast: serialize and await each client in turn."""
+    fast = sockets[-1]
+    start = time.perf_counter()
+    for i in range(messages):
+        for ws in sockets:
+            await ws.send_text(json.dumps({"type": "pipeline_update", "data": {"pipeline_id": i % 10, "progress": i}}))
+    return fast.last_received_at - start
+
+
+async def queued_broadcast(sockets, messages):
+    manager = ConnectionManager(max_queue=50, slow_consumer_policy=SLOW_CONSUMER_COALESCE)
+    for ws in sockets:
+        await manager.connect(ws)
+    fast = sockets[-1]
+
+    start = time.perf_counter()
+    for i in range(messages):
+        update = {"pipeline_id": i % 10, "progress": i}
+        await manager.broadcast({"type": "pipeline_update", "data": update}, key=f"pipeline:{i % 10}")
+        await asyncio.sleep(0)
+    while fast.received < messages:
+        await asyncio.sleep(0.001)
+    fast_done = fast.last_received_at - start
+
+    coalesced = sum(c.coalesced for c in manager.connections.values())
+    for ws in list(manager.connections):
+        manager.disconnect(ws)
+    return fast_done, coalesced
+
+
+async def topic_broadcast(connections, topics, messages):
+    manager = ConnectionManager()
+    sockets = build_sockets(connections, 0, 0.0)
+    for i, ws in enumerate(sockets):
+        await manager.connect(ws, topics=[f"pipeline:{i % topics}"])
+
+    start = time.perf_counter()
+    for i in range(messages):
+        await manager.broadcast({"pipeline_id": i % topics, "progress": i}, topics=[f"pipeline:{i % topics}"])
+        await asyncio.sleep(0)
+    await asyncio.sleep(0.01)
+    seconds = time.perf_counter() - start
+
+    for ws in list(manager.connections):
+        manager.disconnect(ws)
+    return seconds, sum(ws.received for ws in sockets)
+
+
+def main(connections=5000, slow_clients=5, slow_delay=0.05, messages=20, topics=100):
+    sequential_seconds = asyncio.run(sequential_broadcast(build_sockets(connections, slow_clients, slow_delay), messages))
+    queued_seconds, coalesced = asyncio.run(queued_broadcast(build_sockets(connections, slow_clients, slow_delay), messages))
+    topic_seconds, topic_received = asyncio.run(topic_broadcast(connections, topics, messages * topics))
+
+    results = {
+        'connections': connections,
+        'slow_clients': slow_clients,
+        'slow_client_send_delay_seconds': slow_delay,
+        'messages': messages,
+        'sequential': {
+            'seconds_until_fast_client_has_all': sequential_seconds
+        },
+        'queued': {
+            'seconds_until_fast_client_has_all': queued_seconds,
+            'coalesced_for_slow_clients': coalesced
+        },
+        'speedup': sequential_seconds / queued_seconds,
+        'topics': {
+            'topics': topics,
+            'messages': messages * topics,
+            'seconds': topic_seconds,
+            'deliveries': topic_received,
+            'deliveries_if_broadcast_to_all': messages * topics * connections
+        }
+    }
+
+    print(json.dumps(results, indent=4))
+    return results
+
+
+if __name__ == '__main__':
+    main()
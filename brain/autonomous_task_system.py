@@ -17,20 +17,194 @@ from .error_handler import with_retry, with_error_handling, CircuitBreaker, log_
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+class ProjectStateCounters:
+    """
+    Redis counters and sets behind analyze_project_state, kept up to date
+    next to every task write so a snapshot is a few O(1) reads instead of a
+    scan over the keyspace or the tasks table.
+
+    Not every writer of the tasks table goes through these counters, so
+    triggers on the table bump a version row in SQLite on every task write.
+    Writers that update the counters add the bumps they caused to
+    tasks:version; when it no longer equals the SQLite version, some write
+    was missed and the task counters have to be rebuilt.
+
+    Keys (under `prefix`):
+        tasks:status    hash  status -> task count
+        tasks:category  hash  category -> task count
+        tasks:agent     hash  agent -> assigned task count
+        tasks:pending   zset  pending task id -> created_at timestamp
+        tasks:version   tasks_version the counters account for
+        crm             hash  contacts / deals -> record count
+        reconciled_at   last rebuild, missing until the first one
+    """
+
+    CRM_KEY_PATTERNS = {"contacts": "contact:*", "deals": "deal:*"}
+
+    VERSION_SCHEMA = [
+        "CREATE TABLE IF NOT EXISTS tasks_version (id INTEGER PRIMARY KEY CHECK (id = 1), version INTEGER NOT NULL)",
+        "INSERT OR IGNORE INTO tasks_version (id, version) VALUES (1, 0)",
+    ] + [
+        f"""CREATE TRIGGER IF NOT EXISTS tasks_version_{name} AFTER {event} ON tasks
+            BEGIN UPDATE tasks_version SET version = version + 1 WHERE id = 1; END"""
+        for name, event in (("insert", "INSERT"), ("delete", "DELETE"),
+                            ("update", "UPDATE OF status, category, assigned_agent, created_at"))
+    ]
+
+    def __init__(self, redis_client, prefix: str = "project_state"):
+        self.redis = redis_client
+        self.prefix = prefix
+
+    def key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+    def task_created(self, pipe, task_id: int, status: str, category: str, created_at: datetime):
+        """Queue the counter updates for a new task on `pipe`."""
+        pipe.hincrby(self.key("tasks:status"), status, 1)
+        pipe.hincrby(self.key("tasks:category"), category, 1)
+        if status == "pending":
+            pipe.zadd(self.key("tasks:pending"), {str(task_id): created_at.timestamp()})
+
+    def task_status_changed(self, pipe, task_id: int, old_status: str, new_status: str, agent: Optional[str] = None):
+        """Queue the counter updates for a status change (and assignment) on `pipe`."""
+        pipe.hincrby(self.key("tasks:status"), old_status, -1)
+        pipe.hincrby(self.key("tasks:status"), new_status, 1)
+        if old_status == "pending":
+            pipe.zrem(self.key("tasks:pending"), str(task_id))
+        if agent:
+            pipe.hincrby(self.key("tasks:agent"), agent, 1)
+
+    def tasks_written(self, pipe, versions: int):
+        """Queue the tasks_version bumps of writes whose counter updates are on `pipe`."""
+        if versions:
+            pipe.incrby(self.key("tasks:version"), versions)
+
+    @staticmethod
+    def install(conn: sqlite3.Connection):
+        """Create the tasks_version table and the triggers that maintain it."""
+        for statement in ProjectStateCounters.VERSION_SCHEMA:
+            conn.execute(statement)
+        conn.commit()
+
+    @staticmethod
+    def tasks_version(conn: sqlite3.Connection) -> Optional[int]:
+        """The current tasks_version, or None before install()."""
+        try:
+            row = conn.execute("SELECT version FROM tasks_version WHERE id = 1").fetchone()
+        except sqlite3.OperationalError:
+            return None
+        return row[0] if row is not None else None
+
+    def crm_records_changed(self, pipe, kind: str, delta: int = 1):
+        """Queue a change in the number of CRM contacts or deals on `pipe`."""
+        pipe.hincrby(self.key("crm"), kind, delta)
+
+    def snapshot(self, stale_before: datetime) -> Optional[Dict[str, Any]]:
+        """Read all counters in one round trip; None until the first rebuild."""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.exists(self.key("reconciled_at"))
+        pipe.hgetall(self.key("tasks:status"))
+        pipe.hgetall(self.key("tasks:category"))
+        pipe.hgetall(self.key("tasks:agent"))
+        pipe.zcount(self.key("tasks:pending"), "-inf", f"({stale_before.timestamp()}")
+        pipe.hgetall(self.key("crm"))
+        pipe.get(self.key("tasks:version"))
+        initialized, by_status, by_category, by_agent, stale_pending, crm, version = pipe.execute()
+        if not initialized:
+            return None
+
+        def counts(mapping):
+            return {_text(k): int(v) for k, v in mapping.items() if int(v)}
+
+        crm = counts(crm)
+        return {
+            "tasks_by_status": counts(by_status),
+            "tasks_by_category": counts(by_category),
+            "tasks_by_agent": counts(by_agent),
+            "stale_pending": stale_pending,
+            "total_contacts": crm.get("contacts", 0),
+            "total_deals": crm.get("deals", 0),
+            "tasks_version": int(version) if version is not None else None,
+        }
+
+    def rebuild(self, conn: sqlite3.Connection, scan_count: int = 1000, crm: bool = True) -> Dict[str, Any]:
+        """
+        Recompute every counter from the tasks table and a SCAN of the CRM keys
+        and swap them in atomically. Updates made by other writers while the
+        rebuild runs are overwritten and picked up by the next one. With
+        crm=False only the task counters are rebuilt.
+        """
+        self.install(conn)
+        cursor = conn.cursor()
+        # One read transaction, so the counts and the version describe the same state
+        cursor.execute("BEGIN")
+        version = self.tasks_version(conn)
+        cursor.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status")
+        by_status = {row[0]: row[1] for row in cursor.fetchall() if row[0] is not None}
+        cursor.execute("SELECT category, COUNT(*) FROM tasks GROUP BY category")
+        by_category = {row[0]: row[1] for row in cursor.fetchall() if row[0] is not None}
+        cursor.execute("SELECT assigned_agent, COUNT(*) FROM tasks WHERE assigned_agent IS NOT NULL GROUP BY assigned_agent")
+        by_agent = {row[0]: row[1] for row in cursor.fetchall()}
+        cursor.execute("SELECT id, created_at FROM tasks WHERE status = 'pending'")
+        pending = {}
+        for task_id, created_at in cursor.fetchall():
+            try:
+                pending[str(task_id)] = _parse_timestamp(created_at).timestamp()
+            except (TypeError, ValueError):
+                pending[str(task_id)] = 0.0
+        conn.commit()
+
+        hashes = [("tasks:status", by_status), ("tasks:category", by_category), ("tasks:agent", by_agent)]
+        counts = {}
+        if crm:
+            for kind, pattern in self.CRM_KEY_PATTERNS.items():
+                counts[kind] = sum(1 for _ in self.redis.scan_iter(match=pattern, count=scan_count))
+            hashes.append(("crm", counts))
+
+        pipe = self.redis.pipeline(transaction=True)
+        for name, mapping in hashes:
+            pipe.delete(self.key(name))
+            if mapping:
+                pipe.hset(self.key(name), mapping=mapping)
+        pipe.delete(self.key("tasks:pending"))
+        if pending:
+            pipe.zadd(self.key("tasks:pending"), pending)
+        pipe.set(self.key("tasks:version"), version)
+        if crm:
+            pipe.set(self.key("reconciled_at"), datetime.now().isoformat())
+        pipe.execute()
+        return {"tasks": sum(by_status.values()), "pending": len(pending), **counts}
+
+    def invalidate(self):
+        """Force a rebuild before the next snapshot, e.g. after a failed update."""
+        self.redis.delete(self.key("reconciled_at"))
+
+
+def _text(value) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return datetime.fromisoformat(value.replace("Z", "+00:00")).replace(tzinfo=None)
+
+
 class AutonomousTaskSystem:
     """
     Advanced autonomous task generation system that continuously monitors
     project state and generates appropriate tasks for AI agents.
     """
     
-    def __init__(self, db_path: str = "godmode-state.db", redis_host: str = "localhost"):
+    def __init__(self, db_path: str = "godmode-state.db", redis_host: str = "localhost", redis_client=None, client=None):
         """Initialize the autonomous task system."""
         self.db_path = Path(__file__).parent.parent / db_path
-        self.redis = redis.Redis(host=redis_host, port=6379, db=0, decode_responses=True)
-        self.client = OpenAI()
+        self.redis = redis_client or redis.Redis(host=redis_host, port=6379, db=0, decode_responses=True)
+        self._client = client
         self.openai_circuit_breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=60, expected_exception=Exception) # Adjust exception type as needed
         self.running = False
         self.task_generation_interval = 300  # 5 minutes
+        self.state_counters = ProjectStateCounters(self.redis)
+        self.reconcile_interval = 3600  # rebuild the state counters hourly
+        self._reconcile_task = None
         
         # Task categories with priorities and generation rules
         self.task_categories = {
@@ -71,9 +245,13 @@ class AutonomousTaskSystem:
             }
         }
         
-    @with_error_handling(fallback=default_fallback_value)
-    def get_db_connection(self) -> sqlite3.Connection:
+    @property
+    def client(self) -> OpenAI:
+        if self._client is None:
+            self._client = OpenAI()
+        return self._client
 
+    def get_db_connection(self) -> sqlite3.Connection:
         """Get database connection."""
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
@@ -84,6 +262,8 @@ class AutonomousTaskSystem:
         """Start the autonomous task generation system."""
         self.running = True
         logger.info("Autonomous Task System started")
+        if self._reconcile_task is None:
+            self._reconcile_task = asyncio.create_task(self._reconcile_loop())
         
         try:
             await self.generation_cycle()
@@ -94,7 +274,40 @@ class AutonomousTaskSystem:
     async def stop(self):
         """Stop the autonomous task generation system."""
         self.running = False
+        if self._reconcile_task is not None:
+            self._reconcile_task.cancel()
+            self._reconcile_task = None
         logger.info("Autonomous Task System stopped")
+
+    def reconcile_state_counters(self, crm: bool = True) -> Dict[str, Any]:
+        """Rebuild the project state counters from SQLite and Redis (only the task counters with crm=False)."""
+        conn = self.get_db_connection()
+        try:
+            summary = self.state_counters.rebuild(conn, crm=crm)
+        finally:
+            conn.close()
+        logger.info(f"Project state counters reconciled: {summary}")
+        return summary
+
+    async def _reconcile_loop(self):
+        """Periodically rebuild the counters off the event loop to correct drift."""
+        while self.running:
+            await asyncio.sleep(self.reconcile_interval)
+            try:
+                await asyncio.to_thread(self.reconcile_state_counters)
+            except Exception as e:
+                logger.error(f"Error reconciling project state counters: {str(e)}")
+
+    def _apply_counter_updates(self, pipe):
+        """Run queued counter updates; on failure leave them to the next rebuild."""
+        try:
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"Error updating project state counters: {str(e)}")
+            try:
+                self.state_counters.invalidate()
+            except Exception:
+                pass
         
     @with_error_handling(fallback=default_fallback_value)
     async def generation_cycle(self):
@@ -139,21 +352,44 @@ class AutonomousTaskSystem:
             'code_quality': {}
         }
         
-        # Analyze tasks
-        cursor.execute("""
-            SELECT status, COUNT(*) as count
-            FROM tasks
-            GROUP BY status
-        """)
-        analysis['tasks']['by_status'] = {row['status']: row['count'] for row in cursor.fetchall()}
-        
-        cursor.execute("""
-            SELECT COUNT(*) as count
-            FROM tasks
-            WHERE status = 'pending'
-            AND created_at < datetime('now', '-24 hours')
-        """)
-        analysis['tasks']['stale_pending'] = cursor.fetchone()['count']
+        # Analyze tasks and CRM data from the maintained counters
+        try:
+            snapshot = self.state_counters.snapshot(datetime.now() - timedelta(hours=24))
+            if snapshot is None:
+                await asyncio.to_thread(self.reconcile_state_counters)
+                snapshot = self.state_counters.snapshot(datetime.now() - timedelta(hours=24))
+            elif (snapshot['tasks_version'] is None
+                  or snapshot['tasks_version'] != self.state_counters.tasks_version(conn)):
+                # Tasks were written without updating the counters
+                await asyncio.to_thread(self.reconcile_state_counters, False)
+                snapshot = self.state_counters.snapshot(datetime.now() - timedelta(hours=24))
+        except Exception as e:
+            logger.error(f"Error reading project state counters: {str(e)}")
+            analysis['crm']['error'] = str(e)
+            snapshot = None
+
+        if snapshot is not None:
+            analysis['tasks']['by_status'] = snapshot['tasks_by_status']
+            analysis['tasks']['by_category'] = snapshot['tasks_by_category']
+            analysis['tasks']['stale_pending'] = snapshot['stale_pending']
+            analysis['agents']['assigned_tasks'] = snapshot['tasks_by_agent']
+            analysis['crm']['total_contacts'] = snapshot['total_contacts']
+            analysis['crm']['total_deals'] = snapshot['total_deals']
+        else:
+            cursor.execute("""
+                SELECT status, COUNT(*) as count
+                FROM tasks
+                GROUP BY status
+            """)
+            analysis['tasks']['by_status'] = {row['status']: row['count'] for row in cursor.fetchall()}
+
+            cursor.execute("""
+                SELECT COUNT(*) as count
+                FROM tasks
+                WHERE status = 'pending'
+                AND created_at < datetime('now', '-24 hours')
+            """)
+            analysis['tasks']['stale_pending'] = cursor.fetchone()['count']
         
         # Analyze agents
         cursor.execute("""
@@ -168,23 +404,6 @@ class AutonomousTaskSystem:
                 analysis['agents']['by_status'][row['agent_name']] = {}
             analysis['agents']['by_status'][row['agent_name']][row['status']] = row['count']
         
-        # Analyze CRM data
-        try:
-            # Get contact count
-            contact_count = 0
-            for key in self.redis.scan_iter("contact:*"):
-                contact_count += 1
-            analysis['crm']['total_contacts'] = contact_count
-            
-            # Get deal count
-            deal_count = 0
-            for key in self.redis.scan_iter("deal:*"):
-                deal_count += 1
-            analysis['crm']['total_deals'] = deal_count
-        except Exception as e:
-            logger.error(f"Error analyzing CRM data: {str(e)}")
-            analysis['crm']['error'] = str(e)
-        
         conn.close()
         
         return analysis
@@ -373,9 +592,13 @@ class AutonomousTaskSystem:
         conn = self.get_db_connection()
         cursor = conn.cursor()
         stored_count = 0
+        counters = self.redis.pipeline(transaction=True)
+        cursor.execute("BEGIN IMMEDIATE")
+        version = self.state_counters.tasks_version(conn)
         
         for task in tasks:
             try:
+                created_at = datetime.now()
                 cursor.execute("""
                     INSERT INTO tasks (
                         title, description, status, priority, category,
@@ -389,15 +612,20 @@ class AutonomousTaskSystem:
                     task.get('category', 'maintenance'),
                     1 if task.get('auto_generated', False) else 0,
                     task.get('source', 'unknown'),
-                    datetime.now().isoformat(),
-                    datetime.now().isoformat()
+                    created_at.isoformat(),
+                    created_at.isoformat()
                 ))
+                self.state_counters.task_created(counters, cursor.lastrowid, 'pending',
+                                                 task.get('category', 'maintenance'), created_at)
                 stored_count += 1
             except Exception as e:
                 logger.error(f"Error storing task '{task['title']}': {str(e)}")
         
+        if version is not None:
+            self.state_counters.tasks_written(counters, self.state_counters.tasks_version(conn) - version)
         conn.commit()
         conn.close()
+        self._apply_counter_updates(counters)
         
         return stored_count
         
@@ -413,6 +641,8 @@ class AutonomousTaskSystem:
         """
         conn = self.get_db_connection()
         cursor = conn.cursor()
+        cursor.execute("BEGIN IMMEDIATE")
+        version = self.state_counters.tasks_version(conn)
         
         # Get high-priority pending tasks
         cursor.execute("""
@@ -435,6 +665,7 @@ class AutonomousTaskSystem:
         available_agents = cursor.fetchall()
         
         assigned_count = 0
+        counters = self.redis.pipeline(transaction=True)
         
         for task in high_priority_tasks:
             if assigned_count >= len(available_agents):
@@ -450,14 +681,18 @@ class AutonomousTaskSystem:
                         updated_at = ?
                     WHERE id = ?
                 """, (agent['agent_name'], datetime.now().isoformat(), task['id']))
+                self.state_counters.task_status_changed(counters, task['id'], 'pending', 'assigned', agent['agent_name'])
                 
                 logger.info(f"Auto-assigned task '{task['title']}' to agent {agent['agent_name']}")
                 assigned_count += 1
             except Exception as e:
                 logger.error(f"Error auto-assigning task {task['id']}: {str(e)}")
         
+        if version is not None:
+            self.state_counters.tasks_written(counters, self.state_counters.tasks_version(conn) - version)
         conn.commit()
         conn.close()
+        self._apply_counter_updates(counters)
         
         return assigned_count
         
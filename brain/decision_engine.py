@@ -1,5 +1,9 @@
 import heapq
-from typing import List, Dict, Any, Tuple, Optional
+import itertools
+from collections import deque
+from typing import List, Dict, Any, Iterator, Set, Tuple, Optional
+
+_task_sequence = itertools.count()
 
 class Task:
     """Represents a task with priority and resource requirements."""
@@ -10,11 +14,192 @@ class Task:
         self.resource_requirements = resource_requirements  # e.g., {"cpu": 2, "memory": 512}
         self.allocated_resources = {}
         self.status = "pending"  # could be pending, running, completed, failed
+        self.sequence = next(_task_sequence)  # FIFO among equal priorities
 
     def __lt__(self, other: 'Task'):
         # For priority queue, invert because heapq is min-heap
         return self.priority > other.priority
 
+class IndexedPriorityQueue:
+    """
+    Heap of tasks, highest priority first (FIFO among equal priorities), with a
+    task_id -> heap entry index. Removing or reprioritizing a task marks its
+    entry stale and costs O(log n) instead of rebuilding the heap; stale
+    entries are dropped when they reach the top or outnumber live ones.
+    """
+    def __init__(self):
+        self._heap: List[list] = []
+        self._entries: Dict[str, list] = {}
+        self._pushes = itertools.count()  # keeps stale and live entries of a task apart
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._entries
+
+    def __iter__(self) -> Iterator[Task]:
+        return iter([entry[3] for entry in self._entries.values()])
+
+    def __getitem__(self, index: int) -> Task:
+        if index != 0:
+            raise IndexError("Only the top of the queue can be indexed")
+        task = self.peek()
+        if task is None:
+            raise IndexError("Queue is empty")
+        return task
+
+    def get(self, task_id: str) -> Optional[Task]:
+        entry = self._entries.get(task_id)
+        return entry[3] if entry is not None else None
+
+    def push(self, task: Task) -> None:
+        if task.task_id in self._entries:
+            raise KeyError(f"Task {task.task_id} is already queued")
+        entry = [-task.priority, task.sequence, next(self._pushes), task]
+        self._entries[task.task_id] = entry
+        heapq.heappush(self._heap, entry)
+
+    def peek(self) -> Optional[Task]:
+        heap = self._heap
+        while heap and heap[0][3] is None:
+            heapq.heappop(heap)
+        return heap[0][3] if heap else None
+
+    def pop(self) -> Task:
+        heap = self._heap
+        while heap:
+            task = heapq.heappop(heap)[3]
+            if task is not None:
+                del self._entries[task.task_id]
+                return task
+        raise IndexError("pop from an empty queue")
+
+    def remove(self, task_id: str) -> Optional[Task]:
+        entry = self._entries.pop(task_id, None)
+        if entry is None:
+            return None
+        task = entry[3]
+        entry[3] = None
+        if len(self._heap) > 2 * len(self._entries) + 64:
+            self._heap = [e for e in self._heap if e[3] is not None]
+            heapq.heapify(self._heap)
+        return task
+
+    def update(self, task_id: str) -> None:
+        """Restore heap order after the task's priority changed."""
+        self.push(self.remove(task_id))
+
+class DependencyCycleError(ValueError):
+    """Raised when a dependency would create a cycle."""
+
+class DependencyGraph:
+    """
+    Task dependency graph that keeps a topological order up to date as edges
+    are added and removed, instead of re-running Kahn's algorithm over the
+    whole graph. In-degrees (Kahn's bookkeeping) are maintained per edge, and
+    an inserted edge that contradicts the current order only reorders the
+    tasks between its endpoints (Pearce-Kelly).
+    """
+    def __init__(self):
+        self.successors: Dict[str, Set[str]] = {}
+        self.predecessors: Dict[str, Set[str]] = {}
+        self.in_degree: Dict[str, int] = {}
+        self._rank: Dict[str, int] = {}
+        self._order: List[Optional[str]] = []
+        self._holes = 0
+
+    def __contains__(self, task_id: str) -> bool:
+        return task_id in self._rank
+
+    def __len__(self) -> int:
+        return len(self._rank)
+
+    def add_task(self, task_id: str) -> None:
+        if task_id in self._rank:
+            return
+        self.successors[task_id] = set()
+        self.predecessors[task_id] = set()
+        self.in_degree[task_id] = 0
+        self._rank[task_id] = len(self._order)
+        self._order.append(task_id)
+
+    def remove_task(self, task_id: str) -> None:
+        if task_id not in self._rank:
+            return
+        for successor in list(self.successors[task_id]):
+            self.remove_dependency(successor, task_id)
+        for predecessor in list(self.predecessors[task_id]):
+            self.remove_dependency(task_id, predecessor)
+        self._order[self._rank.pop(task_id)] = None
+        del self.successors[task_id], self.predecessors[task_id], self.in_degree[task_id]
+        self._holes += 1
+        if self._holes > len(self._order) // 2:
+            self._compact()
+
+    def _compact(self) -> None:
+        self._order = [task_id for task_id in self._order if task_id is not None]
+        self._rank = {task_id: rank for rank, task_id in enumerate(self._order)}
+        self._holes = 0
+
+    def add_dependency(self, task_id: str, prerequisite: str) -> None:
+        """Record that `task_id` depends on `prerequisite`; raises DependencyCycleError on a cycle."""
+        self.add_task(task_id)
+        self.add_task(prerequisite)
+        if task_id == prerequisite:
+            raise DependencyCycleError(f"Task {task_id} cannot depend on itself")
+        if task_id in self.successors[prerequisite]:
+            return
+        lower, upper = self._rank[task_id], self._rank[prerequisite]
+        if lower <= upper:
+            # Order is violated: collect what has to move between the two ranks
+            forward = self._search(task_id, self.successors, lambda rank: rank <= upper, prerequisite)
+            backward = self._search(prerequisite, self.predecessors, lambda rank: rank >= lower, None)
+            self._reorder(backward, forward)
+        self.successors[prerequisite].add(task_id)
+        self.predecessors[task_id].add(prerequisite)
+        self.in_degree[task_id] += 1
+
+    def remove_dependency(self, task_id: str, prerequisite: str) -> None:
+        if prerequisite in self.predecessors.get(task_id, ()):
+            # Removing an edge never invalidates the order
+            self.predecessors[task_id].discard(prerequisite)
+            self.successors[prerequisite].discard(task_id)
+            self.in_degree[task_id] -= 1
+
+    def _search(self, start: str, edges: Dict[str, Set[str]], in_range, cycle_target: Optional[str]) -> List[str]:
+        seen = {start}
+        stack = [start]
+        while stack:
+            node = stack.pop()
+            for neighbor in edges[node]:
+                if neighbor == cycle_target:
+                    raise DependencyCycleError(f"Dependency {cycle_target} -> {start} would create a cycle")
+                if neighbor not in seen and in_range(self._rank[neighbor]):
+                    seen.add(neighbor)
+                    stack.append(neighbor)
+        return list(seen)
+
+    def _reorder(self, backward: List[str], forward: List[str]) -> None:
+        backward.sort(key=self._rank.__getitem__)
+        forward.sort(key=self._rank.__getitem__)
+        nodes = backward + forward
+        slots = sorted(self._rank[node] for node in nodes)
+        for node, rank in zip(nodes, slots):
+            self._rank[node] = rank
+            self._order[rank] = node
+
+    def topological_order(self) -> List[str]:
+        """Tasks with every prerequisite before its dependents."""
+        return [task_id for task_id in self._order if task_id is not None]
+
+    def ready_tasks(self) -> List[str]:
+        """Tasks with no prerequisites left."""
+        return [task_id for task_id in self.topological_order() if self.in_degree[task_id] == 0]
+
 class ResourcePool:
     """Tracks available resources and allocation."""
     def __init__(self, total_resources: Dict[str, int]):
@@ -44,12 +229,62 @@ class DecisionEngine:
     """Handles task prioritization, resource allocation, and strategic decisions."""
     def __init__(self, total_resources: Dict[str, int]):
         self.resource_pool = ResourcePool(total_resources)
-        self.task_queue: List[Task] = []  # priority queue
+        self.task_queue = IndexedPriorityQueue()  # every pending task
         self.running_tasks: Dict[str, Task] = {}
+        self.dependency_graph = DependencyGraph()
+        # Pending tasks that might fit now. A task that did not fit waits on the
+        # first resource it was short of, in a min-heap by the amount it needs,
+        # and is only retried once enough of that resource has been released.
+        self._ready = IndexedPriorityQueue()
+        self._waiting: Dict[str, List[Tuple[int, int, str]]] = {}
+        self._parked: Dict[str, int] = {}
+        self._park_sequence = itertools.count()
 
     def add_task(self, task_id: str, description: str, priority: int, resource_requirements: Dict[str, int]) -> None:
         task = Task(task_id, description, priority, resource_requirements)
-        heapq.heappush(self.task_queue, task)
+        self.task_queue.push(task)
+        self._ready.push(task)
+
+    def update_priority(self, task_id: str, priority: int) -> bool:
+        """Change the priority of a pending task in O(log n)."""
+        task = self.task_queue.get(task_id)
+        if task is None:
+            return False
+        task.priority = priority
+        self.task_queue.update(task_id)
+        if task_id in self._ready:
+            self._ready.update(task_id)
+        return True
+
+    def cancel_task(self, task_id: str) -> bool:
+        """Drop a pending task."""
+        task = self.task_queue.remove(task_id)
+        if task is None:
+            return False
+        self._ready.remove(task_id)
+        # Its entry in a waiting heap is skipped when reached
+        self._parked.pop(task_id, None)
+        return True
+
+    def _park(self, task: Task) -> None:
+        available = self.resource_pool.available_resources
+        for resource, amount in task.resource_requirements.items():
+            if available.get(resource, 0) < amount:
+                token = next(self._park_sequence)
+                self._parked[task.task_id] = token
+                heapq.heappush(self._waiting.setdefault(resource, []), (amount, token, task.task_id))
+                return
+        self._ready.push(task)
+
+    def _wake(self, resource: str) -> None:
+        """Make tasks waiting on `resource` ready again if enough of it is free."""
+        waiting = self._waiting.get(resource)
+        available = self.resource_pool.available_resources.get(resource, 0)
+        while waiting and waiting[0][0] <= available:
+            _, token, task_id = heapq.heappop(waiting)
+            if self._parked.get(task_id) == token:
+                del self._parked[task_id]
+                self._ready.push(self.task_queue.get(task_id))
 
     def _allocate_resources_to_task(self, task: Task) -> bool:
         if self.resource_pool.allocate(task.resource_requirements):
@@ -65,22 +300,17 @@ class DecisionEngine:
         Returns list of tasks that started running this cycle.
         """
         started_tasks = []
-        # We will try tasks in priority order but if cannot allocate, skip and try next
-
-        # Use a temporary list to hold tasks that can't be allocated now
-        temp_tasks = []
-
-        while self.task_queue:
-            task = heapq.heappop(self.task_queue)
+        # We will try tasks in priority order but if cannot allocate, skip and try next.
+        # Waiting tasks are left out: nothing they were short of has been released,
+        # so they would fail again.
+        while self._ready:
+            task = self._ready.pop()
             if self._allocate_resources_to_task(task):
+                self.task_queue.remove(task.task_id)
                 started_tasks.append(task)
             else:
-                # Cannot allocate now, keep for next time
-                temp_tasks.append(task)
-
-        # Put back tasks that were not allocated
-        for task in temp_tasks:
-            heapq.heappush(self.task_queue, task)
+                # Cannot allocate now, wait for the missing resource
+                self._park(task)
 
         return started_tasks
 
@@ -90,6 +320,8 @@ class DecisionEngine:
             return
         # Release resources
         self.resource_pool.release(task.allocated_resources)
+        for resource in task.allocated_resources:
+            self._wake(resource)
         task.status = "completed" if success else "failed"
 
     def get_status(self) -> Dict[str, Any]:
@@ -109,7 +341,7 @@ class DecisionEngine:
         if not self.task_queue:
             return None
 
-        highest_priority_task = self.task_queue[0]
+        highest_priority_task = self.task_queue.peek()
         if self.resource_pool.can_allocate(highest_priority_task.resource_requirements):
             return None  # No action needed
 
@@ -161,28 +393,46 @@ class DecisionEngine:
         Returns:
             List of task_ids in topological order (dependencies first)
         """
-        # Topological sort using Kahn's algorithm
+        # Apply only the changes since the previous call to the maintained graph
+        graph = self.dependency_graph
+        for task_id in [t for t in graph.topological_order() if t not in task_dependencies]:
+            graph.remove_task(task_id)
+        for task_id in task_dependencies:
+            graph.add_task(task_id)
+
+        cyclic = False
+        for task_id, deps in task_dependencies.items():
+            wanted = {dep for dep in deps if dep in task_dependencies}
+            for dep in graph.predecessors[task_id] - wanted:
+                graph.remove_dependency(task_id, dep)
+            for dep in wanted - graph.predecessors[task_id]:
+                try:
+                    graph.add_dependency(task_id, dep)
+                except DependencyCycleError:
+                    cyclic = True
+
+        if not cyclic:
+            return graph.topological_order()
+
+        # Tasks on a cycle, and everything after them, cannot be ordered
         in_degree = {task_id: 0 for task_id in task_dependencies}
-        
+        dependents: Dict[str, List[str]] = {task_id: [] for task_id in task_dependencies}
         for task_id, deps in task_dependencies.items():
-            for dep in deps:
+            for dep in set(deps):
                 if dep in in_degree:
                     in_degree[task_id] += 1
-        
-        queue = [task_id for task_id, degree in in_degree.items() if degree == 0]
+                    dependents[dep].append(task_id)
+
+        queue = deque(task_id for task_id, degree in in_degree.items() if degree == 0)
         result = []
-        
         while queue:
-            task_id = queue.pop(0)
+            task_id = queue.popleft()
             result.append(task_id)
-            
-            # Reduce in-degree for dependent tasks
-            for other_task_id, deps in task_dependencies.items():
-                if task_id in deps:
-                    in_degree[other_task_id] -= 1
-                    if in_degree[other_task_id] == 0:
-                        queue.append(other_task_id)
-        
+            for other_task_id in dependents[task_id]:
+                in_degree[other_task_id] -= 1
+                if in_degree[other_task_id] == 0:
+                    queue.append(other_task_id)
+
         return result
     
     def optimize_resource_allocation(self) -> Dict[str, Any]:
@@ -5,7 +5,7 @@ from functools import wraps
 from datetime import datetime, timedelta
 
 # Configure logging
-logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s"))
+logging.basicConfig(level=logging.ERROR, format="%(asctime)s - %(levelname)s - %(message)s")
 
 class CircuitBreaker:
     def __init__(self, failure_threshold=5, recovery_timeout=30, expected_exception=Exception):
@@ -5,9 +5,10 @@ Enables continuous learning and improvement of AI agents through experience and
 
 import json
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterable, List, Any, Optional, Tuple
 from datetime import datetime, timedelta
-from collections import defaultdict
+from collections import defaultdict, deque
+from dataclasses import dataclass
 import redis
 import numpy as np
 from .error_handler import with_retry, with_error_handling, default_fallback_value
@@ -15,29 +16,213 @@ from .error_handler import with_retry, with_error_handling, default_fallback_val
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+EXPERIENCE_STREAM = 'learning:experiences'
+PATTERN_INDEX = 'learning:patterns'
+AGGREGATE_PREFIX = 'learning:agg:'
+
+# Folds one experience into its (agent, task_type, action) aggregate and
+# appends the raw record to the capped experience stream, atomically.
+# KEYS: aggregate hash, pattern index set, experience stream
+# ARGV: success (0/1), duration ('' when unknown), feedback score, EWMA alpha,
+#       stream max length, experience JSON, agent/task_type/action as JSON
+RECORD_EXPERIENCE_SCRIPT = """
+local success = tonumber(ARGV[1])
+local feedback = tonumber(ARGV[3])
+local alpha = tonumber(ARGV[4])
+
+local function ewma(field, value)
+    local current = redis.call('HGET', KEYS[1], field)
+    if current then
+        value = alpha * value + (1 - alpha) * tonumber(current)
+    end
+    redis.call('HSET', KEYS[1], field, string.format('%.17g', value))
+end
+
+if redis.call('HSETNX', KEYS[1], 'agent_id', ARGV[7]) == 1 then
+    redis.call('HSET', KEYS[1], 'task_type', ARGV[8], 'action', ARGV[9])
+    redis.call('SADD', KEYS[2], KEYS[1])
+end
+redis.call('HINCRBY', KEYS[1], 'count', 1)
+redis.call('HINCRBY', KEYS[1], 'success_count', success)
+redis.call('HINCRBYFLOAT', KEYS[1], 'feedback_sum', ARGV[3])
+ewma('ewma_success', success)
+ewma('ewma_feedback_score', feedback)
+if ARGV[2] ~= '' then
+    redis.call('HINCRBY', KEYS[1], 'duration_count', 1)
+    redis.call('HINCRBYFLOAT', KEYS[1], 'duration_sum', ARGV[2])
+    ewma('ewma_duration', tonumber(ARGV[2]))
+end
+redis.call('XADD', KEYS[3], 'MAXLEN', '~', ARGV[5], '*', 'data', ARGV[6])
+return 1
+"""
+
+
+@dataclass
+class PatternStats:
+    """Running totals for one (agent, task_type, action) pattern."""
+    count: int = 0
+    success_count: int = 0
+    feedback_sum: float = 0.0
+    duration_count: int = 0
+    duration_sum: float = 0.0
+    ewma_success: Optional[float] = None
+    ewma_feedback_score: Optional[float] = None
+    ewma_duration: Optional[float] = None
+
+    @staticmethod
+    def _ewma(current: Optional[float], value: float, alpha: float) -> float:
+        return value if current is None else alpha * value + (1 - alpha) * current
+
+    def add(self, success: bool, feedback_score: float, duration: Optional[float], alpha: float):
+        """Same update as RECORD_EXPERIENCE_SCRIPT."""
+        self.count += 1
+        self.success_count += int(success)
+        self.feedback_sum += feedback_score
+        self.ewma_success = self._ewma(self.ewma_success, float(int(success)), alpha)
+        self.ewma_feedback_score = self._ewma(self.ewma_feedback_score, feedback_score, alpha)
+        if duration is not None:
+            self.duration_count += 1
+            self.duration_sum += duration
+            self.ewma_duration = self._ewma(self.ewma_duration, duration, alpha)
+
+    @classmethod
+    def from_redis(cls, fields: Dict[str, str]) -> 'PatternStats':
+        def number(name, cast=float):
+            value = fields.get(name)
+            return cast(value) if value is not None else None
+
+        return cls(
+            count=number('count', int) or 0,
+            success_count=number('success_count', int) or 0,
+            feedback_sum=number('feedback_sum') or 0.0,
+            duration_count=number('duration_count', int) or 0,
+            duration_sum=number('duration_sum') or 0.0,
+            ewma_success=number('ewma_success'),
+            ewma_feedback_score=number('ewma_feedback_score'),
+            ewma_duration=number('ewma_duration')
+        )
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'count': self.count,
+            'success_rate': self.success_count / self.count if self.count else 0,
+            'avg_feedback_score': self.feedback_sum / self.count if self.count else 0,
+            'avg_duration': self.duration_sum / self.duration_count if self.duration_count else None,
+            'ewma_success': self.ewma_success,
+            'ewma_feedback_score': self.ewma_feedback_score,
+            'ewma_duration': self.ewma_duration
+        }
+
+
+def _top_actions(counts: Dict[Any, int]) -> Dict[Any, int]:
+    # Ties broken by action name so results do not depend on arrival order
+    return dict(sorted(counts.items(), key=lambda x: (-x[1], str(x[0])))[:5])
+
+
+def summarize_experiences(experiences: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Pattern summary recomputed from raw experience records. LearningSystem
+    keeps running aggregates instead; this is the reference they must match.
+    """
+    successful_experiences = [e for e in experiences if e.get('success', False)]
+    failed_experiences = [e for e in experiences if not e.get('success', False)]
+
+    task_type_success = defaultdict(lambda: {'total': 0, 'successful': 0})
+    for exp in experiences:
+        task_type = exp.get('task_type', 'unknown')
+        task_type_success[task_type]['total'] += 1
+        if exp.get('success', False):
+            task_type_success[task_type]['successful'] += 1
+
+    successful_actions = defaultdict(int)
+    for exp in successful_experiences:
+        successful_actions[exp.get('action_taken', 'unknown')] += 1
+
+    failed_actions = defaultdict(int)
+    for exp in failed_experiences:
+        failed_actions[exp.get('action_taken', 'unknown')] += 1
+
+    return {
+        'total_experiences': len(experiences),
+        'successful_experiences': len(successful_experiences),
+        'failed_experiences': len(failed_experiences),
+        'overall_success_rate': len(successful_experiences) / len(experiences) if experiences else 0,
+        'success_rates_by_task_type': {
+            task_type: stats['successful'] / stats['total'] if stats['total'] > 0 else 0
+            for task_type, stats in task_type_success.items()
+        },
+        'most_successful_actions': _top_actions(successful_actions),
+        'most_failed_actions': _top_actions(failed_actions)
+    }
+
+
+def summarize_aggregates(aggregates: Iterable[Tuple[Any, Any, PatternStats]]) -> Dict[str, Any]:
+    """The summarize_experiences() result, from (task_type, action, stats) aggregates."""
+    total = successful = 0
+    task_type_success = defaultdict(lambda: {'total': 0, 'successful': 0})
+    successful_actions = defaultdict(int)
+    failed_actions = defaultdict(int)
+    for task_type, action, stats in aggregates:
+        total += stats.count
+        successful += stats.success_count
+        task_type_success[task_type]['total'] += stats.count
+        task_type_success[task_type]['successful'] += stats.success_count
+        if stats.success_count:
+            successful_actions[action] += stats.success_count
+        if stats.count > stats.success_count:
+            failed_actions[action] += stats.count - stats.success_count
+
+    return {
+        'total_experiences': total,
+        'successful_experiences': successful,
+        'failed_experiences': total - successful,
+        'overall_success_rate': successful / total if total else 0,
+        'success_rates_by_task_type': {
+            task_type: stats['successful'] / stats['total'] if stats['total'] > 0 else 0
+            for task_type, stats in task_type_success.items()
+        },
+        'most_successful_actions': _top_actions(successful_actions),
+        'most_failed_actions': _top_actions(failed_actions)
+    }
+
 class LearningSystem:
     """
     Advanced learning system that enables AI agents to learn from experience,
     adapt to new patterns, and continuously improve their performance.
     """
     
-    def __init__(self, redis_client: redis.Redis):
-        """Initialize the learning system."""
+    def __init__(self, redis_client: redis.Redis, ewma_alpha: float = 0.1,
+                 stream_maxlen: int = 100000, max_history: int = 10000):
+        """
+        Initialize the learning system.
+        
+        Args:
+            redis_client: Redis connection for aggregates and the experience stream
+            ewma_alpha: Weight of the newest experience in the moving averages
+            stream_maxlen: Approximate number of raw experiences kept in Redis
+            max_history: Raw experiences kept in memory per agent
+        """
         self.redis = redis_client
-        self.learning_data: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.ewma_alpha = ewma_alpha
+        self.stream_maxlen = stream_maxlen
+        self.max_history = max_history
+        self.learning_data: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.max_history))
+        # agent_id -> (task_type, action) -> running totals
+        self.aggregates: Dict[str, Dict[Tuple[Any, Any], PatternStats]] = defaultdict(dict)
         self.patterns: Dict[str, Any] = {}
         self.feedback_history: List[Dict[str, Any]] = []
+        self._record_script = redis_client.register_script(RECORD_EXPERIENCE_SCRIPT)
         
     @with_error_handling(fallback=default_fallback_value)
     @with_retry(expected_exception=redis.exceptions.ConnectionError)
-    def record_experience(self, agent_id: str, experience: Dict[str, Any]) -> None:
+    async def record_experience(self, agent_id: str, experience: Dict[str, Any]) -> None:
 
         """
         Record an experience for an agent to learn from.
         
         Args:
             agent_id: Agent identifier
-            experience: Dictionary containing task, action, result, and feedback
+            experience: Dictionary containing task, action, result, feedback and optionally duration
         """
         experience_record = {
             'agent_id': agent_id,
@@ -47,81 +232,111 @@ class LearningSystem:
             'result': experience.get('result'),
             'success': experience.get('success', False),
             'feedback_score': experience.get('feedback_score', 0.0),
+            'duration': experience.get('duration'),
             'context': experience.get('context', {})
         }
         
         self.learning_data[agent_id].append(experience_record)
         
-        # Store in Redis for persistence
+        task_type, action = experience_record['task_type'], experience_record['action_taken']
+        success = bool(experience_record['success'])
+        feedback_score = float(experience_record['feedback_score'] or 0.0)
+        duration = experience_record['duration']
+        duration = float(duration) if duration is not None else None
+        stats = self.aggregates[agent_id].get((task_type, action))
+        if stats is None:
+            stats = self.aggregates[agent_id][(task_type, action)] = PatternStats()
+        stats.add(success, feedback_score, duration, self.ewma_alpha)
+        
+        # Update the shared aggregate and append to the capped stream in one round trip
         try:
-            key = f"learning:experience:{agent_id}:{datetime.now().timestamp()}"
-            self.redis.set(key, json.dumps(experience_record))
-            self.redis.expire(key, 86400 * 30)  # Keep for 30 days
+            self._record_script(
+                keys=[self._aggregate_key(agent_id, task_type, action), PATTERN_INDEX, EXPERIENCE_STREAM],
+                args=[
+                    int(success),
+                    repr(duration) if duration is not None else '',
+                    repr(feedback_score),
+                    repr(self.ewma_alpha),
+                    self.stream_maxlen,
+                    json.dumps(experience_record, default=str),
+                    json.dumps(agent_id),
+                    json.dumps(task_type),
+                    json.dumps(action)
+                ]
+            )
         except Exception as e:
             logger.error(f"Failed to store experience in Redis: {str(e)}")
             
         logger.info(f"Recorded experience for agent {agent_id}")
         
+    @staticmethod
+    def _aggregate_key(agent_id: str, task_type: Any, action: Any) -> str:
+        return AGGREGATE_PREFIX + json.dumps([agent_id, task_type, action])
+        
     @with_error_handling(fallback=default_fallback_value)
-    def analyze_patterns(self, agent_id: Optional[str] = None) -> Dict[str, Any]:
+    async def load_aggregates(self) -> int:
+        """
+        Replace the in-memory aggregates with the ones stored in Redis, e.g.
+        those recorded by other processes.
+        
+        Returns:
+            Number of patterns loaded
+        """
+        keys = sorted(self.redis.smembers(PATTERN_INDEX))
+        pipe = self.redis.pipeline(transaction=False)
+        for key in keys:
+            pipe.hgetall(key)
+        aggregates: Dict[str, Dict[Tuple[Any, Any], PatternStats]] = defaultdict(dict)
+        for fields in pipe.execute():
+            fields = {(k.decode() if isinstance(k, bytes) else k): (v.decode() if isinstance(v, bytes) else v)
+                      for k, v in fields.items()}
+            if 'agent_id' not in fields:
+                continue
+            agent_id = json.loads(fields['agent_id'])
+            key = (json.loads(fields['task_type']), json.loads(fields['action']))
+            aggregates[agent_id][key] = PatternStats.from_redis(fields)
+        self.aggregates = aggregates
+        return sum(len(patterns) for patterns in aggregates.values())
+        
+    def _pattern_rows(self, agent_id: Optional[str]) -> List[Tuple[Any, Any, PatternStats]]:
+        if agent_id:
+            return [(task_type, action, stats)
+                    for (task_type, action), stats in self.aggregates.get(agent_id, {}).items()]
+        merged: Dict[Tuple[Any, Any], PatternStats] = {}
+        for agent_patterns in self.aggregates.values():
+            for key, stats in agent_patterns.items():
+                total = merged.setdefault(key, PatternStats())
+                total.count += stats.count
+                total.success_count += stats.success_count
+                total.feedback_sum += stats.feedback_sum
+                total.duration_count += stats.duration_count
+                total.duration_sum += stats.duration_sum
+        return [(task_type, action, stats) for (task_type, action), stats in merged.items()]
+        
+    @with_error_handling(fallback=default_fallback_value)
+    async def analyze_patterns(self, agent_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Analyze patterns in agent experiences to identify successful strategies.
         
+        Works from the running aggregates, so the cost depends on the number of
+        (task_type, action) patterns rather than the number of experiences.
+        
         Args:
             agent_id: Optional agent ID to analyze specific agent, or None for all agents
             
         Returns:
             Dictionary of identified patterns and insights
         """
-        if agent_id:
-            experiences = self.learning_data.get(agent_id, [])
-        else:
-            experiences = []
-            for agent_experiences in self.learning_data.values():
-                experiences.extend(agent_experiences)
-        
-        if not experiences:
+        rows = self._pattern_rows(agent_id)
+        if not rows:
             return {'patterns': [], 'message': 'No experiences to analyze'}
         
-        # Analyze success patterns
-        successful_experiences = [e for e in experiences if e.get('success', False)]
-        failed_experiences = [e for e in experiences if not e.get('success', False)]
-        
-        # Calculate success rate by task type
-        task_type_success = defaultdict(lambda: {'total': 0, 'successful': 0})
-        for exp in experiences:
-            task_type = exp.get('task_type', 'unknown')
-            task_type_success[task_type]['total'] += 1
-            if exp.get('success', False):
-                task_type_success[task_type]['successful'] += 1
-        
-        success_rates = {
-            task_type: stats['successful'] / stats['total'] if stats['total'] > 0 else 0
-            for task_type, stats in task_type_success.items()
-        }
-        
-        # Identify common patterns in successful experiences
-        successful_actions = defaultdict(int)
-        for exp in successful_experiences:
-            action = exp.get('action_taken', 'unknown')
-            successful_actions[action] += 1
-        
-        # Identify common patterns in failed experiences
-        failed_actions = defaultdict(int)
-        for exp in failed_experiences:
-            action = exp.get('action_taken', 'unknown')
-            failed_actions[action] += 1
-        
-        patterns = {
-            'total_experiences': len(experiences),
-            'successful_experiences': len(successful_experiences),
-            'failed_experiences': len(failed_experiences),
-            'overall_success_rate': len(successful_experiences) / len(experiences) if experiences else 0,
-            'success_rates_by_task_type': success_rates,
-            'most_successful_actions': dict(sorted(successful_actions.items(), key=lambda x: x[1], reverse=True)[:5]),
-            'most_failed_actions': dict(sorted(failed_actions.items(), key=lambda x: x[1], reverse=True)[:5]),
-            'analysis_timestamp': datetime.now().isoformat()
-        }
+        patterns = summarize_aggregates(rows)
+        # Moving averages are kept per agent, so they are None across all agents
+        patterns['pattern_stats'] = [
+            dict(task_type=task_type, action=action, **stats.summary()) for task_type, action, stats in rows
+        ]
+        patterns['analysis_timestamp'] = datetime.now().isoformat()
         
         # Store patterns
         if agent_id:
@@ -132,7 +347,7 @@ class LearningSystem:
         return patterns
         
     @with_error_handling(fallback=default_fallback_value)
-    def get_recommendations(self, agent_id: str, task_type: str) -> Dict[str, Any]:
+    async def get_recommendations(self, agent_id: str, task_type: str) -> Dict[str, Any]:
         """
         Get recommendations for an agent based on learned patterns.
         
@@ -144,7 +359,7 @@ class LearningSystem:
             Dictionary of recommendations
         """
         # Analyze agent-specific patterns
-        agent_patterns = self.analyze_patterns(agent_id)
+        agent_patterns = await self.analyze_patterns(agent_id)
         
         # Get success rate for this task type
         task_success_rate = agent_patterns.get('success_rates_by_task_type', {}).get(task_type, 0.0)
@@ -173,7 +388,7 @@ class LearningSystem:
         
     @with_error_handling(fallback=default_fallback_value)
     @with_retry(expected_exception=redis.exceptions.ConnectionError)
-    def record_feedback(self, task_id: str, feedback: Dict[str, Any]) -> None:
+    async def record_feedback(self, task_id: str, feedback: Dict[str, Any]) -> None:
         """
         Record feedback on a completed task for learning purposes.
         
@@ -204,7 +419,7 @@ class LearningSystem:
         logger.info(f"Recorded feedback for task {task_id}")
         
     @with_error_handling(fallback=default_fallback_value)
-    def get_learning_progress(self, agent_id: str, days: int = 30) -> Dict[str, Any]:
+    async def get_learning_progress(self, agent_id: str, days: int = 30) -> Dict[str, Any]:
         """
         Get learning progress for an agent over a specified period.
         
@@ -273,7 +488,7 @@ class LearningSystem:
         }
         
     @with_error_handling(fallback=default_fallback_value)
-    def export_learning_data(self, agent_id: Optional[str] = None, format: str = 'json') -> str:
+    async def export_learning_data(self, agent_id: Optional[str] = None, format: str = 'json') -> str:
 
         """
         Export learning data for analysis or backup.
@@ -288,13 +503,13 @@ class LearningSystem:
         if agent_id:
             data = {
                 'agent_id': agent_id,
-                'experiences': self.learning_data.get(agent_id, []),
+                'experiences': list(self.learning_data.get(agent_id, [])),
                 'patterns': self.patterns.get(agent_id, {}),
                 'export_timestamp': datetime.now().isoformat()
             }
         else:
             data = {
-                'all_agents': dict(self.learning_data),
+                'all_agents': {aid: list(experiences) for aid, experiences in self.learning_data.items()},
                 'patterns': self.patterns,
                 'feedback_history': self.feedback_history,
                 'export_timestamp': datetime.now().isoformat()
@@ -309,7 +524,7 @@ class LearningSystem:
             raise ValueError(f"Unsupported export format: {format}")
             
     @with_error_handling(fallback=default_fallback_value)
-    def reset_learning_data(self, agent_id: Optional[str] = None) -> None:
+    async def reset_learning_data(self, agent_id: Optional[str] = None) -> None:
         """
         Reset learning data for an agent or all agents.
         
@@ -317,53 +532,53 @@ class LearningSystem:
             agent_id: Optional agent ID to reset specific agent, or None for all
         """
         if agent_id:
-            self.learning_data[agent_id] = []
+            self.learning_data.pop(agent_id, None)
+            self.aggregates.pop(agent_id, None)
             if agent_id in self.patterns:
                 del self.patterns[agent_id]
             logger.info(f"Reset learning data for agent {agent_id}")
         else:
             self.learning_data.clear()
+            self.aggregates.clear()
             self.patterns.clear()
             self.feedback_history.clear()
             logger.info("Reset all learning data")
             
     @with_error_handling(fallback=default_fallback_value)
-    def get_insights(self) -> Dict[str, Any]:
+    async def get_insights(self) -> Dict[str, Any]:
         """
         Get high-level insights from all learning data.
         
         Returns:
             Dictionary of insights and recommendations
         """
-        all_experiences = []
-        for agent_experiences in self.learning_data.values():
-            all_experiences.extend(agent_experiences)
-        
-        if not all_experiences:
+        # Per-agent and per-task-type totals from the aggregates
+        agent_totals = {}
+        task_type_performance = defaultdict(lambda: {'total': 0, 'successful': 0})
+        for agent_id, agent_patterns in self.aggregates.items():
+            total = successful = 0
+            for (task_type, _), stats in agent_patterns.items():
+                total += stats.count
+                successful += stats.success_count
+                task_type_performance[task_type]['total'] += stats.count
+                task_type_performance[task_type]['successful'] += stats.success_count
+            if total:
+                agent_totals[agent_id] = (total, successful)
+        
+        if not agent_totals:
             return {'message': 'No learning data available'}
         
         # Calculate overall metrics
-        total_experiences = len(all_experiences)
-        successful_experiences = sum(1 for e in all_experiences if e.get('success', False))
+        total_experiences = sum(total for total, _ in agent_totals.values())
+        successful_experiences = sum(successful for _, successful in agent_totals.values())
         overall_success_rate = successful_experiences / total_experiences if total_experiences > 0 else 0
         
         # Identify top performing agents
-        agent_performance = {}
-        for agent_id, experiences in self.learning_data.items():
-            if experiences:
-                success_count = sum(1 for e in experiences if e.get('success', False))
-                agent_performance[agent_id] = success_count / len(experiences)
+        agent_performance = {agent_id: successful / total for agent_id, (total, successful) in agent_totals.items()}
         
         top_agents = sorted(agent_performance.items(), key=lambda x: x[1], reverse=True)[:5]
         
         # Identify areas for improvement
-        task_type_performance = defaultdict(lambda: {'total': 0, 'successful': 0})
-        for exp in all_experiences:
-            task_type = exp.get('task_type', 'unknown')
-            task_type_performance[task_type]['total'] += 1
-            if exp.get('success', False):
-                task_type_performance[task_type]['successful'] += 1
-        
         weak_areas = []
         for task_type, stats in task_type_performance.items():
             success_rate = stats['successful'] / stats['total'] if stats['total'] > 0 else 0
@@ -379,6 +594,6 @@ class LearningSystem:
             'overall_success_rate': round(overall_success_rate, 3),
             'top_performing_agents': [{'agent_id': aid, 'success_rate': round(rate, 3)} for aid, rate in top_agents],
             'areas_for_improvement': weak_areas,
-            'total_agents_learning': len(self.learning_data),
+            'total_agents_learning': len(agent_totals),
             'timestamp': datetime.now().isoformat()
         }
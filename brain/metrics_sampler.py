@@ -0,0 +1,290 @@
+"""
+Windowed System Metrics Sampler for Flowstate-AI
+Samples host metrics on a background thread into fixed-size NumPy ring
+buffers with downsampled tiers, so trend queries never block the event loop.
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import psutil
+
+logger = logging.getLogger(__name__)
+
+SYSTEM_FIELDS = ('cpu_percent', 'memory_percent', 'disk_percent', 'network_connections')
+
+# (resolution_seconds, capacity) per tier; the first tier holds raw samples.
+# Defaults: 1 hour at 1s, 1 day at 1 min, 1 week at 15 min.
+DEFAULT_TIERS = ((1, 3600), (60, 1440), (900, 672))
+
+_PROC_NET_FILES = ('/proc/net/tcp', '/proc/net/tcp6', '/proc/net/udp', '/proc/net/udp6')
+
+
+def count_network_connections() -> int:
+    """
+    Count inet sockets without resolving their owning processes.
+
+    On Linux this counts entries in /proc/net, which is far cheaper than
+    psutil.net_connections() on busy hosts. Other platforms fall back to psutil.
+
+    Returns:
+        Number of TCP/UDP sockets
+    """
+    total = 0
+    found = False
+    for path in _PROC_NET_FILES:
+        try:
+            with open(path, 'rb') as f:
+                total += max(0, sum(1 for _ in f) - 1)  # Skip header line
+            found = True
+        except OSError:
+            continue
+
+    if found:
+        return total
+    return len(psutil.net_connections(kind='inet'))
+
+
+class MetricsRingBuffer:
+    """
+    Fixed-capacity ring buffer of timestamped metric rows backed by NumPy arrays.
+
+    Rows are appended in timestamp order, so window queries binary-search the
+    two chronological segments and only copy the rows they return.
+    """
+
+    def __init__(self, capacity: int, num_fields: int):
+        self.capacity = capacity
+        self._timestamps = np.zeros(capacity, dtype=np.float64)
+        self._values = np.zeros((capacity, num_fields), dtype=np.float64)
+        self._head = 0  # Next write position
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, timestamp: float, values: Sequence[float]):
+        """Append one row, overwriting the oldest row when full."""
+        self._timestamps[self._head] = timestamp
+        self._values[self._head] = values
+        self._head = (self._head + 1) % self.capacity
+        self._size = min(self._size + 1, self.capacity)
+
+    def _segments(self) -> List[Tuple[int, int]]:
+        """Index ranges of the stored rows in chronological order."""
+        if self._size < self.capacity:
+            return [(0, self._size)]
+        return [(self._head, self.capacity), (0, self._head)]
+
+    def window(self, since: float) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get rows with timestamp >= since.
+
+        Args:
+            since: Epoch seconds lower bound
+
+        Returns:
+            Tuple of (timestamps, values) arrays in chronological order
+        """
+        ts_parts = []
+        value_parts = []
+        for start, end in self._segments():
+            offset = start + int(np.searchsorted(self._timestamps[start:end], since, side='left'))
+            if offset < end:
+                ts_parts.append(self._timestamps[offset:end])
+                value_parts.append(self._values[offset:end])
+
+        if not ts_parts:
+            return np.empty(0), np.empty((0, self._values.shape[1]))
+        return np.concatenate(ts_parts), np.concatenate(value_parts)
+
+    def oldest_timestamp(self) -> Optional[float]:
+        """Timestamp of the oldest stored row, if any."""
+        if self._size == 0:
+            return None
+        return float(self._timestamps[self._segments()[0][0]])
+
+
+class TieredMetricsBuffer:
+    """
+    Raw ring buffer plus downsampled tiers holding per-bucket means.
+
+    Queries pick the finest tier whose retention covers the requested window,
+    so cost stays O(window / resolution) regardless of how long we have run.
+    """
+
+    def __init__(self, fields: Sequence[str] = SYSTEM_FIELDS, tiers: Sequence[Tuple[int, int]] = DEFAULT_TIERS):
+        self.fields = tuple(fields)
+        self.tiers = [(resolution, MetricsRingBuffer(capacity, len(self.fields))) for resolution, capacity in tiers]
+        # Running sums for the open bucket of each downsampled tier
+        self._buckets: List[Optional[int]] = [None] * len(self.tiers)
+        self._sums = [np.zeros(len(self.fields)) for _ in self.tiers]
+        self._counts = [0] * len(self.tiers)
+        self._lock = threading.Lock()
+
+    def add(self, timestamp: float, values: Sequence[float]):
+        """Record one sample in the raw tier and fold it into the coarser tiers."""
+        row = np.asarray(values, dtype=np.float64)
+        with self._lock:
+            self.tiers[0][1].append(timestamp, row)
+
+            for i in range(1, len(self.tiers)):
+                resolution, buffer = self.tiers[i]
+                bucket = int(timestamp // resolution)
+                if self._buckets[i] is not None and bucket != self._buckets[i] and self._counts[i]:
+                    buffer.append(self._buckets[i] * resolution, self._sums[i] / self._counts[i])
+                    self._sums[i][:] = 0
+                    self._counts[i] = 0
+                self._buckets[i] = bucket
+                self._sums[i] += row
+                self._counts[i] += 1
+
+    def window(self, seconds: float, now: Optional[float] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Get samples from the last `seconds`, using the finest tier that covers them.
+
+        Args:
+            seconds: Length of the window
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Tuple of (timestamps, values) arrays
+        """
+        now = time.time() if now is None else now
+        since = now - seconds
+        with self._lock:
+            for resolution, buffer in self.tiers:
+                oldest = buffer.oldest_timestamp()
+                covers = len(buffer) < buffer.capacity or (oldest is not None and oldest <= since)
+                if covers and len(buffer):
+                    return buffer.window(since)
+            # Nothing covers the whole window; return the longest history we have
+            for resolution, buffer in reversed(self.tiers):
+                if len(buffer):
+                    return buffer.window(since)
+        return np.empty(0), np.empty((0, len(self.fields)))
+
+    def latest(self) -> Optional[Dict[str, float]]:
+        """Most recent raw sample as a dict, if any."""
+        with self._lock:
+            buffer = self.tiers[0][1]
+            if not len(buffer):
+                return None
+            index = (buffer._head - 1) % buffer.capacity
+            return dict(zip(self.fields, buffer._values[index].tolist()))
+
+
+class PSUtilSampler:
+    """
+    Background thread sampling host metrics without blocking callers.
+
+    CPU is measured with non-blocking psutil deltas between samples, and the
+    more expensive disk and connection probes run every few samples.
+    """
+
+    def __init__(
+        self,
+        interval: float = 1.0,
+        tiers: Sequence[Tuple[int, int]] = DEFAULT_TIERS,
+        disk_path: str = '/',
+        slow_probe_every: int = 5
+    ):
+        """
+        Initialize the sampler.
+
+        Args:
+            interval: Seconds between samples
+            tiers: (resolution_seconds, capacity) per buffer tier
+            disk_path: Mount point used for disk usage
+            slow_probe_every: Refresh disk and connection counts every N samples
+        """
+        self.interval = interval
+        self.disk_path = disk_path
+        self.slow_probe_every = max(1, slow_probe_every)
+        self.buffer = TieredMetricsBuffer(SYSTEM_FIELDS, tiers)
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._samples_taken = 0
+        self._disk_percent = 0.0
+        self._connections = 0
+
+        # Prime the CPU counter so the first delta is meaningful
+        psutil.cpu_percent(interval=None)
+
+    def sample_once(self) -> Dict[str, float]:
+        """Take one sample and record it in the buffer."""
+        if self._samples_taken % self.slow_probe_every == 0:
+            self._disk_percent = psutil.disk_usage(self.disk_path).percent
+            self._connections = count_network_connections()
+        self._samples_taken += 1
+
+        sample = {
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'memory_percent': psutil.virtual_memory().percent,
+            'disk_percent': self._disk_percent,
+            'network_connections': self._connections
+        }
+        self.buffer.add(time.time(), [sample[field] for field in SYSTEM_FIELDS])
+        return sample
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                self.sample_once()
+            except Exception as e:
+                logger.error(f"Error sampling system metrics: {str(e)}")
+            self._stop_event.wait(self.interval)
+
+    def start(self):
+        """Start the sampling thread if it is not already running."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='psutil-sampler', daemon=True)
+        self._thread.start()
+        logger.info(f"System metrics sampler started (interval={self.interval}s)")
+
+    def stop(self):
+        """Stop the sampling thread."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1)
+            self._thread = None
+
+    def latest(self) -> Dict[str, float]:
+        """Latest sample, taking one immediately if none exists yet."""
+        sample = self.buffer.latest()
+        if sample is None:
+            sample = self.sample_once()
+        return sample
+
+    def trends(self, seconds: float, now: Optional[float] = None) -> Optional[Dict[str, Dict[str, float]]]:
+        """
+        Vectorized averages and first-half/second-half deltas over a window.
+
+        Args:
+            seconds: Length of the window
+            now: Reference time (defaults to the current time)
+
+        Returns:
+            Dict with 'averages', 'deltas' and 'data_points', or None if no samples
+        """
+        _, values = self.buffer.window(seconds, now)
+        if not len(values):
+            return None
+
+        averages = values.mean(axis=0)
+        mid_point = len(values) // 2
+        if mid_point:
+            deltas = values[mid_point:].mean(axis=0) - values[:mid_point].mean(axis=0)
+        else:
+            deltas = np.zeros(len(SYSTEM_FIELDS))
+
+        return {
+            'averages': dict(zip(SYSTEM_FIELDS, averages.tolist())),
+            'deltas': dict(zip(SYSTEM_FIELDS, deltas.tolist())),
+            'data_points': len(values)
+        }
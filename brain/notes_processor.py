@@ -6,42 +6,386 @@ Handles natural language processing, time extraction, and lead matching
 
 import re
 import json
+import sqlite3
+import bisect
+import hashlib
+import heapq
+import math
+import threading
+import time
+import uuid
+import weakref
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
 from openai import OpenAI
 
-client = OpenAI()
+# Norwegian and English time patterns
+TIME_PATTERNS = {
+    'no': {
+        'time': r'(\d{1,2}):(\d{2})',
+        'relative_time': r'(om|i|etter)\s+(\d+)\s+(minutt|timer|time|dag|dager|uke|uker)',
+        'specific_day': r'(i\s+dag|i\s+morgen|neste\s+uke|på\s+(mandag|tirsdag|onsdag|torsdag|fredag|lørdag|søndag))',
+    },
+    'en': {
+        'time': r'(\d{1,2}):(\d{2})',
+        'relative_time': r'(in|after)\s+(\d+)\s+(minute|minutes|hour|hours|day|days|week|weeks)',
+        'specific_day': r'(today|tomorrow|next\s+week|on\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday))',
+    }
+}
+
+# Compiled once at import instead of on every note
+TIME_REGEXES = {
+    language: {
+        'time': re.compile(patterns['time']),
+        'relative_time': re.compile(patterns['relative_time'], re.IGNORECASE),
+        'specific_day': re.compile(patterns['specific_day'], re.IGNORECASE),
+    }
+    for language, patterns in TIME_PATTERNS.items()
+}
+
+NORWEGIAN_WORDS = ('å', 'høre', 'skulle', 'ville', 'kommer', 'på', 'til')
+ENGLISH_WORDS = ('to', 'hear', 'should', 'would', 'comes', 'on', 'at')
+
+# Capitalized words that start notes but are not names
+COMMON_WORDS = frozenset(['Skrive', 'Write', 'Send', 'Call', 'Email', 'Message'])
+
+PUNCTUATION_REGEX = re.compile(r'[^\w\s]')
+NAME_TOKEN_REGEX = re.compile(r'\w+')
+
+CATEGORIZATION_MODEL = "gpt-4.1-mini"
+
+CATEGORIZATION_PROMPT = """You are an AI assistant helping to categorize and extract information from quick notes in a CRM system.
+
+Analyze the note and extract:
+1. note_type: "reminder", "follow_up", "meeting", "general", "task"
+2. priority: "low", "normal", "high", "urgent"
+3. action_required: true/false
+4. summary: A brief 1-sentence summary
+5. suggested_lead_name: If a person's name is mentioned
+6. confidence: 0.0-1.0 score of how confident you are
+
+Respond in JSON format only."""
+
+BATCH_CATEGORIZATION_PROMPT = CATEGORIZATION_PROMPT + """
+
+You will receive several numbered notes. Respond with a JSON object of the form
+{"results": [{"index": <note number>, ...fields above...}, ...]} with one entry per note."""
+
+
+def normalize_name(name: str) -> List[str]:
+    """Lower-cased word tokens of a name."""
+    return NAME_TOKEN_REGEX.findall(name.casefold())
+
+
+def trigrams(token: str) -> set:
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def note_hash(text: str, language: str) -> str:
+    return hashlib.sha256(f"{language}\0{text}".encode('utf-8')).hexdigest()
+
+
+class LeadNameIndex:
+    """
+    In-memory index of lead names for matching names found in notes.
+
+    Only ids and names are indexed; callers load the other lead fields by id.
+    Names are split into normalized tokens kept in a sorted vocabulary, so a
+    note name matches leads with a token starting with it (what the previous
+    `LIKE 'name%' OR LIKE '% name%'` query found), ranked first-name matches
+    first. Names with no prefix match fall back to trigram similarity, which
+    tolerates typos. The index is loaded once and reloaded when the leads
+    table changes (checked at most every `check_interval` seconds), or updated
+    directly through upsert()/remove(). The check sees inserts, deletes and
+    updates that bump `updated_at`; match_leads repairs matched leads whose
+    name changed without one.
+    """
+
+    def __init__(self, check_interval: float = 5.0, fuzzy_threshold: float = 0.3):
+        self.check_interval = check_interval
+        self.fuzzy_threshold = fuzzy_threshold
+        self.loaded = False
+        self._leads: Dict[int, Dict] = {}
+        self._tokens: Dict[str, set] = {}
+        self._trigrams: Dict[str, set] = {}
+        self._token_grams: Dict[str, frozenset] = {}
+        # Recent match results; notes keep mentioning the same names and words
+        self._match_cache: Dict[Tuple[str, int], List[Tuple[int, str]]] = {}
+        self._vocabulary: Optional[List[str]] = None
+        self._signature = None
+        self._signature_sql = None
+        self._checked_at = 0.0
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._leads)
+
+    @staticmethod
+    def _signature_query(conn) -> str:
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(leads)")}
+        changed = ", MAX(updated_at)" if 'updated_at' in columns else ""
+        return f"SELECT COUNT(*), COALESCE(MAX(id), 0), COALESCE(SUM(LENGTH(name)), 0){changed} FROM leads"
+
+    def _table_signature(self, conn) -> Tuple:
+        return tuple(conn.execute(self._signature_sql).fetchone())
+
+    def load(self, conn):
+        """(Re)build the index from the leads table."""
+        cursor = conn.execute("SELECT id, name FROM leads")
+        with self._lock:
+            self._leads, self._tokens, self._trigrams, self._token_grams = {}, {}, {}, {}
+            self._vocabulary = None
+            for lead_id, name in cursor:
+                self._add({'id': lead_id, 'name': name})
+            self._signature_sql = self._signature_query(conn)
+            self._signature = self._table_signature(conn)
+            self._checked_at = time.monotonic()
+            self.loaded = True
+
+    def ensure_fresh(self, conn):
+        """Load on first use, then reload if the leads table changed since."""
+        with self._lock:
+            if not self.loaded:
+                self.load(conn)
+            elif time.monotonic() - self._checked_at >= self.check_interval:
+                self._checked_at = time.monotonic()
+                if self._table_signature(conn) != self._signature:
+                    self.load(conn)
+
+    def invalidate(self):
+        """Reload from the database on next use."""
+        with self._lock:
+            self.loaded = False
+
+    def _add(self, lead: Dict):
+        self._match_cache = {}
+        lead_id = lead['id']
+        self._leads[lead_id] = lead
+        for position, token in enumerate(normalize_name(lead.get('name') or '')):
+            postings = self._tokens.get(token)
+            if postings is None:
+                postings = self._tokens[token] = set()
+                self._vocabulary = None
+                grams = self._token_grams[token] = frozenset(trigrams(token))
+                for gram in grams:
+                    self._trigrams.setdefault(gram, set()).add(token)
+            postings.add((lead_id, position == 0))
+
+    def _discard(self, lead_id: int):
+        self._match_cache = {}
+        lead = self._leads.pop(lead_id, None)
+        if lead is None:
+            return
+        for position, token in enumerate(normalize_name(lead.get('name') or '')):
+            postings = self._tokens.get(token)
+            if postings is None:
+                continue
+            postings.discard((lead_id, position == 0))
+            if not postings:
+                del self._tokens[token]
+                self._vocabulary = None
+                for gram in self._token_grams.pop(token):
+                    self._trigrams[gram].discard(token)
+
+    def upsert(self, lead: Dict):
+        """Add or replace one lead (a dict with at least id and name)."""
+        with self._lock:
+            self._discard(lead['id'])
+            self._add({'id': lead['id'], 'name': lead.get('name')})
+
+    def remove(self, lead_id: int):
+        with self._lock:
+            self._discard(lead_id)
+
+    def name_of(self, lead_id: int) -> Optional[str]:
+        """The indexed name of a lead."""
+        with self._lock:
+            lead = self._leads.get(lead_id)
+            return lead['name'] if lead is not None else None
+
+    def _prefix_tokens(self, query: str) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._tokens)
+        vocabulary = self._vocabulary
+        found = []
+        i = bisect.bisect_left(vocabulary, query)
+        while i < len(vocabulary) and vocabulary[i].startswith(query):
+            found.append(vocabulary[i])
+            i += 1
+        return found
+
+    def _fuzzy_tokens(self, query: str) -> List[Tuple[float, str]]:
+        grams = trigrams(query)
+        threshold = self.fuzzy_threshold
+        # A match shares at least `needed` trigrams, so it must contain one of
+        # the len(grams) - needed + 1 rarest ones; only those postings are scanned
+        needed = max(1, math.ceil(threshold * len(grams)))
+        rarest = sorted(grams, key=lambda gram: len(self._trigrams.get(gram, ())))[:len(grams) - needed + 1]
+        min_size, max_size = threshold * len(grams), len(grams) / threshold
+
+        candidates = set()
+        for gram in rarest:
+            candidates.update(self._trigrams.get(gram, ()))
+        scored = []
+        for token in candidates:
+            token_grams = self._token_grams[token]
+            if not min_size <= len(token_grams) <= max_size:
+                continue
+            shared = len(grams & token_grams)
+            similarity = shared / (len(grams) + len(token_grams) - shared)
+            if similarity >= threshold:
+                scored.append((similarity, token))
+        scored.sort(reverse=True)
+        return scored
+
+    def match(self, name: str, limit: int = 5) -> List[Tuple[Dict, str]]:
+        """Leads matching `name`, best first, as (lead, match type) pairs."""
+        tokens = normalize_name(name)
+        if not tokens:
+            return []
+        query = tokens[0]
+        with self._lock:
+            key = (query, limit)
+            found = self._match_cache.get(key)
+            if found is None:
+                found = self._match(query, limit)
+                if len(self._match_cache) >= 10000:
+                    self._match_cache = {}
+                self._match_cache[key] = found
+            return [(self._leads[lead_id], match_type) for lead_id, match_type in found]
+
+    def _match(self, query: str, limit: int) -> List[Tuple[int, str]]:
+        ranked = {}
+        for token in self._prefix_tokens(query):
+            for lead_id, first in self._tokens[token]:
+                rank = 1 if first else 2
+                if rank < ranked.get(lead_id, 3):
+                    ranked[lead_id] = rank
+        if ranked:
+            best = heapq.nsmallest(limit, ranked, key=lambda lead_id: (ranked[lead_id], lead_id))
+            return [(lead_id, 'prefix') for lead_id in best]
+
+        matches = []
+        seen = set()
+        for _, token in self._fuzzy_tokens(query):
+            for lead_id, _ in sorted(self._tokens[token]):
+                if lead_id not in seen:
+                    seen.add(lead_id)
+                    matches.append((lead_id, 'fuzzy'))
+                    if len(matches) >= limit:
+                        return matches
+        return matches
+
+
+# Indexes shared by every NotesProcessor, keyed by database file
+_lead_indexes: Dict[str, LeadNameIndex] = {}
+_lead_indexes_lock = threading.Lock()
+
+# Indexes of in-memory databases, kept alive by their connection (see _memory_index)
+_memory_indexes: "weakref.WeakValueDictionary[str, LeadNameIndex]" = weakref.WeakValueDictionary()
+_MEMORY_INDEX_FUNCTION = 'flowstate_lead_index'
+
+# Leads loaded per query in match_leads
+LEAD_FETCH_CHUNK = 500
+
+
+def _database_file(conn) -> str:
+    for _, name, path in conn.execute("PRAGMA database_list"):
+        if name == 'main':
+            return path or ''
+    return ''
+
+
+def _memory_index(conn) -> LeadNameIndex:
+    """
+    The index for an in-memory database, which is private to its connection.
+
+    Connections take no attributes or weak references, so the index is tied to
+    the connection through a SQL function that holds it and returns its key:
+    it lives exactly as long as the connection, and a new connection can never
+    pick up the index of an old one.
+    """
+    try:
+        key = conn.execute(f"SELECT {_MEMORY_INDEX_FUNCTION}()").fetchone()[0]
+        index = _memory_indexes.get(key)
+        if index is not None:
+            return index
+    except sqlite3.OperationalError:
+        pass
+    key = uuid.uuid4().hex
+    index = _memory_indexes[key] = LeadNameIndex()
+    conn.create_function(_MEMORY_INDEX_FUNCTION, 0, lambda index=index: key)
+    return index
+
+
+def invalidate_lead_indexes():
+    """Make every shared lead index reload on next use, e.g. after bulk lead changes."""
+    with _lead_indexes_lock:
+        for index in _lead_indexes.values():
+            index.invalidate()
+
+
+class CategorizationCache:
+    """Thread-safe LRU of AI categorizations keyed by note hash."""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+                return dict(value)
+            return None
+
+    def set(self, key: str, value: Dict):
+        with self._lock:
+            self._entries[key] = dict(value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+_categorization_cache = CategorizationCache()
+
 
 class NotesProcessor:
     """Process quick notes with AI-powered categorization and extraction"""
-    
-    # Norwegian and English time patterns
-    TIME_PATTERNS = {
-        'no': {
-            'time': r'(\d{1,2}):(\d{2})',
-            'relative_time': r'(om|i|etter)\s+(\d+)\s+(minutt|timer|time|dag|dager|uke|uker)',
-            'specific_day': r'(i\s+dag|i\s+morgen|neste\s+uke|på\s+(mandag|tirsdag|onsdag|torsdag|fredag|lørdag|søndag))',
-        },
-        'en': {
-            'time': r'(\d{1,2}):(\d{2})',
-            'relative_time': r'(in|after)\s+(\d+)\s+(minute|minutes|hour|hours|day|days|week|weeks)',
-            'specific_day': r'(today|tomorrow|next\s+week|on\s+(monday|tuesday|wednesday|thursday|friday|saturday|sunday))',
-        }
-    }
-    
-    def __init__(self):
-        self.client = OpenAI()
-    
+
+    TIME_PATTERNS = TIME_PATTERNS
+
+    def __init__(self, client=None, lead_index: Optional[LeadNameIndex] = None,
+                 cache: Optional[CategorizationCache] = None, batch_size: int = 20):
+        """
+        client: OpenAI-compatible client (created on first use by default)
+        lead_index: index to match names against (default: shared per database file)
+        cache: categorization cache (default: shared by all processors)
+        batch_size: notes categorized per LLM request in process_notes_batch
+        """
+        self._client = client
+        self.lead_index = lead_index
+        self.cache = cache if cache is not None else _categorization_cache
+        self.batch_size = batch_size
+
+    @property
+    def client(self):
+        if self._client is None:
+            self._client = OpenAI()
+        return self._client
+
     def detect_language(self, text: str) -> str:
         """Detect if text is Norwegian or English"""
-        norwegian_words = ['å', 'høre', 'skulle', 'ville', 'kommer', 'på', 'til']
-        english_words = ['to', 'hear', 'should', 'would', 'comes', 'on', 'at']
-        
-        no_count = sum(1 for word in norwegian_words if word in text.lower())
-        en_count = sum(1 for word in english_words if word in text.lower())
-        
+        lowered = text.lower()
+        no_count = sum(1 for word in NORWEGIAN_WORDS if word in lowered)
+        en_count = sum(1 for word in ENGLISH_WORDS if word in lowered)
+
         return 'no' if no_count > en_count else 'en'
-    
+
     def extract_time_info(self, text: str, language: str) -> Dict:
         """Extract time and date information from text"""
         result = {
@@ -50,32 +394,32 @@ class NotesProcessor:
             'datetime': None,
             'relative': None
         }
-        
-        patterns = self.TIME_PATTERNS.get(language, self.TIME_PATTERNS['en'])
-        
+
+        patterns = TIME_REGEXES.get(language, TIME_REGEXES['en'])
+
         # Extract specific time (HH:MM)
-        time_match = re.search(patterns['time'], text)
+        time_match = patterns['time'].search(text)
         if time_match:
             hour, minute = int(time_match.group(1)), int(time_match.group(2))
             result['time'] = f"{hour:02d}:{minute:02d}"
-            
+
             # Assume today if no date specified
             now = datetime.now()
             target_datetime = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            
+
             # If time has passed today, assume tomorrow
             if target_datetime < now:
                 target_datetime += timedelta(days=1)
-            
+
             result['datetime'] = target_datetime.isoformat()
             result['date'] = target_datetime.date().isoformat()
-        
+
         # Extract relative time
-        relative_match = re.search(patterns['relative_time'], text, re.IGNORECASE)
+        relative_match = patterns['relative_time'].search(text)
         if relative_match:
             amount = int(relative_match.group(2))
             unit = relative_match.group(3).lower()
-            
+
             now = datetime.now()
             if 'minutt' in unit or 'minute' in unit:
                 target_datetime = now + timedelta(minutes=amount)
@@ -87,127 +431,196 @@ class NotesProcessor:
                 target_datetime = now + timedelta(weeks=amount)
             else:
                 target_datetime = now
-            
+
             result['datetime'] = target_datetime.isoformat()
             result['date'] = target_datetime.date().isoformat()
             result['relative'] = f"{amount} {unit}"
-        
+
         return result
-    
+
     def extract_person_names(self, text: str) -> List[str]:
         """Extract potential person names from text (capitalized words)"""
         # Simple heuristic: look for capitalized words that might be names
-        words = text.split()
         potential_names = []
-        
-        for i, word in enumerate(words):
+
+        for word in text.split():
             # Remove punctuation
-            clean_word = re.sub(r'[^\w\s]', '', word)
+            clean_word = PUNCTUATION_REGEX.sub('', word)
             if clean_word and clean_word[0].isupper() and len(clean_word) > 2:
                 # Check if it's not a common word
-                common_words = ['Skrive', 'Write', 'Send', 'Call', 'Email', 'Message']
-                if clean_word not in common_words:
+                if clean_word not in COMMON_WORDS:
                     potential_names.append(clean_word)
-        
+
         return potential_names
-    
+
+    def lead_index_for(self, conn) -> LeadNameIndex:
+        """The lead index for this connection's database, loaded and up to date."""
+        if self.lead_index is not None:
+            index = self.lead_index
+        else:
+            path = _database_file(conn)
+            if path:
+                with _lead_indexes_lock:
+                    index = _lead_indexes.setdefault(path, LeadNameIndex())
+            else:
+                index = _memory_index(conn)
+        index.ensure_fresh(conn)
+        return index
+
     def match_leads(self, names: List[str], conn) -> List[Dict]:
         """Match extracted names against leads in database"""
         if not names:
             return []
-        
-        cursor = conn.cursor()
+
+        index = self.lead_index_for(conn)
+        while True:
+            found = [(name, lead['id'], match_type) for name in names for lead, match_type in index.match(name)]
+            leads = self._fetch_leads(conn, {lead_id for _, lead_id, _ in found})
+            # Leads deleted or renamed since the index last loaded are fixed and matched again
+            stale = [lead_id for _, lead_id, _ in found
+                     if lead_id not in leads or leads[lead_id].get('name') != index.name_of(lead_id)]
+            if not stale:
+                break
+            for lead_id in stale:
+                if lead_id in leads:
+                    index.upsert(leads[lead_id])
+                else:
+                    index.remove(lead_id)
+
         matches = []
-        
-        for name in names:
-            # Search for leads with similar names
-            cursor.execute("""
-                SELECT id, name, email, phone, stage, pipeline
-                FROM leads
-                WHERE name LIKE ? OR name LIKE ?
-                ORDER BY 
-                    CASE 
-                        WHEN name LIKE ? THEN 1
-                        WHEN name LIKE ? THEN 2
-                        ELSE 3
-                    END
-                LIMIT 5
-            """, (f"{name}%", f"% {name}%", f"{name}%", f"% {name}%"))
-            
-            results = cursor.fetchall()
-            for row in results:
-                matches.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'email': row[2],
-                    'phone': row[3],
-                    'stage': row[4],
-                    'pipeline': row[5],
-                    'matched_on': name
-                })
-        
+        for name, lead_id, match_type in found:
+            lead = leads[lead_id]
+            matches.append({
+                'id': lead_id,
+                'name': lead.get('name'),
+                'email': lead.get('email'),
+                'phone': lead.get('phone'),
+                'stage': lead.get('stage'),
+                'pipeline': lead.get('pipeline'),
+                'matched_on': name,
+                'match_type': match_type
+            })
+
         return matches
-    
+
+    @staticmethod
+    def _fetch_leads(conn, lead_ids) -> Dict[int, Dict]:
+        """Current rows of the given leads, by id."""
+        lead_ids = list(lead_ids)
+        leads = {}
+        for start in range(0, len(lead_ids), LEAD_FETCH_CHUNK):
+            chunk = lead_ids[start:start + LEAD_FETCH_CHUNK]
+            cursor = conn.execute(
+                f"SELECT * FROM leads WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            columns = [description[0] for description in cursor.description]
+            for row in cursor:
+                lead = dict(zip(columns, row))
+                leads[lead['id']] = lead
+        return leads
+
+    @staticmethod
+    def _default_analysis(text: str) -> Dict:
+        return {
+            "note_type": "general",
+            "priority": "normal",
+            "action_required": False,
+            "summary": text[:100],
+            "confidence": 0.5
+        }
+
     def categorize_note_with_ai(self, text: str, language: str) -> Dict:
         """Use AI to categorize and extract structured information from note"""
-        
-        system_prompt = """You are an AI assistant helping to categorize and extract information from quick notes in a CRM system.
-        
-Analyze the note and extract:
-1. note_type: "reminder", "follow_up", "meeting", "general", "task"
-2. priority: "low", "normal", "high", "urgent"
-3. action_required: true/false
-4. summary: A brief 1-sentence summary
-5. suggested_lead_name: If a person's name is mentioned
-6. confidence: 0.0-1.0 score of how confident you are
-
-Respond in JSON format only."""
+        key = note_hash(text, language)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
 
         try:
             response = self.client.chat.completions.create(
-                model="gpt-4.1-mini",
+                model=CATEGORIZATION_MODEL,
                 messages=[
-                    {"role": "system", "content": system_prompt},
+                    {"role": "system", "content": CATEGORIZATION_PROMPT},
                     {"role": "user", "content": f"Language: {language}\nNote: {text}"}
                 ],
                 temperature=0.3,
                 max_tokens=300
             )
-            
+
             result = json.loads(response.choices[0].message.content)
+            self.cache.set(key, result)
             return result
         except Exception as e:
             print(f"AI categorization error: {e}")
-            return {
-                "note_type": "general",
-                "priority": "normal",
-                "action_required": False,
-                "summary": text[:100],
-                "confidence": 0.5
-            }
-    
-    def process_note(self, text: str, conn) -> Dict:
-        """Main processing function for a quick note"""
-        
-        # Detect language
-        language = self.detect_language(text)
-        
-        # Extract time information
-        time_info = self.extract_time_info(text, language)
-        
-        # Extract person names
-        names = self.extract_person_names(text)
-        
-        # Match leads
-        lead_matches = self.match_leads(names, conn)
-        
-        # AI categorization
-        ai_analysis = self.categorize_note_with_ai(text, language)
-        
+            return self._default_analysis(text)
+
+    def categorize_notes_batch(self, notes: Sequence[Tuple[str, str]]) -> List[Dict]:
+        """
+        Categorize (text, language) pairs with one LLM request per `batch_size`
+        uncached notes. Identical notes are only sent once, and notes missing
+        from a batch response are categorized on their own.
+        """
+        results: List[Optional[Dict]] = [None] * len(notes)
+        pending: Dict[str, List[int]] = {}
+        for i, (text, language) in enumerate(notes):
+            key = note_hash(text, language)
+            cached = self.cache.get(key)
+            if cached is not None:
+                results[i] = cached
+            else:
+                pending.setdefault(key, []).append(i)
+
+        keys = list(pending)
+        for start in range(0, len(keys), self.batch_size):
+            batch = keys[start:start + self.batch_size]
+            analyses = self._categorize_batch([notes[pending[key][0]] for key in batch])
+            for key, analysis in zip(batch, analyses):
+                if analysis is None:
+                    text, language = notes[pending[key][0]]
+                    analysis = self.categorize_note_with_ai(text, language)
+                else:
+                    self.cache.set(key, analysis)
+                for i in pending[key]:
+                    results[i] = dict(analysis)
+        return results
+
+    def _categorize_batch(self, notes: List[Tuple[str, str]]) -> List[Optional[Dict]]:
+        if len(notes) == 1:
+            return [None]
+        numbered = "\n\n".join(
+            f"Note {i}:\nLanguage: {language}\nNote: {text}" for i, (text, language) in enumerate(notes, 1)
+        )
+        try:
+            response = self.client.chat.completions.create(
+                model=CATEGORIZATION_MODEL,
+                messages=[
+                    {"role": "system", "content": BATCH_CATEGORIZATION_PROMPT},
+                    {"role": "user", "content": numbered}
+                ],
+                temperature=0.3,
+                max_tokens=150 * len(notes) + 100,
+                response_format={"type": "json_object"}
+            )
+            entries = json.loads(response.choices[0].message.content).get("results", [])
+        except Exception as e:
+            print(f"AI batch categorization error: {e}")
+            return [None] * len(notes)
+
+        analyses: List[Optional[Dict]] = [None] * len(notes)
+        for entry in entries:
+            if not isinstance(entry, dict):
+                continue
+            index = entry.pop("index", None)
+            if isinstance(index, int) and 1 <= index <= len(notes):
+                analyses[index - 1] = entry
+        return analyses
+
+    def _assemble(self, text: str, language: str, time_info: Dict, names: List[str],
+                  lead_matches: List[Dict], ai_analysis: Dict) -> Dict:
         # Determine if disambiguation is needed
         requires_disambiguation = len(lead_matches) > 1
-        
-        result = {
+
+        return {
             'raw_content': text,
             'language': language,
             'time_info': time_info,
@@ -219,5 +632,39 @@ Respond in JSON format only."""
             'priority': ai_analysis.get('priority', 'normal'),
             'confidence': ai_analysis.get('confidence', 0.5)
         }
-        
-        return result
+
+    def process_note(self, text: str, conn) -> Dict:
+        """Main processing function for a quick note"""
+
+        # Detect language
+        language = self.detect_language(text)
+
+        # Extract time information
+        time_info = self.extract_time_info(text, language)
+
+        # Extract person names
+        names = self.extract_person_names(text)
+
+        # Match leads
+        lead_matches = self.match_leads(names, conn)
+
+        # AI categorization
+        ai_analysis = self.categorize_note_with_ai(text, language)
+
+        return self._assemble(text, language, time_info, names, lead_matches, ai_analysis)
+
+    def process_notes_batch(self, texts: Iterable[str], conn) -> List[Dict]:
+        """Process many notes, matching leads from the index and categorizing in batched LLM requests"""
+        texts = list(texts)
+        extracted = []
+        for text in texts:
+            language = self.detect_language(text)
+            names = self.extract_person_names(text)
+            extracted.append((text, language, self.extract_time_info(text, language), names,
+                              self.match_leads(names, conn)))
+
+        analyses = self.categorize_notes_batch([(text, language) for text, language, *_ in extracted])
+        return [
+            self._assemble(text, language, time_info, names, lead_matches, analysis)
+            for (text, language, time_info, names, lead_matches), analysis in zip(extracted, analyses)
+        ]
@@ -6,14 +6,15 @@ Continuously monitors system performance, security, and health.
 import asyncio
 import json
 import logging
-import psutil
 import subprocess
+from collections import deque
 from typing import Dict, List, Any, Optional
 from datetime import datetime, timedelta
 from pathlib import Path
 import sqlite3
 import redis
 from .error_handler import with_retry, with_error_handling, CircuitBreaker, log_error_to_db, default_fallback_value
+from .metrics_sampler import PSUtilSampler
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -24,13 +25,20 @@ class SystemMonitor:
     performance metrics, security status, and system health.
     """
     
-    def __init__(self, db_path: str = "godmode-state.db", redis_host: str = "localhost"):
+    def __init__(self, db_path: str = "godmode-state.db", redis_host: str = "localhost", sample_interval: float = 1.0):
         """Initialize the system monitor."""
         self.db_path = Path(__file__).parent.parent / db_path
         self.redis = redis.Redis(host=redis_host, port=6379, db=0, decode_responses=True)
         self.running = False
         self.monitoring_interval = 60  # 1 minute
-        self.metrics_history: List[Dict[str, Any]] = []
+        self.metrics_history = deque(maxlen=1000)
+        
+        # Host metrics are sampled on a background thread into ring buffers
+        self.sampler = PSUtilSampler(interval=sample_interval)
+        
+        # Snapshots are appended to one capped Redis stream instead of a key each
+        self.metrics_stream = "metrics:stream"
+        self.metrics_stream_maxlen = 86400 * 7 // self.monitoring_interval  # ~7 days
         
         # Performance thresholds
         self.thresholds = {
@@ -53,6 +61,7 @@ class SystemMonitor:
     async def start(self):
         """Start the system monitoring."""
         self.running = True
+        self.sampler.start()
         logger.info("System Monitor started")
         
         while self.running:
@@ -67,6 +76,7 @@ class SystemMonitor:
     async def stop(self):
         """Stop the system monitoring."""
         self.running = False
+        self.sampler.stop()
         logger.info("System Monitor stopped")
         
     @with_error_handling(fallback=default_fallback_value)
@@ -105,11 +115,8 @@ class SystemMonitor:
             'security': {}
         }
         
-        # System metrics
-        metrics['system']['cpu_percent'] = psutil.cpu_percent(interval=1)
-        metrics['system']['memory_percent'] = psutil.virtual_memory().percent
-        metrics['system']['disk_percent'] = psutil.disk_usage('/').percent
-        metrics['system']['network_connections'] = len(psutil.net_connections())
+        # System metrics (latest non-blocking sample from the background sampler)
+        metrics['system'].update(self.sampler.latest())
         
         # Application metrics
         conn = self.get_db_connection()
@@ -142,16 +149,17 @@ class SystemMonitor:
         
     @with_error_handling(fallback=default_fallback_value)
     async def store_metrics(self, metrics: Dict[str, Any]):
-        """Store metrics in Redis for historical analysis."""
+        """Store metrics in a capped Redis stream for historical analysis."""
         try:
-            key = f"metrics:{datetime.now().timestamp()}"
-            self.redis.set(key, json.dumps(metrics))
-            self.redis.expire(key, 86400 * 7)  # Keep for 7 days
-            
-            # Also keep in memory for quick access
+            # Keep in memory for quick access
             self.metrics_history.append(metrics)
-            if len(self.metrics_history) > 1000:
-                self.metrics_history.pop(0)
+            
+            self.redis.xadd(
+                self.metrics_stream,
+                {'data': json.dumps(metrics)},
+                maxlen=self.metrics_stream_maxlen,
+                approximate=True
+            )
         except Exception as e:
             logger.error(f"Error storing metrics: {str(e)}")
             
@@ -297,49 +305,27 @@ class SystemMonitor:
         Returns:
             Dictionary with trend analysis
         """
-        cutoff_time = datetime.now() - timedelta(hours=hours)
-        
-        # Filter metrics within time window
-        recent_metrics = [
-            m for m in self.metrics_history
-            if datetime.fromisoformat(m['timestamp']) >= cutoff_time
-        ]
+        trends = self.sampler.trends(hours * 3600)
         
-        if not recent_metrics:
+        if not trends:
             return {'message': f'No metrics in the last {hours} hours'}
         
-        # Calculate averages
-        avg_cpu = sum(m['system'].get('cpu_percent', 0) for m in recent_metrics) / len(recent_metrics)
-        avg_memory = sum(m['system'].get('memory_percent', 0) for m in recent_metrics) / len(recent_metrics)
-        avg_disk = sum(m['system'].get('disk_percent', 0) for m in recent_metrics) / len(recent_metrics)
-        
-        # Calculate trends (comparing first half vs second half)
-        mid_point = len(recent_metrics) // 2
-        first_half = recent_metrics[:mid_point]
-        second_half = recent_metrics[mid_point:]
-        
-        if first_half and second_half:
-            cpu_trend = (sum(m['system'].get('cpu_percent', 0) for m in second_half) / len(second_half)) - \
-                       (sum(m['system'].get('cpu_percent', 0) for m in first_half) / len(first_half))
-            
-            memory_trend = (sum(m['system'].get('memory_percent', 0) for m in second_half) / len(second_half)) - \
-                          (sum(m['system'].get('memory_percent', 0) for m in first_half) / len(first_half))
-        else:
-            cpu_trend = 0
-            memory_trend = 0
+        averages = trends['averages']
+        cpu_trend = trends['deltas']['cpu_percent']
+        memory_trend = trends['deltas']['memory_percent']
         
         return {
             'period_hours': hours,
             'averages': {
-                'cpu_percent': round(avg_cpu, 2),
-                'memory_percent': round(avg_memory, 2),
-                'disk_percent': round(avg_disk, 2)
+                'cpu_percent': round(averages['cpu_percent'], 2),
+                'memory_percent': round(averages['memory_percent'], 2),
+                'disk_percent': round(averages['disk_percent'], 2)
             },
             'trends': {
                 'cpu': 'increasing' if cpu_trend > 5 else 'decreasing' if cpu_trend < -5 else 'stable',
                 'memory': 'increasing' if memory_trend > 5 else 'decreasing' if memory_trend < -5 else 'stable'
             },
-            'data_points': len(recent_metrics),
+            'data_points': trends['data_points'],
             'timestamp': datetime.now().isoformat()
         }
 
@@ -7,17 +7,23 @@
 """
 
 from flask import Flask, render_template, jsonify, request
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import json
 import time
 import threading
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
+import os
 import sqlite3
+import sys
 from typing import Dict, List, Any
 import random
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flowstate_ai.dashboard_feed import ChangeFeed, FileChangeSource, RedisPubSubSource
+
 # Setup logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -26,6 +32,11 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = 'boss-dashboard-secret'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
+METRICS_ROOM = "metrics"
+METRICS_CHANNEL = "flowstate:business-metrics"
+
+feed = ChangeFeed(socketio.emit, patch_event='metrics_patch', snapshot_event='metrics_snapshot')
+
 class BossDashboard:
     """
     Executive Business Impact Dashboard
@@ -58,8 +69,15 @@ class BossDashboard:
             "efficiency_gains": 0
         }
         
+        # Change detection state
+        self._metrics_mtime = None
+        self._wake = threading.Event()
+        self._sources = []
+        self.demo_mode = False
+        
         # Initialize dashboard
         self.initialize_dashboard()
+        self.start_change_sources()
         self.start_monitoring_thread()
     
     def initialize_dashboard(self):
@@ -78,6 +96,33 @@ class BossDashboard:
         
         logger.info("💼 Boss Dashboard initialized")
     
+    def start_change_sources(self):
+        """Wake the monitor when the metrics file changes or metrics are published on Redis"""
+        file_source = FileChangeSource(
+            [self.project_root / "business-dashboard" / "metrics"],
+            lambda path: self._wake.set()
+        )
+        file_source.start()
+        self._sources.append(file_source)
+        
+        redis_url = os.environ.get("REDIS_URL")
+        if redis_url:
+            try:
+                import redis
+                redis_source = RedisPubSubSource(
+                    redis.Redis.from_url(redis_url), [METRICS_CHANNEL], self.apply_metrics_message
+                )
+                redis_source.start()
+                self._sources.append(redis_source)
+            except Exception as e:
+                logger.warning(f"Redis metrics feed unavailable: {e}")
+    
+    def apply_metrics_message(self, channel: str, data: Any):
+        """Apply business metrics published on Redis and wake the monitor"""
+        if isinstance(data, dict):
+            self.apply_metrics_data(data)
+        self._wake.set()
+    
     def start_monitoring_thread(self):
         """Start background monitoring for business metrics"""
         def monitor_loop():
@@ -86,7 +131,9 @@ class BossDashboard:
                     self.update_business_metrics()
                     self.calculate_roi()
                     self.broadcast_metrics()
-                    time.sleep(5)  # Update every 5 seconds for real-time feel
+                    # Sleep until metrics change; only the demo simulation needs a tick
+                    self._wake.wait(timeout=5 if self.demo_mode else 60)
+                    self._wake.clear()
                 except Exception as e:
                     logger.error(f"Error in boss monitoring loop: {e}")
                     time.sleep(10)
@@ -102,28 +149,38 @@ class BossDashboard:
             metrics_file = self.project_root / "business-dashboard" / "metrics" / "latest_metrics.json"
             
             if metrics_file.exists():
-                with open(metrics_file, 'r') as f:
-                    data = json.load(f)
-                
-                # Update current metrics
-                business_metrics = data.get("business_metrics", {})
-                self.current_metrics.update(business_metrics)
+                self.demo_mode = False
                 
-                # Update ROI from democracy system
-                roi_data = data.get("roi_calculation", {})
-                self.current_metrics["roi_percentage"] = roi_data.get("roi_percentage", 0)
-                
-                # Update AI decisions count
-                democracy_stats = data.get("ai_democracy_stats", {})
-                self.current_metrics["ai_decisions_made"] = democracy_stats.get("total_decisions", 0)
+                # Only re-read the file when it was rewritten
+                mtime = metrics_file.stat().st_mtime
+                if mtime != self._metrics_mtime:
+                    with open(metrics_file, 'r') as f:
+                        data = json.load(f)
+                    self._metrics_mtime = mtime
+                    self.apply_metrics_data(data)
             
             else:
                 # Simulate business growth for demo
+                self.demo_mode = True
                 self.simulate_business_growth()
             
         except Exception as e:
             logger.error(f"Error updating business metrics: {e}")
     
+    def apply_metrics_data(self, data: Dict):
+        """Update current metrics from an AI democracy metrics document"""
+        # Update current metrics
+        business_metrics = data.get("business_metrics", {})
+        self.current_metrics.update(business_metrics)
+        
+        # Update ROI from democracy system
+        roi_data = data.get("roi_calculation", {})
+        self.current_metrics["roi_percentage"] = roi_data.get("roi_percentage", 0)
+        
+        # Update AI decisions count
+        democracy_stats = data.get("ai_democracy_stats", {})
+        self.current_metrics["ai_decisions_made"] = democracy_stats.get("total_decisions", 0)
+    
     def simulate_business_growth(self):
         """Simulate realistic business growth for demonstration"""
         try:
@@ -193,17 +250,18 @@ class BossDashboard:
         except Exception as e:
             logger.error(f"Error calculating ROI: {e}")
     
+    def build_metrics_model(self):
+        """Build the model pushed to clients (no per-tick volatile fields)"""
+        return {
+            "metrics": self.current_metrics,
+            "revenue_streams": self.revenue_streams,
+            "summary": self.generate_executive_summary()
+        }
+    
     def broadcast_metrics(self):
-        """Broadcast metrics to connected clients"""
+        """Push metric changes to subscribed clients; nothing is sent when nothing changed"""
         try:
-            dashboard_data = {
-                "metrics": self.current_metrics,
-                "revenue_streams": self.revenue_streams,
-                "timestamp": datetime.now().isoformat(),
-                "summary": self.generate_executive_summary()
-            }
-            
-            socketio.emit('metrics_update', dashboard_data)
+            feed.publish(METRICS_ROOM, self.build_metrics_model())
             
         except Exception as e:
             logger.error(f"Error broadcasting metrics: {e}")
@@ -232,12 +290,9 @@ class BossDashboard:
     
     def get_dashboard_data(self):
         """Get current dashboard data"""
-        return {
-            "metrics": self.current_metrics,
-            "revenue_streams": self.revenue_streams,
-            "timestamp": datetime.now().isoformat(),
-            "summary": self.generate_executive_summary()
-        }
+        data = self.build_metrics_model()
+        data["timestamp"] = datetime.now().isoformat()
+        return data
 
 # Initialize boss dashboard
 boss_dashboard = BossDashboard()
@@ -256,7 +311,25 @@ def get_metrics():
 def handle_connect():
     """Handle client connection"""
     logger.info("Boss connected to dashboard")
-    emit('metrics_update', boss_dashboard.get_dashboard_data())
+    join_room(METRICS_ROOM)
+    feed.send_snapshot(METRICS_ROOM, emit)
+
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    """Subscribe to a room and receive its snapshot"""
+    room = (data or {}).get('room', METRICS_ROOM)
+    join_room(room)
+    feed.send_snapshot(room, emit)
+
+@socketio.on('unsubscribe')
+def handle_unsubscribe(data):
+    """Stop receiving patches for a room"""
+    leave_room((data or {}).get('room', METRICS_ROOM))
+
+@socketio.on('resync')
+def handle_resync(data):
+    """Resend a room snapshot after a client detects a missed version"""
+    feed.send_snapshot((data or {}).get('room', METRICS_ROOM), emit)
 
 @socketio.on('disconnect')
 def handle_disconnect():
@@ -581,11 +654,41 @@ if __name__ == '__main__':
     
     <script>
         const socket = io();
+        let state = null;
+        let version = 0;
         
-        socket.on('metrics_update', function(data) {
-            updateDashboard(data);
+        socket.on('metrics_snapshot', function(message) {
+            state = message.data;
+            version = message.version;
+            updateDashboard(state);
         });
         
+        socket.on('metrics_patch', function(message) {
+            if (message.version !== version + 1 && message.version !== 1) {
+                socket.emit('resync', {room: 'metrics'});
+                return;
+            }
+            state = applyPatch(state, message.ops);
+            version = message.version;
+            updateDashboard(state);
+        });
+        
+        function applyPatch(doc, ops) {
+            ops.forEach(op => {
+                if (op.path === '') { doc = op.value; return; }
+                const tokens = op.path.split('/').slice(1).map(t => t.replace(/~1/g, '/').replace(/~0/g, '~'));
+                let target = doc;
+                tokens.slice(0, -1).forEach(t => { target = target[t]; });
+                const last = tokens[tokens.length - 1];
+                if (op.op === 'remove') {
+                    if (Array.isArray(target)) target.splice(Number(last), 1); else delete target[last];
+                } else {
+                    target[last] = op.value;
+                }
+            });
+            return doc;
+        }
+        
         function updateDashboard(data) {
             const metrics = data.metrics;
             const revenue = data.revenue_streams;
@@ -1,6 +1,8 @@
 import enum
 import json
-from typing import Dict, Any, Optional
+import struct
+import time
+from typing import Dict, Any, Iterable, List, Optional, Union
 
 class MessageType(enum.Enum):
     REQUEST = "REQUEST"
@@ -8,6 +10,33 @@ class MessageType(enum.Enum):
     EVENT = "EVENT"
     ERROR = "ERROR"
 
+# Binary wire format, version 1 (little endian):
+#   frame:   magic "AM" | version u8 | payload codec u8 | message count u32
+#   message: type u8 | flags u8 | timestamp ms u64 | sender, receiver,
+#            message_id, in_response_to lengths u16 x4 | payload length u32
+#            followed by the four UTF-8 ids and the payload (compact JSON)
+WIRE_MAGIC = b"AM"
+WIRE_VERSION = 1
+PAYLOAD_JSON = 0
+FRAME_HEADER = struct.Struct("<2sBBI")
+MESSAGE_HEADER = struct.Struct("<BBQHHHHI")
+HAS_MESSAGE_ID = 0x01
+HAS_IN_RESPONSE_TO = 0x02
+
+MESSAGE_TYPE_CODES = {
+    MessageType.REQUEST: 1,
+    MessageType.RESPONSE: 2,
+    MessageType.EVENT: 3,
+    MessageType.ERROR: 4,
+}
+MESSAGE_TYPES_BY_CODE = {code: msg_type for msg_type, code in MESSAGE_TYPE_CODES.items()}
+
+_compact_json = json.JSONEncoder(separators=(",", ":"), ensure_ascii=False).encode
+_decode_json = json.JSONDecoder().decode
+
+def now_millis() -> int:
+    return time.time_ns() // 1_000_000
+
 class AgentMessage:
     def __init__(self, 
                  sender_id: str, 
@@ -15,13 +44,36 @@ class AgentMessage:
                  msg_type: MessageType, 
                  content: Dict[str, Any], 
                  message_id: Optional[str] = None, 
-                 in_response_to: Optional[str] = None):
+                 in_response_to: Optional[str] = None,
+                 timestamp: Optional[int] = None):
         self.sender_id = sender_id
         self.receiver_id = receiver_id
         self.msg_type = msg_type
-        self.content = content
+        self._content = content
+        self._payload = None
         self.message_id = message_id
         self.in_response_to = in_response_to
+        self.timestamp = timestamp if timestamp is not None else now_millis()  # epoch milliseconds
+
+    @property
+    def content(self) -> Dict[str, Any]:
+        # Messages decoded from the wire parse their payload on first access.
+        # The caller may then edit the dict, so the received bytes are dropped.
+        if self._content is None and self._payload is not None:
+            self._content = _decode_json(str(self._payload, "utf-8"))
+            self._payload = None
+        return self._content
+
+    @content.setter
+    def content(self, value: Dict[str, Any]):
+        self._content = value
+        self._payload = None
+
+    def payload_bytes(self) -> Union[bytes, memoryview]:
+        """Encoded content; the received bytes are reused while the content was never read."""
+        if self._content is None and self._payload is not None:
+            return self._payload
+        return _compact_json(self._content).encode("utf-8")
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -30,7 +82,8 @@ class AgentMessage:
             "msg_type": self.msg_type.value,
             "content": self.content,
             "message_id": self.message_id,
-            "in_response_to": self.in_response_to
+            "in_response_to": self.in_response_to,
+            "timestamp": self.timestamp
         }
 
     def to_json(self) -> str:
@@ -45,7 +98,8 @@ class AgentMessage:
             msg_type=msg_type,
             content=data["content"],
             message_id=data.get("message_id"),
-            in_response_to=data.get("in_response_to")
+            in_response_to=data.get("in_response_to"),
+            timestamp=data.get("timestamp")
         )
 
     @staticmethod
@@ -53,6 +107,91 @@ class AgentMessage:
         data = json.loads(json_str)
         return AgentMessage.from_dict(data)
 
+    def to_bytes(self) -> bytes:
+        """Binary encoding of this message (a frame of one)."""
+        return encode_batch([self])
+
+    @staticmethod
+    def from_bytes(data: Union[bytes, bytearray, memoryview]) -> 'AgentMessage':
+        messages = decode_batch(data)
+        if len(messages) != 1:
+            raise ValueError(f"Expected one message, frame holds {len(messages)}")
+        return messages[0]
+
+    def __repr__(self) -> str:
+        return (f"AgentMessage({self.sender_id!r} -> {self.receiver_id!r}, {self.msg_type.value}, "
+                f"message_id={self.message_id!r})")
+
+def encode_batch(messages: Iterable[AgentMessage]) -> bytes:
+    """Pack many messages into one binary frame."""
+    parts = [b""]
+    pack = MESSAGE_HEADER.pack
+    count = 0
+    for message in messages:
+        sender = message.sender_id.encode("utf-8")
+        receiver = message.receiver_id.encode("utf-8")
+        message_id = message.message_id.encode("utf-8") if message.message_id is not None else b""
+        in_response_to = message.in_response_to.encode("utf-8") if message.in_response_to is not None else b""
+        payload = message.payload_bytes()
+        flags = (HAS_MESSAGE_ID if message.message_id is not None else 0) | \
+            (HAS_IN_RESPONSE_TO if message.in_response_to is not None else 0)
+        parts.append(pack(MESSAGE_TYPE_CODES[message.msg_type], flags, message.timestamp,
+                          len(sender), len(receiver), len(message_id), len(in_response_to), len(payload)))
+        parts += (sender, receiver, message_id, in_response_to, payload)
+        count += 1
+    parts[0] = FRAME_HEADER.pack(WIRE_MAGIC, WIRE_VERSION, PAYLOAD_JSON, count)
+    return b"".join(parts)
+
+def decode_batch(data: Union[bytes, bytearray, memoryview]) -> List[AgentMessage]:
+    """
+    Unpack a binary frame. Payloads are kept as views into the frame and only
+    parsed when a message's content is read, so a hop that just routes on the
+    header fields can re-encode them without touching the body.
+    """
+    raw = data if isinstance(data, bytes) else bytes(data)
+    view = memoryview(raw)
+    if len(raw) < FRAME_HEADER.size:
+        raise ValueError("Truncated frame header")
+    magic, version, codec, count = FRAME_HEADER.unpack_from(raw)
+    if magic != WIRE_MAGIC:
+        raise ValueError("Not an agent message frame")
+    if version != WIRE_VERSION:
+        raise ValueError(f"Unsupported wire format version {version}")
+    if codec != PAYLOAD_JSON:
+        raise ValueError(f"Unsupported payload codec {codec}")
+
+    messages = []
+    offset = FRAME_HEADER.size
+    unpack_from = MESSAGE_HEADER.unpack_from
+    header_size = MESSAGE_HEADER.size
+    new = AgentMessage.__new__
+    try:
+        for _ in range(count):
+            (type_code, flags, timestamp, sender_len, receiver_len,
+             message_id_len, in_response_to_len, payload_len) = unpack_from(raw, offset)
+            offset += header_size
+            end = offset + sender_len + receiver_len + message_id_len + in_response_to_len + payload_len
+            if end > len(raw):
+                raise ValueError("Truncated message")
+            message = new(AgentMessage)
+            message.msg_type = MESSAGE_TYPES_BY_CODE[type_code]
+            message.timestamp = timestamp
+            message.sender_id = raw[offset:offset + sender_len].decode("utf-8")
+            offset += sender_len
+            message.receiver_id = raw[offset:offset + receiver_len].decode("utf-8")
+            offset += receiver_len
+            message.message_id = raw[offset:offset + message_id_len].decode("utf-8") if flags & HAS_MESSAGE_ID else None
+            offset += message_id_len
+            message.in_response_to = (raw[offset:offset + in_response_to_len].decode("utf-8")
+                                      if flags & HAS_IN_RESPONSE_TO else None)
+            message._content = None
+            message._payload = view[end - payload_len:end]
+            messages.append(message)
+            offset = end
+    except (struct.error, KeyError) as e:
+        raise ValueError(f"Malformed agent message frame: {e}") from e
+    return messages
+
 # Standardized message structure example:
 # {
 #   "sender_id": "agent_123",
@@ -60,7 +199,8 @@ class AgentMessage:
 #   "msg_type": "REQUEST",
 #   "content": {"task": "fetch_data", "params": {"url": "http://example.com"}},
 #   "message_id": "msg_001",
-#   "in_response_to": null
+#   "in_response_to": null,
+#   "timestamp": 1735689600000
 # }
 
 # Protocol utility functions
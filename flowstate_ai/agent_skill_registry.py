@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional
+from typing import Dict, FrozenSet, Iterable, List, Optional
 from threading import Lock
 
 
@@ -34,57 +34,164 @@ class Agent:
         return f"Agent(agent_id={self.agent_id}, skills={list(self.skills.keys())}, available={self.available})"
 
 
+class _RegistrySnapshot:
+    """Immutable view of the registry: agents plus skill -> agent id indexes."""
+
+    __slots__ = ('agents', 'holders', 'available')
+
+    def __init__(self, agents: Dict[str, Agent], holders: Dict[str, FrozenSet[str]],
+                 available: Dict[str, FrozenSet[str]]):
+        self.agents = agents
+        self.holders = holders  # skill -> ids of every agent with it
+        self.available = available  # skill -> ids of available agents with it
+
+
 class AgentSkillRegistry:
+    """
+    Registry of agents and their skills with an inverted index from skill to
+    agent ids. Writers are serialized and publish a new snapshot, copying only
+    the index entries they change; readers use the current snapshot without
+    locking, so lookups never wait for writers and a multi-skill query sees
+    one consistent state. Change agents through the registry, not through
+    Agent methods, so the index stays in step.
+    """
+
     def __init__(self):
-        self._agents: Dict[str, Agent] = {}
         self._lock = Lock()
+        self._snapshot = _RegistrySnapshot({}, {}, {})
+
+    @property
+    def _agents(self) -> Dict[str, Agent]:
+        return self._snapshot.agents
+
+    def _publish(self, agents=None, holders=None, available=None):
+        current = self._snapshot
+        self._snapshot = _RegistrySnapshot(
+            agents if agents is not None else current.agents,
+            holders if holders is not None else current.holders,
+            available if available is not None else current.available
+        )
+
+    @staticmethod
+    def _with(index: Dict[str, FrozenSet[str]], skill_name: str, agent_id: str):
+        index[skill_name] = index.get(skill_name, frozenset()) | {agent_id}
+
+    @staticmethod
+    def _without(index: Dict[str, FrozenSet[str]], skill_name: str, agent_id: str):
+        remaining = index.get(skill_name, frozenset()) - {agent_id}
+        if remaining:
+            index[skill_name] = remaining
+        else:
+            index.pop(skill_name, None)
 
     def register_agent(self, agent_id: str) -> Agent:
         with self._lock:
-            if agent_id not in self._agents:
-                self._agents[agent_id] = Agent(agent_id)
-            return self._agents[agent_id]
+            agent = self._snapshot.agents.get(agent_id)
+            if agent is None:
+                agent = Agent(agent_id)
+                agents = dict(self._snapshot.agents)
+                agents[agent_id] = agent
+                self._publish(agents=agents)
+            return agent
 
     def unregister_agent(self, agent_id: str):
         with self._lock:
-            if agent_id in self._agents:
-                del self._agents[agent_id]
+            snapshot = self._snapshot
+            agent = snapshot.agents.get(agent_id)
+            if agent is None:
+                return
+            agents = dict(snapshot.agents)
+            del agents[agent_id]
+            holders = dict(snapshot.holders)
+            available = dict(snapshot.available)
+            for skill_name in agent.skills:
+                self._without(holders, skill_name, agent_id)
+                self._without(available, skill_name, agent_id)
+            self._publish(agents, holders, available)
+
+    def _get_registered(self, agent_id: str) -> Agent:
+        agent = self._snapshot.agents.get(agent_id)
+        if not agent:
+            raise ValueError(f"Agent '{agent_id}' not registered.")
+        return agent
 
     def add_skill_to_agent(self, agent_id: str, skill_name: str, description: Optional[str] = None):
         with self._lock:
-            agent = self._agents.get(agent_id)
-            if not agent:
-                raise ValueError(f"Agent '{agent_id}' not registered.")
+            agent = self._get_registered(agent_id)
             skill = Skill(skill_name, description)
             agent.add_skill(skill)
+            holders = dict(self._snapshot.holders)
+            self._with(holders, skill_name, agent_id)
+            available = None
+            if agent.available:
+                available = dict(self._snapshot.available)
+                self._with(available, skill_name, agent_id)
+            self._publish(holders=holders, available=available)
 
     def remove_skill_from_agent(self, agent_id: str, skill_name: str):
         with self._lock:
-            agent = self._agents.get(agent_id)
-            if not agent:
-                raise ValueError(f"Agent '{agent_id}' not registered.")
+            agent = self._get_registered(agent_id)
+            if not agent.has_skill(skill_name):
+                return
             agent.remove_skill(skill_name)
+            holders = dict(self._snapshot.holders)
+            available = dict(self._snapshot.available)
+            self._without(holders, skill_name, agent_id)
+            self._without(available, skill_name, agent_id)
+            self._publish(holders=holders, available=available)
 
     def set_agent_availability(self, agent_id: str, available: bool):
         with self._lock:
-            agent = self._agents.get(agent_id)
-            if not agent:
-                raise ValueError(f"Agent '{agent_id}' not registered.")
+            agent = self._get_registered(agent_id)
+            if agent.available == available:
+                return
             agent.set_availability(available)
+            index = dict(self._snapshot.available)
+            update = self._with if available else self._without
+            for skill_name in agent.skills:
+                update(index, skill_name, agent_id)
+            self._publish(available=index)
 
     def get_agent(self, agent_id: str) -> Optional[Agent]:
-        with self._lock:
-            return self._agents.get(agent_id)
+        return self._snapshot.agents.get(agent_id)
+
+    def find_agent_ids_with_skills(self, skill_names: Iterable[str], only_available: bool = True) -> FrozenSet[str]:
+        """Ids of agents holding every skill, intersecting the smallest sets first."""
+        snapshot = self._snapshot
+        index = snapshot.available if only_available else snapshot.holders
+        sets = []
+        for skill_name in set(skill_names):
+            agent_ids = index.get(skill_name)
+            if not agent_ids:
+                return frozenset()
+            sets.append(agent_ids)
+        if not sets:
+            return frozenset()
+        sets.sort(key=len)
+        result = sets[0]
+        for agent_ids in sets[1:]:
+            result = result & agent_ids
+            if not result:
+                break
+        return result
+
+    def find_agents_with_skills(self, skill_names: Iterable[str], only_available: bool = True) -> List[Agent]:
+        """Agents holding every one of `skill_names`, in no particular order."""
+        snapshot = self._snapshot
+        index = snapshot.available if only_available else snapshot.holders
+        skill_names = list(skill_names)
+        if len(skill_names) == 1:
+            agent_ids = index.get(skill_names[0], ())
+        else:
+            agent_ids = self.find_agent_ids_with_skills(skill_names, only_available)
+        agents = snapshot.agents
+        return [agents[agent_id] for agent_id in agent_ids]
 
     def find_agents_with_skill(self, skill_name: str, only_available: bool = True) -> List[Agent]:
-        with self._lock:
-            agents = [agent for agent in self._agents.values()
-                      if agent.has_skill(skill_name) and (agent.available or not only_available)]
-            return agents
+        return self.find_agents_with_skills([skill_name], only_available)
 
     def list_all_agents(self) -> List[Agent]:
-        with self._lock:
-            return list(self._agents.values())
+        return list(self._snapshot.agents.values())
 
 
 # Example usage:
@@ -0,0 +1,347 @@
+"""
+Push-based change feed for the Flowstate-AI dashboards.
+
+Dashboards publish their current model to a ChangeFeed, which diffs it
+against the last published version and emits only JSON-patch style deltas
+to the Socket.IO room subscribed to that model. Nothing is emitted when
+nothing changed, so bandwidth scales with the change rate rather than
+client count x tick rate.
+
+Change sources wake the dashboards instead of fixed-interval polling:
+FileChangeSource uses watchdog (inotify on Linux) when installed and falls
+back to cheap mtime checks; RedisPubSubSource listens on pub/sub channels.
+"""
+
+import json
+import logging
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - optional dependency
+    FileSystemEventHandler = object
+    Observer = None
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(token: str) -> str:
+    return str(token).replace("~", "~0").replace("/", "~1")
+
+
+def _unescape(token: str) -> str:
+    return token.replace("~1", "/").replace("~0", "~")
+
+
+def json_diff(old: Any, new: Any, path: str = "") -> List[Dict[str, Any]]:
+    """
+    Compute JSON-patch (RFC 6902 subset) operations turning `old` into `new`.
+
+    Dicts are diffed key by key and equal-length lists element by element;
+    anything else that differs is replaced wholesale.
+
+    Args:
+        old: Previous JSON-compatible value
+        new: Current JSON-compatible value
+        path: JSON pointer of the values being compared
+
+    Returns:
+        List of add/remove/replace operations (empty when equal)
+    """
+    if old == new:
+        return []
+
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({"op": "remove", "path": f"{path}/{_escape(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape(key)}"
+            if key not in old:
+                ops.append({"op": "add", "path": child, "value": value})
+            else:
+                ops.extend(json_diff(old[key], value, child))
+        return ops
+
+    if isinstance(old, list) and isinstance(new, list) and len(old) == len(new):
+        ops = []
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            ops.extend(json_diff(old_item, new_item, f"{path}/{index}"))
+        return ops
+
+    return [{"op": "replace", "path": path, "value": new}]
+
+
+def apply_patch(document: Any, ops: Iterable[Dict[str, Any]]) -> Any:
+    """
+    Apply operations produced by json_diff to a document.
+
+    Args:
+        document: JSON-compatible value to patch in place where possible
+        ops: Patch operations
+
+    Returns:
+        The patched document
+    """
+    for op in ops:
+        if op["path"] == "":
+            document = op["value"]
+            continue
+
+        tokens = [_unescape(t) for t in op["path"].split("/")[1:]]
+        target = document
+        for token in tokens[:-1]:
+            target = target[int(token)] if isinstance(target, list) else target[token]
+
+        last = tokens[-1]
+        if isinstance(target, list):
+            last = int(last)
+        if op["op"] == "remove":
+            del target[last]
+        else:
+            target[last] = op["value"]
+    return document
+
+
+class ChangeFeed:
+    """
+    Versioned per-room dashboard models with delta-only emits.
+
+    Each room holds the last published snapshot of one model. Publishing a
+    new model emits a patch event to that room only if something changed;
+    clients that join late or detect a version gap ask for a full snapshot.
+    """
+
+    def __init__(
+        self,
+        emit: Callable[..., Any],
+        patch_event: str = "patch",
+        snapshot_event: str = "snapshot"
+    ):
+        """
+        Initialize the change feed.
+
+        Args:
+            emit: Socket.IO style emit function, called as emit(event, data, to=room)
+            patch_event: Event name for deltas
+            snapshot_event: Event name for full snapshots
+        """
+        self._emit = emit
+        self.patch_event = patch_event
+        self.snapshot_event = snapshot_event
+        self._rooms: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.stats = {"publishes": 0, "emits": 0, "unchanged": 0, "ops": 0}
+
+    @staticmethod
+    def _normalize(model: Any) -> Any:
+        """Deep-copy a model into plain JSON types (datetimes become strings)."""
+        return json.loads(json.dumps(model, default=str))
+
+    def publish(self, room: str, model: Any) -> List[Dict[str, Any]]:
+        """
+        Publish the current model for a room, emitting a delta if it changed.
+
+        Args:
+            room: Socket.IO room the model belongs to
+            model: Current JSON-compatible model
+
+        Returns:
+            The emitted patch operations (empty if nothing changed)
+        """
+        snapshot = self._normalize(model)
+        with self._lock:
+            self.stats["publishes"] += 1
+            state = self._rooms.get(room)
+            if state is None:
+                self._rooms[room] = {"version": 1, "data": snapshot}
+                ops = [{"op": "replace", "path": "", "value": snapshot}]
+                version = 1
+            else:
+                ops = json_diff(state["data"], snapshot)
+                if not ops:
+                    self.stats["unchanged"] += 1
+                    return []
+                state["version"] += 1
+                state["data"] = snapshot
+                version = state["version"]
+            self.stats["emits"] += 1
+            self.stats["ops"] += len(ops)
+
+        self._emit(self.patch_event, {"room": room, "version": version, "ops": ops}, to=room)
+        return ops
+
+    def snapshot(self, room: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the full current model of a room.
+
+        Returns:
+            Dict with room, version and data, or None if nothing was published
+        """
+        with self._lock:
+            state = self._rooms.get(room)
+            if state is None:
+                return None
+            return {"room": room, "version": state["version"], "data": state["data"]}
+
+    def send_snapshot(self, room: str, emit: Callable[..., Any]):
+        """Send a room's snapshot through a caller-supplied emit (e.g. to one client)."""
+        snapshot = self.snapshot(room)
+        if snapshot is not None:
+            emit(self.snapshot_event, snapshot)
+
+
+class _WatchdogHandler(FileSystemEventHandler):
+    def __init__(self, source: "FileChangeSource"):
+        self.source = source
+
+    def on_any_event(self, event):
+        if not event.is_directory:
+            self.source._notify(Path(event.src_path))
+            dest = getattr(event, "dest_path", None)
+            if dest:
+                self.source._notify(Path(dest))
+
+
+class FileChangeSource:
+    """
+    Notifies a callback when files matching a pattern change in watched directories.
+
+    Uses watchdog observers (inotify on Linux) when available; otherwise
+    falls back to stat-only polling, which never re-reads unchanged files.
+    """
+
+    def __init__(
+        self,
+        directories: Iterable[Path],
+        callback: Callable[[Path], None],
+        pattern: str = "*.json",
+        poll_interval: float = 2.0
+    ):
+        """
+        Initialize the file change source.
+
+        Args:
+            directories: Directories to watch (non-recursive)
+            callback: Called with the path of each changed or removed file
+            pattern: Glob pattern of files of interest
+            poll_interval: Stat interval for the fallback poller
+        """
+        self.directories = [Path(d) for d in directories]
+        self.callback = callback
+        self.pattern = pattern
+        self.poll_interval = poll_interval
+        self._observer = None
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._mtimes: Dict[Path, float] = {}
+
+    def _notify(self, path: Path):
+        if path.match(self.pattern):
+            try:
+                self.callback(path)
+            except Exception as e:
+                logger.error(f"Error handling change to {path}: {e}")
+
+    def _scan(self) -> Dict[Path, float]:
+        mtimes = {}
+        for directory in self.directories:
+            if directory.exists():
+                for path in directory.glob(self.pattern):
+                    try:
+                        mtimes[path] = path.stat().st_mtime
+                    except OSError:
+                        continue
+        return mtimes
+
+    def _poll(self):
+        self._mtimes = self._scan()
+        while not self._stop_event.wait(self.poll_interval):
+            current = self._scan()
+            for path, mtime in current.items():
+                if self._mtimes.get(path) != mtime:
+                    self._notify(path)
+            for path in self._mtimes.keys() - current.keys():
+                self._notify(path)
+            self._mtimes = current
+
+    def start(self):
+        """Start watching."""
+        if Observer is not None:
+            self._observer = Observer()
+            handler = _WatchdogHandler(self)
+            for directory in self.directories:
+                directory.mkdir(parents=True, exist_ok=True)
+                self._observer.schedule(handler, str(directory), recursive=False)
+            self._observer.start()
+            logger.info(f"Watching {len(self.directories)} directories for changes")
+        else:
+            self._thread = threading.Thread(target=self._poll, name="file-change-poller", daemon=True)
+            self._thread.start()
+            logger.info("watchdog not installed; polling file mtimes for changes")
+
+    def stop(self):
+        """Stop watching."""
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5.0)
+            self._observer = None
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.poll_interval + 1)
+            self._thread = None
+
+
+class RedisPubSubSource:
+    """Notifies a callback for each message published on Redis channels."""
+
+    def __init__(self, redis_client, channels: Iterable[str], callback: Callable[[str, Any], None]):
+        """
+        Initialize the Redis pub/sub source.
+
+        Args:
+            redis_client: redis.Redis client
+            channels: Channels to subscribe to
+            callback: Called with (channel, decoded JSON payload or raw string)
+        """
+        self.redis = redis_client
+        self.channels = list(channels)
+        self.callback = callback
+        self._pubsub = None
+        self._thread = None
+
+    def _handle(self, message):
+        channel = message["channel"]
+        data = message["data"]
+        if isinstance(channel, bytes):
+            channel = channel.decode("utf-8")
+        if isinstance(data, bytes):
+            data = data.decode("utf-8")
+        try:
+            data = json.loads(data)
+        except (TypeError, ValueError):
+            pass
+        try:
+            self.callback(channel, data)
+        except Exception as e:
+            logger.error(f"Error handling message on {channel}: {e}")
+
+    def start(self):
+        """Subscribe and start the listener thread."""
+        self._pubsub = self.redis.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{channel: self._handle for channel in self.channels})
+        self._thread = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+        logger.info(f"Listening for dashboard changes on {', '.join(self.channels)}")
+
+    def stop(self):
+        """Stop the listener thread and unsubscribe."""
+        if self._thread is not None:
+            self._thread.stop()
+            self._thread = None
+        if self._pubsub is not None:
+            self._pubsub.close()
+            self._pubsub = None
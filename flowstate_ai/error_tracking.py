@@ -1,17 +1,155 @@
+import atexit
+import hashlib
+import linecache
 import logging
-import traceback
+import queue
 import sys
 import threading
+import time
 import datetime
 
+
+class ErrorRecord:
+    """
+    What a failing thread hands to the writer: the exception type and message
+    and its frames as (code object, line number) pairs, with any chained
+    causes. Formatting and source lookups are left to the writer thread.
+    Manual records also keep the (code object, line number) they were logged
+    from, since an exception that was never raised has no frames.
+    """
+
+    __slots__ = ('kind', 'chain', 'context', 'site', 'thread_id', 'created')
+
+    def __init__(self, kind, exc_type, exc_value, exc_traceback, context=None,
+                 thread_id=None, max_frames=100, max_chain=5, site=None):
+        self.kind = kind
+        self.context = context
+        self.site = site
+        self.thread_id = thread_id if thread_id is not None else threading.get_ident()
+        self.created = time.time()
+        # Innermost exception last, as traceback.format_exception prints it
+        chain = []
+        seen = set()
+        link = None
+        while exc_type is not None and len(chain) < max_chain:
+            chain.append((exc_type, _message(exc_value), _frames(exc_traceback, max_frames), link))
+            if exc_value is None:
+                break
+            seen.add(id(exc_value))
+            if exc_value.__cause__ is not None:
+                cause, link = exc_value.__cause__, 'cause'
+            elif exc_value.__context__ is not None and not exc_value.__suppress_context__:
+                cause, link = exc_value.__context__, 'context'
+            else:
+                break
+            if id(cause) in seen:
+                break
+            exc_type, exc_value, exc_traceback = type(cause), cause, cause.__traceback__
+        chain.reverse()
+        self.chain = chain
+
+    @property
+    def key(self):
+        """Normalized stack: exception types and frame positions, no messages."""
+        return (self.kind, self.context, self.site) + tuple((exc_type, frames) for exc_type, _, frames, _ in self.chain)
+
+    def fingerprint(self):
+        parts = [self.kind]
+        if self.kind == 'manual':
+            parts.append(self.context or '')
+            if self.site is not None:
+                code, lineno = self.site
+                parts.append(f"{code.co_filename}:{_qualname(code)}:{lineno}")
+        for exc_type, _, frames, _ in self.chain:
+            parts.append(f"{exc_type.__module__}.{exc_type.__qualname__}")
+            parts.extend(f"{code.co_filename}:{_qualname(code)}:{lineno}" for code, lineno in frames)
+        return hashlib.blake2b('|'.join(parts).encode(), digest_size=6).hexdigest()
+
+    def summary(self):
+        exc_type, message = self.chain[-1][:2]
+        return _exception_only(exc_type, message)
+
+    def format(self):
+        """Traceback text in the layout of traceback.format_exception, from the stored frames."""
+        lines = []
+        for exc_type, message, frames, link in self.chain:
+            if frames:
+                lines.append('Traceback (most recent call last):\n')
+                for code, lineno in frames:
+                    lines.append(f'  File "{code.co_filename}", line {lineno}, in {_qualname(code, short=True)}\n')
+                    source = linecache.getline(code.co_filename, lineno).strip()
+                    if source:
+                        lines.append(f'    {source}\n')
+            lines.append(_exception_only(exc_type, message) + '\n')
+            if link == 'cause':
+                lines.append('\nThe above exception was the direct cause of the following exception:\n\n')
+            elif link == 'context':
+                lines.append('\nDuring handling of the above exception, another exception occurred:\n\n')
+        return ''.join(lines)
+
+
+def _frames(tb, max_frames):
+    frames = []
+    while tb is not None:
+        frames.append((tb.tb_frame.f_code, tb.tb_lineno))
+        tb = tb.tb_next
+    return tuple(frames[-max_frames:])
+
+
+def _message(exc_value):
+    if exc_value is None:
+        return ''
+    try:
+        return str(exc_value)
+    except Exception:
+        return '<exception str() failed>'
+
+
+def _qualname(code, short=False):
+    return code.co_name if short else getattr(code, 'co_qualname', code.co_name)
+
+
+def _exception_only(exc_type, message):
+    name = exc_type.__qualname__
+    if exc_type.__module__ not in ('builtins', '__main__'):
+        name = f"{exc_type.__module__}.{name}"
+    return f"{name}: {message}" if message else name
+
+
+class _ErrorGroup:
+    __slots__ = ('exemplar', 'fingerprint', 'count', 'first_seen', 'last_seen')
+
+    def __init__(self, record):
+        self.exemplar = record
+        self.fingerprint = record.fingerprint()
+        self.count = 1
+        self.first_seen = self.last_seen = record.created
+
+
+class _FlushRequest:
+    __slots__ = ('done',)
+
+    def __init__(self):
+        self.done = threading.Event()
+
+
+_STOP = object()
+
+
 class ErrorTracker:
     """
     ErrorTracker sets up comprehensive error tracking and reporting.
     It captures uncaught exceptions globally, logs them with detailed traceback,
     timestamps, and thread info. It also provides a manual logging interface.
+
+    Capturing only queues an ErrorRecord; a background thread writes the log.
+    Errors are fingerprinted by exception type and stack: the first one of
+    each fingerprint in a window of `window` seconds is logged in full and
+    the repeats are summed into one line when the window closes. When the
+    queue is full new records are dropped and the drop count is logged.
     """
 
-    def __init__(self, log_file_path="flowstate_ai_error.log"):
+    def __init__(self, log_file_path="flowstate_ai_error.log", window=5.0, queue_size=10000):
         self.logger = logging.getLogger("FlowstateAIErrorTracker")
         self.logger.setLevel(logging.ERROR)
 
@@ -19,11 +157,21 @@ class ErrorTracker:
             '%(asctime)s | %(levelname)s | Thread-%(thread)d | %(message)s'
         )
 
-        file_handler = logging.FileHandler(log_file_path)
-        file_handler.setLevel(logging.ERROR)
-        file_handler.setFormatter(formatter)
+        self.file_handler = logging.FileHandler(log_file_path)
+        self.file_handler.setLevel(logging.ERROR)
+        self.file_handler.setFormatter(formatter)
 
-        self.logger.addHandler(file_handler)
+        self.logger.addHandler(self.file_handler)
+
+        self.window = window
+        self.dropped = 0  # total records lost to a full queue
+        self._dropped_reported = 0
+        self._dropped_lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._groups = {}
+        self._writer = threading.Thread(target=self._run, name="ErrorTrackerWriter", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
 
         # Hook into the global exception handler
         sys.excepthook = self.handle_exception
@@ -38,29 +186,124 @@ class ErrorTracker:
             sys.__excepthook__(exc_type, exc_value, exc_traceback)
             return
 
-        error_message = ''.join(
-            traceback.format_exception(exc_type, exc_value, exc_traceback)
-        )
-        self.logger.error(f"Uncaught exception:\n{error_message}")
+        self._capture(ErrorRecord('uncaught', exc_type, exc_value, exc_traceback))
 
     def thread_exception_hook(self, args):
         # args is a threading.ExceptHookArgs object
         if issubclass(args.exc_type, KeyboardInterrupt):
             return
 
-        error_message = ''.join(
-            traceback.format_exception(args.exc_type, args.exc_value, args.exc_traceback)
-        )
-        self.logger.error(f"Uncaught thread exception (Thread-{args.thread.ident}):\n{error_message}")
+        thread_id = args.thread.ident if args.thread is not None else None
+        self._capture(ErrorRecord('thread', args.exc_type, args.exc_value, args.exc_traceback,
+                                  thread_id=thread_id))
 
     def log_error(self, error: Exception, context: str = None):
         """
-        Manually log an error with optional context information.
+        Manually log an error with optional context information. Errors are
+        grouped by context and call site as well as by stack.
         """
-        error_message = ''.join(traceback.format_exception_only(type(error), error)).strip()
-        context_message = f" Context: {context}" if context else ""
-        self.logger.error(f"Manual error log: {error_message}{context_message}")
+        caller = sys._getframe(1)
+        self._capture(ErrorRecord('manual', type(error), error, error.__traceback__, context=context,
+                                  site=(caller.f_code, caller.f_lineno)))
+
+    def _capture(self, record):
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            with self._dropped_lock:
+                self.dropped += 1
+
+    def flush(self, timeout=None):
+        """Write everything captured so far, closing the current window."""
+        if not self._writer.is_alive():
+            return False
+        request = _FlushRequest()
+        self._queue.put(request)
+        return request.done.wait(timeout)
+
+    def close(self):
+        """Flush, stop the writer thread and detach the log file."""
+        if self._writer.is_alive():
+            self._queue.put(_STOP)
+            self._writer.join()
+        self.logger.removeHandler(self.file_handler)
+        self.file_handler.close()
+        atexit.unregister(self.close)
+
+    def _run(self):
+        window_end = None
+        while True:
+            timeout = None if window_end is None else max(window_end - time.monotonic(), 0)
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if window_end is not None and time.monotonic() >= window_end:
+                self._close_window()
+                window_end = None
+
+            if isinstance(item, ErrorRecord):
+                self._add(item)
+                if window_end is None:
+                    window_end = time.monotonic() + self.window
+            elif isinstance(item, _FlushRequest):
+                self._close_window()
+                window_end = None
+                item.done.set()
+            elif item is _STOP:
+                self._close_window()
+                return
+
+    def _add(self, record):
+        key = record.key
+        group = self._groups.get(key)
+        if group is not None:
+            group.count += 1
+            group.last_seen = record.created
+            return
+        group = self._groups[key] = _ErrorGroup(record)
+        message = self._describe(record, group.fingerprint)
+        if record.kind != 'manual':
+            message += ':\n' + record.format().rstrip('\n')
+        self._write(record, message)
+
+    def _close_window(self):
+        for group in self._groups.values():
+            if group.count > 1:
+                record = group.exemplar
+                first = datetime.datetime.fromtimestamp(group.first_seen).isoformat(timespec='milliseconds')
+                last = datetime.datetime.fromtimestamp(group.last_seen).isoformat(timespec='milliseconds')
+                self._write(record, f"{self._describe(record, group.fingerprint)} repeated "
+                                    f"{group.count - 1} more times between {first} and {last}")
+        self._groups = {}
+
+        with self._dropped_lock:
+            dropped = self.dropped - self._dropped_reported
+            self._dropped_reported = self.dropped
+        if dropped:
+            self._write(None, f"Dropped {dropped} error records: capture queue full")
+
+    @staticmethod
+    def _describe(record, fingerprint):
+        if record.kind == 'uncaught':
+            title = "Uncaught exception"
+        elif record.kind == 'thread':
+            title = f"Uncaught thread exception (Thread-{record.thread_id})"
+        else:
+            context = f" Context: {record.context}" if record.context else ""
+            title = f"Manual error log: {record.summary()}{context}"
+        return f"{title} [fingerprint {fingerprint}]"
+
+    def _write(self, record, message):
+        log_record = self.logger.makeRecord(self.logger.name, logging.ERROR, __file__, 0, message, None, None)
+        if record is not None:
+            # Stamp the entry with when and where the error happened, not the writer's
+            log_record.created = record.created
+            log_record.msecs = (record.created - int(record.created)) * 1000
+            log_record.thread = record.thread_id
+        self.logger.handle(log_record)
 
 
 # Singleton instance for easy import and use
-error_tracker = ErrorTracker()
\ No newline at end of file
+error_tracker = ErrorTracker()
@@ -1,51 +1,232 @@
 import csv
 import json
 import io
+import zlib
+from itertools import islice
 from fpdf import FPDF
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - optional dependency
+    pa = None
+    pq = None
+
+
+class StreamingPDF(FPDF):
+    """
+    FPDF that writes every finished page to `stream` instead of keeping the
+    whole document in memory until output(). Call close() to finish the file.
+    Page links and the total page alias are not supported, since both need
+    every page to be known before the first one is written.
+    """
+
+    def __init__(self, stream, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stream = stream
+        self._written = 0
+        self._started = False
+
+    def _flush(self):
+        if self.buffer:
+            data = self.buffer.encode('latin1')
+            self.stream.write(data)
+            self._written += len(data)
+            self.buffer = ''
+
+    def _newobj(self):
+        self.n += 1
+        self.offsets[self.n] = self._written + len(self.buffer)
+        self._out(str(self.n) + ' 0 obj')
+
+    def _endpage(self):
+        super()._endpage()
+        if not self._started:
+            self._putheader()
+            self._started = True
+        filter = '/Filter /FlateDecode ' if self.compress else ''
+        # Same objects as FPDF._putpages writes for each page, one page at a time
+        self._newobj()
+        self._out('<</Type /Page')
+        self._out('/Parent 1 0 R')
+        if self.page in self.orientation_changes:
+            self._out('/MediaBox [0 0 %.2f %.2f]' % self._page_size(landscape=True))
+        self._out('/Resources 2 0 R')
+        if self.pdf_version > '1.3':
+            self._out('/Group <</Type /Group /S /Transparency /CS /DeviceRGB>>')
+        self._out('/Contents ' + str(self.n + 1) + ' 0 R>>')
+        self._out('endobj')
+        content = self.pages[self.page].encode('latin1')
+        if self.compress:
+            content = zlib.compress(content)
+        self._newobj()
+        self._out('<<' + filter + '/Length ' + str(len(content)) + '>>')
+        self._putstream(content)
+        self._out('endobj')
+        self.pages[self.page] = ''
+        self._flush()
+
+    def _page_size(self, landscape=False):
+        portrait = self.def_orientation == 'P'
+        if portrait != landscape:
+            return self.fw_pt, self.fh_pt
+        return self.fh_pt, self.fw_pt
+
+    def _putresources(self):
+        self._putfonts()
+        self._putimages()
+        # Resource dictionary
+        self.offsets[2] = self._written + len(self.buffer)
+        self._out('2 0 obj')
+        self._out('<<')
+        self._putresourcedict()
+        self._out('>>')
+        self._out('endobj')
+
+    def _enddoc(self):
+        # Pages root
+        self.offsets[1] = self._written + len(self.buffer)
+        self._out('1 0 obj')
+        self._out('<</Type /Pages')
+        self._out('/Kids [' + ''.join(str(3 + 2 * i) + ' 0 R ' for i in range(self.page)) + ']')
+        self._out('/Count ' + str(self.page))
+        self._out('/MediaBox [0 0 %.2f %.2f]' % self._page_size())
+        self._out('>>')
+        self._out('endobj')
+        self._putresources()
+        # Info
+        self._newobj()
+        self._out('<<')
+        self._putinfo()
+        self._out('>>')
+        self._out('endobj')
+        # Catalog
+        self._newobj()
+        self._out('<<')
+        self._putcatalog()
+        self._out('>>')
+        self._out('endobj')
+        # Cross-ref
+        xref = self._written + len(self.buffer)
+        self._out('xref')
+        self._out('0 ' + str(self.n + 1))
+        self._out('0000000000 65535 f ')
+        for i in range(1, self.n + 1):
+            self._out('%010d 00000 n ' % self.offsets[i])
+        # Trailer
+        self._out('trailer')
+        self._out('<<')
+        self._puttrailer()
+        self._out('>>')
+        self._out('startxref')
+        self._out(xref)
+        self._out('%%EOF')
+        self.state = 3
+        self._flush()
+
+
 class DataExporter:
-    def __init__(self, data):
-        """Initialize with data to export. Data should be a list of dictionaries."""
+    def __init__(self, data, chunk_size=1000, width_sample_size=1000):
+        """
+        Initialize with data to export. Data should be a list of dictionaries,
+        any iterable of dictionaries (consumed once), or a DB-API cursor whose
+        rows are fetched chunk_size at a time.
+        """
         self.data = data
+        self.chunk_size = chunk_size
+        self.width_sample_size = width_sample_size
 
-    def to_csv(self):
-        """Export data as CSV format string."""
-        if not self.data:
-            return ""
+    def iter_chunks(self):
+        """Yield the rows as lists of at most chunk_size dictionaries."""
+        if hasattr(self.data, 'fetchmany') and hasattr(self.data, 'description'):
+            names = None
+            while True:
+                rows = self.data.fetchmany(self.chunk_size)
+                if not rows:
+                    return
+                if names is None:
+                    names = [column[0] for column in self.data.description]
+                yield [dict(zip(names, row)) for row in rows]
+        else:
+            rows = iter(self.data)
+            while True:
+                chunk = list(islice(rows, self.chunk_size))
+                if not chunk:
+                    return
+                yield chunk
 
+    def iter_csv(self):
+        """Yield the CSV export in pieces, one per chunk of rows."""
         output = io.StringIO()
-        fieldnames = self.data[0].keys()
-        writer = csv.DictWriter(output, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(self.data)
-        return output.getvalue()
+        writer = None
+        for chunk in self.iter_chunks():
+            if writer is None:
+                writer = csv.DictWriter(output, fieldnames=chunk[0].keys())
+                writer.writeheader()
+            writer.writerows(chunk)
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
+
+    def iter_ndjson(self):
+        """Yield one JSON document per line, one piece per chunk of rows."""
+        for chunk in self.iter_chunks():
+            yield ''.join(json.dumps(row) + '\n' for row in chunk)
+
+    def iter_json(self):
+        """Yield the same JSON array as to_json() in pieces."""
+        separator = '[\n'
+        for chunk in self.iter_chunks():
+            # Encoding the chunk as a list indents its rows as in the full array
+            yield separator + json.dumps(chunk, indent=2)[2:-2]
+            separator = ',\n'
+        yield '[]' if separator == '[\n' else '\n]'
+
+    def to_csv(self):
+        """Export data as CSV format string."""
+        return ''.join(self.iter_csv())
 
     def to_json(self):
         """Export data as JSON format string."""
-        return json.dumps(self.data, indent=2)
+        return ''.join(self.iter_json())
 
-    def to_pdf(self):
-        """Export data as PDF byte string."""
-        if not self.data:
-            pdf = FPDF()
-            pdf.add_page()
-            pdf.set_font("Arial", size=12)
-            pdf.cell(0, 10, "No Data Available", ln=True)
-            return pdf.output(dest='S').encode('latin1')
+    def to_ndjson(self):
+        """Export data as newline-delimited JSON string."""
+        return ''.join(self.iter_ndjson())
 
-        pdf = FPDF()
+    def write_pdf(self, stream):
+        """
+        Write the PDF export to a binary stream, flushing each page as it is
+        finished. Column widths are estimated from the first
+        width_sample_size rows; longer values later on are cut to fit.
+        """
+        pdf = StreamingPDF(stream)
         pdf.add_page()
         pdf.set_font("Arial", size=12)
 
+        chunks = self.iter_chunks()
+        sample = []
+        for chunk in chunks:
+            sample.extend(chunk)
+            if len(sample) >= self.width_sample_size:
+                break
+
+        if not sample:
+            pdf.cell(0, 10, "No Data Available", ln=True)
+            pdf.close()
+            return
+
         # Calculate column widths
         col_widths = {}
-        headers = list(self.data[0].keys())
+        max_chars = {}
+        headers = list(sample[0].keys())
         for header in headers:
             max_len = len(header)
-            for row in self.data:
+            for row in islice(sample, self.width_sample_size):
                 max_len = max(max_len, len(str(row.get(header, ''))))
             # Approximate width in points (1 char ~ 3 points)
             col_widths[header] = max_len * 3 + 4
+            max_chars[header] = max_len
 
         # Print headers
         for header in headers:
@@ -53,14 +234,97 @@ class DataExporter:
         pdf.ln()
 
         # Print rows
-        for row in self.data:
-            for header in headers:
-                text = str(row.get(header, ''))
-                pdf.cell(col_widths[header], 10, text, border=1)
-            pdf.ln()
+        def print_rows(rows):
+            for row in rows:
+                for header in headers:
+                    text = str(row.get(header, ''))
+                    if len(text) > max_chars[header]:
+                        text = text[:max(max_chars[header] - 3, 0)] + '...'
+                    pdf.cell(col_widths[header], 10, text, border=1)
+                pdf.ln()
+
+        print_rows(sample)
+        del sample
+        for chunk in chunks:
+            print_rows(chunk)
+        pdf.close()
+
+    def to_pdf(self):
+        """Export data as PDF byte string."""
+        output = io.BytesIO()
+        self.write_pdf(output)
+        return output.getvalue()
+
+    def iter_record_batches(self, schema=None):
+        """
+        Yield the rows as Arrow record batches of chunk_size rows. Unless
+        given, the schema is merged from the first width_sample_size rows:
+        columns are taken in order of first appearance, mixed int and float
+        columns become float, and columns that are null throughout the sample
+        become strings. Rows after the sample must fit that schema; pass
+        schema= when they may not.
+        """
+        return self._arrow_batches(schema)[1]
+
+    def _arrow_batches(self, schema=None):
+        """The Arrow schema and an iterator over the record batches."""
+        if pa is None:
+            raise ImportError("Arrow export requires the 'pyarrow' package")
+        chunks = self.iter_chunks()
+        if schema is not None:
+            return schema, (pa.RecordBatch.from_pylist(chunk, schema=schema) for chunk in chunks)
+
+        sample = []
+        for chunk in chunks:
+            sample.append(chunk)
+            if sum(len(rows) for rows in sample) >= self.width_sample_size:
+                break
+        if not sample:
+            return pa.schema([]), iter(())
+        schema = pa.unify_schemas([pa.Table.from_pylist(chunk).schema for chunk in sample],
+                                  promote_options='permissive')
+        schema = pa.schema([field.with_type(pa.string()) if pa.types.is_null(field.type) else field
+                            for field in schema])
+
+        def batches():
+            for chunk in sample:
+                yield pa.RecordBatch.from_pylist(chunk, schema=schema)
+            names = set(schema.names)
+            for chunk in chunks:
+                extra = {key for row in chunk for key in row if key not in names}
+                if extra:
+                    raise ValueError(f"Columns {sorted(extra)} first appear after the first "
+                                     f"{self.width_sample_size} rows; pass schema= to export them")
+                yield pa.RecordBatch.from_pylist(chunk, schema=schema)
+
+        return schema, batches()
 
-        return pdf.output(dest='S').encode('latin1')
+    def write_parquet(self, where, schema=None, compression='snappy'):
+        """
+        Write a Parquet file (path or binary stream) with one row group per
+        chunk. Returns the number of rows written.
+        """
+        if pq is None:
+            raise ImportError("Parquet export requires the 'pyarrow' package")
+        schema, batches = self._arrow_batches(schema)
+        rows = 0
+        with pq.ParquetWriter(where, schema, compression=compression) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        return rows
 
+    def write_arrow(self, where, schema=None):
+        """Write an Arrow IPC stream (path or binary stream). Returns the number of rows written."""
+        if pa is None:
+            raise ImportError("Arrow export requires the 'pyarrow' package")
+        schema, batches = self._arrow_batches(schema)
+        rows = 0
+        with pa.ipc.new_stream(where, schema) as writer:
+            for batch in batches:
+                writer.write_batch(batch)
+                rows += batch.num_rows
+        return rows
 
 if __name__ == "__main__":
     sample_data = [
@@ -1,52 +1,241 @@
+import asyncio
+import hashlib
+import heapq
+import itertools
+import json
 import time
 import threading
-import requests
 
-class PollingSystem:
-    def __init__(self, poll_interval, endpoint, callback):
-        """
-        Initializes the polling system.
+import aiohttp
 
-        :param poll_interval: Time in seconds between polls.
-        :param endpoint: URL or API endpoint to poll.
-        :param callback: Function to call with new data when updates detected.
-        """
-        self.poll_interval = poll_interval
+
+class PollSource:
+    """
+    One polled endpoint: its validators, last payload hash and current
+    interval. The interval grows by `backoff` after every poll without a
+    change, up to max_interval, and drops back to min_interval on a change.
+    """
+
+    def __init__(self, endpoint, callback, min_interval, max_interval=None, backoff=2.0):
         self.endpoint = endpoint
         self.callback = callback
-        self._stop_event = threading.Event()
+        self.min_interval = min_interval
+        self.max_interval = max_interval if max_interval is not None else min_interval * 8
+        self.backoff = backoff
+        self.interval = min_interval
+        self.etag = None
+        self.last_modified = None
+        self.digest = None
+        self.next_poll = 0.0
+        self.active = True
+        self.stats = {'requests': 0, 'not_modified': 0, 'unchanged': 0, 'changes': 0, 'errors': 0}
+
+    def request_headers(self):
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def idle(self):
+        self.interval = min(self.interval * self.backoff, self.max_interval)
+
+    def changed(self):
+        self.interval = self.min_interval
+
+
+class PollingHub:
+    """
+    Polls many endpoints from a single asyncio loop over one keep-alive
+    session. Requests carry If-None-Match/If-Modified-Since so unchanged
+    sources answer 304, and a 200 only counts as a change when the body hash
+    differs from the last one; the JSON is parsed for changes only.
+    """
+
+    def __init__(self, max_concurrency=16, timeout=10):
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.sources = []
+        self._due = []  # (next_poll, seq, source)
+        self._seq = itertools.count()
+        self._loop = None
+        self._wakeup = None
+        self._stopping = False
         self._thread = None
-        self._last_data = None
+        self._ready = threading.Event()
 
-    def _poll(self):
-        while not self._stop_event.is_set():
-            try:
-                response = requests.get(self.endpoint)
-                response.raise_for_status()
-                data = response.json()
+    def add_source(self, endpoint, callback, min_interval, max_interval=None, backoff=2.0):
+        """Register an endpoint; polled right away if the hub is running."""
+        source = PollSource(endpoint, callback, min_interval, max_interval, backoff)
+        self.sources.append(source)
+        self._call_in_loop(self._schedule, source, 0.0)
+        return source
+
+    def remove_source(self, source):
+        source.active = False
+        if source in self.sources:
+            self.sources.remove(source)
+
+    def _call_in_loop(self, function, *args):
+        loop = self._loop
+        if loop is None:
+            function(*args)
+        elif loop.is_running() and threading.current_thread() is not self._thread:
+            loop.call_soon_threadsafe(function, *args)
+        else:
+            function(*args)
 
-                if data != self._last_data:
-                    self._last_data = data
-                    self.callback(data)
+    def _schedule(self, source, delay):
+        now = self._loop.time() if self._loop else time.monotonic()
+        source.next_poll = now + delay
+        heapq.heappush(self._due, (source.next_poll, next(self._seq), source))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def poll_once(self, session, source):
+        """Poll one source; returns True when its payload changed."""
+        source.stats['requests'] += 1
+        async with session.get(source.endpoint, headers=source.request_headers()) as response:
+            if response.status == 304:
+                source.stats['not_modified'] += 1
+                source.idle()
+                return False
+            response.raise_for_status()
+            body = await response.read()
+            source.etag = response.headers.get('ETag', source.etag)
+            source.last_modified = response.headers.get('Last-Modified', source.last_modified)
+
+        digest = hashlib.blake2b(body, digest_size=16).digest()
+        if digest == source.digest:
+            source.stats['unchanged'] += 1
+            source.idle()
+            return False
+
+        source.digest = digest
+        source.stats['changes'] += 1
+        source.changed()
+        data = json.loads(body)
+        if asyncio.iscoroutinefunction(source.callback):
+            await source.callback(data)
+        else:
+            # Keep a slow callback from holding up the other sources
+            await asyncio.to_thread(source.callback, data)
+        return True
+
+    async def _poll_and_reschedule(self, session, source, slots):
+        async with slots:
+            try:
+                await self.poll_once(session, source)
             except Exception as e:
-                print(f"Polling error: {e}")
+                source.stats['errors'] += 1
+                source.idle()
+                print(f"Polling error for {source.endpoint}: {e}")
+        if source.active and not self._stopping:
+            self._schedule(source, source.interval)
 
-            time.sleep(self.poll_interval)
+    async def run(self):
+        """Poll all sources until stop() is called."""
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+        self._due = []
+        for source in self.sources:
+            self._schedule(source, 0.0)
+        self._ready.set()
+
+        slots = asyncio.Semaphore(self.max_concurrency)
+        pending = set()
+        connector = aiohttp.TCPConnector(limit=self.max_concurrency)
+        timeout = aiohttp.ClientTimeout(total=self.timeout)
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            try:
+                while not self._stopping:
+                    now = self._loop.time()
+                    while self._due and self._due[0][0] <= now:
+                        _, _, source = heapq.heappop(self._due)
+                        if source.active:
+                            task = asyncio.create_task(self._poll_and_reschedule(session, source, slots))
+                            pending.add(task)
+                            task.add_done_callback(pending.discard)
+                    delay = self._due[0][0] - now if self._due else None
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+            finally:
+                for task in list(pending):
+                    task.cancel()
+                await asyncio.gather(*pending, return_exceptions=True)
+                self._loop = None
+                self._wakeup = None
+                self._ready.clear()
+
+    def _request_stop(self):
+        self._stopping = True
+        if self._wakeup is not None:
+            self._wakeup.set()
 
     def start(self):
+        """Run the hub on its own thread."""
         if self._thread and self._thread.is_alive():
             print("Polling already running")
             return
-
-        self._stop_event.clear()
-        self._thread = threading.Thread(target=self._poll)
+        self._thread = threading.Thread(target=asyncio.run, args=(self.run(),))
         self._thread.daemon = True
         self._thread.start()
+        self._ready.wait(5)
 
     def stop(self):
-        self._stop_event.set()
+        loop = self._loop
+        if loop is not None:
+            loop.call_soon_threadsafe(self._request_stop)
+        else:
+            self._stopping = True
         if self._thread:
             self._thread.join()
+            self._thread = None
+
+
+class PollingSystem:
+    def __init__(self, poll_interval, endpoint, callback, max_interval=None, hub=None):
+        """
+        Initializes the polling system.
+
+        :param poll_interval: Time in seconds between polls while the endpoint changes.
+        :param endpoint: URL or API endpoint to poll.
+        :param callback: Function to call with new data when updates detected.
+        :param max_interval: Longest time between polls once the endpoint is idle
+                             (defaults to 8 x poll_interval).
+        :param hub: Shared PollingHub to poll on; a private one is used by default.
+        """
+        self.poll_interval = poll_interval
+        self.max_interval = max_interval
+        self.endpoint = endpoint
+        self.callback = callback
+        self.hub = hub
+        self._own_hub = hub is None
+        self._source = None
+
+    def start(self):
+        if self._source is not None:
+            print("Polling already running")
+            return
+
+        if self._own_hub:
+            self.hub = PollingHub(max_concurrency=1)
+        self._source = self.hub.add_source(self.endpoint, self.callback, self.poll_interval, self.max_interval)
+        if self._own_hub:
+            self.hub.start()
+
+    def stop(self):
+        if self._source is None:
+            return
+        self.hub.remove_source(self._source)
+        self._source = None
+        if self._own_hub:
+            self.hub.stop()
 
 
 # Example callback function
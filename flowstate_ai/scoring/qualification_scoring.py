@@ -1,4 +1,87 @@
-from typing import Dict, Any
+import re
+from typing import Dict, Any, Iterable
+
+import numpy as np
+
+# Job title scoring
+TITLE_SCORES = {
+    "ceo": 1.0,
+    "founder": 1.0,
+    "co-founder": 1.0,
+    "director": 0.8,
+    "manager": 0.6,
+    "engineer": 0.5,
+    "intern": 0.1
+}
+
+# Industry scoring - prioritize tech and related
+INDUSTRY_SCORES = {
+    "software": 1.0,
+    "technology": 1.0,
+    "saas": 0.9,
+    "finance": 0.7,
+    "healthcare": 0.6,
+    "education": 0.5
+}
+
+ENGAGEMENT_FIELDS = ("visits", "time_spent_minutes", "emails_sent", "emails_opened", "links_clicked")
+PROFILE_FIELDS = ("job_title", "company_size", "industry")
+
+
+class KeywordScoreTable:
+    """
+    Scores text by the first keyword of `scores` (in dict order) it contains,
+    like the substring loops in score_profile, using one precompiled regex
+    and a cache of the values already seen.
+    """
+
+    def __init__(self, scores: Dict[str, float], default: float, max_cache_size: int = 100000):
+        self.scores = scores
+        self.default = default
+        self.max_cache_size = max_cache_size
+        self._priority = {keyword: i for i, keyword in enumerate(scores)}
+        self._values = list(scores.values())
+        # The lookahead reports a match at every position, overlapping ones
+        # included; at each position the alternation prefers earlier keywords
+        self._pattern = re.compile("(?=(" + "|".join(re.escape(keyword) for keyword in scores) + "))")
+        self._cache: Dict[Any, float] = {}
+
+    def lookup(self, text) -> float:
+        cached = self._cache.get(text)
+        if cached is not None:
+            return cached
+        found = [self._priority[match.group(1)] for match in self._pattern.finditer(text.lower())]
+        score = self._values[min(found)] if found else self.default
+        if len(self._cache) >= self.max_cache_size:
+            self._cache.clear()
+        self._cache[text] = score
+        return score
+
+    def score_many(self, texts: Iterable, count: int = -1) -> np.ndarray:
+        if isinstance(texts, np.ndarray):
+            # Python strings hash much faster than NumPy string scalars
+            texts = texts.tolist()
+        cache, lookup = self._cache, self.lookup
+        return np.fromiter((cache[t] if t in cache else lookup(t) for t in texts), dtype=float, count=count)
+
+
+def _columns(leads, section: str, fields, defaults):
+    """
+    Per-field arrays for a batch of leads: either a sequence of lead dicts as
+    taken by calculate_score, or columnar data (dict of arrays or structured
+    array) keyed by the flat field names.
+    """
+    names = getattr(getattr(leads, "dtype", None), "names", None)
+    if names is not None or isinstance(leads, dict):
+        available = names if names is not None else leads
+        size = len(leads) if names is not None else len(next(iter(leads.values()), ()))
+        return {
+            field: (np.asarray(leads[field]) if field in available else np.full(size, default, dtype=object))
+            for field, default in zip(fields, defaults)
+        }
+    sections = [lead.get(section, {}) for lead in leads]
+    return {field: [data.get(field, default) for data in sections] for field, default in zip(fields, defaults)}
+
 
 class QualificationScorer:
     """
@@ -26,6 +109,8 @@ class QualificationScorer:
             "email_open_rate": 0.1,
             "click_through_rate": 0.1
         }
+        self.title_table = KeywordScoreTable(TITLE_SCORES, default=0.3)
+        self.industry_table = KeywordScoreTable(INDUSTRY_SCORES, default=0.3)
 
     def score_engagement(self, engagement_metrics: Dict[str, Any]) -> float:
         """
@@ -69,15 +154,7 @@ class QualificationScorer:
         industry = profile_data.get("industry", "").lower()
 
         # Job title scoring
-        title_scores = {
-            "ceo": 1.0,
-            "founder": 1.0,
-            "co-founder": 1.0,
-            "director": 0.8,
-            "manager": 0.6,
-            "engineer": 0.5,
-            "intern": 0.1
-        }
+        title_scores = TITLE_SCORES
 
         job_score = 0.3  # default low score
         for key, val in title_scores.items():
@@ -97,14 +174,7 @@ class QualificationScorer:
             company_score = 0.1
 
         # Industry scoring - prioritize tech and related
-        industry_scores = {
-            "software": 1.0,
-            "technology": 1.0,
-            "saas": 0.9,
-            "finance": 0.7,
-            "healthcare": 0.6,
-            "education": 0.5
-        }
+        industry_scores = INDUSTRY_SCORES
 
         industry_score = 0.3  # base score for unknown
         for key, val in industry_scores.items():
@@ -156,6 +226,62 @@ class QualificationScorer:
         # Clamp final score between 0 and 1
         return max(0.0, min(weighted_score, 1.0))
 
+    def score_engagement_batch(self, columns: Dict[str, Any]) -> np.ndarray:
+        """Vectorized score_engagement over per-field arrays."""
+        visit_score = np.minimum(np.asarray(columns["visits"], dtype=float) / 10, 1.0)
+        time_score = np.minimum(np.asarray(columns["time_spent_minutes"], dtype=float) / 30, 1.0)
+        open_rate = np.minimum(np.asarray(columns["emails_opened"], dtype=float) / 5, 1.0)
+        click_rate = np.minimum(np.asarray(columns["links_clicked"], dtype=float) / 3, 1.0)
+        return 0.4 * visit_score + 0.3 * time_score + 0.2 * open_rate + 0.1 * click_rate
+
+    def score_profile_batch(self, columns: Dict[str, Any]) -> np.ndarray:
+        """Vectorized score_profile over per-field arrays."""
+        company_size = np.asarray(columns["company_size"], dtype=float)
+        count = len(company_size)
+        job_score = self.title_table.score_many(columns["job_title"], count)
+        industry_score = self.industry_table.score_many(columns["industry"], count)
+        company_score = np.select(
+            [company_size >= 1000, company_size >= 100, company_size >= 10],
+            [1.0, 0.7, 0.4],
+            default=0.1
+        )
+        return 0.5 * job_score + 0.3 * company_score + 0.2 * industry_score
+
+    def score_batch(self, leads) -> np.ndarray:
+        """
+        Calculate qualification scores for many leads at once.
+
+        leads: sequence of lead dicts as taken by calculate_score, or columnar
+        data (dict of arrays or NumPy structured array) with the flat fields
+        visits, time_spent_minutes, emails_sent, emails_opened, links_clicked,
+        job_title, company_size and industry.
+
+        Returns an array with the calculate_score result for each lead.
+        """
+        columns = _columns(leads, "engagement_metrics", ENGAGEMENT_FIELDS, (0, 0.0, 0, 0, 0))
+        columns.update(_columns(leads, "profile_data", PROFILE_FIELDS, ("", 0, "")))
+
+        engagement_score = self.score_engagement_batch(columns)
+        profile_score = self.score_profile_batch(columns)
+
+        weighted_score = (
+            self.weights.get("engagement_score", 0.4) * engagement_score +
+            self.weights.get("profile_score", 0.4) * profile_score
+        )
+
+        emails_sent = np.asarray(columns["emails_sent"], dtype=float)
+        emails_opened = np.asarray(columns["emails_opened"], dtype=float)
+        links_clicked = np.asarray(columns["links_clicked"], dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            email_open_rate = np.where(emails_sent > 0, emails_opened / emails_sent, 0.0)
+            click_through_rate = np.where(emails_opened > 0, links_clicked / emails_opened, 0.0)
+
+        weighted_score += self.weights.get("email_open_rate", 0.1) * np.minimum(email_open_rate, 1.0)
+        weighted_score += self.weights.get("click_through_rate", 0.1) * np.minimum(click_through_rate, 1.0)
+
+        # Clamp final score between 0 and 1
+        return np.clip(weighted_score, 0.0, 1.0)
+
 
 if __name__ == "__main__":
     scorer = QualificationScorer()
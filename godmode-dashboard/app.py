@@ -3,11 +3,11 @@
 📊 GODMODE AI MONITORING DASHBOARD
 ⚡ Real-time AI activity monitor with progress bars
 🎯 Shows what each AI is doing with visual progress indicators
-🔄 Updates every 2 seconds with live status
+🔄 Pushes only what changed, when status files or Redis messages change
 """
 
 from flask import Flask, render_template, jsonify, request
-from flask_socketio import SocketIO, emit
+from flask_socketio import SocketIO, emit, join_room, leave_room
 import json
 import time
 import threading
@@ -19,6 +19,11 @@ import sqlite3
 from typing import Dict, List, Any
 import asyncio
 import glob
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flowstate_ai.dashboard_feed import ChangeFeed, FileChangeSource, RedisPubSubSource
 
 # Setup logging
 logging.basicConfig(level=logging.INFO)
@@ -28,6 +33,13 @@ app = Flask(__name__)
 app.config['SECRET_KEY'] = 'godmode-dashboard-secret'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
+# Clients join the overview room by default and can subscribe to per-AI rooms
+OVERVIEW_ROOM = "overview"
+AI_ROOM_PREFIX = "ai:"
+STATUS_CHANNEL = "flowstate:ai-status"
+
+feed = ChangeFeed(socketio.emit, patch_event='status_patch', snapshot_event='status_snapshot')
+
 class GodmodeMonitor:
     """
     Real-time AI monitoring system
@@ -62,10 +74,17 @@ class GodmodeMonitor:
             "collective-memory-system": {"name": "Collective Memory", "icon": "🧠", "color": "#FBE842"}
         }
         
+        # Change detection state
+        self._file_mtimes: Dict[Path, float] = {}
+        self._wake = threading.Event()
+        self._sources = []
+        self.demo_mode = False
+        
         # Initialize monitoring
         self.initialize_monitoring()
         
         # Start background monitoring
+        self.start_change_sources()
         self.start_monitoring_thread()
     
     def initialize_monitoring(self):
@@ -76,6 +95,7 @@ class GodmodeMonitor:
             "godmode-dashboard/templates", 
             "ai-status",
             "task-progress",
+            "progress-tracking",
             "monitoring-logs"
         ]
         
@@ -99,6 +119,36 @@ class GodmodeMonitor:
                 "current_activity": "Initializing systems"
             }
     
+    def start_change_sources(self):
+        """Wake the monitor on status file changes and Redis status messages"""
+        file_source = FileChangeSource(
+            [self.project_root / "ai-status", self.project_root / "progress-tracking"],
+            lambda path: self._wake.set()
+        )
+        file_source.start()
+        self._sources.append(file_source)
+        
+        redis_url = os.environ.get("REDIS_URL")
+        if redis_url:
+            try:
+                import redis
+                redis_source = RedisPubSubSource(
+                    redis.Redis.from_url(redis_url), [STATUS_CHANNEL], self.apply_status_message
+                )
+                redis_source.start()
+                self._sources.append(redis_source)
+            except Exception as e:
+                logger.warning(f"Redis status feed unavailable: {e}")
+    
+    def apply_status_message(self, channel: str, data: Any):
+        """Apply a status update published on Redis and wake the monitor"""
+        if isinstance(data, dict) and data.get("ai_id") in self.ai_status:
+            self.ai_status[data["ai_id"]].update({
+                key: data[key] for key in ("status", "current_task", "progress", "current_activity") if key in data
+            })
+            self.ai_status[data["ai_id"]]["last_update"] = data.get("timestamp", datetime.now().isoformat())
+        self._wake.set()
+    
     def start_monitoring_thread(self):
         """Start background monitoring thread"""
         def monitor_loop():
@@ -107,7 +157,9 @@ class GodmodeMonitor:
                     self.update_ai_status()
                     self.update_system_stats()
                     self.broadcast_updates()
-                    time.sleep(2)  # Update every 2 seconds
+                    # Sleep until something changes; only the demo simulation needs a tick
+                    self._wake.wait(timeout=2 if self.demo_mode else 60)
+                    self._wake.clear()
                 except Exception as e:
                     logger.error(f"Error in monitoring loop: {e}")
                     time.sleep(5)
@@ -116,19 +168,34 @@ class GodmodeMonitor:
         monitor_thread.start()
         logger.info("🔄 AI Monitoring thread started")
     
+    def _load_if_changed(self, path: Path):
+        """Load a JSON file only if its mtime changed since the last read"""
+        try:
+            mtime = path.stat().st_mtime
+        except OSError:
+            self._file_mtimes.pop(path, None)
+            return None
+        if self._file_mtimes.get(path) == mtime:
+            return None
+        self._file_mtimes[path] = mtime
+        with open(path, 'r') as f:
+            return json.load(f)
+    
     def update_ai_status(self):
         """Update status of all AI agents"""
         try:
             # Check for AI status files
             status_dir = self.project_root / "ai-status"
+            demo_mode = False
             
             for ai_id in self.ai_agents.keys():
                 status_file = status_dir / f"{ai_id}_status.json"
                 
                 if status_file.exists():
                     try:
-                        with open(status_file, 'r') as f:
-                            status_data = json.load(f)
+                        status_data = self._load_if_changed(status_file)
+                        if status_data is None:
+                            continue
                         
                         # Update AI status
                         self.ai_status[ai_id].update({
@@ -144,6 +211,9 @@ class GodmodeMonitor:
                 else:
                     # Simulate AI activity for demo (remove in production)
                     self.simulate_ai_activity(ai_id)
+                    demo_mode = True
+            
+            self.demo_mode = demo_mode
             
             # Check task progress files
             self.update_task_progress()
@@ -235,8 +305,9 @@ class GodmodeMonitor:
             if progress_dir.exists():
                 for progress_file in progress_dir.glob("*.json"):
                     try:
-                        with open(progress_file, 'r') as f:
-                            task_data = json.load(f)
+                        task_data = self._load_if_changed(progress_file)
+                        if task_data is None:
+                            continue
                         
                         # Update AI status based on task progress
                         assigned_ai = task_data.get("assigned_ai")
@@ -263,37 +334,15 @@ class GodmodeMonitor:
                 "total_ais": len(self.ai_agents),
                 "active_ais": active_count,
                 "completed_tasks": completed_tasks,
-                "active_tasks": len([ai for ai in self.ai_status.values() if ai["progress"] > 0 and ai["progress"] < 100]),
-                "uptime_seconds": (datetime.now() - self.system_stats["system_uptime"]).total_seconds()
+                "active_tasks": len([ai for ai in self.ai_status.values() if ai["progress"] > 0 and ai["progress"] < 100])
             })
             
         except Exception as e:
             logger.error(f"Error updating system stats: {e}")
     
-    def broadcast_updates(self):
-        """Broadcast updates to connected clients"""
-        try:
-            # Get top 15 most active AIs (not overwhelming)
-            active_ais = sorted(
-                self.ai_status.values(),
-                key=lambda x: (x["status"] == "ACTIVE", x["progress"]),
-                reverse=True
-            )[:15]
-            
-            update_data = {
-                "ai_status": active_ais,
-                "system_stats": self.system_stats,
-                "timestamp": datetime.now().isoformat()
-            }
-            
-            socketio.emit('status_update', update_data)
-            
-        except Exception as e:
-            logger.error(f"Error broadcasting updates: {e}")
-    
-    def get_dashboard_data(self):
-        """Get current dashboard data"""
-        # Return top 15 most relevant AIs
+    def build_status_model(self):
+        """Build the overview model pushed to clients (no per-tick volatile fields)"""
+        # Top 15 most relevant AIs (not overwhelming)
         active_ais = sorted(
             self.ai_status.values(),
             key=lambda x: (x["status"] == "ACTIVE", x["progress"], x["tasks_completed"]),
@@ -302,9 +351,28 @@ class GodmodeMonitor:
         
         return {
             "ai_status": active_ais,
-            "system_stats": self.system_stats,
-            "timestamp": datetime.now().isoformat()
+            "system_stats": self.system_stats
         }
+    
+    def broadcast_updates(self):
+        """Push changes to subscribed clients; nothing is sent when nothing changed"""
+        try:
+            feed.publish(OVERVIEW_ROOM, self.build_status_model())
+            for ai_id, status in self.ai_status.items():
+                feed.publish(AI_ROOM_PREFIX + ai_id, status)
+            
+        except Exception as e:
+            logger.error(f"Error broadcasting updates: {e}")
+    
+    def get_dashboard_data(self):
+        """Get current dashboard data"""
+        data = self.build_status_model()
+        data["system_stats"] = dict(
+            data["system_stats"],
+            uptime_seconds=(datetime.now() - self.system_stats["system_uptime"]).total_seconds()
+        )
+        data["timestamp"] = datetime.now().isoformat()
+        return data
 
 # Initialize monitor
 monitor = GodmodeMonitor()
@@ -330,7 +398,25 @@ def get_ai_details(ai_id):
 def handle_connect():
     """Handle client connection"""
     logger.info("Client connected to monitoring dashboard")
-    emit('status_update', monitor.get_dashboard_data())
+    join_room(OVERVIEW_ROOM)
+    feed.send_snapshot(OVERVIEW_ROOM, emit)
+
+@socketio.on('subscribe')
+def handle_subscribe(data):
+    """Subscribe to a room (overview or ai:<id>) and receive its snapshot"""
+    room = (data or {}).get('room', OVERVIEW_ROOM)
+    join_room(room)
+    feed.send_snapshot(room, emit)
+
+@socketio.on('unsubscribe')
+def handle_unsubscribe(data):
+    """Stop receiving patches for a room"""
+    leave_room((data or {}).get('room', OVERVIEW_ROOM))
+
+@socketio.on('resync')
+def handle_resync(data):
+    """Resend a room snapshot after a client detects a missed version"""
+    feed.send_snapshot((data or {}).get('room', OVERVIEW_ROOM), emit)
 
 @socketio.on('disconnect')
 def handle_disconnect():
@@ -545,11 +631,43 @@ if __name__ == '__main__':
     
     <script>
         const socket = io();
+        let state = null;
+        let version = 0;
+        
+        socket.on('status_snapshot', function(message) {
+            if (message.room !== 'overview') return;
+            state = message.data;
+            version = message.version;
+            updateDashboard(state);
+        });
         
-        socket.on('status_update', function(data) {
-            updateDashboard(data);
+        socket.on('status_patch', function(message) {
+            if (message.room !== 'overview') return;
+            if (message.version !== version + 1 && message.version !== 1) {
+                socket.emit('resync', {room: 'overview'});
+                return;
+            }
+            state = applyPatch(state, message.ops);
+            version = message.version;
+            updateDashboard(state);
         });
         
+        function applyPatch(doc, ops) {
+            ops.forEach(op => {
+                if (op.path === '') { doc = op.value; return; }
+                const tokens = op.path.split('/').slice(1).map(t => t.replace(/~1/g, '/').replace(/~0/g, '~'));
+                let target = doc;
+                tokens.slice(0, -1).forEach(t => { target = target[t]; });
+                const last = tokens[tokens.length - 1];
+                if (op.op === 'remove') {
+                    if (Array.isArray(target)) target.splice(Number(last), 1); else delete target[last];
+                } else {
+                    target[last] = op.value;
+                }
+            });
+            return doc;
+        }
+        
         function updateDashboard(data) {
             // Update system stats
             document.getElementById('total-ais').textContent = data.system_stats.total_ais;
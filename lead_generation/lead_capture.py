@@ -1,7 +1,9 @@
 import re
 import json
+import threading
 import requests
-from typing import Dict, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
 
 class LeadCapture:
     """Automated lead capture with form validation and multi-source integration."""
@@ -9,10 +11,12 @@ class LeadCapture:
     EMAIL_REGEX = re.compile(r"^[\w\.-]+@[\w\.-]+\.\w+$")
     PHONE_REGEX = re.compile(r"^\+?\d{7,15}$")
 
-    def __init__(self, sources_config: Dict[str, Dict]):
+    def __init__(self, sources_config: Dict[str, Dict], max_workers: int = 8):
         """
         Initialize with sources configuration.
 
+        max_workers bounds how many source submissions run at once.
+
         sources_config example:
         {
             "crm_api": {
@@ -26,6 +30,31 @@ class LeadCapture:
         }
         """
         self.sources_config = sources_config
+        self.max_workers = max_workers
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._local = threading.local()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='lead-capture')
+        return self._executor
+
+    @property
+    def session(self) -> requests.Session:
+        """Per-thread session, so connections to each source are kept alive and reused."""
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
 
     def validate_lead(self, lead_data: Dict[str, str]) -> Optional[str]:
         """
@@ -64,20 +93,66 @@ class LeadCapture:
         if validation_error:
             return {"success": False, "errors": [validation_error]}
 
-        for source, config in self.sources_config.items():
-            try:
-                if source == 'crm_api':
-                    self._submit_to_crm(lead_data, config)
-                elif source == 'email_marketing':
-                    self._submit_to_email_marketing(lead_data, config)
-                else:
-                    errors.append(f"Unknown source: {source}")
-            except Exception as e:
-                errors.append(f"Failed to submit to {source}: {str(e)}")
+        # Submit to all sources at once rather than one after another
+        futures = [
+            self.executor.submit(self._submit_to_source, source, config, lead_data)
+            for source, config in self.sources_config.items()
+        ]
+        for future in futures:
+            error = future.result()
+            if error:
+                errors.append(error)
 
         success = len(errors) == 0
         return {"success": success, "errors": errors}
 
+    def submit_many(self, leads: List[Dict[str, str]],
+                    progress: Optional[Callable[[int], None]] = None) -> List[Dict]:
+        """
+        Submits already validated leads to all configured sources, running up to
+        max_workers submissions concurrently.
+
+        Returns one {"success", "errors"} dict per lead, in order. `progress` is
+        called with the number of leads completed so far.
+        """
+        errors: List[List[str]] = [[] for _ in leads]
+        remaining = [len(self.sources_config)] * len(leads)
+        completed = [0]
+        lock = threading.Lock()
+
+        def run(index, source, config):
+            error = self._submit_to_source(source, config, leads[index])
+            with lock:
+                if error:
+                    errors[index].append(error)
+                remaining[index] -= 1
+                if remaining[index] == 0:
+                    completed[0] += 1
+                    if progress:
+                        progress(completed[0])
+
+        futures = [
+            self.executor.submit(run, index, source, config)
+            for index in range(len(leads))
+            for source, config in self.sources_config.items()
+        ]
+        for future in futures:
+            future.result()
+        return [{"success": not lead_errors, "errors": lead_errors} for lead_errors in errors]
+
+    def _submit_to_source(self, source: str, config: Dict, lead_data: Dict[str, str]) -> Optional[str]:
+        """Submits to one source; returns an error message or None."""
+        try:
+            if source == 'crm_api':
+                self._submit_to_crm(lead_data, config)
+            elif source == 'email_marketing':
+                self._submit_to_email_marketing(lead_data, config)
+            else:
+                return f"Unknown source: {source}"
+        except Exception as e:
+            return f"Failed to submit to {source}: {str(e)}"
+        return None
+
     def _submit_to_crm(self, lead_data: Dict[str, str], config: Dict):
         headers = {
             'Authorization': f"Bearer {config.get('api_key')}",
@@ -88,7 +163,7 @@ class LeadCapture:
             'email': lead_data['email'],
             'phone': lead_data.get('phone', '')
         }
-        response = requests.post(config['url'], headers=headers, data=json.dumps(payload), timeout=10)
+        response = self.session.post(config['url'], headers=headers, data=json.dumps(payload), timeout=10)
         if response.status_code != 201:
             raise Exception(f"CRM API returned status {response.status_code}")
 
@@ -101,7 +176,7 @@ class LeadCapture:
             'email': lead_data['email'],
             'name': lead_data['name']
         }
-        response = requests.post(config['url'], headers=headers, data=json.dumps(payload), timeout=10)
+        response = self.session.post(config['url'], headers=headers, data=json.dumps(payload), timeout=10)
         if response.status_code != 200 and response.status_code != 201:
             raise Exception(f"Email marketing API returned status {response.status_code}")
 
@@ -1,11 +1,19 @@
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import List, Dict, Any, Callable
+import heapq
+import itertools
+import logging
+import queue
 import time
 import threading
 import requests
 
+logger = logging.getLogger(__name__)
+
 # Configuration for email and SMS gateways
 EMAIL_HOST = 'smtp.example.com'
 EMAIL_PORT = 587
@@ -14,14 +22,198 @@ EMAIL_HOST_PASSWORD = 'your-email-password'
 SMS_API_URL = 'https://smsprovider.example.com/api/send'
 SMS_API_KEY = 'your-sms-api-key'
 
+# Default send rate for the SMS provider (messages per second)
+SMS_RATE_PER_SECOND = 1.0
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Tokens may be reserved ahead of time: reserve()
+    always succeeds and returns how long the caller has to wait for its token,
+    so queued work can be scheduled for its slot instead of polling.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        rate: tokens added per second
+        capacity: maximum burst (default: one second's worth, at least 1)
+        """
+        if rate <= 0:
+            raise ValueError('rate must be positive')
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens: float = 1) -> float:
+        """Take `tokens` now and return the seconds until they are actually available."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return max(0.0, -self._tokens / self.rate)
+
+    def acquire(self, tokens: float = 1):
+        """Block until `tokens` are available."""
+        wait = self.reserve(tokens)
+        if wait:
+            time.sleep(wait)
+
+
+class _PooledConnection:
+    def __init__(self, server: smtplib.SMTP):
+        self.server = server
+        self.sent = 0
+        self.last_used = time.monotonic()
+
+    def close(self):
+        try:
+            self.server.quit()
+        except Exception:
+            self.server.close()
+
+
+def _connection_lost(error: Exception) -> bool:
+    # SMTPException subclasses OSError, but only disconnects and socket errors end the session
+    return isinstance(error, smtplib.SMTPServerDisconnected) or (
+        isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException))
+
+
+class SMTPConnectionPool:
+    """
+    Keeps up to `size` logged-in SMTP sessions open and reuses them, instead
+    of connecting, starting TLS and authenticating for every message.
+    """
+
+    def __init__(self, host: str, port: int, user: str = None, password: str = None, size: int = 4,
+                 use_tls: bool = True, timeout: float = 30, max_messages: int = 100, max_idle: float = 60):
+        """
+        size: maximum open sessions (and concurrent sends)
+        use_tls: issue STARTTLS after connecting
+        max_messages: messages per session before it is recycled
+        max_idle: seconds a session may sit unused before it is checked with NOOP
+        """
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.max_messages = max_messages
+        self.max_idle = max_idle
+        self.stats = {'connections_opened': 0, 'reconnects': 0, 'messages_sent': 0}
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._stats_lock = threading.Lock()
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _connect(self) -> _PooledConnection:
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.use_tls:
+                server.starttls()
+            if self.password:
+                server.login(self.user, self.password)
+        except Exception:
+            server.close()
+            raise
+        self._count('connections_opened')
+        return _PooledConnection(server)
+
+    def _checkout(self) -> _PooledConnection:
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return self._connect()
+            if time.monotonic() - conn.last_used < self.max_idle:
+                return conn
+            # Servers drop idle sessions; make sure this one is still there
+            try:
+                if conn.server.noop()[0] == 250:
+                    return conn
+            except Exception:
+                pass
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        """Borrow a logged-in smtplib.SMTP session."""
+        self._slots.acquire()
+        conn = None
+        try:
+            conn = self._checkout()
+            yield conn.server
+            conn.sent += 1
+        except Exception as e:
+            if conn is not None:
+                if _connection_lost(e):
+                    conn.server.close()
+                    conn = None
+                else:
+                    # The server refused this message; reset the session and keep it
+                    try:
+                        conn.server.rset()
+                    except Exception:
+                        conn.server.close()
+                        conn = None
+            raise
+        finally:
+            if conn is not None:
+                conn.last_used = time.monotonic()
+                if conn.sent >= self.max_messages:
+                    conn.close()
+                else:
+                    self._idle.put(conn)
+            self._slots.release()
+
+    def sendmail(self, from_addr: str, to_addrs, msg: str):
+        """Send through a pooled session, reconnecting once if the session was lost."""
+        for attempt in range(2):
+            try:
+                with self.connection() as server:
+                    server.sendmail(from_addr, to_addrs, msg)
+                self._count('messages_sent')
+                return
+            except Exception as e:
+                if attempt or not _connection_lost(e):
+                    raise
+                self._count('reconnects')
+
+    def close(self):
+        """Log out of all idle sessions."""
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
 class EmailSender:
-    def __init__(self, host=EMAIL_HOST, port=EMAIL_PORT, user=EMAIL_HOST_USER, password=EMAIL_HOST_PASSWORD):
+    def __init__(self, host=EMAIL_HOST, port=EMAIL_PORT, user=EMAIL_HOST_USER, password=EMAIL_HOST_PASSWORD,
+                 pool_size: int = 4, use_tls: bool = True, rate_per_second: float = None, burst: float = None):
+        """
+        pool_size: persistent SMTP sessions shared by all sends
+        rate_per_second: provider send limit (None for no limit)
+        """
         self.host = host
         self.port = port
         self.user = user
         self.password = password
+        self.pool = SMTPConnectionPool(host, port, user, password, size=pool_size, use_tls=use_tls)
+        self.rate_limiter = TokenBucket(rate_per_second, burst) if rate_per_second else None
 
     def send_email(self, to_email: str, subject: str, html_content: str, text_content: str = None):
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        self._deliver(to_email, subject, html_content, text_content)
+
+    def _deliver(self, to_email: str, subject: str, html_content: str, text_content: str = None):
         msg = MIMEMultipart('alternative')
         msg['From'] = self.user
         msg['To'] = to_email
@@ -37,53 +229,181 @@ class EmailSender:
         msg.attach(part1)
         msg.attach(part2)
 
-        with smtplib.SMTP(self.host, self.port) as server:
-            server.starttls()
-            server.login(self.user, self.password)
-            server.sendmail(self.user, to_email, msg.as_string())
+        self.pool.sendmail(self.user, [to_email], msg.as_string())
+
+    def close(self):
+        self.pool.close()
+
 
 class SMSSender:
-    def __init__(self, api_url=SMS_API_URL, api_key=SMS_API_KEY):
+    def __init__(self, api_url=SMS_API_URL, api_key=SMS_API_KEY,
+                 rate_per_second: float = SMS_RATE_PER_SECOND, burst: float = None, timeout: float = 10):
+        """
+        rate_per_second: provider send limit (None for no limit)
+        """
         self.api_url = api_url
         self.api_key = api_key
+        self.timeout = timeout
+        self.rate_limiter = TokenBucket(rate_per_second, burst) if rate_per_second else None
+        self._local = threading.local()
+
+    def _session(self) -> requests.Session:
+        # Keep-alive connection per thread
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = requests.Session()
+        return session
 
     def send_sms(self, phone_number: str, message: str) -> bool:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+        return self._deliver(phone_number, message)
+
+    def _deliver(self, phone_number: str, message: str) -> bool:
         payload = {
             'api_key': self.api_key,
             'to': phone_number,
             'message': message
         }
-        response = requests.post(self.api_url, json=payload)
+        response = self._session().post(self.api_url, json=payload, timeout=self.timeout)
         return response.status_code == 200
 
+
+class StepScheduler:
+    """
+    Runs due steps from one priority queue on a small worker pool, replacing a
+    sleeping thread per sequence. Steps schedule their own follow-ups.
+    Stopping is final: steps scheduled afterwards are dropped.
+    """
+
+    def __init__(self, workers: int = 8):
+        self.workers = workers
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._slots = threading.Semaphore(workers)
+        self._pending = 0
+        self._stopped = False
+        self._thread = None
+        self._executor = None
+
+    def start(self):
+        with self._cond:
+            if self._stopped:
+                raise RuntimeError('StepScheduler was stopped')
+            if self._thread is not None:
+                return
+            self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix='nurture-step')
+            self._thread = threading.Thread(target=self._run, name='nurture-scheduler', daemon=True)
+            self._thread.start()
+
+    def schedule(self, step: Callable[[], Any], delay: float = 0.0, priority: int = 0):
+        """
+        Run `step` after `delay` seconds; lower priority values go first among
+        due steps. Returns False (dropping the step) once the scheduler is stopped.
+        """
+        with self._cond:
+            if self._stopped:
+                logger.info('Scheduler stopped, dropping nurturing step')
+                return False
+            heapq.heappush(self._heap, (time.monotonic() + delay, priority, next(self._counter), step))
+            self._pending += 1
+            self._cond.notify_all()
+            # Under the (reentrant) lock, so a concurrent stop() cannot slip in between
+            self.start()
+        return True
+
+    def _run(self):
+        while True:
+            # Only take a step off the queue once a worker can run it
+            self._slots.acquire()
+            with self._cond:
+                while not self._stopped:
+                    if self._heap:
+                        wait = self._heap[0][0] - time.monotonic()
+                        if wait <= 0:
+                            break
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+                if self._stopped:
+                    self._slots.release()
+                    return
+                _, priority, _, step = heapq.heappop(self._heap)
+            self._executor.submit(self._execute, step)
+
+    def _execute(self, step):
+        try:
+            step()
+        except Exception:
+            logger.exception('Nurturing step failed')
+        finally:
+            self._slots.release()
+            with self._cond:
+                self._pending -= 1
+                self._cond.notify_all()
+
+    def wait_idle(self, timeout: float = None) -> bool:
+        """Block until every scheduled step has run; False on timeout."""
+        with self._cond:
+            return self._cond.wait_for(lambda: self._pending == 0, timeout)
+
+    def stop(self, wait: bool = True):
+        """
+        Stop taking steps for good; steps not yet started are dropped, as are
+        follow-ups scheduled by steps still running.
+        """
+        with self._cond:
+            self._stopped = True
+            self._pending -= len(self._heap)
+            self._heap.clear()
+            self._cond.notify_all()
+            thread, executor = self._thread, self._executor
+            self._thread = self._executor = None
+        if thread is not None:
+            thread.join()
+            executor.shutdown(wait=wait)
+
+
 class NurturingAutomation:
-    def __init__(self, email_sender: EmailSender, sms_sender: SMSSender):
+    def __init__(self, email_sender: EmailSender, sms_sender: SMSSender, scheduler: StepScheduler = None):
         self.email_sender = email_sender
         self.sms_sender = sms_sender
+        self.scheduler = scheduler or StepScheduler()
+
+    def _rate_limited(self, sender, deliver: Callable[[], Any], priority: int):
+        """Step that takes a token from the sender's bucket and runs in its slot."""
+        def step():
+            wait = sender.rate_limiter.reserve() if sender.rate_limiter is not None else 0.0
+            if wait:
+                self.scheduler.schedule(deliver, wait, priority)
+            else:
+                deliver()
+        return step
 
-    def send_email_sequence(self, user_email: str, sequence: List[Dict[str, Any]]):
+    def send_email_sequence(self, user_email: str, sequence: List[Dict[str, Any]], priority: int = 0):
         """
         sequence: list of dicts with keys: 'subject', 'html_content', 'text_content'(optional), 'delay_seconds'
         """
-        def run_sequence():
-            for step in sequence:
-                self.email_sender.send_email(
-                    user_email,
-                    step['subject'],
-                    step['html_content'],
-                    step.get('text_content')
-                )
-                time.sleep(step.get('delay_seconds', 0))
+        def schedule_step(index, delay):
+            if index >= len(sequence):
+                return
+            step = sequence[index]
 
-        threading.Thread(target=run_sequence).start()
+            def deliver():
+                self.email_sender._deliver(user_email, step['subject'], step['html_content'], step.get('text_content'))
+                # The next step is due `delay_seconds` after this one was sent
+                schedule_step(index + 1, step.get('delay_seconds', 0))
 
-    def send_sms_campaign(self, phone_numbers: List[str], message: str):
-        def send_to_all():
-            for number in phone_numbers:
-                self.sms_sender.send_sms(number, message)
-                time.sleep(1)  # throttle to avoid rate limits
+            self.scheduler.schedule(self._rate_limited(self.email_sender, deliver, priority), delay, priority)
 
-        threading.Thread(target=send_to_all).start()
+        schedule_step(0, 0)
+
+    def send_sms_campaign(self, phone_numbers: List[str], message: str, priority: int = 1):
+        # Spaced by the SMS provider's token bucket rather than a fixed sleep
+        for number in phone_numbers:
+            deliver = lambda number=number: self.sms_sender._deliver(number, message)
+            self.scheduler.schedule(self._rate_limited(self.sms_sender, deliver, priority), 0, priority)
 
     def deliver_personalized_content(self, user_contact: Dict[str, Any], content: Dict[str, Any]):
         """
@@ -99,3 +419,11 @@ class NurturingAutomation:
             )
         if 'phone' in user_contact and content.get('sms_message'):
             self.sms_sender.send_sms(user_contact['phone'], content['sms_message'])
+
+    def wait_until_idle(self, timeout: float = None) -> bool:
+        """Block until all scheduled sequence steps and campaign messages are sent."""
+        return self.scheduler.wait_idle(timeout)
+
+    def shutdown(self):
+        self.scheduler.stop()
+        self.email_sender.close()
@@ -7,6 +7,7 @@ Self-improvement and continuous learning framework for Flowstate-AI.
 from .config import EvolutionConfig, default_config
 from .metrics_collector import MetricsCollector
 from .evolution_manager import EvolutionManager
+from .llm_gateway import LLMGateway, LLMResult, OllamaBackend, FakeLLMBackend
 from .knowledge_manager import VectorKnowledgeManager
 from .code_analyzer import CodeAnalyzer
 from .self_modification_orchestrator import SelfModificationOrchestrator
@@ -27,6 +28,10 @@ __all__ = [
     "default_config",
     "MetricsCollector",
     "EvolutionManager",
+    "LLMGateway",
+    "LLMResult",
+    "OllamaBackend",
+    "FakeLLMBackend",
     "VectorKnowledgeManager",
     "CodeAnalyzer",
     "SelfModificationOrchestrator",
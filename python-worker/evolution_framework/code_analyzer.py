@@ -5,19 +5,181 @@ Analyzes code for complexity, maintainability, and potential issues.
 """
 
 import ast
+import hashlib
+import json
 import logging
-from typing import Dict, List, Any, Optional
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Set, Tuple
 from radon.complexity import cc_visit
 from radon.metrics import mi_visit
 from radon.raw import analyze
 
 
+# Directory names never descended into when walking a project
+DEFAULT_SKIP_DIRS = frozenset({'node_modules', 'venv', '.git', '__pycache__', 'dist', 'build'})
+
+# Bump when the shape of analyze_code() results changes to invalidate cached entries
+CACHE_VERSION = 1
+
+# Below this many files to analyze, a process pool costs more than it saves
+MIN_FILES_FOR_POOL = 8
+
+
+class _StructureVisitor(ast.NodeVisitor):
+    """Counts functions, classes and imports in a single AST traversal."""
+    
+    def __init__(self):
+        self.function_count = 0
+        self.class_count = 0
+        self.import_count = 0
+    
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        self.function_count += 1
+        self.generic_visit(node)
+    
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.class_count += 1
+        self.generic_visit(node)
+    
+    def visit_Import(self, node: ast.Import):
+        self.import_count += 1
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        self.import_count += 1
+
+
+def iter_source_files(
+    project_root: str,
+    extensions: Iterable[str],
+    skip_dirs: Iterable[str] = DEFAULT_SKIP_DIRS
+) -> Iterator[str]:
+    """
+    Yield paths of source files under a project root.
+    
+    Skipped directories are pruned from the walk in place, so their
+    subtrees are never visited.
+    
+    Args:
+        project_root: Root directory of the project
+        extensions: File extensions to include
+        skip_dirs: Directory names to prune from the walk
+        
+    Yields:
+        Paths of matching files
+    """
+    extensions = tuple(extensions)
+    skip_dirs = set(skip_dirs)
+    
+    for root, dirs, files in os.walk(project_root):
+        dirs[:] = [d for d in dirs if d not in skip_dirs]
+        
+        for file in files:
+            if file.endswith(extensions):
+                yield os.path.join(root, file)
+
+
+def _analyze_in_worker(args: Tuple[str, str]) -> Optional[Dict[str, Any]]:
+    """Process-pool entry point: analyze one file's source."""
+    code_content, file_path = args
+    return CodeAnalyzer().analyze_code(code_content, file_path)
+
+
+class AnalysisCache:
+    """
+    Persistent cache of per-file analysis results keyed by content hash.
+    
+    Entries are stored as JSON so the cache survives process restarts and
+    unchanged files can be skipped on the next evolution cycle.
+    """
+    
+    def __init__(self, cache_path: Optional[str] = None):
+        """
+        Initialize the analysis cache.
+        
+        Args:
+            cache_path: JSON file to persist entries to (in-memory only if None)
+        """
+        self.cache_path = cache_path
+        self.logger = logging.getLogger("code_analyzer")
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        self._load()
+    
+    def _load(self):
+        """Load cached entries from disk, discarding incompatible caches."""
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return
+        
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_VERSION:
+                self._entries = data.get("entries", {})
+        except Exception as e:
+            self.logger.warning(f"Ignoring unreadable analysis cache {self.cache_path}: {e}")
+    
+    def get(self, file_path: str, content_hash: str) -> Tuple[bool, Optional[Dict[str, Any]]]:
+        """
+        Look up a cached analysis.
+        
+        Args:
+            file_path: Path of the analyzed file
+            content_hash: Hash of the file's current content
+            
+        Returns:
+            Tuple of (hit, analysis); analysis may be None for files that failed to parse
+        """
+        entry = self._entries.get(file_path)
+        if entry is None or entry.get("hash") != content_hash:
+            return False, None
+        return True, entry.get("analysis")
+    
+    def put(self, file_path: str, content_hash: str, analysis: Optional[Dict[str, Any]]):
+        """Store the analysis for a file's current content."""
+        self._entries[file_path] = {"hash": content_hash, "analysis": analysis}
+        self._dirty = True
+    
+    def prune(self, live_paths: Set[str]):
+        """Drop entries for files under the walked roots that no longer exist."""
+        stale = [path for path in self._entries if path not in live_paths and not os.path.exists(path)]
+        for path in stale:
+            del self._entries[path]
+        if stale:
+            self._dirty = True
+    
+    def save(self):
+        """Persist entries atomically if anything changed."""
+        if not self.cache_path or not self._dirty:
+            return
+        
+        try:
+            directory = os.path.dirname(os.path.abspath(self.cache_path))
+            os.makedirs(directory, exist_ok=True)
+            tmp_path = f"{self.cache_path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"version": CACHE_VERSION, "entries": self._entries}, f)
+            os.replace(tmp_path, self.cache_path)
+            self._dirty = False
+        except Exception as e:
+            self.logger.error(f"Error saving analysis cache {self.cache_path}: {e}")
+
+
 class CodeAnalyzer:
     """Analyzes code quality metrics and identifies improvement opportunities."""
     
-    def __init__(self):
-        """Initialize the code analyzer."""
+    def __init__(self, cache_path: Optional[str] = None, max_workers: Optional[int] = None):
+        """
+        Initialize the code analyzer.
+        
+        Args:
+            cache_path: JSON file used to cache per-file results across runs
+            max_workers: Process pool size for project analysis (default: CPU count)
+        """
         self.logger = logging.getLogger("code_analyzer")
+        self.cache_path = cache_path
+        self.max_workers = max_workers
+        self._cache: Optional[AnalysisCache] = None
     
     def analyze_code(self, code_content: str, file_path: str = "unknown") -> Optional[Dict[str, Any]]:
         """
@@ -34,10 +196,9 @@ class CodeAnalyzer:
             # Parse AST for structural analysis
             tree = ast.parse(code_content)
             
-            # Count structural elements
-            function_count = sum(1 for node in ast.walk(tree) if isinstance(node, ast.FunctionDef))
-            class_count = sum(1 for node in ast.walk(tree) if isinstance(node, ast.ClassDef))
-            import_count = sum(1 for node in ast.walk(tree) if isinstance(node, (ast.Import, ast.ImportFrom)))
+            # Count structural elements in a single pass
+            structure = _StructureVisitor()
+            structure.visit(tree)
             
             # Analyze complexity using Radon
             complexity_results = cc_visit(code_content)
@@ -57,12 +218,7 @@ class CodeAnalyzer:
                 ]
             
             # Analyze maintainability index
-            maintainability_results = mi_visit(code_content, multi=True)
-            maintainability_index = 0
-            
-            if maintainability_results:
-                maintainability_scores = [m for m in maintainability_results]
-                maintainability_index = sum(maintainability_scores) / len(maintainability_scores)
+            maintainability_index = mi_visit(code_content, multi=True)
             
             # Analyze raw metrics
             raw_metrics = analyze(code_content)
@@ -86,9 +242,9 @@ class CodeAnalyzer:
             return {
                 "file_path": file_path,
                 "structure": {
-                    "function_count": function_count,
-                    "class_count": class_count,
-                    "import_count": import_count,
+                    "function_count": structure.function_count,
+                    "class_count": structure.class_count,
+                    "import_count": structure.import_count,
                     "loc": raw_metrics.loc,
                     "lloc": raw_metrics.lloc,
                     "sloc": raw_metrics.sloc,
@@ -261,52 +417,99 @@ class CodeAnalyzer:
         # Ensure score is within bounds
         return max(0, min(100, score))
     
-    def analyze_project(self, project_root: str, extensions: List[str] = None) -> Dict[str, Any]:
+    def _get_cache(self) -> AnalysisCache:
+        """Get the analysis cache, loading it on first use."""
+        if self._cache is None:
+            self._cache = AnalysisCache(self.cache_path)
+        return self._cache
+    
+    def analyze_files(self, file_paths: Iterable[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """
+        Analyze a set of files, reusing cached results for unchanged content.
+        
+        Files whose content hash matches the cache are skipped; the rest are
+        fanned out across a process pool.
+        
+        Args:
+            file_paths: Paths of files to analyze
+            
+        Returns:
+            Mapping of file path to analysis results (None if analysis failed)
+        """
+        cache = self._get_cache()
+        results: Dict[str, Optional[Dict[str, Any]]] = {}
+        pending: List[Tuple[str, str, str]] = []
+        
+        for file_path in file_paths:
+            try:
+                with open(file_path, 'rb') as f:
+                    raw = f.read()
+                content_hash = hashlib.sha256(raw).hexdigest()
+                
+                hit, analysis = cache.get(file_path, content_hash)
+                if hit:
+                    results[file_path] = analysis
+                else:
+                    pending.append((file_path, content_hash, raw.decode('utf-8')))
+            
+            except Exception as e:
+                self.logger.error(f"Error processing {file_path}: {e}")
+        
+        self.logger.info(
+            f"Code analysis: {len(results)} cached, {len(pending)} to analyze"
+        )
+        
+        jobs = [(code_content, file_path) for file_path, _, code_content in pending]
+        
+        if len(jobs) < MIN_FILES_FOR_POOL or self.max_workers == 1:
+            analyses = [self.analyze_code(code_content, file_path) for code_content, file_path in jobs]
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers) as executor:
+                analyses = list(executor.map(_analyze_in_worker, jobs, chunksize=4))
+        
+        for (file_path, content_hash, _), analysis in zip(pending, analyses):
+            cache.put(file_path, content_hash, analysis)
+            results[file_path] = analysis
+        
+        cache.prune(set(results))
+        cache.save()
+        return results
+    
+    def analyze_project(
+        self,
+        project_root: str,
+        extensions: List[str] = None,
+        skip_dirs: Iterable[str] = DEFAULT_SKIP_DIRS
+    ) -> Dict[str, Any]:
         """
         Analyze all code files in a project.
         
         Args:
             project_root: Root directory of the project
             extensions: List of file extensions to analyze (default: ['.py'])
+            skip_dirs: Directory names to prune from the walk
             
         Returns:
             Dictionary with project-wide analysis results
         """
-        import os
-        
         if extensions is None:
             extensions = ['.py']
         
         self.logger.info(f"Analyzing project: {project_root}")
         
+        analyses = self.analyze_files(iter_source_files(project_root, extensions, skip_dirs))
+        
         file_analyses = []
         total_loc = 0
         total_issues = 0
         quality_scores = []
         
-        for root, _, files in os.walk(project_root):
-            # Skip certain directories
-            if any(skip in root for skip in ['node_modules', 'venv', '.git', '__pycache__', 'dist', 'build']):
-                continue
-            
-            for file in files:
-                if any(file.endswith(ext) for ext in extensions):
-                    file_path = os.path.join(root, file)
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            code_content = f.read()
-                        
-                        analysis = self.analyze_code(code_content, file_path)
-                        
-                        if analysis:
-                            file_analyses.append(analysis)
-                            total_loc += analysis['structure']['loc']
-                            total_issues += len(analysis['issues'])
-                            quality_scores.append(analysis['quality_score'])
-                    
-                    except Exception as e:
-                        self.logger.error(f"Error processing {file_path}: {e}")
+        for analysis in analyses.values():
+            if analysis:
+                file_analyses.append(analysis)
+                total_loc += analysis['structure']['loc']
+                total_issues += len(analysis['issues'])
+                quality_scores.append(analysis['quality_score'])
         
         # Calculate project-wide metrics
         average_quality_score = sum(quality_scores) / len(quality_scores) if quality_scores else 0
@@ -326,4 +529,3 @@ class CodeAnalyzer:
             "files_needing_attention": files_needing_attention[:10],  # Top 10
             "file_analyses": file_analyses
         }
-
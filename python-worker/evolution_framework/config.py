@@ -34,6 +34,11 @@ class EvolutionConfig:
     cost_budget_per_operation_limit: float = 0.50  # USD
     use_local_llm: bool = True  # Prioritize local LLMs for cost savings
     local_llm_endpoint: str = field(default_factory=lambda: os.getenv("LOCAL_LLM_ENDPOINT", "http://localhost:11434"))
+    local_llm_model: str = field(default_factory=lambda: os.getenv("LOCAL_LLM_MODEL", "llama2"))
+    llm_timeout_seconds: float = 30.0
+    llm_max_concurrency: int = 4  # Backend calls in flight at once
+    llm_cache_size: int = 1024  # Cached prompt responses (0 disables caching)
+    llm_cache_ttl_seconds: float = 3600.0
     
     # Modification boundaries
     allowed_modifications: List[str] = field(default_factory=lambda: [
@@ -54,6 +59,8 @@ class EvolutionConfig:
     cycle_interval_minutes: int = 60  # How often to run evolution cycles
     max_modifications_per_cycle: int = 3
     require_validation: bool = True
+    analysis_cache_path: str = field(default_factory=lambda: os.getenv("EVOLUTION_ANALYSIS_CACHE", ".evolution_cache/code_analysis.json"))
+    analysis_max_workers: int = field(default_factory=lambda: int(os.getenv("EVOLUTION_ANALYSIS_WORKERS", "0")))  # 0 = CPU count
     
     # Monitoring and logging
     log_level: str = field(default_factory=lambda: os.getenv("LOG_LEVEL", "INFO"))
@@ -85,11 +92,18 @@ class EvolutionConfig:
             "cost_budget_per_operation_limit": self.cost_budget_per_operation_limit,
             "use_local_llm": self.use_local_llm,
             "local_llm_endpoint": self.local_llm_endpoint,
+            "local_llm_model": self.local_llm_model,
+            "llm_timeout_seconds": self.llm_timeout_seconds,
+            "llm_max_concurrency": self.llm_max_concurrency,
+            "llm_cache_size": self.llm_cache_size,
+            "llm_cache_ttl_seconds": self.llm_cache_ttl_seconds,
             "allowed_modifications": self.allowed_modifications,
             "human_oversight_required": self.human_oversight_required,
             "cycle_interval_minutes": self.cycle_interval_minutes,
             "max_modifications_per_cycle": self.max_modifications_per_cycle,
             "require_validation": self.require_validation,
+            "analysis_cache_path": self.analysis_cache_path,
+            "analysis_max_workers": self.analysis_max_workers,
             "log_level": self.log_level,
             "metrics_retention_days": self.metrics_retention_days,
             "enable_detailed_logging": self.enable_detailed_logging,
@@ -107,6 +121,12 @@ class EvolutionConfig:
         if self.metrics_window < 10:
             raise ValueError("metrics_window must be at least 10")
         
+        if self.llm_max_concurrency < 1:
+            raise ValueError("llm_max_concurrency must be at least 1")
+        
+        if self.analysis_max_workers < 0:
+            raise ValueError("analysis_max_workers must be non-negative")
+        
         if not self.database_url:
             raise ValueError("database_url is required")
         
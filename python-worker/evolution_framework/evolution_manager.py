@@ -10,26 +10,38 @@ from datetime import datetime
 from typing import Dict, List, Any, Optional
 import psycopg2
 from psycopg2.extras import Json
-import requests
 from .config import EvolutionConfig
+from .llm_gateway import LLMGateway, OllamaBackend
 from .metrics_collector import MetricsCollector
 
 
 class EvolutionManager:
     """Manages the evolution process for Flowstate-AI."""
     
-    def __init__(self, config: Optional[EvolutionConfig] = None):
+    def __init__(self, config: Optional[EvolutionConfig] = None, llm_gateway: Optional[LLMGateway] = None):
         """
         Initialize the evolution manager.
         
         Args:
             config: Evolution framework configuration
+            llm_gateway: Gateway for LLM calls (defaults to a pooled Ollama gateway)
         """
         self.config = config or EvolutionConfig()
         self.config.validate()
         self.logger = logging.getLogger("evolution_manager")
         self.metrics_collector = MetricsCollector("evolution_manager", self.config)
         self._conn = None
+        self.llm_gateway = llm_gateway or LLMGateway(
+            OllamaBackend(
+                self.config.local_llm_endpoint,
+                timeout=self.config.llm_timeout_seconds,
+                max_connections=self.config.llm_max_concurrency
+            ),
+            default_model=self.config.local_llm_model,
+            max_concurrency=self.config.llm_max_concurrency,
+            cache_size=self.config.llm_cache_size,
+            cache_ttl_seconds=self.config.llm_cache_ttl_seconds
+        )
         
         self.logger.info("Evolution Manager initialized")
         if self.config.safe_mode:
@@ -391,27 +403,26 @@ class EvolutionManager:
             return None
         
         try:
-            # Assuming Ollama-compatible API
-            response = requests.post(
-                f"{self.config.local_llm_endpoint}/api/generate",
-                json={
-                    "model": "llama2",  # Default model
-                    "prompt": prompt,
-                    "stream": False
-                },
-                timeout=30
+            # Pooled, cached and deduplicated through the LLM gateway
+            result = self.llm_gateway.generate_sync(
+                prompt,
+                timeout=self.config.llm_timeout_seconds
             )
-            
-            if response.status_code == 200:
-                return response.json().get("response")
-            else:
-                self.logger.error(f"LLM request failed: {response.status_code}")
-                return None
+            return result.text
                 
         except Exception as e:
             self.logger.error(f"Error getting LLM response: {e}")
             return None
     
+    def get_llm_metrics(self) -> Dict[str, Any]:
+        """
+        Get token, latency and cache metrics for LLM calls.
+        
+        Returns:
+            Dictionary of LLM gateway metrics
+        """
+        return self.llm_gateway.get_metrics()
+    
     def __del__(self):
         """Close database connection on cleanup."""
         if self._conn and not self._conn.closed:
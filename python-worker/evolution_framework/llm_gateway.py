@@ -0,0 +1,353 @@
+"""
+LLM Gateway
+
+Shared access point for LLM calls made by the Evolution Framework, with
+connection pooling, bounded concurrency, response caching, in-flight request
+deduplication and token/latency accounting.
+"""
+
+import abc
+import asyncio
+import hashlib
+import logging
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+
+@dataclass
+class LLMResult:
+    """A single completion returned by an LLM backend."""
+
+    text: str
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+
+class LLMBackend(abc.ABC):
+    """Interface for LLM backends used by the gateway."""
+
+    @abc.abstractmethod
+    async def generate(self, prompt: str, model: str) -> LLMResult:
+        """Generate a completion for a prompt."""
+
+    async def close(self):
+        """Release backend resources."""
+
+
+class OllamaBackend(LLMBackend):
+    """
+    Ollama-compatible backend using a pooled keep-alive HTTP client.
+
+    An httpx async pool belongs to the event loop that opened it, so each
+    loop that calls the backend gets its own client.
+    """
+
+    def __init__(self, endpoint: str, timeout: float = 30.0, max_connections: int = 8):
+        """
+        Initialize the Ollama backend.
+
+        Args:
+            endpoint: Base URL of the Ollama server
+            timeout: Request timeout in seconds
+            max_connections: Size of the HTTP connection pool
+        """
+        self.endpoint = endpoint.rstrip("/")
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self._clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+            weakref.WeakKeyDictionary()
+        )
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Get the running loop's pooled client, creating it on first use."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.get(loop)
+        if client is None:
+            client = self._clients[loop] = httpx.AsyncClient(
+                base_url=self.endpoint,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=self.max_connections
+                )
+            )
+        return client
+
+    async def generate(self, prompt: str, model: str) -> LLMResult:
+        response = await self._get_client().post(
+            "/api/generate",
+            json={"model": model, "prompt": prompt, "stream": False}
+        )
+        response.raise_for_status()
+        data = response.json()
+        return LLMResult(
+            text=data.get("response", ""),
+            prompt_tokens=data.get("prompt_eval_count", 0),
+            completion_tokens=data.get("eval_count", 0)
+        )
+
+    async def close(self):
+        """Close the running loop's client; clients of closed loops are discarded."""
+        loop = asyncio.get_running_loop()
+        client = self._clients.pop(loop, None)
+        if client is not None:
+            await client.aclose()
+        for other in [other for other in self._clients if other.is_closed()]:
+            del self._clients[other]
+
+
+class FakeLLMBackend(LLMBackend):
+    """
+    Deterministic offline backend for tests and benchmarks.
+
+    Responses are derived from a hash of the prompt and model, and token
+    counts from whitespace-separated words, so identical inputs always
+    produce identical outputs.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        """
+        Initialize the fake backend.
+
+        Args:
+            latency: Simulated seconds per call
+        """
+        self.latency = latency
+        self.calls = 0
+
+    async def generate(self, prompt: str, model: str) -> LLMResult:
+        self.calls += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        digest = hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()[:16]
+        text = f"[{model}] response {digest}"
+        return LLMResult(
+            text=text,
+            prompt_tokens=len(prompt.split()),
+            completion_tokens=len(text.split())
+        )
+
+
+class _LoopState:
+    """Gateway state tied to one event loop: its concurrency limit and in-flight calls."""
+
+    def __init__(self, max_concurrency: int):
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight: Dict[str, asyncio.Future] = {}
+
+
+class LLMGateway:
+    """
+    Caching, deduplicating, concurrency-bounded front for an LLM backend.
+
+    The cache is shared by every caller. Semaphores and futures belong to an
+    event loop, so the concurrency limit and in-flight deduplication apply
+    per loop; synchronous callers all share the gateway's background loop.
+    """
+
+    def __init__(
+        self,
+        backend: LLMBackend,
+        default_model: str = "llama2",
+        max_concurrency: int = 4,
+        cache_size: int = 1024,
+        cache_ttl_seconds: Optional[float] = 3600.0
+    ):
+        """
+        Initialize the LLM gateway.
+
+        Args:
+            backend: Backend that performs the actual generation
+            default_model: Model used when a call does not specify one
+            max_concurrency: Maximum backend calls in flight at once
+            cache_size: Maximum number of cached responses (0 disables caching)
+            cache_ttl_seconds: Lifetime of cached responses (None for no expiry)
+        """
+        self.backend = backend
+        self.default_model = default_model
+        self.max_concurrency = max_concurrency
+        self.cache_size = cache_size
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self.logger = logging.getLogger("llm_gateway")
+
+        self._cache: "OrderedDict[str, Tuple[float, LLMResult]]" = OrderedDict()
+        self._loop_states: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, _LoopState]" = (
+            weakref.WeakKeyDictionary()
+        )
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread: Optional[threading.Thread] = None
+        self._loop_lock = threading.Lock()
+
+        self._metrics = {
+            "requests": 0,
+            "cache_hits": 0,
+            "deduplicated": 0,
+            "backend_calls": 0,
+            "errors": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "backend_latency_total": 0.0,
+            "backend_latency_max": 0.0
+        }
+
+    @staticmethod
+    def cache_key(prompt: str, model: str) -> str:
+        """Build the cache/dedup key for a prompt and model."""
+        return hashlib.sha256(f"{model}\0{prompt}".encode("utf-8")).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[LLMResult]:
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if self.cache_ttl_seconds is not None and time.monotonic() - stored_at > self.cache_ttl_seconds:
+            del self._cache[key]
+            return None
+        self._cache.move_to_end(key)
+        return result
+
+    def _cache_put(self, key: str, result: LLMResult):
+        if self.cache_size <= 0:
+            return
+        self._cache[key] = (time.monotonic(), result)
+        self._cache.move_to_end(key)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+
+    async def generate(self, prompt: str, model: Optional[str] = None) -> LLMResult:
+        """
+        Generate a completion, serving from cache or an identical in-flight call when possible.
+
+        Args:
+            prompt: Prompt to send to the LLM
+            model: Model name (defaults to the gateway's default model)
+
+        Returns:
+            The LLM result
+        """
+        model = model or self.default_model
+        key = self.cache_key(prompt, model)
+        self._metrics["requests"] += 1
+
+        cached = self._cache_get(key)
+        if cached is not None:
+            self._metrics["cache_hits"] += 1
+            return cached
+
+        state = self._loop_state()
+        pending = state.in_flight.get(key)
+        if pending is not None:
+            self._metrics["deduplicated"] += 1
+            return await asyncio.shield(pending)
+
+        future = asyncio.get_running_loop().create_future()
+        state.in_flight[key] = future
+        try:
+            result = await self._call_backend(state, prompt, model)
+            self._cache_put(key, result)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so waiter-less failures are not reported as unhandled
+            future.exception()
+            raise
+        finally:
+            del state.in_flight[key]
+
+    def _loop_state(self) -> _LoopState:
+        loop = asyncio.get_running_loop()
+        state = self._loop_states.get(loop)
+        if state is None:
+            state = self._loop_states[loop] = _LoopState(self.max_concurrency)
+        return state
+
+    async def _call_backend(self, state: _LoopState, prompt: str, model: str) -> LLMResult:
+        async with state.semaphore:
+            start = time.perf_counter()
+            try:
+                result = await self.backend.generate(prompt, model)
+            except Exception:
+                self._metrics["errors"] += 1
+                raise
+            finally:
+                latency = time.perf_counter() - start
+                self._metrics["backend_calls"] += 1
+                self._metrics["backend_latency_total"] += latency
+                self._metrics["backend_latency_max"] = max(self._metrics["backend_latency_max"], latency)
+
+        self._metrics["prompt_tokens"] += result.prompt_tokens
+        self._metrics["completion_tokens"] += result.completion_tokens
+        return result
+
+    async def generate_many(self, prompts: List[str], model: Optional[str] = None) -> List[Optional[LLMResult]]:
+        """
+        Generate completions for a batch of prompts concurrently.
+
+        Args:
+            prompts: Prompts to send
+            model: Model name for every prompt
+
+        Returns:
+            Results in prompt order; None for prompts that failed
+        """
+        results = await asyncio.gather(
+            *(self.generate(prompt, model) for prompt in prompts),
+            return_exceptions=True
+        )
+        return [None if isinstance(r, BaseException) else r for r in results]
+
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        """Start the gateway's background event loop for synchronous callers."""
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop_thread = threading.Thread(
+                    target=self._loop.run_forever,
+                    name="llm-gateway-loop",
+                    daemon=True
+                )
+                self._loop_thread.start()
+        return self._loop
+
+    def generate_sync(self, prompt: str, model: Optional[str] = None, timeout: Optional[float] = None) -> LLMResult:
+        """
+        Blocking wrapper around generate() for synchronous code.
+
+        Calls from any thread share the gateway's connection pool, cache,
+        dedup table and concurrency limit by running on one background loop.
+        """
+        future = asyncio.run_coroutine_threadsafe(self.generate(prompt, model), self._ensure_loop())
+        try:
+            return future.result(timeout)
+        except TimeoutError:
+            # Stop the call on the loop instead of leaving it holding a slot
+            future.cancel()
+            raise
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Get token, latency and cache accounting for the gateway."""
+        metrics = dict(self._metrics)
+        calls = metrics["backend_calls"]
+        requests_served = metrics["requests"]
+        metrics["backend_latency_avg"] = metrics["backend_latency_total"] / calls if calls else 0.0
+        metrics["cache_hit_rate"] = metrics["cache_hits"] / requests_served if requests_served else 0.0
+        metrics["cache_entries"] = len(self._cache)
+        metrics["in_flight"] = sum(len(state.in_flight) for state in list(self._loop_states.values()))
+        return metrics
+
+    def close(self):
+        """Close the backend and stop the background loop, if started."""
+        with self._loop_lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            asyncio.run_coroutine_threadsafe(self.backend.close(), loop).result()
+            loop.call_soon_threadsafe(loop.stop)
+            self._loop_thread.join()
+            loop.close()
@@ -7,15 +7,19 @@ Orchestrates autonomous code improvements and self-modification.
 import os
 import logging
 import json
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
 from datetime import datetime
 from .evolution_manager import EvolutionManager
 from .knowledge_manager import VectorKnowledgeManager
 from .metrics_collector import MetricsCollector
-from .code_analyzer import CodeAnalyzer
+from .code_analyzer import CodeAnalyzer, DEFAULT_SKIP_DIRS, iter_source_files
 from .config import EvolutionConfig
 
 
+# Called as progress_callback(stage, completed, total); may raise to abort the cycle
+ProgressCallback = Callable[[str, int, int], None]
+
+
 class SelfModificationOrchestrator:
     """Orchestrates the self-modification process for autonomous improvements."""
     
@@ -32,7 +36,10 @@ class SelfModificationOrchestrator:
         self.evolution_manager = EvolutionManager(config)
         self.knowledge_manager = VectorKnowledgeManager(config)
         self.metrics_collector = MetricsCollector()
-        self.code_analyzer = CodeAnalyzer()
+        self.code_analyzer = CodeAnalyzer(
+            cache_path=self.config.analysis_cache_path,
+            max_workers=self.config.analysis_max_workers or None
+        )
         self.logger = logging.getLogger("self_modification_orchestrator")
         
         # Track modifications
@@ -58,45 +65,35 @@ class SelfModificationOrchestrator:
         
         opportunities = []
         
-        # Analyze Python files in the project
-        for root, _, files in os.walk(self.project_root):
-            # Skip certain directories
-            if any(skip in root for skip in [
-                'node_modules', 'venv', '.git', '__pycache__',
-                'dist', 'build', 'evolution_framework'  # Don't modify self
-            ]):
-                continue
-            
-            for file in files:
-                if file.endswith('.py'):
-                    file_path = os.path.join(root, file)
-                    
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as f:
-                            code_content = f.read()
-                        
-                        # Analyze code quality
-                        analysis = self.code_analyzer.analyze_code(code_content, file_path)
-                        
-                        if analysis and analysis['quality_score'] < min_quality_score:
-                            # Search knowledge base for similar improvements
-                            knowledge_results = self.knowledge_manager.search_knowledge(
-                                f"code improvement for {file}",
-                                category="pattern",
-                                limit=3
-                            )
-                            
-                            opportunities.append({
-                                "file_path": file_path,
-                                "quality_score": analysis['quality_score'],
-                                "issues": analysis['issues'],
-                                "analysis": analysis,
-                                "related_knowledge": knowledge_results,
-                                "priority": self._calculate_priority(analysis)
-                            })
+        # Analyze Python files in the project (unchanged files come from the cache)
+        file_paths = iter_source_files(
+            self.project_root,
+            ['.py'],
+            skip_dirs=DEFAULT_SKIP_DIRS | {'evolution_framework'}  # Don't modify self
+        )
+        analyses = self.code_analyzer.analyze_files(file_paths)
+        
+        for file_path, analysis in analyses.items():
+            if analysis and analysis['quality_score'] < min_quality_score:
+                try:
+                    # Search knowledge base for similar improvements
+                    knowledge_results = self.knowledge_manager.search_knowledge(
+                        f"code improvement for {os.path.basename(file_path)}",
+                        category="pattern",
+                        limit=3
+                    )
                     
-                    except Exception as e:
-                        self.logger.error(f"Error processing {file_path}: {e}")
+                    opportunities.append({
+                        "file_path": file_path,
+                        "quality_score": analysis['quality_score'],
+                        "issues": analysis['issues'],
+                        "analysis": analysis,
+                        "related_knowledge": knowledge_results,
+                        "priority": self._calculate_priority(analysis)
+                    })
+                
+                except Exception as e:
+                    self.logger.error(f"Error processing {file_path}: {e}")
         
         # Sort by priority and limit
         opportunities.sort(key=lambda x: x['priority'], reverse=True)
@@ -399,7 +396,8 @@ class SelfModificationOrchestrator:
         self,
         min_quality_score: float = 70.0,
         max_modifications: int = 5,
-        auto_apply: bool = False
+        auto_apply: bool = False,
+        progress_callback: Optional[ProgressCallback] = None
     ) -> Dict[str, Any]:
         """
         Execute a complete self-modification cycle.
@@ -408,30 +406,41 @@ class SelfModificationOrchestrator:
             min_quality_score: Minimum quality score threshold
             max_modifications: Maximum number of modifications to apply
             auto_apply: Whether to automatically apply validated modifications
+            progress_callback: Called between steps with (stage, completed, total).
+                Exceptions it raises abort the cycle, which is how callers cancel
+                without interrupting a file write.
             
         Returns:
             Summary of the modification cycle
         """
+        def report(stage: str, completed: int, total: int):
+            if progress_callback:
+                progress_callback(stage, completed, total)
+        
         self.logger.info("Starting self-modification cycle")
         self.metrics_collector.start_timer("self_modification_cycle")
         
         # Identify opportunities
+        report("scanning", 0, 1)
         opportunities = self.identify_improvement_opportunities(
             min_quality_score=min_quality_score,
             max_opportunities=max_modifications
         )
+        report("scanning", 1, 1)
         
         proposed_modifications = []
         applied_modifications = []
         
         # Propose modifications
-        for opportunity in opportunities:
+        for index, opportunity in enumerate(opportunities):
+            report("proposing", index, len(opportunities))
             modification = self.propose_modification(opportunity)
             if modification:
                 proposed_modifications.append(modification)
         
         # Validate and optionally apply modifications
-        for modification in proposed_modifications:
+        for index, modification in enumerate(proposed_modifications):
+            report("applying", index, len(proposed_modifications))
             if self.validate_modification(modification):
                 if auto_apply:
                     if self.apply_modification(modification):
@@ -0,0 +1,216 @@
+import logging
+import multiprocessing
+import threading
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+TERMINAL_STATUSES = (COMPLETED, FAILED, CANCELLED)
+
+# Orchestrator reused across cycles inside each worker process
+_worker_orchestrator = None
+
+
+class JobQueueFullError(Exception):
+    """Raised when too many evolution cycles are already queued or running."""
+
+
+class CycleCancelledError(Exception):
+    """Raised inside a worker process to abort a cycle that was cancelled."""
+
+
+def run_self_modification_cycle(project_root: str, params: Dict[str, Any], progress_callback) -> Dict[str, Any]:
+    """Default job runner: execute one self-modification cycle in a worker process."""
+    global _worker_orchestrator
+    from evolution_framework.self_modification_orchestrator import SelfModificationOrchestrator
+
+    if _worker_orchestrator is None or _worker_orchestrator.project_root != project_root:
+        _worker_orchestrator = SelfModificationOrchestrator(project_root=project_root)
+    return _worker_orchestrator.run_self_modification_cycle(progress_callback=progress_callback, **params)
+
+
+def _execute_job(runner: Callable, project_root: str, params: Dict[str, Any], job_id: str, progress, cancel_flags) -> Dict[str, Any]:
+    """Worker-process entry point that wires progress reporting and cancellation into a runner.
+
+    The progress entry also carries the real start time, so the service can
+    mark the job running whether or not anyone polls it while it runs.
+    """
+    started_at = datetime.now().isoformat()
+    progress[job_id] = {"status": RUNNING, "started_at": started_at, "stage": "starting", "completed": 0, "total": 0}
+
+    def progress_callback(stage: str, completed: int, total: int):
+        if cancel_flags.get(job_id):
+            raise CycleCancelledError(f"Job {job_id} cancelled during {stage}")
+        progress[job_id] = {
+            "status": RUNNING, "started_at": started_at, "stage": stage, "completed": completed, "total": total
+        }
+
+    return runner(project_root, params, progress_callback)
+
+
+class EvolutionJobService:
+    """Runs self-modification cycles as background jobs in a worker process pool.
+
+    Cycles never execute on the API process: the request handler only submits
+    a job and returns its id, so the event loop (and the GIL) stay free for the
+    request path while radon analysis, LLM calls and file writes run elsewhere.
+    """
+
+    def __init__(
+        self,
+        project_root: str,
+        max_workers: int = 1,
+        max_pending_jobs: int = 4,
+        runner: Callable = run_self_modification_cycle,
+    ):
+        self.project_root = project_root
+        self.max_workers = max_workers
+        self.max_pending_jobs = max_pending_jobs
+        self.runner = runner
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._manager = None
+        self._progress = None
+        self._cancel_flags = None
+
+    def start(self):
+        """Start the worker pool and manager process now rather than on the first submit.
+
+        Spawning them blocks for a while, so async apps call this at startup
+        off the event loop (e.g. through asyncio.to_thread).
+        """
+        with self._lock:
+            self._ensure_started()
+
+    def _ensure_started(self):
+        """Start the worker pool and shared progress state on first use; callers hold the lock."""
+        if self._executor is None:
+            self._manager = multiprocessing.Manager()
+            self._progress = self._manager.dict()
+            self._cancel_flags = self._manager.dict()
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def submit_cycle(self, **params) -> Dict[str, Any]:
+        """Queue a self-modification cycle and return its job record."""
+        with self._lock:
+            active = sum(1 for job in self._jobs.values() if job["status"] not in TERMINAL_STATUSES)
+            if active >= self.max_pending_jobs:
+                raise JobQueueFullError(f"{active} evolution cycles already queued or running")
+
+            self._ensure_started()
+            job_id = str(uuid.uuid4())
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": QUEUED,
+                "params": params,
+                "submitted_at": datetime.now().isoformat(),
+                "started_at": None,
+                "finished_at": None,
+                "result": None,
+                "error": None,
+            }
+            future = self._executor.submit(
+                _execute_job, self.runner, self.project_root, params, job_id, self._progress, self._cancel_flags
+            )
+            self._futures[job_id] = future
+
+        future.add_done_callback(lambda f, job_id=job_id: self._on_job_done(job_id, f))
+        logger.info(f"Queued evolution cycle {job_id}")
+        return self.get_job(job_id)
+
+    def _mark_started(self, job_id: str, progress: Dict[str, Any]):
+        """Copy the worker's start record onto the job; callers hold the lock."""
+        job = self._jobs[job_id]
+        if job["started_at"] is None:
+            job["started_at"] = progress["started_at"]
+        if job["status"] == QUEUED:
+            job["status"] = progress["status"]
+
+    def _on_job_done(self, job_id: str, future: Future):
+        """Record the outcome of a finished, failed or cancelled job."""
+        progress = self._progress.get(job_id) if self._manager is not None else None
+        with self._lock:
+            job = self._jobs[job_id]
+            if progress is not None:
+                self._mark_started(job_id, progress)
+            job["finished_at"] = datetime.now().isoformat()
+            if future.cancelled():
+                job["status"] = CANCELLED
+            else:
+                error = future.exception()
+                if isinstance(error, CycleCancelledError):
+                    job["status"] = CANCELLED
+                elif error is not None:
+                    job["status"] = FAILED
+                    job["error"] = str(error)
+                else:
+                    job["status"] = COMPLETED
+                    job["result"] = future.result()
+            self._futures.pop(job_id, None)
+
+        if self._manager is not None:
+            self._progress.pop(job_id, None)
+            self._cancel_flags.pop(job_id, None)
+        logger.info(f"Evolution cycle {job_id} finished with status {job['status']}")
+
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job's status, including live progress for running jobs."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            job = dict(job)
+
+        if job["status"] not in TERMINAL_STATUSES and self._manager is not None:
+            progress = self._progress.get(job_id)
+            if progress is not None:
+                progress = dict(progress)
+                with self._lock:
+                    self._mark_started(job_id, progress)
+                    job["status"] = self._jobs[job_id]["status"]
+                    job["started_at"] = self._jobs[job_id]["started_at"]
+                job["progress"] = {key: progress[key] for key in ("stage", "completed", "total")}
+        return job
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """List all known jobs, newest first."""
+        with self._lock:
+            job_ids = list(self._jobs)
+        return [self.get_job(job_id) for job_id in reversed(job_ids)]
+
+    def cancel_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Cancel a job.
+
+        Queued jobs are dropped immediately; running jobs stop at the next step
+        boundary of the cycle, so a modification is never left half-written.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            future = self._futures.get(job_id)
+
+        if job["status"] not in TERMINAL_STATUSES:
+            if future is None or not future.cancel():
+                self._cancel_flags[job_id] = True
+        return self.get_job(job_id)
+
+    def shutdown(self):
+        """Stop the worker pool, cancelling jobs that have not started."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
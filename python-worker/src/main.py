@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import os
@@ -11,18 +12,22 @@ from pydantic import BaseModel
 import httpx
 BACKEND_API_URL = os.getenv("BACKEND_API_URL", "http://localhost:3001")
 from ai_gods.logging_config import setup_logging
-from evolution_framework.self_modification_orchestrator import SelfModificationOrchestrator
 from evolution_framework.evolution_governor import EvolutionGovernor
 from evolution_framework.evolution_manager import FlowstateEvolutionManager
 from evolution_framework.anomaly_detector import AnomalyDetector
 from evolution_framework.metrics_collector import MetricsCollector
+from services.evolution_job_service import EvolutionJobService, JobQueueFullError
 app = FastAPI(title="Flowstate-AI Worker", version="1.0.0")
 # Initialize Evolution Framework components
 metrics_collector = MetricsCollector("python_worker")
 evolution_manager = FlowstateEvolutionManager()
 anomaly_detector = AnomalyDetector(metrics_collector)
 evolution_governor = EvolutionGovernor(evolution_manager, anomaly_detector, metrics_collector)
-self_modification_orchestrator = SelfModificationOrchestrator(project_root="/home/ubuntu/Flowstate-AI", config_path=None)
+# Self-modification cycles run in a separate worker process so they never block request handling
+evolution_jobs = EvolutionJobService(
+    project_root=os.getenv("EVOLUTION_PROJECT_ROOT", "/home/ubuntu/Flowstate-AI"),
+    max_workers=int(os.getenv("EVOLUTION_MAX_WORKERS", "1")),
+)
 
 # CORS middleware
 app.add_middleware(
@@ -45,6 +50,11 @@ class NBARequest(BaseModel):
     customer_id: Optional[str] = None
     limit: int = 10
 
+class ExperimentationRequest(BaseModel):
+    min_quality_score: float = 70.0
+    max_modifications: int = 5
+    auto_apply: bool = False
+
 @app.get("/")
 async def root():
     return {
@@ -144,18 +154,55 @@ async def analyze_customer_data():
         logger.error(f"Error analyzing customer data: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.post("/autonomous-experimentation")
-async def run_autonomous_experimentation():
-    """Trigger a cycle of autonomous experimentation and self-modification."""
+@app.post("/autonomous-experimentation", status_code=202)
+async def run_autonomous_experimentation(request: Optional[ExperimentationRequest] = None):
+    """Queue a cycle of autonomous experimentation and self-modification as a background job."""
+    request = request or ExperimentationRequest()
     try:
-        logger.info("Initiating autonomous experimentation cycle...")
-        self_modification_orchestrator.run_self_modification_cycle()
-        logger.info("Autonomous experimentation cycle completed.")
-        return {"status": "success", "message": "Autonomous experimentation cycle initiated."}
+        # Off the event loop: submitting may wait on the service lock or start the worker pool
+        job = await asyncio.to_thread(evolution_jobs.submit_cycle, **request.model_dump())
+        logger.info(f"Autonomous experimentation cycle queued as job {job['job_id']}")
+        return {
+            "status": job["status"],
+            "job_id": job["job_id"],
+            "message": "Autonomous experimentation cycle queued.",
+        }
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
     except Exception as e:
-        logger.error(f"Error during autonomous experimentation: {e}")
+        logger.error(f"Error queueing autonomous experimentation: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.get("/autonomous-experimentation/jobs")
+async def list_experimentation_jobs():
+    """List autonomous experimentation jobs"""
+    return {"jobs": evolution_jobs.list_jobs()}
+
+@app.get("/autonomous-experimentation/jobs/{job_id}")
+async def get_experimentation_job(job_id: str):
+    """Get status and progress of an autonomous experimentation job"""
+    job = evolution_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.delete("/autonomous-experimentation/jobs/{job_id}")
+async def cancel_experimentation_job(job_id: str):
+    """Cancel a queued or running autonomous experimentation job"""
+    job = evolution_jobs.cancel_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@app.on_event("startup")
+async def start_evolution_jobs():
+    # Spawning the worker pool and manager process blocks, so do it before serving, off the loop
+    await asyncio.to_thread(evolution_jobs.start)
+
+@app.on_event("shutdown")
+async def shutdown_evolution_jobs():
+    evolution_jobs.shutdown()
+
 if __name__ == "__main__":
     port = int(os.getenv("PYTHON_API_PORT", 8000))
     uvicorn.run(app, host="0.0.0.0", port=port)
@@ -1,6 +1,7 @@
 import unittest
 import sys
 import os
+import tempfile
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
@@ -33,6 +34,45 @@ def simple_function():
         self.assertIn("complexity", result)
         self.assertIn("maintainability", result)
     
+    def test_code_analyzer_structure_counts(self):
+        """Test single-pass structural counts"""
+        analyzer = CodeAnalyzer()
+        test_code = """
+import os
+from sys import path
+
+class A:
+    def method(self):
+        def inner():
+            return 1
+        return inner()
+"""
+        result = analyzer.analyze_code(test_code)
+        self.assertEqual(result["structure"]["function_count"], 2)
+        self.assertEqual(result["structure"]["class_count"], 1)
+        self.assertEqual(result["structure"]["import_count"], 2)
+    
+    def test_analyze_project_prunes_and_caches(self):
+        """Test that skipped dirs are pruned and unchanged files come from the cache"""
+        with tempfile.TemporaryDirectory() as project_root:
+            os.makedirs(os.path.join(project_root, "pkg"))
+            os.makedirs(os.path.join(project_root, "node_modules", "dep"))
+            with open(os.path.join(project_root, "pkg", "mod.py"), "w") as f:
+                f.write("def f():\n    return 1\n")
+            with open(os.path.join(project_root, "node_modules", "dep", "skip.py"), "w") as f:
+                f.write("def g():\n    return 2\n")
+            
+            cache_path = os.path.join(project_root, "cache.json")
+            result = CodeAnalyzer(cache_path=cache_path).analyze_project(project_root)
+            self.assertEqual(result["total_files"], 1)
+            self.assertTrue(os.path.exists(cache_path))
+            
+            # A fresh analyzer reuses the persisted result without re-analyzing
+            analyzer = CodeAnalyzer(cache_path=cache_path)
+            analyzer.analyze_code = lambda *args, **kwargs: self.fail("cached file re-analyzed")
+            cached = analyzer.analyze_project(project_root)
+            self.assertEqual(cached["file_analyses"], result["file_analyses"])
+    
     def test_anomaly_detector(self):
         """Test anomaly detection"""
         collector = MetricsCollector("test")
@@ -0,0 +1,130 @@
+import pytest
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.evolution_job_service import EvolutionJobService, JobQueueFullError
+
+
+def slow_cycle(project_root, params, progress_callback):
+    """Stand-in for a self-modification cycle that reports progress between steps"""
+    steps = params.get("steps", 3)
+    for step in range(steps):
+        progress_callback("proposing", step, steps)
+        time.sleep(params.get("step_seconds", 0.1))
+    return {"project_root": project_root, "steps": steps}
+
+
+def failing_cycle(project_root, params, progress_callback):
+    raise RuntimeError("analysis failed")
+
+
+def wait_for_status(service, job_id, statuses, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = service.get_job(job_id)
+        if job["status"] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} never reached {statuses}: {service.get_job(job_id)}")
+
+
+@pytest.fixture
+def service():
+    service = EvolutionJobService(project_root="/tmp/project", runner=slow_cycle)
+    yield service
+    service.shutdown()
+
+
+def test_submit_returns_without_waiting_for_cycle(service):
+    """Submitting a long cycle must not block the caller"""
+    start = time.monotonic()
+    job = service.submit_cycle(steps=5, step_seconds=0.5)
+    assert time.monotonic() - start < 1.0
+    assert job["status"] == "queued"
+
+    running = wait_for_status(service, job["job_id"], ("running",))
+    assert running["progress"]["stage"] == "proposing"
+
+
+def test_job_completes_with_result(service):
+    job = service.submit_cycle(steps=2, step_seconds=0.01)
+    done = wait_for_status(service, job["job_id"], ("completed",))
+    assert done["result"] == {"project_root": "/tmp/project", "steps": 2}
+    assert done["finished_at"] is not None
+
+
+def test_failed_cycle_records_error():
+    service = EvolutionJobService(project_root="/tmp/project", runner=failing_cycle)
+    try:
+        job = service.submit_cycle()
+        done = wait_for_status(service, job["job_id"], ("failed",))
+        assert "analysis failed" in done["error"]
+    finally:
+        service.shutdown()
+
+
+def test_cancel_running_and_queued_jobs(service):
+    running = service.submit_cycle(steps=50, step_seconds=0.05)
+    queued = service.submit_cycle(steps=1, step_seconds=0.01)
+    wait_for_status(service, running["job_id"], ("running",))
+
+    service.cancel_job(queued["job_id"])
+    service.cancel_job(running["job_id"])
+
+    assert wait_for_status(service, queued["job_id"], ("cancelled",))["result"] is None
+    assert wait_for_status(service, running["job_id"], ("cancelled",))["result"] is None
+
+
+def test_pending_job_limit():
+    service = EvolutionJobService(project_root="/tmp/project", max_pending_jobs=1, runner=slow_cycle)
+    try:
+        service.submit_cycle(steps=5, step_seconds=0.1)
+        with pytest.raises(JobQueueFullError):
+            service.submit_cycle()
+    finally:
+        service.shutdown()
+
+
+def test_unknown_job(service):
+    assert service.get_job("missing") is None
+    assert service.cancel_job("missing") is None
+
+
+def test_start_time_is_recorded_by_the_worker(service):
+    """started_at comes from the worker, even for a job nobody polled while it ran"""
+    job = service.submit_cycle(steps=2, step_seconds=0.05)
+    done = wait_for_status(service, job["job_id"], ("completed",))
+    assert done["submitted_at"] <= done["started_at"] <= done["finished_at"]
+
+    unpolled = service.submit_cycle(steps=2, step_seconds=0.05)
+    deadline = time.monotonic() + 10
+    while service._jobs[unpolled["job_id"]]["status"] != "completed" and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert service._jobs[unpolled["job_id"]]["started_at"] is not None
+
+
+def test_status_reads_stay_fast_while_cycle_runs(service):
+    job = service.submit_cycle(steps=10, step_seconds=0.2)
+    running = wait_for_status(service, job["job_id"], ("running",))
+    assert running["started_at"] is not None
+
+    for _ in range(20):
+        start = time.monotonic()
+        polled = service.get_job(job["job_id"])
+        assert time.monotonic() - start < 0.1
+        assert polled["status"] == "running"
+        assert polled["started_at"] == running["started_at"]
+    service.cancel_job(job["job_id"])
+
+
+def test_start_spawns_the_pool_before_the_first_submit(service):
+    service.start()
+    assert service._executor is not None
+    executor = service._executor
+    job = service.submit_cycle(steps=1, step_seconds=0.01)
+    assert service._executor is executor
+    assert wait_for_status(service, job["job_id"], ("completed",))["result"]["steps"] == 1
@@ -0,0 +1,124 @@
+import asyncio
+import unittest
+import sys
+import os
+import time
+
+# Add parent directory to path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from evolution_framework.llm_gateway import LLMBackend, LLMGateway, FakeLLMBackend, LLMResult
+
+
+class FailingBackend(FakeLLMBackend):
+    async def generate(self, prompt, model):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        raise RuntimeError("backend down")
+
+
+class TestLLMGateway(unittest.TestCase):
+    
+    def test_fake_backend_is_deterministic(self):
+        """Test that the fake backend returns identical output for identical input"""
+        backend = FakeLLMBackend()
+        first = asyncio.run(backend.generate("hello world", "llama2"))
+        second = asyncio.run(backend.generate("hello world", "llama2"))
+        other_model = asyncio.run(backend.generate("hello world", "mistral"))
+        self.assertEqual(first, second)
+        self.assertNotEqual(first.text, other_model.text)
+        self.assertEqual(first.prompt_tokens, 2)
+    
+    def test_cache_keyed_by_prompt_and_model(self):
+        """Test that repeated prompts are served from cache per model"""
+        backend = FakeLLMBackend()
+        gateway = LLMGateway(backend)
+        
+        async def run():
+            await gateway.generate("prompt", "llama2")
+            await gateway.generate("prompt", "llama2")
+            await gateway.generate("prompt", "mistral")
+        
+        asyncio.run(run())
+        self.assertEqual(backend.calls, 2)
+        metrics = gateway.get_metrics()
+        self.assertEqual(metrics["cache_hits"], 1)
+        self.assertEqual(metrics["requests"], 3)
+    
+    def test_identical_in_flight_prompts_are_deduplicated(self):
+        """Test that concurrent identical prompts share one backend call"""
+        backend = FakeLLMBackend(latency=0.05)
+        gateway = LLMGateway(backend, cache_size=0)
+        
+        results = asyncio.run(gateway.generate_many(["same"] * 10 + ["other"]))
+        self.assertEqual(backend.calls, 2)
+        self.assertEqual(len(set(r.text for r in results[:10])), 1)
+        self.assertEqual(gateway.get_metrics()["deduplicated"], 9)
+    
+    def test_concurrency_is_bounded(self):
+        """Test that backend calls in flight never exceed max_concurrency"""
+        active = {"now": 0, "peak": 0}
+        
+        class TrackingBackend(FakeLLMBackend):
+            async def generate(self, prompt, model):
+                active["now"] += 1
+                active["peak"] = max(active["peak"], active["now"])
+                await asyncio.sleep(0.01)
+                active["now"] -= 1
+                return LLMResult(text=prompt)
+        
+        gateway = LLMGateway(TrackingBackend(), max_concurrency=3)
+        asyncio.run(gateway.generate_many([f"p{i}" for i in range(20)]))
+        self.assertEqual(active["peak"], 3)
+    
+    def test_failures_propagate_and_are_not_cached(self):
+        """Test that backend errors are counted and retried on the next call"""
+        backend = FailingBackend()
+        gateway = LLMGateway(backend)
+        
+        results = asyncio.run(gateway.generate_many(["a", "a"]))
+        self.assertEqual(results, [None, None])
+        self.assertEqual(backend.calls, 1)
+        with self.assertRaises(RuntimeError):
+            gateway.generate_sync("a", timeout=5)
+        self.assertEqual(backend.calls, 2)
+        self.assertEqual(gateway.get_metrics()["errors"], 2)
+        gateway.close()
+    
+    def test_generate_sync(self):
+        """Test the blocking wrapper used by EvolutionManager"""
+        gateway = LLMGateway(FakeLLMBackend())
+        result = gateway.generate_sync("sync prompt", timeout=5)
+        self.assertIn("response", result.text)
+        self.assertEqual(gateway.get_metrics()["completion_tokens"], result.completion_tokens)
+        gateway.close()
+
+    
+    def test_sync_timeout_cancels_the_call(self):
+        """Test that a timed-out generate_sync does not keep running on the loop"""
+        backend = FakeLLMBackend(latency=5)
+        gateway = LLMGateway(backend)
+        with self.assertRaises(TimeoutError):
+            gateway.generate_sync("slow", timeout=0.05)
+        deadline = time.monotonic() + 2
+        while gateway.get_metrics()["in_flight"] and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(gateway.get_metrics()["in_flight"], 0)
+        gateway.close()
+    
+    def test_gateway_works_across_event_loops(self):
+        """Test that the concurrency limit is not tied to the first loop that used it"""
+        gateway = LLMGateway(FakeLLMBackend(latency=0.01), max_concurrency=2, cache_size=0)
+        for run in range(3):
+            results = asyncio.run(gateway.generate_many([f"run{run}-{i}" for i in range(6)]))
+            self.assertTrue(all(results))
+        self.assertEqual(gateway.get_metrics()["backend_calls"], 18)
+    
+    def test_backend_requires_generate(self):
+        """Test that the backend interface is abstract"""
+        with self.assertRaises(TypeError):
+            LLMBackend()
+
+
+if __name__ == '__main__':
+    unittest.main()
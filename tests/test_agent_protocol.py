@@ -0,0 +1,90 @@
+import json
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flowstate_ai.agent_communication.protocol import (
+    AgentMessage, MessageType, create_error, create_event, create_request, create_response,
+    decode_batch, encode_batch
+)
+
+
+def sample_messages():
+    return [
+        create_request('planner', 'coder', {'task': 'fetch_data', 'params': {'url': 'http://example.com'}}, 'msg_001'),
+        create_response('coder', 'planner', {'status': 'ok', 'rows': [1, 2, 3]}, 'msg_002', 'msg_001'),
+        create_event('monitor', 'broadcast', {'cpu': 0.93, 'note': 'høy last ✓'}, 'msg_003'),
+        create_error('coder', 'planner', {'error': 'timeout'}, None),
+        AgentMessage('a', 'b', MessageType.EVENT, {}, message_id='', in_response_to=''),
+    ]
+
+
+def test_binary_round_trip_matches_json():
+    messages = sample_messages()
+    decoded = decode_batch(encode_batch(messages))
+    assert [m.to_dict() for m in decoded] == [m.to_dict() for m in messages]
+    # None and empty ids stay distinct
+    assert decoded[3].message_id is None and decoded[4].message_id == ''
+    for message in messages:
+        assert AgentMessage.from_bytes(message.to_bytes()).to_dict() == message.to_dict()
+        assert AgentMessage.from_json(message.to_json()).to_dict() == message.to_dict()
+        assert len(message.to_bytes()) < len(message.to_json().encode())
+
+
+def test_routing_hop_passes_payload_through_untouched():
+    frame = encode_batch(sample_messages())
+    routed = decode_batch(frame)
+    for message in routed:
+        message.receiver_id = f'relay:{message.receiver_id}'
+    forwarded = encode_batch(routed)
+
+    # Bodies were never parsed and are copied byte for byte
+    assert all(message._content is None for message in routed)
+    assert decode_batch(forwarded)[0].receiver_id == 'relay:coder'
+    assert [m.content for m in decode_batch(forwarded)] == [m.content for m in sample_messages()]
+    assert len(forwarded) == len(frame) + len(b'relay:') * len(routed)
+
+    # Replacing the content re-encodes it
+    routed[0].content = {'task': 'changed'}
+    assert decode_batch(encode_batch(routed[:1]))[0].content == {'task': 'changed'}
+
+
+def test_content_edits_after_encoding_are_sent():
+    message = create_event('monitor', 'broadcast', {'x': 1}, 'msg_001')
+    message.to_bytes()
+    message.content['x'] = 2
+    assert AgentMessage.from_bytes(message.to_bytes()).content == {'x': 2}
+
+    # A relay editing a received message in place
+    relayed = AgentMessage.from_bytes(message.to_bytes())
+    relayed.content['seen_by'] = ['relay']
+    assert AgentMessage.from_bytes(relayed.to_bytes()).content == {'x': 2, 'seen_by': ['relay']}
+
+
+def test_rejects_bad_frames():
+    frame = encode_batch(sample_messages())
+    with pytest.raises(ValueError):
+        decode_batch(b'XX' + frame[2:])
+    with pytest.raises(ValueError):
+        decode_batch(frame[:2] + bytes([99]) + frame[3:])
+    with pytest.raises(ValueError):
+        decode_batch(frame[:-5])
+    with pytest.raises(ValueError):
+        decode_batch(frame[:8] + bytes([42]) + frame[9:])
+    with pytest.raises(ValueError):
+        AgentMessage.from_bytes(frame)
+    assert decode_batch(encode_batch([])) == []
+
+
+def test_json_keeps_timestamps_in_epoch_millis():
+    message = create_event('a', 'b', {'x': 1}, 'm1')
+    data = json.loads(message.to_json())
+    assert isinstance(data['timestamp'], int) and data['timestamp'] > 1_600_000_000_000
+    # Messages without a timestamp, from before it was added, still parse
+    del data['timestamp']
+    assert AgentMessage.from_dict(data).timestamp > 0
+    assert struct.unpack_from('<Q', message.to_bytes(), 8 + 2)[0] == message.timestamp
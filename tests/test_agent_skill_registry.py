@@ -0,0 +1,103 @@
+import random
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flowstate_ai.agent_skill_registry import AgentSkillRegistry
+
+SKILLS = [f"skill{i}" for i in range(15)]
+
+
+def scan(registry, skill_names, only_available=True):
+    """Brute-force answer from the agents themselves."""
+    return sorted(
+        agent.agent_id for agent in registry.list_all_agents()
+        if all(agent.has_skill(s) for s in skill_names) and (agent.available or not only_available)
+    )
+
+
+def ids(agents):
+    return sorted(agent.agent_id for agent in agents)
+
+
+def test_index_matches_scan_under_random_updates():
+    rng = random.Random(5)
+    registry = AgentSkillRegistry()
+    for step in range(3000):
+        agent_id = f"a{rng.randrange(60)}"
+        action = rng.random()
+        if action < 0.1:
+            registry.register_agent(agent_id)
+        elif action < 0.15:
+            registry.unregister_agent(agent_id)
+        elif registry.get_agent(agent_id) is None:
+            continue
+        elif action < 0.6:
+            registry.add_skill_to_agent(agent_id, rng.choice(SKILLS))
+        elif action < 0.8:
+            registry.remove_skill_from_agent(agent_id, rng.choice(SKILLS))
+        else:
+            registry.set_agent_availability(agent_id, rng.random() < 0.5)
+
+        if step % 25 == 0:
+            query = rng.sample(SKILLS, rng.randrange(1, 4))
+            for only_available in (True, False):
+                assert ids(registry.find_agents_with_skills(query, only_available)) == \
+                    scan(registry, query, only_available)
+                assert ids(registry.find_agents_with_skill(query[0], only_available)) == \
+                    scan(registry, query[:1], only_available)
+
+
+def test_find_agents_with_skills_edge_cases():
+    registry = AgentSkillRegistry()
+    registry.register_agent("a")
+    registry.add_skill_to_agent("a", "python")
+    registry.add_skill_to_agent("a", "sql")
+    assert registry.find_agents_with_skills([]) == []
+    assert registry.find_agents_with_skills(["python", "unknown"]) == []
+    assert ids(registry.find_agents_with_skills(["python", "python", "sql"])) == ["a"]
+
+    registry.set_agent_availability("a", False)
+    assert registry.find_agents_with_skills(["python"]) == []
+    assert ids(registry.find_agents_with_skills(["python"], only_available=False)) == ["a"]
+
+    with pytest.raises(ValueError):
+        registry.add_skill_to_agent("missing", "python")
+
+
+def test_readers_see_consistent_snapshots_during_writes():
+    registry = AgentSkillRegistry()
+    for i in range(200):
+        registry.register_agent(f"a{i}")
+        registry.add_skill_to_agent(f"a{i}", "x")
+        registry.add_skill_to_agent(f"a{i}", "y")
+    stop = threading.Event()
+
+    def writer(seed):
+        rng = random.Random(seed)
+        while not stop.is_set():
+            agent_id = f"a{rng.randrange(200)}"
+            registry.set_agent_availability(agent_id, rng.random() < 0.5)
+
+    threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(3)]
+    for thread in threads:
+        thread.start()
+    try:
+        for _ in range(2000):
+            # Every agent holds both skills, so within one snapshot the two
+            # index entries agree even while availability flips
+            snapshot = registry._snapshot
+            assert snapshot.available.get("x") == snapshot.available.get("y")
+            assert len(registry.find_agents_with_skills(["x", "y"])) <= 200
+    finally:
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+    for i in range(200):
+        agent = registry.get_agent(f"a{i}")
+        assert (f"a{i}" in registry.find_agent_ids_with_skills(["x", "y"])) == agent.available
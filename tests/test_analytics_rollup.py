@@ -0,0 +1,87 @@
+import os
+import random
+import subprocess
+import sys
+import threading
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from analytics_rollup import LatencyHistogram, RequestLogBuffer, summarize_requests
+
+
+def test_histogram_quantiles_within_bucket_error():
+    rng = random.Random(4)
+    values = [rng.lognormvariate(3, 1) for _ in range(20000)]
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.add(value)
+    values.sort()
+    for q in (0.5, 0.95, 0.99):
+        exact = values[int(q * len(values)) - 1]
+        assert abs(histogram.quantile(q) - exact) / exact < 0.06
+
+    restored = LatencyHistogram.from_json(histogram.to_json())
+    restored.merge(histogram)
+    assert restored.total == 2 * len(values)
+    assert restored.quantile(0.5) == histogram.quantile(0.5)
+
+
+def test_summarize_requests_groups_by_minute_and_endpoint():
+    records = [
+        {'timestamp': datetime(2025, 1, 1, 12, 0, 5), 'endpoint': '/a', 'status_code': 200, 'response_time': 10.0},
+        {'timestamp': datetime(2025, 1, 1, 12, 0, 50), 'endpoint': '/a', 'status_code': 500, 'response_time': 30.0},
+        {'timestamp': datetime(2025, 1, 1, 12, 1, 0), 'endpoint': '/a', 'status_code': 200, 'response_time': 5.0},
+        {'timestamp': datetime(2025, 1, 1, 12, 0, 0), 'endpoint': '/b', 'status_code': 404, 'response_time': None},
+    ]
+    partials = summarize_requests(records)
+    first = partials[(datetime(2025, 1, 1, 12, 0), '/a')]
+    assert (first.request_count, first.error_count, first.total_response_time, first.max_response_time) == (2, 1, 40.0, 30.0)
+    assert partials[(datetime(2025, 1, 1, 12, 1), '/a')].request_count == 1
+    missing_latency = partials[(datetime(2025, 1, 1, 12, 0), '/b')]
+    assert missing_latency.error_count == 1
+    assert missing_latency.histogram.total == 0
+
+
+def test_buffer_batches_and_retries_failed_flushes():
+    batches = []
+    fail = [True]
+    flushed = threading.Event()
+
+    def write(batch):
+        if fail[0]:
+            fail[0] = False
+            raise RuntimeError('database unavailable')
+        batches.append(list(batch))
+        flushed.set()
+
+    buffer = RequestLogBuffer(write, max_batch=10, flush_interval=60)
+    for i in range(5):
+        buffer.append({'i': i})
+    assert buffer.flush() == 0
+    assert len(buffer) == 5
+
+    buffer.start()
+    for i in range(5, 10):
+        buffer.append({'i': i})
+    assert flushed.wait(5)
+    assert [r['i'] for r in batches[0]] == list(range(10))
+
+    buffer.append({'i': 10})
+    buffer.close()
+    assert batches[-1] == [{'i': 10}]
+
+
+def test_buffer_is_flushed_at_interpreter_exit(tmp_path):
+    output = tmp_path / 'records.txt'
+    script = (
+        "import sys\n"
+        f"sys.path.insert(0, {os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')!r})\n"
+        "from analytics_rollup import RequestLogBuffer\n"
+        f"def write(batch):\n    open({str(output)!r}, 'a').write(''.join(str(r['i']) + chr(10) for r in batch))\n"
+        "buffer = RequestLogBuffer(write, flush_interval=60)\n"
+        "buffer.start()\n"
+        "for i in range(3):\n    buffer.append({'i': i})\n"
+    )
+    subprocess.run([sys.executable, '-c', script], check=True, timeout=30)
+    assert output.read_text().split() == ['0', '1', '2']
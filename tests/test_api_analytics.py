@@ -0,0 +1,148 @@
+import importlib
+import sys
+import types
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip('fastapi')
+sqlalchemy = pytest.importorskip('sqlalchemy')
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import Column, DateTime, Float, Integer, String, create_engine
+from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.pool import StaticPool
+
+
+def stub_modules():
+    """Stand-ins for backend.models, backend.database and backend.schemas on one in-memory SQLite database"""
+    Base = declarative_base()
+
+    class APIUsage(Base):
+        __tablename__ = 'api_usage'
+        id = Column(Integer, primary_key=True)
+        endpoint = Column(String(255))
+        method = Column(String(10))
+        status_code = Column(Integer)
+        timestamp = Column(DateTime)
+
+    class APIPerformance(Base):
+        __tablename__ = 'api_performance'
+        id = Column(Integer, primary_key=True)
+        endpoint = Column(String(255))
+        response_time = Column(Float)
+        timestamp = Column(DateTime)
+
+    class APIUsageSchema(BaseModel):
+        endpoint: str
+        method: str
+        status_code: int
+        timestamp: datetime
+
+        model_config = {'from_attributes': True}
+
+    class APIPerformanceSchema(BaseModel):
+        endpoint: str
+        response_time: float
+        timestamp: datetime
+
+        model_config = {'from_attributes': True}
+
+    class AnalyticsSummary(BaseModel):
+        total_calls: int
+        avg_response_time: float
+        error_count: int
+        period_days: int
+
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    def get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    return engine, {
+        'backend.models': types.SimpleNamespace(APIUsage=APIUsage, APIPerformance=APIPerformance),
+        'backend.database': types.SimpleNamespace(get_db=get_db),
+        'backend.schemas': types.SimpleNamespace(APIUsageSchema=APIUsageSchema,
+                                                 APIPerformanceSchema=APIPerformanceSchema,
+                                                 AnalyticsSummary=AnalyticsSummary),
+    }
+
+
+@pytest.fixture
+def analytics(monkeypatch):
+    engine, modules = stub_modules()
+    for name, module in modules.items():
+        monkeypatch.setitem(sys.modules, name, module)
+    monkeypatch.delitem(sys.modules, 'backend.api_analytics', raising=False)
+    module = importlib.import_module('backend.api_analytics')
+    module.create_rollup_tables(engine)
+    yield module
+    module.request_log.close()
+    sys.modules.pop('backend.api_analytics', None)
+
+
+def record(endpoint, status_code, response_time, timestamp):
+    return {'endpoint': endpoint, 'method': 'GET', 'status_code': status_code,
+            'response_time': response_time, 'timestamp': timestamp}
+
+
+def make_client(analytics):
+    app = FastAPI()
+    app.include_router(analytics.router)
+    return TestClient(app)
+
+
+def test_write_batch_feeds_summaries_and_rollups(analytics):
+    now = datetime.utcnow().replace(second=30, microsecond=0)
+    old = now - timedelta(days=30)
+    db = next(analytics.get_db())
+    analytics.write_request_batch(db, [
+        record('/leads', 200, 10.0, now),
+        record('/leads', 500, 30.0, now),
+        record('/deals', 404, None, now),
+        record('/leads', 200, 1000.0, old),
+    ])
+    # A second batch for the same minute updates the existing rollup row
+    analytics.write_request_batch(db, [record('/leads', 200, 20.0, now)])
+    db.close()
+
+    with make_client(analytics) as client:
+        summary = client.get('/analytics/summary').json()
+        assert summary == {'total_calls': 4, 'avg_response_time': 20.0, 'error_count': 2, 'period_days': 7}
+
+        endpoints = client.get('/analytics/endpoints').json()
+        assert endpoints == [
+            {'endpoint': '/leads', 'total_calls': 3, 'error_count': 1, 'avg_response_time': 20.0},
+            {'endpoint': '/deals', 'total_calls': 1, 'error_count': 1, 'avg_response_time': 0},
+        ]
+
+        latency = {row['endpoint']: row for row in client.get('/analytics/latency?minutes=5').json()}
+        assert latency['/leads']['request_count'] == 3 and latency['/leads']['error_count'] == 1
+        assert latency['/deals']['request_count'] == 1
+        assert client.get('/analytics/latency?minutes=0').status_code == 400
+
+    db = next(analytics.get_db())
+    assert db.query(analytics.APIRequestRollup).filter_by(endpoint='/leads').count() == 2
+    db.close()
+
+
+def test_buffered_requests_are_written_on_app_shutdown(analytics):
+    with make_client(analytics):
+        analytics.log_request('/leads', 'GET', 200, 12.0)
+        analytics.log_request('/leads', 'POST', 201, 8.0)
+    # Leaving the client runs the router's lifespan shutdown
+    assert len(analytics.request_log) == 0
+    db = next(analytics.get_db())
+    assert db.query(analytics.APIRequestRollup).one().request_count == 2
+    db.close()
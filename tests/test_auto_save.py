@@ -0,0 +1,91 @@
+import gzip
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from auto_save import AutoSaveManager, apply_patch, diff
+
+
+@pytest.fixture
+def save_dir():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield tmp
+
+
+def make_manager(save_dir, state, **kwargs):
+    manager = AutoSaveManager(save_dir=save_dir, compression='gzip', **kwargs)
+    manager.get_data_callback = lambda: state
+    return manager
+
+
+def test_diff_round_trip():
+    old = {'a': [1, 2, 3], 'b': {'x/y': 1, 'c': 'keep'}, 'gone': True}
+    new = {'a': [1, 2, 4, 5], 'b': {'x/y': 2, 'c': 'keep'}, 'added': None}
+    assert apply_patch(json.loads(json.dumps(old)), diff(old, new)) == new
+    assert diff(new, new) == []
+
+
+def test_unchanged_intervals_are_skipped(save_dir, monkeypatch):
+    state = {'items': list(range(100))}
+    manager = make_manager(save_dir, state)
+    assert manager.save_version() is not None
+    # A clean interval is settled by the diff alone, without copying the state
+    monkeypatch.setattr('auto_save.pickle.dumps', lambda *args, **kwargs: pytest.fail('state was copied'))
+    assert manager.save_version() is None
+    monkeypatch.undo()
+    assert manager.stats['skipped'] == 1
+    assert len(manager.list_versions()) == 1
+
+
+def test_deltas_replay_onto_base(save_dir):
+    state = {'records': [{'id': i, 'value': i} for i in range(200)]}
+    manager = make_manager(save_dir, state)
+    manager.save_version()
+    history = []
+    for i in range(5):
+        state['records'][i]['value'] = -i
+        state['records'].append({'id': 1000 + i})
+        history.append((manager.save_version(), json.loads(json.dumps(state))))
+
+    assert manager.stats == {'saved_full': 1, 'saved_delta': 5, 'skipped': 0,
+                             'bytes_written': manager.stats['bytes_written']}
+    assert all('.delta.' in filename for filename, _ in history)
+
+    # A fresh manager reads everything back from disk
+    reloaded = AutoSaveManager(save_dir=save_dir)
+    assert reloaded.version == 6
+    assert reloaded.list_versions()[0] == history[-1][0]
+    for filename, expected in history:
+        assert reloaded.load_version(filename) == expected
+
+
+def test_compaction_and_rollback(save_dir):
+    state = {'counter': 0, 'blob': 'x' * 1000}
+    manager = make_manager(save_dir, state, compact_every=3)
+    first = manager.save_version()
+    for i in range(1, 5):
+        state['counter'] = i
+        manager.save_version()
+    assert manager.stats['saved_full'] == 2
+    assert manager.stats['saved_delta'] == 3
+
+    assert manager.rollback(first) == {'counter': 0, 'blob': 'x' * 1000}
+    assert manager.load_version(manager.list_versions()[0])['counter'] == 0
+
+
+def test_loads_legacy_uncompressed_versions(save_dir):
+    with open(os.path.join(save_dir, 'version_9_20250101_000000.json'), 'w') as f:
+        json.dump({'legacy': True}, f)
+    manager = make_manager(save_dir, {'legacy': False})
+    assert manager.version == 9
+    filename = manager.save_version()
+    assert filename.startswith('version_10_')
+    assert manager.list_versions() == [filename, 'version_9_20250101_000000.json']
+    assert manager.load_version('version_9_20250101_000000.json') == {'legacy': True}
+    with open(os.path.join(save_dir, filename), 'rb') as f:
+        assert json.loads(gzip.decompress(f.read())) == {'legacy': False}
@@ -0,0 +1,144 @@
+import asyncio
+import sqlite3
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from brain.autonomous_task_system import AutonomousTaskSystem, ProjectStateCounters
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+def make_db(path):
+    conn = sqlite3.connect(path)
+    conn.execute("""CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT, description TEXT, status TEXT,
+                    priority INTEGER, category TEXT, auto_generated INTEGER, source TEXT, assigned_agent TEXT,
+                    created_at TEXT, updated_at TEXT)""")
+    conn.execute("CREATE TABLE agents (agent_name TEXT, status TEXT)")
+    old = (datetime.now() - timedelta(days=3)).isoformat()
+    new = datetime.now().isoformat()
+    conn.executemany("INSERT INTO tasks (title, status, priority, category, assigned_agent, created_at) VALUES (?, ?, ?, ?, ?, ?)", [
+        ('old pending', 'pending', 5, 'testing', None, old),
+        ('new pending', 'pending', 5, 'documentation', None, new),
+        ('done', 'completed', 3, 'testing', 'coder', old),
+    ])
+    conn.executemany("INSERT INTO agents VALUES (?, ?)", [('coder', 'idle'), ('reviewer', 'busy')])
+    conn.commit()
+    conn.close()
+
+
+@pytest.fixture
+def system(tmp_path):
+    make_db(tmp_path / 'state.db')
+    client = fakeredis.FakeRedis(decode_responses=True)
+    for i in range(30):
+        client.set(f'contact:{i}', '{}')
+    for i in range(4):
+        client.set(f'deal:{i}', '{}')
+    client.set('unrelated', 'x')
+    return AutonomousTaskSystem(db_path=str(tmp_path / 'state.db'), redis_client=client, client=object())
+
+
+def rebuilt_snapshot(system):
+    counters = ProjectStateCounters(system.redis, prefix='check')
+    conn = sqlite3.connect(system.db_path)
+    counters.rebuild(conn)
+    conn.close()
+    return counters.snapshot(datetime.now() - timedelta(hours=24))
+
+
+def test_counters_follow_task_writes(system):
+    state = asyncio.run(system.analyze_project_state())
+    assert state['tasks']['by_status'] == {'pending': 2, 'completed': 1}
+    assert state['tasks']['stale_pending'] == 1
+    assert state['crm'] == {'total_contacts': 30, 'total_deals': 4}
+    assert state['agents']['by_status'] == {'coder': {'idle': 1}, 'reviewer': {'busy': 1}}
+
+    stored = asyncio.run(system.store_tasks([
+        {'title': 'Fix login', 'category': 'critical_bug', 'final_priority': 9},
+        {'title': 'Write docs', 'category': 'documentation', 'final_priority': 4},
+    ]))
+    assert stored == 2
+    assert asyncio.run(system.auto_assign_tasks()) == 1
+
+    # Nothing is scanned once the counters exist
+    scans = []
+    system.redis.scan_iter = lambda *a, **k: scans.append(a) or iter(())
+    state = asyncio.run(system.analyze_project_state())
+    assert scans == []
+    assert state['tasks']['by_status'] == {'pending': 3, 'completed': 1, 'assigned': 1}
+    assert state['agents']['assigned_tasks'] == {'coder': 2}
+
+    del system.redis.scan_iter
+    snapshot = system.state_counters.snapshot(datetime.now() - timedelta(hours=24))
+    assert snapshot == rebuilt_snapshot(system)
+
+
+def test_reconciliation_corrects_drift(system):
+    asyncio.run(system.analyze_project_state())
+    # Written by another service without touching the counters
+    system.redis.set('contact:new', '{}')
+    conn = sqlite3.connect(system.db_path)
+    conn.execute("UPDATE tasks SET status = 'completed' WHERE title = 'old pending'")
+    conn.commit()
+    conn.close()
+    assert asyncio.run(system.analyze_project_state())['crm']['total_contacts'] == 30
+
+    system.reconcile_state_counters()
+    state = asyncio.run(system.analyze_project_state())
+    assert state['crm']['total_contacts'] == 31
+    assert state['tasks']['by_status'] == {'pending': 1, 'completed': 2}
+    assert state['tasks']['stale_pending'] == 0
+
+
+def test_failed_counter_update_forces_rebuild(system):
+    asyncio.run(system.analyze_project_state())
+
+    class BrokenPipeline:
+        def __getattr__(self, name):
+            return lambda *a, **k: None
+
+        def execute(self):
+            raise ConnectionError('redis went away')
+
+    pipeline = system.redis.pipeline
+    system.redis.pipeline = lambda transaction=True: BrokenPipeline() if transaction else pipeline(transaction)
+    asyncio.run(system.store_tasks([{'title': 'Lost update', 'category': 'testing'}]))
+    system.redis.pipeline = pipeline
+
+    state = asyncio.run(system.analyze_project_state())
+    assert state['tasks']['by_status'] == {'pending': 3, 'completed': 1}
+
+
+def test_task_writes_outside_the_counters_are_picked_up(system):
+    asyncio.run(system.analyze_project_state())
+    # Other writers (task generator, coordinator, agents) update tasks directly
+    conn = sqlite3.connect(system.db_path)
+    conn.execute("INSERT INTO tasks (title, status, priority, created_at) VALUES ('generated', 'pending', 5, datetime('now'))")
+    conn.execute("UPDATE tasks SET status = 'completed' WHERE title = 'old pending'")
+    conn.execute("UPDATE tasks SET assigned_agent = 'reviewer' WHERE title = 'new pending'")
+    conn.commit()
+    conn.close()
+
+    scans = []
+    system.redis.scan_iter = lambda *a, **k: scans.append(a) or iter(())
+    state = asyncio.run(system.analyze_project_state())
+    # Only the task counters are rebuilt; the CRM keys are not scanned again
+    assert scans == []
+    assert state['tasks']['by_status'] == {'pending': 2, 'completed': 2}
+    assert state['tasks']['stale_pending'] == 0
+    assert state['agents']['assigned_tasks'] == {'coder': 1, 'reviewer': 1}
+    assert state['crm'] == {'total_contacts': 30, 'total_deals': 4}
+    del system.redis.scan_iter
+
+    # Writes through the counters keep the versions in step, so no rebuild follows
+    asyncio.run(system.store_tasks([{'title': 'Fix login', 'category': 'critical_bug', 'final_priority': 9}]))
+    rebuilds = []
+    rebuild = system.state_counters.rebuild
+    system.state_counters.rebuild = lambda *a, **k: rebuilds.append(a) or rebuild(*a, **k)
+    assert asyncio.run(system.analyze_project_state())['tasks']['by_status'] == {'pending': 3, 'completed': 2}
+    assert rebuilds == []
@@ -16,6 +16,7 @@ from brain.core_intelligence import BrainCoreIntelligence
 from brain.decision_engine import DecisionEngine, Task, ResourcePool
 from brain.memory_system import MemorySystem
 from brain.task_generator import AutomaticTaskGenerator
+from brain.metrics_sampler import MetricsRingBuffer, TieredMetricsBuffer, PSUtilSampler, SYSTEM_FIELDS
 
 
 class TestBrainCoreIntelligence(unittest.TestCase):
@@ -357,6 +358,51 @@ class TestAutomaticTaskGenerator(unittest.TestCase):
         self.assertTrue(any("failed" in task["title"].lower() for task in tasks))
 
 
+class TestMetricsSampler(unittest.TestCase):
+    """Test cases for the windowed metrics sampler"""
+    
+    def test_ring_buffer_wraps_and_windows(self):
+        """Test that the ring buffer keeps the newest rows in order"""
+        buffer = MetricsRingBuffer(capacity=5, num_fields=1)
+        for i in range(8):
+            buffer.append(float(i), [i * 10])
+        
+        timestamps, values = buffer.window(since=0)
+        self.assertEqual(timestamps.tolist(), [3.0, 4.0, 5.0, 6.0, 7.0])
+        
+        timestamps, values = buffer.window(since=5.5)
+        self.assertEqual(timestamps.tolist(), [6.0, 7.0])
+        self.assertEqual(values[:, 0].tolist(), [60.0, 70.0])
+    
+    def test_downsampled_tier_means(self):
+        """Test that coarse tiers hold per-bucket means"""
+        buffer = TieredMetricsBuffer(fields=("value",), tiers=((1, 10), (10, 100)))
+        for second in range(35):
+            buffer.add(float(second), [second])
+        
+        # Raw tier only covers 10s, so a 30s window falls back to the 10s tier
+        timestamps, values = buffer.window(30, now=35)
+        self.assertEqual(timestamps.tolist(), [10.0, 20.0])
+        self.assertEqual(values[:, 0].tolist(), [14.5, 24.5])
+        
+        timestamps, _ = buffer.window(5, now=35)
+        self.assertEqual(len(timestamps), 5)
+    
+    def test_sampler_trends(self):
+        """Test sampling and vectorized trend calculation"""
+        sampler = PSUtilSampler(interval=0.01)
+        sample = sampler.sample_once()
+        self.assertEqual(set(sample), set(SYSTEM_FIELDS))
+        
+        trends = sampler.trends(3600)
+        self.assertEqual(trends["data_points"], 1)
+        self.assertIn("cpu_percent", trends["averages"])
+        
+        sampler.start()
+        sampler.stop()
+        self.assertGreaterEqual(len(sampler.buffer.tiers[0][1]), 2)
+
+
 def run_tests():
     """Run all tests"""
     # Create test suite
@@ -368,6 +414,7 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestDecisionEngine))
     suite.addTests(loader.loadTestsFromTestCase(TestMemorySystem))
     suite.addTests(loader.loadTestsFromTestCase(TestAutomaticTaskGenerator))
+    suite.addTests(loader.loadTestsFromTestCase(TestMetricsSampler))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
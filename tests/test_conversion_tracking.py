@@ -0,0 +1,147 @@
+import os
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from conversion_tracking import ConversionTracker, EventQueries, EventStore
+
+START = datetime(2025, 1, 27)  # a Monday
+
+
+@pytest.fixture
+def store_dir():
+    with tempfile.TemporaryDirectory() as tmp:
+        yield tmp
+
+
+def random_events(seed=2, users=300):
+    """Events spread over two months, so they land in two partitions."""
+    rng = random.Random(seed)
+    events = []
+    for u in range(users):
+        t = START + timedelta(hours=rng.randrange(24 * 20))
+        for step in ('visit', 'signup', 'purchase'):
+            if rng.random() < 0.3:
+                events.append((rng.choice(['visit', 'signup', 'purchase']), f'user-{u}', t - timedelta(hours=rng.randrange(48))))
+            if rng.random() > 0.7:
+                break
+            events.append((step, f'user-{u}', t))
+            t += timedelta(hours=rng.randrange(1, 100))
+    return events
+
+
+def brute_force_funnel(events, steps, window):
+    by_user = {}
+    for event, user, ts in events:
+        by_user.setdefault(user, []).append((ts, event))
+    counts = [0] * len(steps)
+    for user_events in by_user.values():
+        firsts = [ts for ts, event in user_events if event == steps[0]]
+        if not firsts:
+            continue
+        anchor = reached = min(firsts)
+        counts[0] += 1
+        for i, step in enumerate(steps[1:], 1):
+            later = [ts for ts, event in user_events
+                     if event == step and ts >= reached and (window is None or ts <= anchor + window)]
+            if not later:
+                break
+            reached = min(later)
+            counts[i] += 1
+    return counts
+
+
+def test_funnel_matches_brute_force_across_partitions(store_dir):
+    events = random_events()
+    store = EventStore(store_dir, buffer_rows=50, compact_after=4)
+    for event, user, ts in events:
+        store.append(event, user, ts)
+    queries = EventQueries(store)
+
+    steps = ['visit', 'signup', 'purchase']
+    for window in (None, timedelta(hours=60)):
+        result = queries.funnel(steps, None if window is None else window.total_seconds())
+        assert [s['users'] for s in result['steps']] == brute_force_funnel(events, steps, window)
+
+    partitions = {row[0] for row in store._conn.execute('SELECT partition FROM segments')}
+    assert partitions == {'2025-01', '2025-02'}
+    store.close()
+
+    # Data survives a restart
+    reopened = EventQueries(EventStore(store_dir))
+    assert [s['users'] for s in reopened.funnel(steps)['steps']] == brute_force_funnel(events, steps, None)
+
+
+def test_cohort_retention_and_time_to_convert(store_dir):
+    store = EventStore(store_dir)
+    day = timedelta(days=1)
+    store.append('signup', 'a', START)
+    store.append('signup', 'b', START + 2 * day)
+    store.append('signup', 'c', START + 8 * day)
+    store.append('login', 'a', START + 9 * day)
+    store.append('login', 'b', START + 3 * day)
+    store.append('login', 'b', START + 16 * day)
+    store.append('login', 'c', START + 8 * day)
+    queries = EventQueries(store)
+
+    cohorts = queries.cohort_retention('signup', 'login', period='week', periods=3)
+    assert [(c['cohort_start'][:10], c['users'], c['retained']) for c in cohorts] == [
+        ('2025-01-27', 2, [1, 1, 1]),
+        ('2025-02-03', 1, [1, 0, 0]),
+    ]
+
+    ttc = queries.time_to_convert('signup', 'login')
+    assert ttc['users_converted'] == 3
+    assert ttc['median_seconds'] == pytest.approx(day.total_seconds())
+
+
+def test_tracker_api(store_dir):
+    tracker = ConversionTracker(store_dir)
+    tracker.track_lead('l1', source='ads')
+    tracker.track_lead('l1', source='ignored')
+    tracker.track_lead('l2')
+    tracker.track_conversion('l1', customer_id='c1', value=99.0)
+    with pytest.raises(ValueError):
+        tracker.track_conversion('missing')
+
+    report = tracker.get_report()
+    assert (report['total_leads'], report['total_conversions'], report['conversion_rate']) == (2, 1, 0.5)
+    assert report['conversions'][0]['source'] == 'ads'
+    funnel = tracker.get_funnel(['lead', 'conversion'])
+    assert [s['users'] for s in funnel['steps']] == [2, 1]
+
+
+def test_tracked_events_survive_without_close(store_dir):
+    tracker = ConversionTracker(store_dir)
+    tracker.track_lead('l1')
+    tracker.track_conversion('l1', value=10.0)
+    tracker.track_event('demo_booked', 'l1')
+
+    # A second tracker sees everything the first acknowledged, without a flush
+    other = ConversionTracker(store_dir)
+    assert other.get_conversion_rate() == 1.0
+    assert [s['users'] for s in other.get_funnel(['lead', 'demo_booked'])['steps']] == [1, 1]
+    assert [s['users'] for s in other.get_funnel(['lead', 'conversion'])['steps']] == [1, 1]
+    other.close()
+    tracker.close()
+
+
+def test_compaction_waits_for_running_scans(store_dir):
+    store = EventStore(store_dir, buffer_rows=10, compact_after=100)
+    for batch in range(5):
+        store.append_many('visit', [f'u{batch}-{i}' for i in range(3)],
+                          [int(START.timestamp() * 1000) + batch * 1000 + i for i in range(3)])
+    scan = store.scan('visit')
+    first = next(scan)
+    store.compact('2025-01')
+    # The scan still reads the segments it listed before the compaction
+    rest = list(scan)
+    assert sum(len(chunk['user']) for chunk in [first] + rest) == 15
+    assert len(store.segments()) == 1
+    assert len(os.listdir(os.path.join(store_dir, 'events', '2025-01'))) == 1
+    store.close()
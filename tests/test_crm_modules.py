@@ -2,6 +2,7 @@
 Comprehensive test suite for CRM modules (contact service, deal service, email automation, CRM agent)
 """
 
+import asyncio
 import unittest
 import sys
 import os
@@ -16,7 +17,8 @@ sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
 
 from backend.crm_contact_service import CRMContactService
 from backend.crm_deal_service import CRMDealService
-from backend.crm_email_automation import CRMEmailAutomation
+from backend.crm_email_automation import CRMEmailAutomation, CampaignRenderer, FakeEmailBackend
+from backend.search import AdvancedSearch, CONTACT_FIELD_WEIGHTS
 
 
 class TestCRMContactService(unittest.TestCase):
@@ -274,6 +276,150 @@ class TestCRMEmailAutomation(unittest.TestCase):
         self.assertTrue(result)
 
 
+class TestCampaignRenderer(unittest.TestCase):
+    """Test cases for segment-templated campaign rendering"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.automation = CRMEmailAutomation()
+        self.backend = FakeEmailBackend(latency=0.01)
+        self.contacts = [
+            {"name": f"Contact {i}", "email": f"c{i}@example.com",
+             "country": "USA" if i % 2 else "Germany", "lifecycle_stage": "lead"}
+            for i in range(10)
+        ]
+    
+    def test_one_generation_per_segment(self):
+        """Contacts in the same segment share one LLM call"""
+        renderer = CampaignRenderer(self.automation, backend=self.backend)
+        emails = renderer.render(self.contacts, "welcome_lead")
+        
+        self.assertEqual(self.backend.calls, 2)
+        self.assertEqual([e["email"] for e in emails], [c["email"] for c in self.contacts])
+        for contact, email in zip(self.contacts, emails):
+            self.assertIn(contact["name"], email["body"])
+            self.assertNotIn("{name}", email["body"])
+    
+    def test_unique_contacts_and_cache(self):
+        """Contacts with notes get their own generation, and repeats hit the cache"""
+        self.contacts[0]["personalization_notes"] = "Asked about the API"
+        renderer = CampaignRenderer(self.automation, backend=self.backend, max_concurrency=2)
+        renderer.render(self.contacts, "welcome_lead")
+        self.assertEqual(self.backend.calls, 3)
+        self.assertLessEqual(self.backend.max_in_flight, 2)
+        
+        renderer.render(self.contacts, "welcome_lead")
+        self.assertEqual(self.backend.calls, 3)
+        self.assertEqual(renderer.stats["unique"], 2)
+    
+    def test_failed_generation_falls_back_to_template(self):
+        """A failing backend still yields filled-in template emails"""
+        class FailingBackend(FakeEmailBackend):
+            async def complete_json(self, system, prompt):
+                raise RuntimeError("API unavailable")
+        
+        renderer = CampaignRenderer(self.automation, backend=FailingBackend(latency=0))
+        emails = renderer.render(self.contacts[:2], "welcome_lead")
+        
+        self.assertEqual(renderer.stats["fallbacks"], 2)
+        self.assertIn("Contact 1", emails[1]["body"])
+
+    def test_campaign_steps_share_one_event_loop(self):
+        """A backend bound to its first event loop works for every step of a sequence"""
+        class LoopBoundBackend(FakeEmailBackend):
+            loop = None
+
+            async def complete_json(self, system, prompt):
+                loop = asyncio.get_running_loop()
+                if self.loop is None:
+                    self.loop = loop
+                elif self.loop is not loop:
+                    raise RuntimeError("Event loop is closed")
+                return await super().complete_json(system, prompt)
+
+        with patch.object(self.automation, "send_email"):
+            stats = self.automation.execute_campaign(
+                self.contacts, "lead_nurture", backend=LoopBoundBackend(latency=0))
+
+        self.assertGreater(stats["segments"], 2)
+        self.assertEqual(stats["fallbacks"], 0)
+
+    def test_render_inside_running_event_loop(self):
+        """render() also works when called from code already running a loop"""
+        renderer = CampaignRenderer(self.automation, backend=self.backend)
+
+        async def caller():
+            return renderer.render(self.contacts, "welcome_lead")
+
+        emails = asyncio.run(caller())
+        self.assertEqual(len(emails), len(self.contacts))
+        self.assertEqual(renderer.stats["fallbacks"], 0)
+
+
+class TestAdvancedSearch(unittest.TestCase):
+    """Test cases for AdvancedSearch"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.search = AdvancedSearch([
+            {"id": 1, "title": "AI roadmap", "content": "Planning the AI launch", "author": "John"},
+            {"id": 2, "title": "Launch checklist", "content": "AI launch tasks", "author": "Jane"},
+            {"id": 3, "title": "AI ethics", "content": "Notes on bias", "author": "John"},
+        ])
+    
+    def test_search_ranks_and_intersects_terms(self):
+        """Test multi-term queries match all terms and rank title hits first"""
+        results = self.search.search("ai launch")
+        
+        self.assertEqual(sorted(item["id"] for item in results), [1, 2])
+        self.assertEqual(self.search.search("launch")[0]["id"], 2)
+    
+    def test_search_with_filters_and_updates(self):
+        """Test filtered queries reflect index updates and removals"""
+        self.assertEqual([item["id"] for item in self.search.search("find AI from author John")], [1, 3])
+        
+        self.search.update_item({"id": 3, "title": "Ethics", "content": "Bias review", "author": "John"})
+        self.search.remove_item(1)
+        
+        self.assertEqual(self.search.search("ai", filters={"author": "john"}), [])
+        self.assertEqual([item["id"] for item in self.search.search("", filters={"author": "John"})], [3])
+    
+    def test_autocomplete_by_popularity(self):
+        """Test autocomplete returns most common values first and tracks removals"""
+        search = AdvancedSearch([
+            {"id": i, "name": name}
+            for i, name in enumerate(["Anna", "Andrew", "Andrew", "Bob", "Andrea", "Andrew"])
+        ], field_weights=CONTACT_FIELD_WEIGHTS)
+        
+        self.assertEqual(search.autocomplete("and", field="name", limit=2), ["Andrew", "Andrea"])
+        
+        search.remove_item(1)
+        search.remove_item(2)
+        search.remove_item(5)
+        search.add_item({"id": 6, "name": "Anna"})
+        
+        self.assertEqual(search.autocomplete("an", field="name"), ["Anna", "Andrea"])
+    
+    def test_contact_service_keeps_index_in_sync(self):
+        """Test that contact create/update/delete maintain the search index"""
+        store = {}
+        redis_client = MagicMock()
+        redis_client.set.side_effect = lambda key, value: store.__setitem__(key, value)
+        redis_client.get.side_effect = store.get
+        index = AdvancedSearch([], field_weights=CONTACT_FIELD_WEIGHTS)
+        service = CRMContactService(redis_client, search_index=index)
+        
+        contact = service.create_contact({"name": "Maria Lopez", "email": "maria@example.com"})
+        self.assertEqual(index.search("maria")[0]["id"], contact["id"])
+        
+        service.update_contact(contact["id"], {"name": "Maria Garcia"})
+        self.assertEqual(len(index.search("garcia")), 1)
+        self.assertEqual(index.search("lopez"), [])
+        
+        service.delete_contact(contact["id"])
+        self.assertEqual(len(index), 0)
+
+
 def run_tests():
     """Run all tests"""
     # Create test suite
@@ -284,6 +430,8 @@ def run_tests():
     suite.addTests(loader.loadTestsFromTestCase(TestCRMContactService))
     suite.addTests(loader.loadTestsFromTestCase(TestCRMDealService))
     suite.addTests(loader.loadTestsFromTestCase(TestCRMEmailAutomation))
+    suite.addTests(loader.loadTestsFromTestCase(TestCampaignRenderer))
+    suite.addTests(loader.loadTestsFromTestCase(TestAdvancedSearch))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)
@@ -0,0 +1,88 @@
+"""
+Test suite for the dashboard change feed.
+"""
+
+import pytest
+import sys
+import time
+from pathlib import Path
+
+# Add project root to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flowstate_ai.dashboard_feed import ChangeFeed, FileChangeSource, apply_patch, json_diff
+
+
+class RecordingEmitter:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, event, data, to=None):
+        self.calls.append((event, data, to))
+
+
+def test_diff_and_patch_round_trip():
+    """Test that applying a diff to the old document yields the new one."""
+    old = {
+        "ai_status": [{"id": "a", "progress": 10}, {"id": "b", "progress": 20}],
+        "system_stats": {"active_ais": 2, "a/b~c": 1},
+        "removed": True
+    }
+    new = {
+        "ai_status": [{"id": "a", "progress": 15}, {"id": "b", "progress": 20}],
+        "system_stats": {"active_ais": 1, "a/b~c": 2},
+        "added": [1, 2, 3]
+    }
+
+    ops = json_diff(old, new)
+
+    assert {"op": "replace", "path": "/ai_status/0/progress", "value": 15} in ops
+    assert {"op": "replace", "path": "/system_stats/a~1b~0c", "value": 2} in ops
+    assert {"op": "remove", "path": "/removed"} in ops
+    assert apply_patch(old, ops) == new
+
+
+def test_feed_emits_only_changes():
+    """Test that unchanged models are not emitted and versions increase per change."""
+    emitter = RecordingEmitter()
+    feed = ChangeFeed(emitter, patch_event="status_patch")
+
+    feed.publish("overview", {"active": 1, "tasks": [1, 2]})
+    assert feed.publish("overview", {"active": 1, "tasks": [1, 2]}) == []
+    feed.publish("overview", {"active": 2, "tasks": [1, 2]})
+
+    assert len(emitter.calls) == 2
+    event, data, room = emitter.calls[-1]
+    assert event == "status_patch"
+    assert room == "overview"
+    assert data["version"] == 2
+    assert data["ops"] == [{"op": "replace", "path": "/active", "value": 2}]
+    assert feed.stats["unchanged"] == 1
+
+    snapshots = []
+    feed.send_snapshot("overview", lambda event, data: snapshots.append(data))
+    assert snapshots == [{"room": "overview", "version": 2, "data": {"active": 2, "tasks": [1, 2]}}]
+
+
+def test_file_change_source_detects_writes(tmp_path):
+    """Test that a change to a watched file triggers the callback."""
+    changed = []
+    source = FileChangeSource([tmp_path], changed.append, poll_interval=0.05)
+    source.start()
+    try:
+        time.sleep(0.2)
+        (tmp_path / "agent_status.json").write_text('{"status": "ACTIVE"}')
+        (tmp_path / "notes.txt").write_text("ignored")
+
+        deadline = time.time() + 5
+        while not changed and time.time() < deadline:
+            time.sleep(0.05)
+    finally:
+        source.stop()
+
+    assert any(path.name == "agent_status.json" for path in changed)
+    assert all(path.suffix == ".json" for path in changed)
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
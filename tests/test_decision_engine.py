@@ -0,0 +1,159 @@
+import heapq
+import random
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from brain.decision_engine import (
+    DecisionEngine, DependencyCycleError, DependencyGraph, IndexedPriorityQueue, Task
+)
+
+
+class GreedyReference:
+    """The previous allocator: every cycle retries every pending task in priority order."""
+
+    def __init__(self, total_resources):
+        self.available = dict(total_resources)
+        self.pending = []
+        self.running = {}
+
+    def add_task(self, task_id, priority, requirements, sequence):
+        heapq.heappush(self.pending, (-priority, sequence, task_id, requirements))
+
+    def cycle(self):
+        started, kept = [], []
+        while self.pending:
+            entry = heapq.heappop(self.pending)
+            requirements = entry[3]
+            if all(self.available.get(r, 0) >= a for r, a in requirements.items()):
+                for r, a in requirements.items():
+                    self.available[r] -= a
+                self.running[entry[2]] = requirements
+                started.append(entry[2])
+            else:
+                kept.append(entry)
+        for entry in kept:
+            heapq.heappush(self.pending, entry)
+        return started
+
+    def complete(self, task_id):
+        for r, a in self.running.pop(task_id).items():
+            self.available[r] += a
+
+
+def test_allocation_matches_greedy_reference():
+    rng = random.Random(3)
+    resources = {f"res{i}": rng.randrange(2, 12) for i in range(20)}
+    engine = DecisionEngine(resources)
+    reference = GreedyReference(resources)
+
+    next_id = 0
+    for _ in range(60):
+        for _ in range(rng.randrange(0, 15)):
+            task_id = f"t{next_id}"
+            next_id += 1
+            requirements = {r: rng.randrange(1, 6) for r in rng.sample(sorted(resources), rng.randrange(1, 4))}
+            priority = rng.randrange(0, 5)
+            engine.add_task(task_id, "", priority, requirements)
+            reference.add_task(task_id, priority, requirements, engine.task_queue.get(task_id).sequence)
+
+        started = [task.task_id for task in engine.prioritize_and_allocate()]
+        assert started == reference.cycle()
+        assert engine.resource_pool.available_resources == reference.available
+
+        for task_id in rng.sample(sorted(engine.running_tasks), len(engine.running_tasks) // 3):
+            engine.complete_task(task_id)
+            reference.complete(task_id)
+
+    assert sorted(t.task_id for t in engine.task_queue) == sorted(e[2] for e in reference.pending)
+
+
+def test_reprioritize_and_cancel_pending_tasks():
+    engine = DecisionEngine({"cpu": 4})
+    engine.add_task("low", "", 1, {"cpu": 4})
+    engine.add_task("mid", "", 5, {"cpu": 4})
+    engine.add_task("gone", "", 9, {"cpu": 4})
+
+    assert engine.cancel_task("gone")
+    assert engine.update_priority("low", 10)
+    assert engine.task_queue.peek().task_id == "low"
+    assert [t.task_id for t in engine.prioritize_and_allocate()] == ["low"]
+
+    # "mid" waits for cpu; raising its priority while it waits is kept
+    assert engine.update_priority("mid", 7)
+    engine.add_task("new", "", 6, {"cpu": 4})
+    engine.complete_task("low")
+    assert [t.task_id for t in engine.prioritize_and_allocate()] == ["mid"]
+    assert not engine.cancel_task("mid")
+
+
+def test_indexed_queue_orders_by_priority_then_insertion():
+    rng = random.Random(8)
+    queue = IndexedPriorityQueue()
+    tasks = {f"t{i}": Task(f"t{i}", "", rng.randrange(10), {}) for i in range(200)}
+    for task in tasks.values():
+        queue.push(task)
+    for task_id in rng.sample(sorted(tasks), 50):
+        tasks[task_id].priority = rng.randrange(10)
+        queue.update(task_id)
+    for task_id in rng.sample(sorted(tasks), 30):
+        queue.remove(task_id)
+        del tasks[task_id]
+
+    popped = [queue.pop() for _ in range(len(queue))]
+    assert popped == sorted(tasks.values(), key=lambda t: (-t.priority, t.sequence))
+
+
+def test_dependency_graph_keeps_order_valid():
+    rng = random.Random(4)
+    graph = DependencyGraph()
+    nodes = [f"n{i}" for i in range(60)]
+    edges = set()
+    for _ in range(400):
+        task_id, prerequisite = rng.sample(nodes, 2)
+        if rng.random() < 0.2 and edges:
+            edge = rng.choice(sorted(edges))
+            graph.remove_dependency(*edge)
+            edges.discard(edge)
+            continue
+        try:
+            graph.add_dependency(task_id, prerequisite)
+            edges.add((task_id, prerequisite))
+        except DependencyCycleError:
+            pass
+        rank = {node: i for i, node in enumerate(graph.topological_order())}
+        assert all(rank[p] < rank[t] for t, p in edges)
+    assert all(graph.in_degree[n] == sum(1 for t, _ in edges if t == n) for n in graph.topological_order())
+
+    with pytest.raises(DependencyCycleError):
+        graph.add_dependency("a", "b")
+        graph.add_dependency("b", "a")
+    with pytest.raises(DependencyCycleError):
+        graph.add_dependency("self", "self")
+
+
+def test_analyze_dependencies_is_incremental_and_handles_cycles():
+    engine = DecisionEngine({"cpu": 1})
+    deps = {"a": [], "b": ["a"], "c": ["b"], "d": ["a", "c"]}
+    assert engine.analyze_task_dependencies(deps) == ["a", "b", "c", "d"]
+
+    deps["a"] = ["d"]
+    order = engine.analyze_task_dependencies(deps)
+    assert order == []
+
+    deps["a"] = []
+    deps["e"] = ["missing"]
+    del deps["c"]
+    deps["d"] = ["b"]
+    order = engine.analyze_task_dependencies(deps)
+    assert sorted(order) == ["a", "b", "d", "e"]
+    assert order.index("a") < order.index("b") < order.index("d")
+
+
+def test_self_dependency_is_a_cycle():
+    engine = DecisionEngine({"cpu": 1})
+    assert engine.analyze_task_dependencies({"a": ["a"], "b": ["a"]}) == []
+    assert DecisionEngine({"cpu": 1}).analyze_task_dependencies({"a": [], "b": ["a"], "c": ["c"]}) == ["a", "b"]
@@ -0,0 +1,126 @@
+import re
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture
+def make_tracker(tmp_path, monkeypatch):
+    # The module's singleton writes its log into the working directory
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, 'excepthook', sys.excepthook)
+    monkeypatch.setattr(threading, 'excepthook', threading.excepthook)
+    from flowstate_ai.error_tracking import ErrorTracker
+
+    trackers = []
+
+    def make(**kwargs):
+        tracker = ErrorTracker(log_file_path=str(tmp_path / f"errors{len(trackers)}.log"), **kwargs)
+        trackers.append(tracker)
+        return tracker
+
+    yield make
+    for tracker in trackers:
+        tracker.close()
+
+
+def read_log(tracker):
+    tracker.flush()
+    return Path(tracker.file_handler.baseFilename).read_text()
+
+
+def fail(value):
+    raise ValueError(f"bad value {value}")
+
+
+def other_failure():
+    raise ValueError("elsewhere")
+
+
+def capture(tracker, function, *args):
+    try:
+        function(*args)
+    except ValueError:
+        tracker.handle_exception(*sys.exc_info())
+
+
+def test_storm_is_logged_once_per_fingerprint(make_tracker):
+    tracker = make_tracker(window=60)
+    for i in range(500):
+        capture(tracker, fail, i)
+    capture(tracker, other_failure)
+
+    log = read_log(tracker)
+    assert log.count("Traceback (most recent call last):") == 2
+    assert "ValueError: bad value 0" in log and "bad value 1\n" not in log
+    assert 'raise ValueError(f"bad value {value}")' in log
+    fingerprints = re.findall(r"\[fingerprint (\w+)\]", log)
+    assert len(set(fingerprints)) == 2
+    assert re.search(r"Uncaught exception \[fingerprint \w+\] repeated 499 more times between", log)
+    assert "Dropped" not in log
+
+
+def test_new_window_logs_a_fresh_exemplar(make_tracker):
+    tracker = make_tracker(window=60)
+    capture(tracker, fail, 1)
+    tracker.flush()
+    capture(tracker, fail, 2)
+    log = read_log(tracker)
+    assert log.count("Traceback (most recent call last):") == 2
+    assert "repeated" not in log
+
+
+def test_drops_are_counted_under_back_pressure(make_tracker):
+    tracker = make_tracker(window=60, queue_size=10)
+    tracker.file_handler.acquire()
+    try:
+        # The writer blocks on the first exemplar, so the queue fills up
+        for i in range(200):
+            capture(tracker, fail, i)
+    finally:
+        tracker.file_handler.release()
+
+    log = read_log(tracker)
+    dropped = int(re.search(r"Dropped (\d+) error records", log).group(1))
+    repeated = int(re.search(r"repeated (\d+) more times", log).group(1))
+    assert dropped > 0
+    assert 1 + repeated + dropped == 200
+
+
+def test_thread_and_manual_errors(make_tracker):
+    tracker = make_tracker(window=60)
+    threading.excepthook = tracker.thread_exception_hook
+    thread = threading.Thread(target=fail, args=("in thread",))
+    thread.start()
+    thread.join()
+
+    try:
+        fail("manual")
+    except ValueError as e:
+        tracker.log_error(e, context="importing leads")
+
+    log = read_log(tracker)
+    assert f"Thread-{thread.ident} | Uncaught thread exception (Thread-{thread.ident})" in log
+    assert "ValueError: bad value in thread" in log
+    assert re.search(r"Manual error log: ValueError: bad value manual Context: importing leads "
+                     r"\[fingerprint \w+\]\n", log)
+
+
+def test_manual_errors_are_grouped_by_context_and_call_site(make_tracker):
+    tracker = make_tracker(window=60)
+    tracker.log_error(ValueError("card declined"), context="billing")
+    for _ in range(3):
+        tracker.log_error(ValueError("bad email"), context="lead import")
+    tracker.log_error(ValueError("bad email"), context="lead import")
+
+    log = read_log(tracker)
+    assert "Manual error log: ValueError: card declined Context: billing" in log
+    logged = re.findall(r"Manual error log: ValueError: bad email Context: lead import \[fingerprint (\w+)\]\n", log)
+    # One group for the loop, and one for the other line
+    assert len(logged) == 2 and logged[0] != logged[1]
+    assert re.search(rf"\[fingerprint {logged[0]}\] repeated 2 more times", log)
+    assert "repeated 1 more times" not in log
@@ -0,0 +1,141 @@
+import io
+import json
+import re
+import sqlite3
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip('fpdf')
+
+from flowstate_ai.exporter import DataExporter
+
+
+def rows(count):
+    for i in range(count):
+        yield {'id': i, 'name': f'Lead {i}', 'email': f'lead{i}@example.com', 'note': 'says "hi", then\nleaves' if i % 5 == 0 else None}
+
+
+class NullSink:
+    def __init__(self):
+        self.size = 0
+
+    def write(self, data):
+        self.size += len(data)
+
+
+def test_streamed_text_formats_match_whole_dataset_output():
+    data = list(rows(257))
+    exporter = DataExporter(data, chunk_size=10)
+    assert exporter.to_json() == json.dumps(data, indent=2)
+    assert [json.loads(line) for line in exporter.to_ndjson().splitlines()] == data
+    assert DataExporter(iter(data), chunk_size=64).to_csv() == exporter.to_csv()
+    assert DataExporter([]).to_json() == '[]'
+    assert DataExporter([]).to_csv() == ''
+
+
+def test_cursor_is_read_in_chunks():
+    conn = sqlite3.connect(':memory:')
+    conn.execute('CREATE TABLE leads (id INTEGER, name TEXT)')
+    conn.executemany('INSERT INTO leads VALUES (?, ?)', [(i, f'Lead {i}') for i in range(25)])
+    cursor = conn.execute('SELECT id, name FROM leads ORDER BY id')
+    exporter = DataExporter(cursor, chunk_size=10)
+    assert [len(chunk) for chunk in exporter.iter_chunks()] == [10, 10, 5]
+
+    cursor = conn.execute('SELECT id, name FROM leads ORDER BY id')
+    lines = DataExporter(cursor, chunk_size=10).to_csv().splitlines()
+    assert lines[0] == 'id,name' and lines[-1] == '24,Lead 24' and len(lines) == 26
+
+
+def test_pdf_is_flushed_page_by_page():
+    sink = io.BytesIO()
+    writes = []
+    sink.write = lambda data, write=sink.write: writes.append(len(data)) or write(data)
+    DataExporter(rows(300), chunk_size=50, width_sample_size=20).write_pdf(sink)
+    pdf = sink.getvalue()
+
+    pages = int(re.search(rb'/Count (\d+)', pdf).group(1))
+    assert pages > 5 and len(writes) >= pages
+    assert pdf.startswith(b'%PDF-') and pdf.rstrip().endswith(b'%%EOF')
+    # Every cross-reference entry points at its object
+    xref = int(re.search(rb'startxref\n(\d+)', pdf).group(1))
+    entries = pdf[xref:].split(b'\n')[3:3 + pages * 2 + 4]
+    for number, entry in enumerate(entries, 1):
+        offset = int(entry.split()[0])
+        assert pdf[offset:].startswith(b'%d 0 obj' % number)
+
+
+def test_memory_stays_flat_with_row_count():
+    def peak(count, export):
+        tracemalloc.start()
+        export(DataExporter(rows(count), chunk_size=500))
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak
+
+    def csv_to_sink(exporter):
+        sink = NullSink()
+        for piece in exporter.iter_csv():
+            sink.write(piece)
+
+    for export in (csv_to_sink, lambda exporter: exporter.write_pdf(NullSink())):
+        small, large = peak(2000, export), peak(20000, export)
+        assert large < small * 2
+
+
+def test_parquet_and_arrow_round_trip(tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+
+    data = [{'id': i, 'name': f'Lead {i}', 'score': i / 3} for i in range(1050)]
+    path = tmp_path / 'leads.parquet'
+    assert DataExporter(iter(data), chunk_size=500).write_parquet(str(path)) == 1050
+    parquet = pq.ParquetFile(str(path))
+    assert parquet.metadata.num_row_groups == 3
+    assert parquet.read().to_pylist() == data
+
+    sink = pa.BufferOutputStream()
+    DataExporter(data, chunk_size=500).write_arrow(sink)
+    assert pa.ipc.open_stream(sink.getvalue()).read_all().to_pylist() == data
+
+
+def test_arrow_schema_is_merged_over_the_sample(tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+
+    # 'note' is null in the first chunk, 'score' switches from int to float,
+    # and 'source' first appears in the second chunk
+    data = [{'id': i, 'note': None, 'score': 1} for i in range(10)]
+    data += [{'id': i, 'note': f'note {i}', 'score': 0.5, 'source': 'ads'} for i in range(10, 25)]
+    path = tmp_path / 'leads.parquet'
+    assert DataExporter(data, chunk_size=10).write_parquet(str(path)) == 25
+    table = pq.read_table(str(path))
+    assert table.schema.names == ['id', 'note', 'score', 'source']
+    assert table.schema.field('note').type == pa.string()
+    assert table.to_pylist() == [{'source': None, **row, 'score': float(row['score'])} for row in data]
+
+    # Columns only seen after the sample are reported instead of dropped
+    exporter = DataExporter(data, chunk_size=10, width_sample_size=10)
+    with pytest.raises(ValueError, match='source'):
+        exporter.write_arrow(pa.BufferOutputStream())
+
+
+def test_empty_export_writes_a_valid_file(tmp_path):
+    pa = pytest.importorskip('pyarrow')
+    import pyarrow.parquet as pq
+
+    path = tmp_path / 'empty.parquet'
+    assert DataExporter([]).write_parquet(str(path)) == 0
+    assert pq.read_table(str(path)).num_rows == 0
+
+    schema = pa.schema([('id', pa.int64()), ('name', pa.string())])
+    assert DataExporter([]).write_parquet(str(path), schema=schema) == 0
+    assert pq.read_table(str(path)).schema == schema
+
+    sink = pa.BufferOutputStream()
+    DataExporter([]).write_arrow(sink, schema=schema)
+    assert pa.ipc.open_stream(sink.getvalue()).read_all().schema == schema
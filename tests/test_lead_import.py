@@ -0,0 +1,128 @@
+import io
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+# backend/lead_generation.py shadows the lead_generation directory once backend/ is on the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'lead_generation'))
+
+from lead_capture import LeadCapture
+
+flask = pytest.importorskip('flask')
+pytest.importorskip('flask_sqlalchemy')
+
+from sqlalchemy.pool import StaticPool
+
+from backend.lead_generation import db, lead_gen, Lead, email_hash
+
+
+@pytest.fixture
+def app():
+    app = flask.Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    # One shared in-memory database for the request and the import thread
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'check_same_thread': False}, 'poolclass': StaticPool}
+    db.init_app(app)
+    app.register_blueprint(lead_gen)
+    with app.app_context():
+        db.create_all()
+    return app
+
+
+def wait_for_job(client, job_id):
+    for _ in range(500):
+        status = client.get(f'/api/leads/import/{job_id}').get_json()
+        if status['status'] in ('completed', 'failed'):
+            return status
+        time.sleep(0.01)
+    raise AssertionError('import did not finish')
+
+
+def test_csv_import_dedupes_and_reports_progress(app):
+    client = app.test_client()
+    assert client.post('/api/leads', json={'name': 'Existing', 'email': 'Ann@Example.com'}).status_code == 201
+
+    rows = ['name,email,phone', 'Ann,ann@example.com,', 'Bob,bob@example.com,+1 555 0100',
+            'Bob again,bobby@example.com,15550100', ',nobody@example.com,', 'Cy,not-an-email,']
+    rows += [f'User {i},user{i}@example.com,' for i in range(1200)]
+    response = client.post('/api/leads/import?format=csv', data='\n'.join(rows).encode(),
+                           content_type='text/csv')
+    assert response.status_code == 202
+
+    status = wait_for_job(client, response.get_json()['job_id'])
+    assert status['status'] == 'completed'
+    assert (status['rows_read'], status['imported'], status['duplicates'], status['invalid']) == (1205, 1201, 2, 2)
+    assert [e['row'] for e in status['errors']] == [5, 6]
+    with app.app_context():
+        assert Lead.query.count() == 1202
+        assert Lead.query.filter_by(email='user7@example.com').one().email_hash == email_hash('USER7@example.com')
+
+
+def test_over_long_fields_are_invalid_rows(app):
+    client = app.test_client()
+    rows = ['name,email,phone', f"{'N' * 101},long-name@example.com,", f"Long Email,{'e' * 110}@example.com,",
+            'Long Phone,phone@example.com,' + '1' * 21, 'Fits,fits@example.com,']
+    response = client.post('/api/leads/import?format=csv', data='\n'.join(rows).encode(),
+                           content_type='text/csv')
+
+    status = wait_for_job(client, response.get_json()['job_id'])
+    assert (status['status'], status['imported'], status['invalid']) == ('completed', 1, 3)
+    assert [sorted(e['error']) for e in status['errors']] == [['name'], ['email'], ['phone']]
+    assert client.post('/api/leads', json={'name': 'x' * 101, 'email': 'x@example.com'}).status_code == 400
+
+
+def test_ndjson_upload_fans_out_submissions(app):
+    submitted = []
+    app.config['LEAD_IMPORT_SUBMITTER'] = lambda leads: [submitted.append(l) or {'success': True} for l in leads]
+    client = app.test_client()
+    body = '\n'.join(json.dumps({'name': f'N{i}', 'email': f'n{i}@example.com'}) for i in range(3)) + '\nnot json\n'
+    response = client.post('/api/leads/import', data={'file': (io.BytesIO(body.encode()), 'leads.ndjson')},
+                           content_type='multipart/form-data')
+    status = wait_for_job(client, response.get_json()['job_id'])
+    assert (status['imported'], status['invalid'], status['submitted']) == (3, 1, 3)
+    assert [l['email'] for l in submitted] == ['n0@example.com', 'n1@example.com', 'n2@example.com']
+
+
+def test_lead_capture_submits_concurrently_with_bounded_parallelism():
+    active = []
+    peak = [0]
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_POST(self):
+            self.rfile.read(int(self.headers['Content-Length']))
+            with lock:
+                active.append(1)
+                peak[0] = max(peak[0], len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+            self.send_response(201)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f'http://127.0.0.1:{server.server_address[1]}/'
+    capture = LeadCapture({'crm_api': {'url': url}, 'email_marketing': {'url': url}}, max_workers=4)
+    try:
+        progress = []
+        leads = [{'name': f'L{i}', 'email': f'l{i}@example.com'} for i in range(20)]
+        results = capture.submit_many(leads, progress=progress.append)
+        assert all(r['success'] for r in results)
+        assert progress[-1] == 20
+        assert 1 < peak[0] <= 4
+    finally:
+        capture.close()
+        server.shutdown()
@@ -0,0 +1,92 @@
+import random
+import sys
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flowstate_ai.lead_scoring import LeadScorer
+from flowstate_ai.scoring.qualification_scoring import KeywordScoreTable, QualificationScorer, TITLE_SCORES
+
+TITLES = ['CEO', 'Co-Founder & CTO', 'Engineering Manager', 'Director of Engineering', 'Software Engineer',
+          'Intern', 'VP Sales', 'Assistant to the CEO', '']
+INDUSTRIES = ['Software', 'SaaS / Finance', 'Healthcare', 'Retail', 'Education Technology', '']
+
+
+def engagement_leads(count, seed=1):
+    rng = random.Random(seed)
+    metrics = [('email_open_rate', 1), ('click_through_rate', 1), ('website_visits', 20), ('time_on_site', 600)]
+    return [{name: rng.uniform(-0.5, 1.5) * scale for name, scale in metrics if rng.random() < 0.9}
+            for _ in range(count)]
+
+
+def qualification_leads(count, seed=2):
+    rng = random.Random(seed)
+    leads = []
+    for _ in range(count):
+        engagement = {k: rng.choice([0, 1, 3, 7, 12, 40])
+                      for k in ['visits', 'emails_sent', 'emails_opened', 'links_clicked'] if rng.random() < 0.9}
+        if rng.random() < 0.9:
+            engagement['time_spent_minutes'] = rng.uniform(0, 60)
+        profile = {}
+        if rng.random() < 0.9:
+            profile['job_title'] = rng.choice(TITLES)
+        if rng.random() < 0.9:
+            profile['company_size'] = rng.choice([0, 5, 10, 99, 100, 999, 1000, 5000])
+        if rng.random() < 0.9:
+            profile['industry'] = rng.choice(INDUSTRIES)
+        leads.append({'engagement_metrics': engagement, 'profile_data': profile})
+    return leads
+
+
+def test_lead_scorer_batch_matches_scalar():
+    scorer = LeadScorer()
+    leads = engagement_leads(5000)
+    expected = [scorer.score(lead) for lead in leads]
+    assert scorer.score_batch(leads).tolist() == expected
+
+    columns = {metric: np.array([lead.get(metric, 0) for lead in leads]) for metric in scorer.weights}
+    del columns['time_on_site']
+    expected = [scorer.score({k: v for k, v in lead.items() if k != 'time_on_site'}) for lead in leads]
+    assert scorer.score_batch(columns).tolist() == expected
+
+    custom = LeadScorer({'website_visits': 2.0, 'unknown_metric': 1.0})
+    assert custom.score_batch(leads).tolist() == [custom.score(lead) for lead in leads]
+
+    # Short decimal inputs often land on halfway cases, where np.round and round() differ
+    rng = random.Random(3)
+    halfway = [{'email_open_rate': 0.0055}] + [
+        {'email_open_rate': round(rng.random(), 4), 'website_visits': round(rng.random() * 20, 3)}
+        for _ in range(20000)
+    ]
+    assert scorer.score_batch(halfway).tolist() == [scorer.score(lead) for lead in halfway]
+
+
+def test_qualification_batch_matches_scalar():
+    scorer = QualificationScorer()
+    leads = qualification_leads(5000)
+    expected = [scorer.calculate_score(lead) for lead in leads]
+    assert scorer.score_batch(leads).tolist() == expected
+
+    dtype = [('visits', 'i8'), ('time_spent_minutes', 'f8'), ('emails_sent', 'i8'), ('emails_opened', 'i8'),
+             ('links_clicked', 'i8'), ('job_title', 'U40'), ('company_size', 'i8'), ('industry', 'U40')]
+    defaults = {'visits': 0, 'time_spent_minutes': 0.0, 'emails_sent': 0, 'emails_opened': 0,
+                'links_clicked': 0, 'job_title': '', 'company_size': 0, 'industry': ''}
+    rows = [tuple({**defaults, **lead['engagement_metrics'], **lead['profile_data']}[name] for name, _ in dtype)
+            for lead in leads]
+    assert scorer.score_batch(np.array(rows, dtype=dtype)).tolist() == expected
+
+    weighted = QualificationScorer({'engagement_score': 0.9, 'profile_score': 0.9})
+    assert weighted.score_batch(leads).tolist() == [weighted.calculate_score(lead) for lead in leads]
+
+
+def test_keyword_table_prefers_dictionary_order():
+    table = KeywordScoreTable(TITLE_SCORES, default=0.3)
+    # "engineer" appears first in the text, but "manager" comes first in the table
+    assert table.lookup('Engineering Manager') == 0.6
+    assert table.lookup('Assistant to the CEO') == 1.0
+    assert table.lookup('VP Sales') == 0.3
+    for title in TITLES + ['co-founder', 'intern engineer']:
+        expected = next((score for key, score in TITLE_SCORES.items() if key in title.lower()), 0.3)
+        assert table.lookup(title) == expected
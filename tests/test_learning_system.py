@@ -0,0 +1,100 @@
+import asyncio
+import random
+import sys
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from brain.learning_system import LearningSystem, summarize_experiences
+
+AGENTS = ['planner', 'coder', 'reviewer']
+TASK_TYPES = ['bugfix', 'feature', 'docs', None]
+ACTIONS = ['search', 'edit', 'test', 'ask_human']
+
+
+def random_experiences(count=600, seed=11):
+    rng = random.Random(seed)
+    experiences = []
+    for _ in range(count):
+        experience = {
+            'task_type': rng.choice(TASK_TYPES),
+            'action': rng.choice(ACTIONS),
+            'success': rng.random() < 0.6,
+            'feedback_score': round(rng.uniform(0, 5), 2)
+        }
+        if rng.random() < 0.8:
+            experience['duration'] = round(rng.uniform(0.1, 30), 3)
+        experiences.append((rng.choice(AGENTS), experience))
+    return experiences
+
+
+def record_all(system, experiences):
+    async def run():
+        for agent_id, experience in experiences:
+            await system.record_experience(agent_id, experience)
+    asyncio.run(run())
+
+
+def without_incremental_fields(patterns):
+    return {k: v for k, v in patterns.items() if k not in ('analysis_timestamp', 'pattern_stats')}
+
+
+def test_aggregates_match_batch_recomputation():
+    system = LearningSystem(MagicMock())
+    experiences = random_experiences()
+    record_all(system, experiences)
+
+    for agent_id in AGENTS + [None]:
+        patterns = asyncio.run(system.analyze_patterns(agent_id))
+        records = [e for aid, records in system.learning_data.items() if agent_id in (None, aid) for e in records]
+        assert without_incremental_fields(patterns) == summarize_experiences(records)
+
+    # Per-pattern averages and moving averages against a replay of the raw records
+    patterns = asyncio.run(system.analyze_patterns('coder'))
+    for row in patterns['pattern_stats']:
+        records = [e for e in system.learning_data['coder']
+                   if (e['task_type'], e['action_taken']) == (row['task_type'], row['action'])]
+        durations = [e['duration'] for e in records if e['duration'] is not None]
+        ewma = None
+        for e in records:
+            ewma = float(e['success']) if ewma is None else 0.1 * float(e['success']) + 0.9 * ewma
+        assert row['count'] == len(records)
+        assert row['avg_duration'] == pytest.approx(sum(durations) / len(durations))
+        assert row['ewma_success'] == pytest.approx(ewma)
+
+
+def test_insights_and_reset_use_aggregates():
+    system = LearningSystem(MagicMock())
+    record_all(system, random_experiences(200))
+    insights = asyncio.run(system.get_insights())
+    assert insights['total_experiences'] == 200
+    assert insights['total_agents_learning'] == 3
+
+    asyncio.run(system.reset_learning_data('coder'))
+    assert asyncio.run(system.get_insights())['total_agents_learning'] == 2
+    assert asyncio.run(system.analyze_patterns('coder'))['message'] == 'No experiences to analyze'
+
+
+def test_redis_script_matches_local_aggregates():
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')
+    client = fakeredis.FakeRedis()
+    system = LearningSystem(client, stream_maxlen=50)
+    record_all(system, random_experiences(300))
+
+    # A second process sees the same patterns through Redis alone
+    other = LearningSystem(client)
+    assert asyncio.run(other.load_aggregates()) == sum(len(p) for p in system.aggregates.values())
+    for agent_id in AGENTS + [None]:
+        expected = asyncio.run(system.analyze_patterns(agent_id))
+        loaded = asyncio.run(other.analyze_patterns(agent_id))
+        assert without_incremental_fields(loaded) == without_incremental_fields(expected)
+        by_pattern = {(row['task_type'], row['action']): row for row in loaded['pattern_stats']}
+        for row in expected['pattern_stats']:
+            assert by_pattern[(row['task_type'], row['action'])] == pytest.approx(row)
+
+    # The raw stream is capped
+    assert client.xlen('learning:experiences') < 300
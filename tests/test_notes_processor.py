@@ -0,0 +1,145 @@
+import gc
+import json
+import random
+import sqlite3
+import sys
+import weakref
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from brain.notes_processor import CategorizationCache, LeadNameIndex, NotesProcessor
+
+FIRST_NAMES = ['Anna', 'Anders', 'John', 'Johanne', 'Kari', 'Karl', 'Ola', 'Olav', 'Sara', 'Sander']
+LAST_NAMES = ['Hansen', 'Johansen', 'Olsen', 'Larsen', 'Andersen', 'Berg', 'Karlsen']
+
+
+class FakeChatClient:
+    """OpenAI-shaped client answering categorization requests, counting calls."""
+
+    def __init__(self, drop_index=None):
+        self.calls = 0
+        self.drop_index = drop_index
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, **kwargs):
+        self.calls += 1
+        content = messages[-1]['content']
+        notes = [part.split('\nNote: ', 1)[1] for part in content.split('\n\n') if '\nNote: ' in part]
+        analyses = [{'note_type': 'task', 'priority': 'high', 'summary': note, 'confidence': 0.9} for note in notes]
+        if 'results' in messages[0]['content']:
+            results = [dict(analysis, index=i) for i, analysis in enumerate(analyses, 1) if i != self.drop_index]
+            body = {'results': results}
+        else:
+            body = analyses[0]
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=json.dumps(body)))])
+
+
+def make_leads_db(count=300, seed=5):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE leads (id INTEGER PRIMARY KEY, name TEXT, email TEXT, phone TEXT, stage TEXT, pipeline TEXT)")
+    conn.executemany(
+        "INSERT INTO leads (name, email, phone, stage, pipeline) VALUES (?, ?, ?, ?, ?)",
+        [(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"lead{i}@example.com", None, 'new', 'default')
+         for i in range(count)]
+    )
+    return conn
+
+
+def like_matches(conn, name):
+    """The previous per-name LIKE query."""
+    return [row[0] for row in conn.execute("""
+        SELECT id FROM leads
+        WHERE name LIKE ? OR name LIKE ?
+        ORDER BY CASE WHEN name LIKE ? THEN 1 WHEN name LIKE ? THEN 2 ELSE 3 END, id
+        LIMIT 5
+    """, (f"{name}%", f"% {name}%", f"{name}%", f"% {name}%"))]
+
+
+def test_index_matches_like_query():
+    conn = make_leads_db()
+    processor = NotesProcessor(client=FakeChatClient())
+    for name in FIRST_NAMES + LAST_NAMES + ['Joh', 'Kar', 'Ols', 'Nobody']:
+        expected = like_matches(conn, name)
+        got = [match['id'] for match in processor.match_leads([name], conn)]
+        if expected:
+            assert got == expected, name
+        else:
+            assert all(match['match_type'] == 'fuzzy' for match in processor.match_leads([name], conn))
+
+
+def test_fuzzy_match_and_refresh():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE leads (id INTEGER PRIMARY KEY, name TEXT, email TEXT, stage TEXT)")
+    conn.execute("INSERT INTO leads (name, email, stage) VALUES ('Jonathan Berg', 'jb@example.com', 'new')")
+    index = LeadNameIndex(check_interval=0)
+    processor = NotesProcessor(client=FakeChatClient(), lead_index=index)
+
+    typo = processor.match_leads(['Jonahtan'], conn)
+    assert [(m['name'], m['match_type']) for m in typo] == [('Jonathan Berg', 'fuzzy')]
+    assert typo[0]['phone'] is None
+
+    conn.execute("INSERT INTO leads (name, email, stage) VALUES ('Ingrid Dahl', 'id@example.com', 'new')")
+    assert [m['name'] for m in processor.match_leads(['Ingrid'], conn)] == ['Ingrid Dahl']
+
+    index.upsert({'id': 99, 'name': 'Ingrid Lie'})
+    index.remove(1)
+    assert index.match('Jonathan') == []
+    assert [lead['name'] for lead, _ in index.match('Ingrid')] == ['Ingrid Dahl', 'Ingrid Lie']
+
+
+def test_batch_categorization_and_cache():
+    conn = make_leads_db(50)
+    client = FakeChatClient(drop_index=3)
+    processor = NotesProcessor(client=client, cache=CategorizationCache(), batch_size=10)
+    notes = [f"Call Kari Hansen about offer {i % 25} at 14:30" for i in range(50)]
+
+    results = processor.process_notes_batch(notes, conn)
+    # 25 distinct notes in 3 batches, plus one single call for each note left out of a batch response
+    assert client.calls == 3 + 3
+    assert [r['ai_analysis']['summary'] for r in results] == notes
+    assert all(r['note_type'] == 'task' and r['time_info']['time'] == '14:30' for r in results)
+    assert results[0]['lead_matches'] and results[0]['requires_disambiguation']
+
+    processor.process_notes_batch(notes, conn)
+    assert client.calls == 6
+    assert processor.process_note(notes[0], conn)['ai_analysis'] == results[0]['ai_analysis']
+    assert client.calls == 6
+
+
+def test_matches_reflect_updated_lead_fields():
+    conn = make_leads_db(0)
+    conn.execute("INSERT INTO leads (name, email, stage, pipeline) VALUES ('Kari Hansen', 'kh@example.com', 'new', 'sales')")
+    processor = NotesProcessor(client=FakeChatClient(), lead_index=LeadNameIndex(check_interval=3600))
+    assert processor.match_leads(['Kari'], conn)[0]['stage'] == 'new'
+
+    conn.execute("UPDATE leads SET stage = 'won', email = 'kari@example.com' WHERE id = 1")
+    match = processor.match_leads(['Kari'], conn)[0]
+    assert (match['stage'], match['email']) == ('won', 'kari@example.com')
+
+    # A rename to a name of the same length is picked up for matched leads
+    conn.execute("UPDATE leads SET name = 'Kari Hanson' WHERE id = 1")
+    assert [m['name'] for m in processor.match_leads(['Kari'], conn)] == ['Kari Hanson']
+    conn.execute("UPDATE leads SET name = 'Sara Hanson' WHERE id = 1")
+    assert processor.match_leads(['Kari'], conn) == []
+    assert [m['id'] for m in processor.match_leads(['Sara'], conn)] == [1]
+
+
+def test_in_memory_indexes_belong_to_their_connection():
+    processor = NotesProcessor(client=FakeChatClient())
+    first = make_leads_db(20)
+    index = processor.lead_index_for(first)
+    assert processor.lead_index_for(first) is index
+
+    second = make_leads_db(0)
+    assert processor.lead_index_for(second) is not index
+    assert processor.match_leads(['Kari'], second) == []
+
+    ref = weakref.ref(index)
+    del index
+    first.close()
+    del first
+    gc.collect()
+    assert ref() is None
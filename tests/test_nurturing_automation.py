@@ -0,0 +1,175 @@
+"""
+Tests for the nurturing dispatcher: pooled SMTP sessions against a local
+aiosmtpd server, token-bucket SMS sending to a local sink and the step scheduler.
+"""
+
+import json
+import socket
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from nurturing_automation.automation import (
+    EmailSender, NurturingAutomation, SMSSender, StepScheduler, TokenBucket
+)
+
+aiosmtpd_controller = pytest.importorskip('aiosmtpd.controller')
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+class RecordingHandler:
+    def __init__(self):
+        self.messages = []
+        self.sessions = set()
+
+    async def handle_DATA(self, server, session, envelope):
+        self.sessions.add(id(session))
+        self.messages.append((envelope.rcpt_tos, envelope.content))
+        return '250 OK'
+
+
+@pytest.fixture
+def smtp_server():
+    handler = RecordingHandler()
+    controller = aiosmtpd_controller.Controller(handler, hostname='127.0.0.1', port=free_port())
+    controller.start()
+    yield controller, handler
+    controller.stop()
+
+
+@pytest.fixture
+def sms_sink():
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            body = self.rfile.read(int(self.headers['Content-Length']))
+            received.append((time.monotonic(), json.loads(body)))
+            self.send_response(200)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f'http://127.0.0.1:{server.server_address[1]}/api/send', received
+    server.shutdown()
+    server.server_close()
+
+
+def test_email_sessions_are_reused(smtp_server):
+    controller, handler = smtp_server
+    sender = EmailSender(controller.hostname, controller.port, user='no-reply@flowstate-ai.com',
+                         password=None, pool_size=2, use_tls=False)
+    for i in range(10):
+        sender.send_email(f'user{i}@example.com', 'Hello', '<p>Hi</p>')
+    sender.close()
+
+    assert len(handler.messages) == 10
+    assert sender.pool.stats['connections_opened'] == 1
+    assert len(handler.sessions) == 1
+
+
+def test_email_reconnects_after_lost_session(smtp_server):
+    controller, handler = smtp_server
+    sender = EmailSender(controller.hostname, controller.port, user='no-reply@flowstate-ai.com',
+                         password=None, pool_size=1, use_tls=False)
+    sender.send_email('a@example.com', 'Hello', '<p>Hi</p>')
+    # Drop the pooled session behind the pool's back
+    sender.pool._idle.queue[0].server.sock.shutdown(socket.SHUT_RDWR)
+    sender.send_email('b@example.com', 'Hello', '<p>Hi</p>')
+    sender.close()
+
+    assert [rcpt for rcpt, _ in handler.messages] == [['a@example.com'], ['b@example.com']]
+    assert sender.pool.stats['reconnects'] == 1
+
+
+def test_token_bucket_reserves_future_slots():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == 0
+    assert bucket.reserve() == pytest.approx(0.1, abs=0.01)
+    assert bucket.reserve() == pytest.approx(0.2, abs=0.01)
+
+
+def test_sms_campaign_is_rate_limited(sms_sink):
+    url, received = sms_sink
+    automation = NurturingAutomation(None, SMSSender(url, 'key', rate_per_second=20, burst=5),
+                                     StepScheduler(workers=4))
+    numbers = [f'+1555000{i:04d}' for i in range(25)]
+    start = time.monotonic()
+    automation.send_sms_campaign(numbers, 'Hi there')
+    assert automation.wait_until_idle(timeout=10)
+    automation.scheduler.stop()
+
+    assert sorted(payload['to'] for _, payload in received) == numbers
+    # 5 sent as a burst, the other 20 at 20/s
+    assert received[-1][0] - start >= 0.9
+
+
+def test_sequences_share_one_scheduler(smtp_server):
+    controller, handler = smtp_server
+    sender = EmailSender(controller.hostname, controller.port, user='no-reply@flowstate-ai.com',
+                         password=None, pool_size=2, use_tls=False)
+    automation = NurturingAutomation(sender, None, StepScheduler(workers=2))
+    sequence = [
+        {'subject': 'Step 1', 'html_content': '<p>1</p>', 'delay_seconds': 0.2},
+        {'subject': 'Step 2', 'html_content': '<p>2</p>'}
+    ]
+    threads_before = threading.active_count()
+    for i in range(20):
+        automation.send_email_sequence(f'user{i}@example.com', sequence)
+    # A scheduler thread plus at most two workers, not a thread per sequence
+    assert threading.active_count() - threads_before <= 3
+    assert automation.wait_until_idle(timeout=10)
+    automation.shutdown()
+
+    assert len(handler.messages) == 40
+    subjects = [content.decode() for rcpt, content in handler.messages if rcpt == ['user0@example.com']]
+    assert 'Step 1' in subjects[0] and 'Step 2' in subjects[1]
+
+
+def test_stop_while_a_sequence_step_is_running():
+    class SlowSender:
+        rate_limiter = None
+
+        def __init__(self):
+            self.sent = []
+            self.started = threading.Event()
+
+        def _deliver(self, to_email, subject, html_content, text_content=None):
+            self.started.set()
+            time.sleep(0.2)
+            self.sent.append(subject)
+
+    sender = SlowSender()
+    scheduler = StepScheduler(workers=2)
+    automation = NurturingAutomation(sender, None, scheduler)
+    automation.send_email_sequence('a@example.com', [
+        {'subject': 'Step 1', 'html_content': '', 'delay_seconds': 0},
+        {'subject': 'Step 2', 'html_content': ''},
+    ])
+    scheduler.schedule(lambda: sender.sent.append('later'), delay=0.1)
+    assert sender.started.wait(5)
+
+    scheduler.stop()
+    assert sender.sent == ['Step 1']
+    # The follow-up of the running step and the not-yet-due step are dropped
+    time.sleep(0.3)
+    assert sender.sent == ['Step 1']
+    assert not any(thread.name == 'nurture-scheduler' for thread in threading.enumerate())
+    assert scheduler.wait_idle()
+    assert scheduler.schedule(lambda: None) is False
@@ -0,0 +1,160 @@
+"""
+Tests for the polling hub against a local HTTP server that counts requests,
+304 answers and connections.
+"""
+
+import asyncio
+import hashlib
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import aiohttp
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from flowstate_ai.polling_system import PollingHub, PollingSystem
+
+
+class FeedServer:
+    """Serves /<name> JSON feeds with optional ETag or Last-Modified validators."""
+
+    def __init__(self):
+        self.feeds = {}
+        self.requests = 0
+        self.not_modified = 0
+        self.connections = 0
+        self.lock = threading.Lock()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                with server.lock:
+                    server.connections += 1
+
+            def do_GET(self):
+                name = self.path.lstrip('/')
+                with server.lock:
+                    server.requests += 1
+                    body, validator = server.feeds[name]
+                payload = json.dumps(body).encode()
+                etag = '"%s"' % hashlib.md5(payload).hexdigest()
+                modified = 'Wed, 01 Jan 2025 00:00:%02d GMT' % (len(payload) % 60)
+                if (validator == 'etag' and self.headers.get('If-None-Match') == etag) or \
+                        (validator == 'last-modified' and self.headers.get('If-Modified-Since') == modified):
+                    with server.lock:
+                        server.not_modified += 1
+                    self.send_response(304)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(payload)))
+                if validator == 'etag':
+                    self.send_header('ETag', etag)
+                elif validator == 'last-modified':
+                    self.send_header('Last-Modified', modified)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.httpd.server_address[1]}'
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def feed_server():
+    server = FeedServer()
+    yield server
+    server.close()
+
+
+def poll(hub, sources, rounds):
+    async def run():
+        async with aiohttp.ClientSession() as session:
+            return [[await hub.poll_once(session, source) for source in sources] for _ in range(rounds)]
+    return asyncio.run(run())
+
+
+def test_conditional_requests_and_hash_detection(feed_server):
+    feed_server.feeds = {'etag': ({'v': 1}, 'etag'), 'modified': ({'v': 1}, 'last-modified'), 'plain': ({'v': 1}, None)}
+    received = []
+    hub = PollingHub()
+    sources = [hub.add_source(f'{feed_server.url}/{name}', lambda data, name=name: received.append((name, data)), 1)
+               for name in ('etag', 'modified', 'plain')]
+
+    assert poll(hub, sources, 3) == [[True, True, True]] + [[False, False, False]] * 2
+    assert feed_server.not_modified == 4
+    # Without validators the body comes back, but an equal hash is not a change
+    assert sources[2].stats == {'requests': 3, 'not_modified': 0, 'unchanged': 2, 'changes': 1, 'errors': 0}
+    assert sorted(received) == [('etag', {'v': 1}), ('modified', {'v': 1}), ('plain', {'v': 1})]
+
+    feed_server.feeds['etag'] = ({'v': 2}, 'etag')
+    feed_server.feeds['plain'] = ({'v': 2}, None)
+    assert poll(hub, sources, 1) == [[True, False, True]]
+    assert ('etag', {'v': 2}) in received and ('plain', {'v': 2}) in received
+
+
+def test_interval_backs_off_when_idle_and_tightens_on_change(feed_server):
+    feed_server.feeds = {'feed': ({'v': 1}, 'etag')}
+    hub = PollingHub()
+    source = hub.add_source(f'{feed_server.url}/feed', lambda data: None, 1, max_interval=10)
+
+    intervals = []
+    for _ in range(6):
+        poll(hub, [source], 1)
+        intervals.append(source.interval)
+    assert intervals == [1, 2, 4, 8, 10, 10]
+
+    feed_server.feeds['feed'] = ({'v': 2}, 'etag')
+    poll(hub, [source], 1)
+    assert source.interval == 1
+
+
+def test_many_sources_share_one_loop_and_connections(feed_server):
+    feed_server.feeds = {f'feed{i}': ({'v': i}, 'etag') for i in range(30)}
+    hub = PollingHub(max_concurrency=4)
+    changes = []
+    for i in range(30):
+        hub.add_source(f'{feed_server.url}/feed{i}', changes.append, 0.05, max_interval=0.2)
+
+    hub.start()
+    time.sleep(1.0)
+    hub.stop()
+
+    assert sorted(change['v'] for change in changes) == list(range(30))
+    assert feed_server.requests > 90
+    assert feed_server.not_modified == feed_server.requests - 30
+    # Keep-alive: requests are spread over a handful of connections
+    assert feed_server.connections <= 8
+    # Idle sources backed off to the maximum interval
+    assert all(source.interval == 0.2 for source in hub.sources)
+
+
+def test_polling_system_keeps_its_interface(feed_server):
+    feed_server.feeds = {'feed': ({'v': 1}, None)}
+    received = []
+    poller = PollingSystem(0.05, f'{feed_server.url}/feed', received.append)
+    poller.start()
+    time.sleep(0.3)
+    feed_server.feeds['feed'] = ({'v': 2}, None)
+    deadline = time.monotonic() + 3
+    while len(received) < 2 and time.monotonic() < deadline:
+        time.sleep(0.05)
+    poller.stop()
+    assert received == [{'v': 1}, {'v': 2}]
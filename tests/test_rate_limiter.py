@@ -0,0 +1,129 @@
+"""
+Test suite for the backend rate limiter middleware.
+"""
+
+import pytest
+import sys
+import uuid
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from middleware.rate_limiter import InMemoryRateLimitBackend, RateLimitPolicy, RateLimiterMiddleware
+
+
+def test_gcra_allows_burst_then_spaces_requests():
+    """Test that a client gets `limit` requests at once, then one per emission interval."""
+    backend = InMemoryRateLimitBackend()
+    policy = RateLimitPolicy(limit=3, period_seconds=3)
+
+    results = [backend.hit_sync("ip:1", policy, now=100.0) for _ in range(4)]
+    assert [r.allowed for r in results] == [True, True, True, False]
+    assert [r.remaining for r in results[:3]] == [2, 1, 0]
+    assert results[3].retry_after == pytest.approx(1.0)
+
+    assert backend.hit_sync("ip:1", policy, now=101.0).allowed
+    assert backend.hit_sync("ip:2", policy, now=101.0).allowed
+
+
+def test_idle_clients_are_evicted():
+    """Test that fully recovered clients no longer hold state."""
+    backend = InMemoryRateLimitBackend(num_shards=1, eviction_interval=1.0)
+    policy = RateLimitPolicy(limit=10, period_seconds=10)
+
+    for i in range(100):
+        backend.hit_sync(f"ip:{i}", policy, now=0.0)
+    assert len(backend) == 100
+
+    backend.hit_sync("ip:new", policy, now=backend._next_eviction + 5)
+    assert len(backend) == 1
+
+
+@pytest.fixture
+def client():
+    """Create an app with default, per-route and per-API-key policies."""
+    app = FastAPI()
+
+    @app.get("/api/items")
+    async def items():
+        return {"ok": True}
+
+    @app.post("/api/login")
+    async def login():
+        return {"ok": True}
+
+    app.add_middleware(
+        RateLimiterMiddleware,
+        max_requests=5,
+        window_seconds=60,
+        route_policies={"/api/login": RateLimitPolicy(2, 60)},
+        api_key_policies={"partner": RateLimitPolicy(50, 60)}
+    )
+    return TestClient(app)
+
+
+def test_route_policy_has_its_own_bucket(client):
+    """Test that a stricter route policy returns 429 without consuming the default bucket."""
+    assert client.post("/api/login").status_code == 200
+    assert client.post("/api/login").status_code == 200
+
+    response = client.post("/api/login")
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+
+    response = client.get("/api/items")
+    assert response.status_code == 200
+    assert response.headers["X-RateLimit-Remaining"] == "4"
+
+
+def test_api_key_policy(client):
+    """Test that API keys are limited by key with their own policy."""
+    for _ in range(10):
+        response = client.get("/api/items", headers={"X-API-Key": "partner"})
+        assert response.status_code == 200
+    assert response.headers["X-RateLimit-Limit"] == "50"
+
+
+def test_unknown_api_keys_share_the_ip_bucket():
+    """Test that sending a fresh random key per request does not escape per-IP limiting."""
+    app = FastAPI()
+
+    @app.get("/api/items")
+    async def items():
+        return {"ok": True}
+
+    backend = InMemoryRateLimitBackend()
+    app.add_middleware(RateLimiterMiddleware, max_requests=5, window_seconds=60, backend=backend,
+                       api_key_policies={"partner": RateLimitPolicy(50, 60)})
+    client = TestClient(app)
+    statuses = [
+        client.get("/api/items", headers={"X-API-Key": uuid.uuid4().hex}).status_code
+        for _ in range(6)
+    ]
+    assert statuses == [200] * 5 + [429]
+    assert len(backend) == 1
+    assert client.get("/api/items", headers={"X-API-Key": "partner"}).status_code == 200
+
+
+def test_validated_api_keys_get_their_own_bucket():
+    """Test that keys accepted by the validator are limited per key."""
+    app = FastAPI()
+
+    @app.get("/api/items")
+    async def items():
+        return {"ok": True}
+
+    app.add_middleware(RateLimiterMiddleware, max_requests=2, window_seconds=60,
+                       api_key_validator=lambda key: key.startswith("valid-"))
+    client = TestClient(app)
+    for key in ("valid-a", "valid-b"):
+        assert [client.get("/api/items", headers={"X-API-Key": key}).status_code for _ in range(3)] == [200, 200, 429]
+    assert client.get("/api/items").status_code == 200
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])
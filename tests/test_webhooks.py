@@ -0,0 +1,154 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
+
+from webhooks import WebhookDispatcher, WebhookOutbox, CircuitBreaker, DELIVERED, DEAD
+
+
+class StubServer:
+    """Local HTTP endpoint answering with a scripted sequence of status codes."""
+
+    def __init__(self, statuses=None):
+        self.statuses = list(statuses or [])
+        self.requests = []
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers['Content-Length']))
+                stub.requests.append((dict(self.headers), json.loads(body)))
+                status = stub.statuses.pop(0) if stub.statuses else 200
+                self.send_response(status)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/hook'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+@pytest.fixture
+def outbox():
+    with tempfile.TemporaryDirectory() as tmp:
+        box = WebhookOutbox(os.path.join(tmp, 'outbox.db'))
+        yield box
+        box.close()
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
+
+
+def test_outbox_survives_restart_and_requeues_in_flight():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'outbox.db')
+        box = WebhookOutbox(path)
+        box.enqueue([('http://a/hook', 'deal.created', '{"id": 1}'), ('http://b/hook', 'deal.created', '{"id": 1}')])
+        assert len(box.claim_due(1)) == 1
+        box.close()
+
+        reopened = WebhookOutbox(path)
+        assert reopened.stats() == {'pending': 2}
+        reopened.close()
+
+
+def test_delivers_retries_and_dead_letters(outbox, stub):
+    stub.statuses = [503, 200, 404]
+    outbox.enqueue([(stub.url, 'deal.created', '{"id": 1}')])
+    dispatcher = WebhookDispatcher(outbox, workers=2, base_delay=0.01, poll_interval=0.05)
+    dispatcher.start()
+    try:
+        assert wait_for(lambda: outbox.stats().get(DELIVERED) == 1)
+        headers, body = stub.requests[-1]
+        assert body == {'id': 1}
+        assert headers['X-FlowstateAI-Event'] == 'deal.created'
+        assert len(stub.requests) == 2
+
+        # A 404 is permanent, so it is not retried
+        outbox.enqueue([(stub.url, 'deal.deleted', '{"id": 2}')])
+        dispatcher.notify()
+        assert wait_for(lambda: outbox.stats().get(DEAD) == 1)
+        assert len(stub.requests) == 3
+    finally:
+        dispatcher.stop()
+
+
+def test_batches_events_per_endpoint(outbox, stub):
+    outbox.enqueue([(stub.url, 'contact.updated', json.dumps({'id': i})) for i in range(5)])
+    dispatcher = WebhookDispatcher(outbox, workers=1, batch_size=10, poll_interval=0.05)
+    dispatcher.start()
+    try:
+        assert wait_for(lambda: outbox.stats().get(DELIVERED) == 5)
+    finally:
+        dispatcher.stop()
+    assert len(stub.requests) == 1
+    headers, body = stub.requests[0]
+    assert headers['X-FlowstateAI-Batch'] == '5'
+    assert [event['payload']['id'] for event in body['events']] == list(range(5))
+
+
+def test_purge_removes_only_expired_finished_rows(outbox):
+    outbox.enqueue([('http://example.com/hook', 'deal.created', '{}')] * 6)
+    rows = outbox.claim_due(6)
+    ids = [row['id'] for row in rows]
+    outbox.mark_delivered(ids[:2])
+    outbox.mark_dead(ids[2:4], 'HTTP 404')
+    outbox.reschedule(ids[4:], time.time(), 'HTTP 503')
+
+    assert outbox.purge(older_than=3600) == 0
+    assert outbox.purge(older_than=3600, now=time.time() + 7200, batch_size=1) == 4
+    assert outbox.stats() == {'pending': 2}
+
+
+def test_dispatcher_purges_delivered_rows(outbox, stub):
+    outbox.enqueue([(stub.url, 'deal.created', '{"id": 1}')])
+    dispatcher = WebhookDispatcher(outbox, workers=1, poll_interval=0.05,
+                                   retention_seconds=0, purge_interval=0.05)
+    dispatcher.start()
+    try:
+        assert wait_for(lambda: dispatcher.get_metrics()['purged'] == 1)
+    finally:
+        dispatcher.stop()
+    assert len(stub.requests) == 1
+    assert outbox.stats() == {}
+
+
+def test_circuit_breaker_opens_and_half_opens():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+    breaker.record_failure(0)
+    assert breaker.allow(1)
+    breaker.record_failure(1)
+    assert not breaker.allow(5)
+    assert breaker.allow(11)
+    assert not breaker.allow(12)
+    breaker.record_success()
+    assert breaker.allow(12)
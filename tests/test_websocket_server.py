@@ -0,0 +1,110 @@
+"""
+Test suite for the backend websocket ConnectionManager.
+"""
+
+import asyncio
+import json
+import pytest
+import sys
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "backend"))
+
+from websocket_server import (
+    ConnectionManager,
+    SLOW_CONSUMER_COALESCE,
+    SLOW_CONSUMER_DISCONNECT,
+    SLOW_CONSUMER_DROP
+)
+
+
+class FakeWebSocket:
+    """Records sent messages; optionally blocks sends until released."""
+
+    def __init__(self, blocked=False):
+        self.sent = []
+        self.closed_code = None
+        self.release = asyncio.Event()
+        if not blocked:
+            self.release.set()
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, message):
+        await self.release.wait()
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.closed_code = code
+
+
+def test_broadcast_targets_topics_and_serializes_once():
+    """Test that topic broadcasts only reach subscribers."""
+    async def scenario():
+        manager = ConnectionManager()
+        everyone, pipeline_fan = FakeWebSocket(), FakeWebSocket()
+        await manager.connect(everyone)
+        await manager.connect(pipeline_fan, topics=["pipeline:7"])
+
+        assert await manager.broadcast({"type": "pipeline_update", "id": 7}, topics=["pipeline:7"]) == 1
+        assert await manager.broadcast("hello") == 2
+        await asyncio.sleep(0)
+
+        assert everyone.sent == ["hello"]
+        assert pipeline_fan.sent == [json.dumps({"type": "pipeline_update", "id": 7}), "hello"]
+
+    asyncio.run(scenario())
+
+
+def test_slow_client_does_not_delay_others():
+    """Test that a blocked client only backs up its own bounded queue."""
+    async def scenario():
+        manager = ConnectionManager(max_queue=3, slow_consumer_policy=SLOW_CONSUMER_DROP)
+        slow, fast = FakeWebSocket(blocked=True), FakeWebSocket()
+        await manager.connect(slow)
+        await manager.connect(fast)
+
+        for i in range(10):
+            await manager.broadcast(f"m{i}")
+            await asyncio.sleep(0)
+
+        assert fast.sent == [f"m{i}" for i in range(10)]
+        slow.release.set()
+        await asyncio.sleep(0.01)
+        # The writer was stuck sending m0; its queue kept the 3 newest
+        assert slow.sent == ["m0", "m7", "m8", "m9"]
+        assert manager.connections[slow].dropped == 6
+
+    asyncio.run(scenario())
+
+
+def test_coalesce_and_disconnect_policies():
+    """Test that keyed messages replace pending ones and overflowing clients are closed."""
+    async def scenario():
+        coalescing = ConnectionManager(max_queue=10, slow_consumer_policy=SLOW_CONSUMER_COALESCE)
+        ws = FakeWebSocket(blocked=True)
+        await coalescing.connect(ws)
+        await coalescing.broadcast("first")
+        await asyncio.sleep(0)
+        for progress in (10, 20, 30):
+            await coalescing.broadcast(f"pipeline 1 at {progress}", key="pipeline:1")
+        ws.release.set()
+        await asyncio.sleep(0.01)
+        assert ws.sent == ["first", "pipeline 1 at 30"]
+
+        strict = ConnectionManager(max_queue=2, slow_consumer_policy=SLOW_CONSUMER_DISCONNECT)
+        stuck = FakeWebSocket(blocked=True)
+        await strict.connect(stuck)
+        for i in range(4):
+            await strict.broadcast(f"m{i}")
+        await asyncio.sleep(0.01)
+        assert stuck.closed_code == 1013
+        assert stuck not in strict.connections
+
+    asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    pytest.main([__file__, '-v'])